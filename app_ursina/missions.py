@@ -14,7 +14,7 @@ from app_ursina.geometry import hex_to_color, linspace
 from core.export import export_csv
 from core.flight_plan import FlightPlan
 from core.lambert import MU_SUN, LambertNoConvergence, solve_lambert
-from core.mission_planner import Objective
+from core.mission_planner import DEFAULT_REFINE_BASINS, Objective
 from core.missions import HistoricalMission
 from core.physics import G, circular_orbit_velocity
 from core.propagator import DEFAULT_DT_MAX
@@ -272,7 +272,8 @@ class MissionMixin:
             solution = self.planner.plan_transfer(
                 origin=origin, target=target,
                 departure_times=departures, flight_times=flights,
-                objective=Objective.MIN_DELTA_V)
+                objective=Objective.MIN_DELTA_V,
+                refine=DEFAULT_REFINE_BASINS)
         except LambertNoConvergence:
             self.mission_label = f"no {origin}->{target} window found"
             self.refresh_hud()
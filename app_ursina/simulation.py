@@ -35,6 +35,7 @@ Conventions:
 from __future__ import annotations
 from datetime import datetime, timedelta
 from math import cos, sin
+import numpy as np
 from ursina import (AmbientLight,
                     Entity,
                     Mesh,
@@ -50,11 +51,12 @@ from jplephem.spk import SPK
 from config import EPHEMERIS_FILE, ORBIT_SAMPLES, simulation_steps
 from core.bodies import CelestialBody, load_bodies_from_json
 from core.ephemeris import JplEphemeris
+from core.interpolated_ephemeris import InterpolatedEphemeris
 from core.lambert import MU_SUN
 from core.mission_planner import MissionPlanner
 from core.missions import HistoricalMission, load_missions
 from core.physics import circular_orbit_velocity
-from core.propagator import advance_coasting
+from core.propagator import advance_coasting, sync_bodies
 from core.spaceship import Spaceship
 from core.time import convert_to_julian_date
 from core.vec3 import Vec3
@@ -79,6 +81,9 @@ class SolaraApp(MissionMixin, HudMixin, MenuMixin, Entity):
                  epoch: datetime) -> None:
         super().__init__()
         self.ephemeris: JplEphemeris = ephemeris
+        # Sub-step resyncs during historical replays read lazily built
+        # Hermite tables instead of the kernel (see core.interpolated_ephemeris).
+        self.coasting_ephemeris: InterpolatedEphemeris = InterpolatedEphemeris(source=ephemeris)
         self.bodies: dict[str, CelestialBody] = bodies
         self.epoch: datetime = epoch
         self.sim_time_s: float = 0.0
@@ -258,7 +263,7 @@ class SolaraApp(MissionMixin, HudMixin, MenuMixin, Entity):
                             dt_s: float) -> None:
         """Coast a real craft forward under full N-body gravity (adaptive)."""
         advance_coasting(ship=self.sim_ship,
-                         ephemeris=self.ephemeris,
+                         ephemeris=self.coasting_ephemeris,
                          bodies=self.bodies,
                          time_s=self.sim_time_s,
                          dt_s=dt_s)
@@ -287,11 +292,9 @@ class SolaraApp(MissionMixin, HudMixin, MenuMixin, Entity):
                 chunk = 86400.0             # cruise: daily
             step: float = min(chunk, remaining)
             self.sim_time_s += step
-            for name, body in self.mission_gravity_bodies.items():
-                position, velocity = self.ephemeris.state(body=name,
-                                                          time_s=self.sim_time_s)
-                body.position = position
-                body.velocity = velocity
+            sync_bodies(ephemeris=self.ephemeris,
+                        bodies=self.mission_gravity_bodies,
+                        time_s=self.sim_time_s)
             self.sim_ship.step_forward(dt=step,
                                        bodies=self.mission_gravity_bodies)
             self._maybe_correct_course()
@@ -324,11 +327,9 @@ class SolaraApp(MissionMixin, HudMixin, MenuMixin, Entity):
     def _sync_bodies_to_time(self,
                              time_s: float) -> None:
         """Move the body objects to their ephemeris state, for live gravity."""
-        for name, body in self.bodies.items():
-            position, velocity = self.ephemeris.state(body=name,
-                                                      time_s=time_s)
-            body.position = position
-            body.velocity = velocity
+        sync_bodies(ephemeris=self.ephemeris,
+                    bodies=self.bodies,
+                    time_s=time_s)
 
     def _advance_ship(self,
                       dt_s: float) -> None:
@@ -409,12 +410,13 @@ class SolaraApp(MissionMixin, HudMixin, MenuMixin, Entity):
             if body.parent_body != "Sun" or body.orbital_period <= 0:
                 continue
             period_s: float = body.orbital_period * 86400.0
-            points: list = []
-            for i in range(ORBIT_SAMPLES + 1):
-                t: float = self.sim_time_s + period_s * i / ORBIT_SAMPLES
-                position, _ = self.ephemeris.state(body=name,
-                                                   time_s=t)
-                points.append(vec3_to_scene(position))
+            times = np.linspace(start=self.sim_time_s,
+                                stop=self.sim_time_s + period_s,
+                                num=ORBIT_SAMPLES + 1)
+            positions, _ = self.ephemeris.states(bodies=[name],
+                                                 times_s=times)
+            points: list = [vec3_to_scene(Vec3(*position))
+                            for position in positions[0].tolist()]
             Entity(model=Mesh(vertices=points,
                               mode="line",
                               thickness=1),
@@ -429,10 +431,10 @@ class SolaraApp(MissionMixin, HudMixin, MenuMixin, Entity):
     # ------------------------------------------------------------------
 
     def refresh_positions(self) -> None:
+        states: dict[str, tuple[Vec3, Vec3]] = self.ephemeris.states_at(time_s=self.sim_time_s,
+                                                                        bodies=self.body_entities)
         for name, entity in self.body_entities.items():
-            position, _ = self.ephemeris.state(body=name,
-                                               time_s=self.sim_time_s)
-            entity.update_from_state(position_km=position)
+            entity.update_from_state(position_km=states[name][0])
             entity.update_spin(time_s=self.sim_time_s)
         # Parked: kinematic parking orbit. Mission: the simulated craft.
         ship_position: Vec3 = (self._parking_position()
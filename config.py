@@ -4,6 +4,8 @@
 from __future__ import annotations
 
 EPHEMERIS_FILE = "de440t.bsp"
+# Launch-window index written by scripts/build_launch_windows.py; optional.
+LAUNCH_WINDOW_FILE = "launch_windows.npz"
 
 # Points per orbit line, used both by the desktop app's orbit-line rendering
 # and the server's /api/orbits endpoint.
@@ -0,0 +1,119 @@
+"""
+Process-wide snapshots of every body's state at one instant.
+
+Each web session keeps its own `CelestialBody` dict for the physics it
+integrates, and used to re-sync all of it from the ephemeris every tick;
+the serializers then rebuilt the same body payload for every session at
+the same instant. A `BodySnapshot` is that state computed once: immutable
+`Vec3` pairs keyed by body name, for one absolute Julian date, borrowed
+by every session sitting at that instant. A session copies it into its
+own bodies (plain attribute stores), and the wire encoders memoize their
+encodings of it on the snapshot itself (`encoded`), so a body payload is
+built once per instant instead of once per session per tick.
+
+Snapshots are reference-counted by Python itself: `BodySnapshots` hands
+them out of a `WeakValueDictionary`, so one lives exactly as long as a
+session (or a push being encoded) still holds it, plus the `retain` most
+recently requested -- kept for a session that reaches an instant just
+after the last one to hold it moved on. Every session loads the same
+data/bodies.json, so a snapshot covers whichever session asks.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Mapping
+from types import MappingProxyType
+from typing import Any, TypeVar
+from weakref import WeakValueDictionary
+
+from core.bodies import CelestialBody
+from core.vec3 import Vec3
+
+T = TypeVar("T")
+
+DEFAULT_RETAINED: int = 256
+
+
+class BodySnapshot:
+    """Every body's (position, velocity) at one instant; never mutated."""
+
+    __slots__ = ("key", "states", "names", "_encoded", "__weakref__")
+
+    def __init__(self, key: Hashable, states: Mapping[str, tuple[Vec3, Vec3]]) -> None:
+        self.key: Hashable = key
+        self.states: Mapping[str, tuple[Vec3, Vec3]] = MappingProxyType(dict(states))
+        self.names: tuple[str, ...] = tuple(self.states)
+        self._encoded: dict[str, Any] = {}
+
+    def apply_to(self, bodies: Mapping[str, CelestialBody]) -> None:
+        """Move every body in `bodies` to this snapshot's state."""
+        for name, body in bodies.items():
+            body.position, body.velocity = self.states[name]
+
+    def encoded(self, kind: str, build: Callable[[BodySnapshot], T]) -> T:
+        """
+        `build(self)`, computed the first time `kind` is asked for and
+        shared by every later caller. Two threads racing on the first call
+        may both build it; they get equal values, so that is harmless.
+        """
+        value: Any = self._encoded.get(kind)
+        if value is None:
+            value = self._encoded.setdefault(kind, build(self))
+        return value
+
+
+class BodySnapshots:
+    """A thread-safe registry of live snapshots, keyed by instant."""
+
+    def __init__(self, retain: int = DEFAULT_RETAINED) -> None:
+        if retain < 0:
+            raise ValueError("retain must not be negative.")
+        self.retain: int = retain
+        self.hits: int = 0
+        self.misses: int = 0
+        self._live: WeakValueDictionary[Hashable, BodySnapshot] = WeakValueDictionary()
+        self._recent: OrderedDict[Hashable, BodySnapshot] = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+
+    def get(self,
+            key: Hashable,
+            compute: Callable[[], Mapping[str, tuple[Vec3, Vec3]]]) -> BodySnapshot:
+        """The snapshot for `key`, from `compute()` if nobody holds one."""
+        with self._lock:
+            snapshot: BodySnapshot | None = self._live.get(key)
+            if snapshot is not None:
+                self.hits += 1
+                self._keep(snapshot)
+                return snapshot
+            self.misses += 1
+        # Computed outside the lock (it may evaluate the kernel); a racing
+        # thread's snapshot for the same instant wins if it got there first.
+        computed = BodySnapshot(key, compute())
+        with self._lock:
+            snapshot = self._live.setdefault(key, computed)
+            self._keep(snapshot)
+            return snapshot
+
+    def _keep(self, snapshot: BodySnapshot) -> None:
+        """Hold `snapshot` among the `retain` most recently requested (lock held)."""
+        self._recent[snapshot.key] = snapshot
+        self._recent.move_to_end(snapshot.key)
+        if len(self._recent) > self.retain:
+            self._recent.popitem(last=False)
+
+    def stats(self) -> dict[str, Any]:
+        """Counters for monitoring: live snapshots, hits, misses, hit rate."""
+        with self._lock:
+            lookups: int = self.hits + self.misses
+            return {
+                "live": len(self._live),
+                "retained": self.retain,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def __len__(self) -> int:
+        return len(self._live)
@@ -18,12 +18,30 @@ barycenter. This module walks those segment chains and converts units:
 By default states are returned heliocentric (relative to the Sun),
 which is the frame the Lambert solver works in. Pass `center=None`
 for raw Solar-System-barycenter states.
+
+Callers that sample many epochs at once (porkchop grids, orbit lines)
+should use `states`, which hands jplephem whole time arrays per segment
+instead of paying the Vec3/float conversion for every scalar. Callers
+that need every body at one instant (the per-tick resync) should use
+`states_at`, which evaluates each distinct segment of the body tree
+once — the SSB->Sun segment is shared by every heliocentric state, and
+SSB->EMB by both Earth and the Moon.
+
+An adapter built with a `StateCache` consults it before the kernel for
+single-instant queries (`state`, `states_at`); the web server hands the
+same cache to every session so users viewing the same instant share the
+work.
 """
 
 from __future__ import annotations
 
-from typing import Protocol
+from collections.abc import Iterable, Sequence
+from typing import Protocol, runtime_checkable
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
 
+from core.state_cache import StateCache
 from core.vec3 import Vec3
 
 SECONDS_PER_DAY: float = 86400.0
@@ -32,8 +50,11 @@ SECONDS_PER_DAY: float = 86400.0
 class SpkSegment(Protocol):
     """One segment of an SPK kernel (jplephem's segment interface)."""
 
-    def compute_and_differentiate(self, tdb: float) -> tuple:
-        """Return (position km, velocity km/day) as array-likes."""
+    def compute_and_differentiate(self, tdb: float | NDArray[np.float64]) -> tuple:
+        """
+        Return (position km, velocity km/day) as array-likes; shaped
+        (3,) for a scalar `tdb` and (3, T) for an array of T dates.
+        """
         ...
 
 
@@ -43,6 +64,21 @@ class SpkKernel(Protocol):
     def __getitem__(self, key: tuple[int, int]) -> SpkSegment: ...
 
 
+@runtime_checkable
+class BatchEphemeris(Protocol):
+    """An ephemeris that can also answer many (body, time) queries at once."""
+
+    def state(self, body: str, time_s: float) -> tuple[Vec3, Vec3]:
+        """Return (position km, velocity km/s) of `body` at `time_s`."""
+        ...
+
+    def states(self,
+               bodies: list[str],
+               times_s: NDArray[np.float64]) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+        """Return (N, T, 3) position (km) and velocity (km/s) arrays."""
+        ...
+
+
 class JplEphemeris:
     """
     Implements the planner's `Ephemeris` protocol on top of an SPK
@@ -51,13 +87,17 @@ class JplEphemeris:
     `location_paths` maps body names to their SPICE target chains as
     already stored in data/bodies.json — e.g. Earth is [0, 3, 399]:
     Solar System barycenter -> Earth-Moon barycenter -> Earth.
+
+    `cache`, if given, is shared state storage keyed by (body, center,
+    Julian date); see core.state_cache.
     """
 
     def __init__(self,
                  kernel: SpkKernel,
                  location_paths: dict[str, list[int]],
                  epoch_jd: float,
-                 center: str | None = "Sun") -> None:
+                 center: str | None = "Sun",
+                 cache: StateCache | None = None) -> None:
         for name, path in location_paths.items():
             if len(path) < 2:
                 raise ValueError(f"Location path of '{name}' needs at "
@@ -68,13 +108,23 @@ class JplEphemeris:
         self.location_paths: dict[str, list[int]] = location_paths
         self.epoch_jd: float = epoch_jd
         self.center: str | None = center
+        self.cache: StateCache | None = cache
+
+    def __getstate__(self) -> dict:
+        # The cache belongs to this process; a pickled copy (a planner
+        # worker) starts without one. The kernel must pickle too, which
+        # core.kernel.LazyKernel does.
+        state: dict = self.__dict__.copy()
+        state["cache"] = None
+        return state
 
     @classmethod
     def from_bodies(cls,
                     kernel: SpkKernel,
                     bodies: dict,
                     epoch_jd: float,
-                    center: str | None = "Sun") -> JplEphemeris:
+                    center: str | None = "Sun",
+                    cache: StateCache | None = None) -> JplEphemeris:
         """Build from a dict of core `CelestialBody` objects."""
         location_paths: dict[str, list[int]] = {
             name: body.location_path for name, body in bodies.items()
@@ -82,7 +132,8 @@ class JplEphemeris:
         return cls(kernel=kernel,
                    location_paths=location_paths,
                    epoch_jd=epoch_jd,
-                   center=center)
+                   center=center,
+                   cache=cache)
 
     # ------------------------------------------------------------------
     # Ephemeris protocol
@@ -94,9 +145,82 @@ class JplEphemeris:
         after the adapter's epoch, relative to `center`.
         """
         jd: float = self.epoch_jd + time_s / SECONDS_PER_DAY
-        position, velocity = self._barycentric_state(body, jd)
+        return self._cached_state(body, jd)
+
+    def states_at(self,
+                  time_s: float,
+                  bodies: Iterable[str] | None = None) -> dict[str, tuple[Vec3, Vec3]]:
+        """
+        States of `bodies` (default: every body with a location path) at
+        one instant, keyed by name — the same values `state` would return
+        for each, but with every (origin, target) segment evaluated only
+        once and shared across all the chains that pass through it.
+        """
+        jd: float = self.epoch_jd + time_s / SECONDS_PER_DAY
+        segments: dict[tuple[int, int], tuple[Vec3, Vec3]] = {}
+        names: Iterable[str] = self.location_paths if bodies is None else bodies
+        return {name: self._cached_state(name, jd, segments) for name in names}
+
+    def states(self,
+               bodies: Sequence[str],
+               times_s: ArrayLike) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+        """
+        Batch form of `state`: positions (km) and velocities (km/s) of
+        every body in `bodies` at every time in `times_s` (seconds after
+        the adapter's epoch), relative to `center`.
+
+        Returns two `(N, T, 3)` arrays for N bodies and T times. Each
+        segment is evaluated once over the whole time array, so sampling
+        hundreds of epochs costs a handful of vectorized kernel calls.
+        """
+        times: NDArray[np.float64] = np.atleast_1d(np.asarray(times_s, dtype=np.float64))
+        if times.ndim != 1:
+            raise ValueError(f"times_s must be one-dimensional, got shape {times.shape}.")
+        jd: NDArray[np.float64] = self.epoch_jd + times / SECONDS_PER_DAY
+        positions: NDArray[np.float64] = np.zeros((len(bodies), times.size, 3))
+        velocities: NDArray[np.float64] = np.zeros((len(bodies), times.size, 3))
+        center_state: tuple[NDArray[np.float64], NDArray[np.float64]] | None = None
+        if self.center is not None and any(body != self.center for body in bodies):
+            center_state = self._barycentric_states(self.center, jd)
+        for index, body in enumerate(bodies):
+            if body == self.center:
+                continue  # at rest at the origin, as in `state`
+            position, velocity = self._barycentric_states(body, jd)
+            if center_state is not None:
+                position -= center_state[0]
+                velocity -= center_state[1]
+            positions[index] = position
+            velocities[index] = velocity
+        return positions, velocities
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _cached_state(self,
+                      body: str,
+                      jd: float,
+                      segments: dict[tuple[int, int], tuple[Vec3, Vec3]] | None = None,
+                      ) -> tuple[Vec3, Vec3]:
+        """`_center_relative_state`, looked up in / stored to `cache` if set."""
+        if self.cache is None:
+            return self._center_relative_state(body, jd, segments)
+        key: tuple[str, str | None, float] = (body, self.center, jd)
+        state: tuple[Vec3, Vec3] | None = self.cache.get(key)
+        if state is None:
+            state = self._center_relative_state(body, jd, segments)
+            self.cache.put(key, state)
+        return state
+
+    def _center_relative_state(self,
+                               body: str,
+                               jd: float,
+                               segments: dict[tuple[int, int], tuple[Vec3, Vec3]] | None = None,
+                               ) -> tuple[Vec3, Vec3]:
+        """The state of `body` at `jd` relative to `center`."""
+        position, velocity = self._barycentric_state(body, jd, segments)
         if self.center is not None and body != self.center:
-            center_position, center_velocity = self._barycentric_state(self.center, jd)
+            center_position, center_velocity = self._barycentric_state(self.center, jd, segments)
             position = position - center_position
             velocity = velocity - center_velocity
         elif self.center is not None:
@@ -104,24 +228,66 @@ class JplEphemeris:
             return Vec3(), Vec3()
         return position, velocity
 
-    # ------------------------------------------------------------------
-    # Internals
-    # ------------------------------------------------------------------
-
-    def _barycentric_state(self, body: str, jd: float) -> tuple[Vec3, Vec3]:
-        """Sum the segment chain to get the SSB-relative state."""
+    def _barycentric_state(self,
+                           body: str,
+                           jd: float,
+                           segments: dict[tuple[int, int], tuple[Vec3, Vec3]] | None = None,
+                           ) -> tuple[Vec3, Vec3]:
+        """
+        Sum the segment chain to get the SSB-relative state. `segments`,
+        when given, memoizes each (origin, target) segment's state at
+        this `jd` so chains sharing a prefix evaluate it only once.
+        """
         if body not in self.location_paths:
             raise KeyError(f"Body '{body}' has no location path.")
         path: list[int] = self.location_paths[body]
         position: Vec3 = Vec3()
         velocity: Vec3 = Vec3()
+        for origin, target in zip(path[:-1], path[1:]):
+            if segments is not None and (origin, target) in segments:
+                segment_state: tuple[Vec3, Vec3] = segments[origin, target]
+            else:
+                segment_state = self._segment_state(origin, target, jd)
+                if segments is not None:
+                    segments[origin, target] = segment_state
+            position = position + segment_state[0]
+            velocity = velocity + segment_state[1]
+        return position, velocity
+
+    def _segment_state(self, origin: int, target: int, jd: float) -> tuple[Vec3, Vec3]:
+        """One segment's state at `jd`, converted to km and km/s."""
+        segment: SpkSegment = self.kernel[origin, target]
+        segment_position, segment_velocity = segment.compute_and_differentiate(jd)
+        return (Vec3(float(segment_position[0]),
+                     float(segment_position[1]),
+                     float(segment_position[2])),
+                Vec3(float(segment_velocity[0]) / SECONDS_PER_DAY,
+                     float(segment_velocity[1]) / SECONDS_PER_DAY,
+                     float(segment_velocity[2]) / SECONDS_PER_DAY))
+
+    def _barycentric_states(self,
+                            body: str,
+                            jd: NDArray[np.float64]) -> tuple[NDArray[np.float64],
+                                                              NDArray[np.float64]]:
+        """Vectorized `_barycentric_state`: (T, 3) SSB-relative arrays."""
+        if body not in self.location_paths:
+            raise KeyError(f"Body '{body}' has no location path.")
+        path: list[int] = self.location_paths[body]
+        position: NDArray[np.float64] = np.zeros((jd.size, 3))
+        velocity: NDArray[np.float64] = np.zeros((jd.size, 3))
         for origin, target in zip(path[:-1], path[1:]):
             segment: SpkSegment = self.kernel[origin, target]
             segment_position, segment_velocity = segment.compute_and_differentiate(jd)
-            position = position + Vec3(float(segment_position[0]),
-                                       float(segment_position[1]),
-                                       float(segment_position[2]))
-            velocity = velocity + Vec3(float(segment_velocity[0]) / SECONDS_PER_DAY,
-                                       float(segment_velocity[1]) / SECONDS_PER_DAY,
-                                       float(segment_velocity[2]) / SECONDS_PER_DAY)
+            position += _as_rows(segment_position, jd.size)
+            velocity += _as_rows(segment_velocity, jd.size) / SECONDS_PER_DAY
         return position, velocity
+
+
+def _as_rows(components: ArrayLike, count: int) -> NDArray[np.float64]:
+    """
+    jplephem returns (3, T) component-major arrays; reshape to (T, 3).
+    A segment whose value is constant over time may hand back plain
+    (3,) components, which are broadcast across all T rows.
+    """
+    array: NDArray[np.float64] = np.asarray(components, dtype=np.float64).reshape(3, -1)
+    return np.broadcast_to(array, (3, count)).T
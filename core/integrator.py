@@ -20,18 +20,42 @@ The acceleration field is a plain `position -> acceleration` callable.
 Gravity depends only on position, which is what lets Verlet stay cheap;
 thrust, which also depends on mass and throttle, is folded into the field
 as a term that is constant over a single (sub-)step by the caller.
+
+Fixed steps force the caller to pick the step size: `Spaceship` caps it at
+60 s, and the propagator hand-sizes it from the distance to the nearest
+planet. The embedded Runge-Kutta pairs (`DormandPrince54`, `DOP853`)
+choose it themselves: each step also yields an error estimate, and the
+step grows or shrinks to hold that estimate at the requested absolute
+and relative tolerances — long strides in cruise, short ones through an
+encounter. They also accept a time-dependent field (`integrate`), so the
+planets can move *during* a long step instead of being frozen at its
+start.
+
+`WisdomHolman` exploits the fact that a heliocentric cruise is almost a
+Kepler orbit: it follows the Sun's pull exactly (core.kepler) and applies
+everything else as kicks, which allows day-long steps with bounded energy
+error; inside a planet's sphere of influence it hands over to a direct
+integrator.
 """
 
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from collections.abc import Callable
+from collections.abc import Callable, Mapping
+from math import inf, sqrt
 from typing import override
 
+import numpy as np
+from numpy.typing import NDArray
+
+from core.kepler import KeplerNoConvergence, propagate_kepler
+from core.physics import G, GravitatingBody
 from core.vec3 import Vec3
 
 # acceleration (km/s^2) as a function of position (km).
 AccelerationField = Callable[[Vec3], Vec3]
+# acceleration (km/s^2) as a function of time (s) and position (km).
+TimedAccelerationField = Callable[[float, Vec3], Vec3]
 
 
 class Integrator(ABC):
@@ -102,3 +126,388 @@ class VelocityVerlet(Integrator):
         acceleration_end: Vec3 = acceleration_at(new_position)
         new_velocity: Vec3 = velocity + (acceleration_start + acceleration_end) * (0.5 * dt)
         return new_position, new_velocity, acceleration_end
+
+
+class AdaptiveIntegrator(Integrator):
+    """
+    An embedded explicit Runge-Kutta pair with step-size control.
+
+    The state y = (position, velocity) obeys y' = (velocity, a(t, x)).
+    Each attempted step of length h gives a solution and an estimate of
+    its local error; the error is measured component-wise against
+    `atol + rtol * |y|` (with `atol` in km for the position and
+    `atol_velocity` in km/s for the velocity) and the step is accepted
+    when the RMS ratio is at most 1. Either way the next h is scaled by
+    the standard controller `safety * error^(-1 / (order + 1))`.
+
+    The step size carries over between calls, so a caller that advances
+    in many short intervals does not pay for re-discovering it. Both
+    pairs are "first same as last": the field evaluated at an accepted
+    step's end is the next step's first stage. `evaluations` counts
+    field evaluations, for comparing methods and tolerances.
+
+    Subclasses supply the tableau: nodes `_C`, coupling rows `_A`,
+    weights `_B`, the error-estimator order `_ERROR_ORDER`, and
+    `_error`, which combines the stages into a scaled error norm.
+    """
+
+    _C: tuple[float, ...]
+    _A: tuple[tuple[float, ...], ...]
+    _B: tuple[float, ...]
+    _ERROR_ORDER: int
+
+    SAFETY: float = 0.9
+    MIN_FACTOR: float = 0.2
+    MAX_FACTOR: float = 10.0
+
+    def __init__(self,
+                 rtol: float = 1e-10,
+                 atol: float = 1e-6,
+                 atol_velocity: float = 1e-12,
+                 max_step: float = inf,
+                 min_step: float = 1e-3) -> None:
+        if rtol <= 0.0 or atol <= 0.0 or atol_velocity <= 0.0:
+            raise ValueError("Tolerances must be positive.")
+        if not 0.0 < min_step <= max_step:
+            raise ValueError("Need 0 < min_step <= max_step.")
+        self.rtol: float = rtol
+        self.atol: float = atol
+        self.atol_velocity: float = atol_velocity
+        self.max_step: float = max_step
+        self.min_step: float = min_step
+        self.evaluations: int = 0
+        self.accepted_steps: int = 0
+        self.rejected_steps: int = 0
+        self._step_size: float | None = None
+        self._c: NDArray[np.float64] = np.array(self._C)
+        self._a: list[NDArray[np.float64]] = [np.array(row) for row in self._A]
+        self._b: NDArray[np.float64] = np.array(self._B)
+        self._absolute: NDArray[np.float64] = np.array([atol] * 3 + [atol_velocity] * 3)
+
+    @override
+    def step(self,
+             position: Vec3,
+             velocity: Vec3,
+             acceleration_at: AccelerationField,
+             dt: float) -> tuple[Vec3, Vec3, Vec3]:
+        """
+        Advance `dt` seconds through a position-only field, in as many
+        internal steps as the tolerances need. The acceleration returned
+        is the one at the new position.
+        """
+        return self.integrate(position, velocity,
+                              lambda _, point: acceleration_at(point), 0.0, dt)
+
+    def integrate(self,
+                  position: Vec3,
+                  velocity: Vec3,
+                  acceleration_at: TimedAccelerationField,
+                  time_s: float,
+                  dt: float) -> tuple[Vec3, Vec3, Vec3]:
+        """Like `step`, through a field that also depends on time."""
+        if dt <= 0.0:
+            raise ValueError("dt must be positive.")
+
+        def derivative(t: float, y: NDArray[np.float64]) -> NDArray[np.float64]:
+            self.evaluations += 1
+            acceleration: Vec3 = acceleration_at(t, Vec3(*y[:3].tolist()))
+            return np.concatenate((y[3:], acceleration.as_tuple()))
+
+        y: NDArray[np.float64] = np.array(position.as_tuple() + velocity.as_tuple())
+        t: float = time_s
+        end: float = time_s + dt
+        first: NDArray[np.float64] = derivative(t, y)
+        h: float = (self._step_size if self._step_size is not None
+                    else self._initial_step(derivative, t, y, first))
+        while end - t > 1e-9 * max(1.0, abs(end)):
+            h = min(max(h, self.min_step), self.max_step)
+            last: bool = h >= end - t
+            h_used: float = end - t if last else h
+            stages, y_new, f_new = self._attempt(derivative, t, y, first, h_used)
+            error: float = self._error(stages, h_used, self._scale(y, y_new))
+            factor: float = (self.MAX_FACTOR if error == 0.0 else
+                             min(self.MAX_FACTOR,
+                                 max(self.MIN_FACTOR,
+                                     self.SAFETY * error ** (-1.0 / (self._ERROR_ORDER + 1)))))
+            if error <= 1.0 or h_used <= self.min_step:
+                self.accepted_steps += 1
+                t = end if last else t + h_used
+                y, first = y_new, f_new
+                # A final step clipped to land on `end` says little about
+                # the natural step size; keep the unclipped proposal.
+                h = max(h, h_used * factor) if last else h_used * factor
+            else:
+                self.rejected_steps += 1
+                h = h_used * min(1.0, factor)
+        self._step_size = h
+        return (Vec3(*y[:3].tolist()), Vec3(*y[3:].tolist()), Vec3(*first[3:].tolist()))
+
+    def reset(self) -> None:
+        """Forget the carried-over step size (e.g. after a discontinuity)."""
+        self._step_size = None
+
+    def _attempt(self,
+                 derivative: Callable[[float, NDArray[np.float64]], NDArray[np.float64]],
+                 t: float,
+                 y: NDArray[np.float64],
+                 first: NDArray[np.float64],
+                 h: float) -> tuple[NDArray[np.float64], NDArray[np.float64], NDArray[np.float64]]:
+        """One trial step: the stages (plus the end point's), the solution, f at the end."""
+        stages: NDArray[np.float64] = np.empty((len(self._C) + 1, y.size))
+        stages[0] = first
+        for i in range(1, len(self._C)):
+            stages[i] = derivative(t + self._c[i] * h, y + h * (self._a[i] @ stages[:i]))
+        y_new: NDArray[np.float64] = y + h * (self._b @ stages[:-1])
+        stages[-1] = derivative(t + h, y_new)
+        return stages, y_new, stages[-1]
+
+    def _scale(self, y: NDArray[np.float64], y_new: NDArray[np.float64]) -> NDArray[np.float64]:
+        return self._absolute + self.rtol * np.maximum(np.abs(y), np.abs(y_new))
+
+    def _initial_step(self,
+                      derivative: Callable[[float, NDArray[np.float64]], NDArray[np.float64]],
+                      t: float,
+                      y: NDArray[np.float64],
+                      first: NDArray[np.float64]) -> float:
+        """Hairer, Norsett & Wanner's starting step estimate (one extra evaluation)."""
+        scale: NDArray[np.float64] = self._absolute + self.rtol * np.abs(y)
+        d0: float = _rms(y / scale)
+        d1: float = _rms(first / scale)
+        h0: float = 1e-6 if d0 < 1e-5 or d1 < 1e-5 else 0.01 * d0 / d1
+        second: NDArray[np.float64] = derivative(t + h0, y + h0 * first)
+        d2: float = _rms((second - first) / scale) / h0
+        h1: float = (max(1e-6, h0 * 1e-3) if max(d1, d2) <= 1e-15
+                     else (0.01 / max(d1, d2)) ** (1.0 / (self._ERROR_ORDER + 1)))
+        return min(100.0 * h0, h1)
+
+    @abstractmethod
+    def _error(self,
+               stages: NDArray[np.float64],
+               h: float,
+               scale: NDArray[np.float64]) -> float:
+        """Scaled RMS local error of the step just attempted."""
+        ...
+
+
+def _rms(values: NDArray[np.float64]) -> float:
+    return sqrt(float(values @ values) / values.size)
+
+
+class DormandPrince54(AdaptiveIntegrator):
+    """
+    Dormand-Prince 5(4): fifth-order steps, fourth-order error estimate,
+    six field evaluations per step. A good default for moderate
+    tolerances (rtol around 1e-6 to 1e-10).
+    """
+
+    _C = (0.0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1.0)
+    _A = ((),
+          (1 / 5,),
+          (3 / 40, 9 / 40),
+          (44 / 45, -56 / 15, 32 / 9),
+          (19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729),
+          (9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656))
+    _B = (35 / 384, 0.0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84)
+    _ERROR_ORDER = 4
+    # Fifth- minus fourth-order weights, over the six stages and the end point.
+    _E: tuple[float, ...] = (71 / 57600, 0.0, -71 / 16695, 71 / 1920,
+                             -17253 / 339200, 22 / 525, -1 / 40)
+
+    @override
+    def _error(self,
+               stages: NDArray[np.float64],
+               h: float,
+               scale: NDArray[np.float64]) -> float:
+        return _rms(h * (np.array(self._E) @ stages) / scale)
+
+
+class DOP853(AdaptiveIntegrator):
+    """
+    Hairer's DOP853: eighth-order steps, twelve field evaluations per
+    step, with a combined fifth/third-order error estimate. Fewer
+    evaluations than `DormandPrince54` at tight tolerances (rtol 1e-10
+    and below), which is where long, accurate coasts live.
+
+    Coefficients from E. Hairer, S. P. Norsett, G. Wanner, "Solving
+    Ordinary Differential Equations I", as published with their DOP853
+    code.
+    """
+
+    _C = (0.0,
+          0.526001519587677318785587544488e-01,
+          0.789002279381515978178381316732e-01,
+          0.118350341907227396726757197510,
+          0.281649658092772603273242802490,
+          0.333333333333333333333333333333,
+          0.25,
+          0.307692307692307692307692307692,
+          0.651282051282051282051282051282,
+          0.6,
+          0.857142857142857142857142857142,
+          1.0)
+    _A = ((),
+          (5.26001519587677318785587544488e-2,),
+          (1.97250569845378994544595329183e-2, 5.91751709536136983633785987549e-2),
+          (2.95875854768068491816892993775e-2, 0.0, 8.87627564304205475450678981324e-2),
+          (2.41365134159266685502369798665e-1, 0.0, -8.84549479328286085344864962717e-1,
+           9.24834003261792003115737966543e-1),
+          (3.7037037037037037037037037037e-2, 0.0, 0.0, 1.70828608729473871279604482173e-1,
+           1.25467687566822425016691814123e-1),
+          (3.7109375e-2, 0.0, 0.0, 1.70252211019544039314978060272e-1,
+           6.02165389804559606850219397283e-2, -1.7578125e-2),
+          (3.70920001185047927108779319836e-2, 0.0, 0.0, 1.70383925712239993810214054705e-1,
+           1.07262030446373284651809199168e-1, -1.53194377486244017527936158236e-2,
+           8.27378916381402288758473766002e-3),
+          (6.24110958716075717114429577812e-1, 0.0, 0.0, -3.36089262944694129406857109825,
+           -8.68219346841726006818189891453e-1, 2.75920996994467083049415600797e1,
+           2.01540675504778934086186788979e1, -4.34898841810699588477366255144e1),
+          (4.77662536438264365890433908527e-1, 0.0, 0.0, -2.48811461997166764192642586468,
+           -5.90290826836842996371446475743e-1, 2.12300514481811942347288949897e1,
+           1.52792336328824235832596922938e1, -3.32882109689848629194453265587e1,
+           -2.03312017085086261358222928593e-2),
+          (-9.3714243008598732571704021658e-1, 0.0, 0.0, 5.18637242884406370830023853209,
+           1.09143734899672957818500254654, -8.14978701074692612513997267357,
+           -1.85200656599969598641566180701e1, 2.27394870993505042818970056734e1,
+           2.49360555267965238987089396762, -3.0467644718982195003823669022),
+          (2.27331014751653820792359768449, 0.0, 0.0, -1.05344954667372501984066689879e1,
+           -2.00087205822486249909675718444, -1.79589318631187989172765950534e1,
+           2.79488845294199600508499808837e1, -2.85899827713502369474065508674,
+           -8.87285693353062954433549289258, 1.23605671757943030647266201528e1,
+           6.43392746015763530355970484046e-1))
+    _B = (5.42937341165687622380535766363e-2, 0.0, 0.0, 0.0, 0.0,
+          4.45031289275240888144113950566, 1.89151789931450038304281599044,
+          -5.8012039600105847814672114227, 3.1116436695781989440891606237e-1,
+          -1.52160949662516078556178806805e-1, 2.01365400804030348374776537501e-1,
+          4.47106157277725905176885569043e-2)
+    _ERROR_ORDER = 7
+    # Error weights over the twelve stages and the end point: a
+    # fifth-order (_E5) and a third-order (_E3) estimate.
+    _E5: tuple[float, ...] = (0.1312004499419488073250102996e-1, 0.0, 0.0, 0.0, 0.0,
+                              -0.1225156446376204440720569753e+1,
+                              -0.4957589496572501915214079952,
+                              0.1664377182454986536961530415e+1,
+                              -0.3503288487499736816886487290,
+                              0.3341791187130174790297318841,
+                              0.8192320648511571246570742613e-1,
+                              -0.2235530786388629525884427845e-1,
+                              0.0)
+    _E3: tuple[float, ...] = (_B[0] - 0.244094488188976377952755905512, 0.0, 0.0, 0.0, 0.0,
+                              _B[5], _B[6], _B[7],
+                              _B[8] - 0.733846688281611857341361741547,
+                              _B[9], _B[10],
+                              _B[11] - 0.220588235294117647058823529412e-1,
+                              0.0)
+
+    @override
+    def _error(self,
+               stages: NDArray[np.float64],
+               h: float,
+               scale: NDArray[np.float64]) -> float:
+        error5: float = float(np.sum(((np.array(self._E5) @ stages) / scale) ** 2))
+        error3: float = float(np.sum(((np.array(self._E3) @ stages) / scale) ** 2))
+        if error5 == 0.0 and error3 == 0.0:
+            return 0.0
+        return abs(h) * error5 / sqrt((error5 + 0.01 * error3) * scale.size)
+
+
+class WisdomHolman(Integrator):
+    """
+    Wisdom-Holman style symplectic mapping for heliocentric cruise.
+
+    The field splits into the central body's point-mass pull, which has
+    an exact solution, and a small remainder (planets, thrust). Each
+    step is kick-drift-kick:
+
+        v += 1/2 dt * remainder(x)
+        (x, v) <- exact Kepler motion about the central body for dt
+        v += 1/2 dt * remainder(x)
+
+    The remainder is the full field minus the central term, so the
+    mapping plugs into any `AccelerationField` unchanged. Like Verlet it
+    is second order and symplectic, but its error scales with the
+    remainder (about 1e-3 of the Sun's pull) rather than with the whole
+    field, so a step of a day or more keeps the energy error bounded and
+    small.
+
+    The split is only sound while the central body dominates: when the
+    craft is inside any other body's sphere of influence,
+    `soi_factor * d * (m / M)^0.4` (d the body's distance from the
+    central body), the step is delegated to `fallback` (an error-
+    controlled `DormandPrince54` by default, which subdivides a long step
+    through the encounter itself).
+
+    A drift the Kepler solver cannot take (`KeplerNoConvergence`, or an
+    overflow on a fast hyperbolic arc over a long step) is delegated to
+    `fallback` too.
+
+    `bodies` is read live at every step — pass the same dict the
+    simulation keeps synced to the ephemeris.
+
+    The server does not use it: FLY_TO coasts through a field the Sun
+    dominates are already jumped whole by `Spaceship`'s analytic coast,
+    and historical craft coast with `DormandPrince54`, which moves the
+    planets within each step rather than holding them still over a day.
+    """
+
+    def __init__(self,
+                 bodies: Mapping[str, GravitatingBody],
+                 central: str = "Sun",
+                 fallback: Integrator | None = None,
+                 soi_factor: float = 1.0) -> None:
+        self.bodies: Mapping[str, GravitatingBody] = bodies
+        self.central: str = central
+        self.fallback: Integrator = (fallback if fallback is not None
+                                     else DormandPrince54(rtol=1e-10))
+        self.soi_factor: float = soi_factor
+        self.kepler_steps: int = 0
+        self.fallback_steps: int = 0
+
+    @override
+    def step(self,
+             position: Vec3,
+             velocity: Vec3,
+             acceleration_at: AccelerationField,
+             dt: float) -> tuple[Vec3, Vec3, Vec3]:
+        central: GravitatingBody = self.bodies[self.central]
+        if self.inside_sphere_of_influence(position) is not None:
+            self.fallback_steps += 1
+            return self.fallback.step(position, velocity, acceleration_at, dt)
+        mu: float = G * central.mass * 1e-9   # km^3/s^2
+        origin: Vec3 = central.position
+        origin_velocity: Vec3 = central.velocity
+
+        def central_pull(point: Vec3) -> Vec3:
+            offset: Vec3 = point - origin
+            distance: float = offset.magnitude()
+            return offset * (-mu / distance**3)
+
+        kicked: Vec3 = velocity + (acceleration_at(position) - central_pull(position)) * (0.5 * dt)
+        try:
+            relative_position, relative_velocity = propagate_kepler(position - origin,
+                                                                    kicked - origin_velocity,
+                                                                    mu, dt)
+        except (KeplerNoConvergence, OverflowError):
+            # As in Spaceship._kepler_coast: a fast hyperbolic arc over a
+            # long step can defeat the drift's solve; integrate it instead.
+            self.fallback_steps += 1
+            return self.fallback.step(position, velocity, acceleration_at, dt)
+        self.kepler_steps += 1
+        # The central body moves on uniformly over the step, carrying the orbit.
+        origin = origin + origin_velocity * dt
+        new_position: Vec3 = origin + relative_position
+        acceleration: Vec3 = acceleration_at(new_position)
+        new_velocity: Vec3 = (relative_velocity + origin_velocity
+                              + (acceleration - central_pull(new_position)) * (0.5 * dt))
+        return new_position, new_velocity, acceleration
+
+    def inside_sphere_of_influence(self, position: Vec3) -> str | None:
+        """The name of the body whose sphere of influence holds `position`, if any."""
+        central: GravitatingBody = self.bodies[self.central]
+        for name, body in self.bodies.items():
+            if name == self.central:
+                continue
+            reach: float = ((body.position - central.position).magnitude()
+                            * (body.mass / central.mass) ** 0.4 * self.soi_factor)
+            if (position - body.position).magnitude() < reach:
+                return name
+        return None
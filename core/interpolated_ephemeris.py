@@ -0,0 +1,209 @@
+"""
+Piecewise-Hermite state tables in front of a slower ephemeris.
+
+`advance_coasting` re-syncs every body at every adaptive sub-step, and a
+historical replay takes tens of thousands of sub-steps — each one a
+chain of kernel lookups per body. Planetary motion is smooth on the
+scale of hours, so those lookups are mostly redundant: knowing a body's
+position *and* velocity at nodes half a day apart pins down a cubic
+Hermite polynomial between them that reproduces the real motion to
+well under a kilometre.
+
+`InterpolatedEphemeris` wraps any `Ephemeris` (normally `JplEphemeris`)
+and satisfies the same protocol. The first query that lands in a time
+window samples the source at that window's nodes; every later query in
+the window is a handful of multiply-adds with no kernel access. Windows
+are built lazily and kept per body in a small LRU, so a replay that
+sweeps decades only ever holds the few windows around the current time.
+
+Accuracy is checked, not assumed: when a window is built the source is
+also sampled at every interval midpoint (where the Hermite error peaks) and,
+if the interpolant misses by more than `tolerance_km`, the window is
+rebuilt with half the node spacing. The worst checked error per body is
+kept for inspection (`max_error_km`).
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from math import ceil, floor
+from typing import Protocol
+
+import numpy as np
+
+from core.ephemeris import BatchEphemeris
+from core.vec3 import Vec3
+
+DEFAULT_WINDOW_S: float = 30.0 * 86400.0       # span of one lazily built table
+DEFAULT_NODE_SPACING_S: float = 0.5 * 86400.0  # initial node spacing
+DEFAULT_MIN_NODE_SPACING_S: float = 600.0      # refinement stops here
+DEFAULT_TOLERANCE_KM: float = 1.0              # allowed position error
+DEFAULT_MAX_WINDOWS: int = 8                   # windows kept per body
+
+
+class Ephemeris(Protocol):
+    """Source of body states (matches core.ephemeris.JplEphemeris)."""
+
+    def state(self, body: str, time_s: float) -> tuple[Vec3, Vec3]: ...
+
+
+@dataclass(frozen=True)
+class HermiteWindow:
+    """
+    One body's cubic Hermite table over [start_s, start_s + step_s * n].
+
+    Node k sits at `start_s + k * step_s`; `positions` and `velocities`
+    hold its (x, y, z) state. `max_error_km` is the largest position
+    error found when the window was checked against the source.
+    """
+    start_s: float
+    step_s: float
+    positions: tuple[tuple[float, float, float], ...]
+    velocities: tuple[tuple[float, float, float], ...]
+    max_error_km: float = 0.0
+
+    def state(self, time_s: float) -> tuple[Vec3, Vec3]:
+        """Interpolated position (km) and velocity (km/s) at `time_s`."""
+        h: float = self.step_s
+        index: int = min(max(int((time_s - self.start_s) // h), 0), len(self.positions) - 2)
+        s: float = (time_s - self.start_s) / h - index
+        x0, y0, z0 = self.positions[index]
+        x1, y1, z1 = self.positions[index + 1]
+        u0, v0, w0 = self.velocities[index]
+        u1, v1, w1 = self.velocities[index + 1]
+        s2: float = s * s
+        s3: float = s2 * s
+        # Hermite basis (position) and its derivative (velocity), with the
+        # tangent terms pre-scaled by h so node velocities enter in km/s.
+        h00: float = 2.0 * s3 - 3.0 * s2 + 1.0
+        h01: float = 1.0 - h00
+        h10: float = (s3 - 2.0 * s2 + s) * h
+        h11: float = (s3 - s2) * h
+        d00: float = (6.0 * s2 - 6.0 * s) / h
+        d10: float = 3.0 * s2 - 4.0 * s + 1.0
+        d11: float = 3.0 * s2 - 2.0 * s
+        position = Vec3(h00 * x0 + h01 * x1 + h10 * u0 + h11 * u1,
+                        h00 * y0 + h01 * y1 + h10 * v0 + h11 * v1,
+                        h00 * z0 + h01 * z1 + h10 * w0 + h11 * w1)
+        velocity = Vec3(d00 * (x0 - x1) + d10 * u0 + d11 * u1,
+                        d00 * (y0 - y1) + d10 * v0 + d11 * v1,
+                        d00 * (z0 - z1) + d10 * w0 + d11 * w1)
+        return position, velocity
+
+
+class InterpolatedEphemeris:
+    """
+    Implements the `Ephemeris` protocol from lazily built Hermite tables
+    over `source`. Time is the source's: seconds from its epoch.
+    """
+
+    def __init__(self,
+                 source: Ephemeris,
+                 window_s: float = DEFAULT_WINDOW_S,
+                 node_spacing_s: float = DEFAULT_NODE_SPACING_S,
+                 tolerance_km: float = DEFAULT_TOLERANCE_KM,
+                 min_node_spacing_s: float = DEFAULT_MIN_NODE_SPACING_S,
+                 max_windows: int = DEFAULT_MAX_WINDOWS) -> None:
+        if not 0.0 < min_node_spacing_s <= node_spacing_s <= window_s:
+            raise ValueError("Need 0 < min_node_spacing_s <= node_spacing_s <= window_s.")
+        if tolerance_km <= 0.0:
+            raise ValueError("tolerance_km must be positive.")
+        if max_windows < 1:
+            raise ValueError("max_windows must be at least 1.")
+        self.source: Ephemeris = source
+        self.window_s: float = window_s
+        self.node_spacing_s: float = node_spacing_s
+        self.tolerance_km: float = tolerance_km
+        self.min_node_spacing_s: float = min_node_spacing_s
+        self.max_windows: int = max_windows
+        self._windows: dict[str, OrderedDict[int, HermiteWindow]] = {}
+
+    # ------------------------------------------------------------------
+    # Ephemeris protocol
+    # ------------------------------------------------------------------
+
+    def state(self, body: str, time_s: float) -> tuple[Vec3, Vec3]:
+        """Position (km) and velocity (km/s) of `body` at `time_s`."""
+        return self._window(body, floor(time_s / self.window_s)).state(time_s)
+
+    # ------------------------------------------------------------------
+    # Inspection
+    # ------------------------------------------------------------------
+
+    def max_error_km(self, body: str) -> float:
+        """Worst checked position error among `body`'s cached windows."""
+        windows = self._windows.get(body)
+        if not windows:
+            return 0.0
+        return max(window.max_error_km for window in windows.values())
+
+    def window_count(self, body: str) -> int:
+        return len(self._windows.get(body, ()))
+
+    def clear(self) -> None:
+        self._windows.clear()
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _window(self, body: str, key: int) -> HermiteWindow:
+        windows: OrderedDict[int, HermiteWindow] = self._windows.setdefault(body, OrderedDict())
+        window: HermiteWindow | None = windows.get(key)
+        if window is not None:
+            windows.move_to_end(key)
+            return window
+        window = self._build(body, key * self.window_s)
+        windows[key] = window
+        if len(windows) > self.max_windows:
+            windows.popitem(last=False)
+        return window
+
+    def _build(self, body: str, start_s: float) -> HermiteWindow:
+        """
+        Sample the source on a node grid over one window, halving the
+        spacing until the midpoint check meets `tolerance_km` (or the
+        spacing floor is reached).
+        """
+        spacing: float = self.node_spacing_s
+        while True:
+            count: int = ceil(self.window_s / spacing - 1e-9)
+            step: float = self.window_s / count
+            node_times: list[float] = [start_s + step * k for k in range(count + 1)]
+            positions, velocities = self._sample(body, node_times)
+            window = HermiteWindow(start_s=start_s, step_s=step,
+                                   positions=positions, velocities=velocities)
+            error: float = self._check(body, window, count)
+            if error <= self.tolerance_km or spacing <= self.min_node_spacing_s:
+                return HermiteWindow(start_s=start_s, step_s=step,
+                                     positions=positions, velocities=velocities,
+                                     max_error_km=error)
+            spacing = max(0.5 * spacing, self.min_node_spacing_s)
+
+    def _check(self, body: str, window: HermiteWindow, count: int) -> float:
+        """
+        Largest position error at every interval midpoint, sampled in one
+        batch: the error peaks mid-interval, and where it peaks across the
+        window (perihelion, a close pass) is not known in advance.
+        """
+        check_times: list[float] = [window.start_s + (k + 0.5) * window.step_s
+                                    for k in range(count)]
+        reference, _ = self._sample(body, check_times)
+        error: float = 0.0
+        for time_s, expected in zip(check_times, reference):
+            error = max(error, (window.state(time_s)[0] - Vec3(*expected)).magnitude())
+        return error
+
+    def _sample(self,
+                body: str,
+                times: list[float]) -> tuple[tuple[tuple[float, float, float], ...],
+                                             tuple[tuple[float, float, float], ...]]:
+        """Source states at `times`, batched when the source supports it."""
+        if isinstance(self.source, BatchEphemeris):
+            positions, velocities = self.source.states([body], np.asarray(times))
+            return (tuple(map(tuple, positions[0].tolist())),
+                    tuple(map(tuple, velocities[0].tolist())))
+        states = [self.source.state(body, time_s) for time_s in times]
+        return (tuple(position.as_tuple() for position, _ in states),
+                tuple(velocity.as_tuple() for _, velocity in states))
@@ -0,0 +1,153 @@
+"""
+Two-body (Keplerian) propagation in universal variables.
+
+Given a position and velocity relative to a point mass of gravitational
+parameter mu, `propagate_kepler` returns the exact state `dt` seconds
+later, for elliptic, parabolic and hyperbolic orbits alike. It solves
+the universal Kepler equation for the universal anomaly chi (Laguerre's
+method, which converges from a crude starting guess where Newton can
+wander) and applies the Lagrange f and g coefficients:
+
+    r = f r0 + g v0        v = f' r0 + g' v0
+
+Elliptic arcs longer than a period are first reduced by whole periods,
+which keeps chi small and the iteration well conditioned for arbitrarily
+long coasts. Units are the caller's; the simulation's are km, km/s and
+km^3/s^2.
+
+`perturbation_ratio` decides when that exact solution may stand in for
+numerical integration of the full field: it bounds the other bodies'
+pull relative to the central body's over a jump.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from math import cos, cosh, fmod, pi, sin, sinh, sqrt
+
+from core.physics import G, GravitatingBody
+from core.vec3 import Vec3
+
+MAX_ITERATIONS: int = 50
+TOLERANCE: float = 1e-13
+
+
+class KeplerNoConvergence(RuntimeError):
+    """The universal Kepler equation did not converge."""
+
+
+def stumpff_c(z: float) -> float:
+    """Stumpff function C(z) = (1 - cos sqrt z) / z, continued through z <= 0."""
+    if z > 1e-3:
+        return (1.0 - cos(sqrt(z))) / z
+    if z < -1e-3:
+        return (cosh(sqrt(-z)) - 1.0) / -z
+    return 1.0 / 2.0 - z / 24.0 + z * z / 720.0 - z * z * z / 40320.0
+
+
+def stumpff_s(z: float) -> float:
+    """Stumpff function S(z) = (sqrt z - sin sqrt z) / sqrt(z)^3, continued through z <= 0."""
+    if z > 1e-3:
+        root: float = sqrt(z)
+        return (root - sin(root)) / root**3
+    if z < -1e-3:
+        root = sqrt(-z)
+        return (sinh(root) - root) / root**3
+    return 1.0 / 6.0 - z / 120.0 + z * z / 5040.0 - z * z * z / 362880.0
+
+
+def propagate_kepler(position: Vec3, velocity: Vec3, mu: float, dt: float) -> tuple[Vec3, Vec3]:
+    """
+    State after `dt` (s, either sign) on the two-body orbit through
+    `position`/`velocity` about a point mass `mu` at the origin.
+    """
+    if dt == 0.0:
+        return position, velocity
+    r0: float = position.magnitude()
+    if r0 == 0.0:
+        raise ValueError("Cannot propagate from the central body's centre.")
+    sqrt_mu: float = sqrt(mu)
+    radial_velocity: float = position.dot(velocity) / r0
+    alpha: float = 2.0 / r0 - velocity.dot(velocity) / mu   # 1/a; < 0 when hyperbolic
+
+    if alpha > 1e-12:
+        # Whole revolutions change nothing; propagate the remainder only.
+        period: float = 2.0 * pi / (sqrt_mu * alpha**1.5)
+        dt = fmod(dt, period)
+        if dt == 0.0:
+            return position, velocity
+
+    chi: float = _solve_universal_anomaly(r0, radial_velocity, alpha, sqrt_mu, dt)
+    z: float = alpha * chi * chi
+    c: float = stumpff_c(z)
+    s: float = stumpff_s(z)
+    f: float = 1.0 - chi * chi / r0 * c
+    g: float = dt - chi**3 / sqrt_mu * s
+    new_position: Vec3 = position * f + velocity * g
+    r: float = new_position.magnitude()
+    f_dot: float = sqrt_mu / (r * r0) * (alpha * chi**3 * s - chi)
+    g_dot: float = 1.0 - chi * chi / r * c
+    return new_position, position * f_dot + velocity * g_dot
+
+
+def perturbation_ratio(position: Vec3,
+                       velocity: Vec3,
+                       central: GravitatingBody,
+                       perturbers: Iterable[GravitatingBody],
+                       dt: float) -> float:
+    """
+    Upper estimate, over the next `dt`, of the other bodies' combined
+    pull on the craft as a fraction of the `central` body's: each
+    perturber is taken at the closest the craft could come to it and the
+    central body at the farthest. The closest approach allows for both
+    speeds (whether or not the perturber is moved between steps) and the
+    central body's pull on both; when the craft could reach a perturber
+    within `dt` the ratio is infinite.
+    """
+    dt = abs(dt)
+    speed: float = velocity.magnitude()
+    ship_distance: float = (position - central.position).magnitude()
+    mu_central: float = G * central.mass * 1e-9   # km^3/s^2
+    central_pull: float = mu_central / (ship_distance + speed * dt)**2
+    perturbing_pull: float = 0.0
+    for body in perturbers:
+        separation: float = (position - body.position).magnitude()
+        body_distance: float = (body.position - central.position).magnitude()
+        relative_pull: float = (mu_central / ship_distance**2
+                                + (mu_central / body_distance**2 if body_distance > 0.0 else 0.0))
+        closest: float = (separation - (speed + body.velocity.magnitude()) * dt
+                          - 0.5 * relative_pull * dt * dt)
+        if closest <= body.radius:
+            return float("inf")
+        perturbing_pull += G * body.mass * 1e-9 / closest**2
+    return perturbing_pull / central_pull
+
+
+def _solve_universal_anomaly(r0: float,
+                             radial_velocity: float,
+                             alpha: float,
+                             sqrt_mu: float,
+                             dt: float) -> float:
+    """Laguerre iteration (n = 5) on the universal Kepler equation."""
+    sigma: float = r0 * radial_velocity / sqrt_mu
+    one_minus_alpha_r0: float = 1.0 - alpha * r0
+    chi: float = (sqrt_mu * abs(alpha) * dt if alpha > 1e-12
+                  else sqrt_mu * dt / r0)
+    n: float = 5.0
+    for _ in range(MAX_ITERATIONS):
+        z: float = alpha * chi * chi
+        c: float = stumpff_c(z)
+        s: float = stumpff_s(z)
+        # F(chi) and its first two derivatives.
+        value: float = (sigma * chi * chi * c + one_minus_alpha_r0 * chi**3 * s
+                        + r0 * chi - sqrt_mu * dt)
+        slope: float = sigma * chi * (1.0 - z * s) + one_minus_alpha_r0 * chi * chi * c + r0
+        curvature: float = sigma * (1.0 - z * c) + one_minus_alpha_r0 * chi * (1.0 - z * s)
+        discriminant: float = abs((n - 1.0)**2 * slope * slope
+                                  - n * (n - 1.0) * value * curvature)
+        denominator: float = slope + (sqrt(discriminant) if slope >= 0.0 else -sqrt(discriminant))
+        step: float = n * value / denominator
+        chi -= step
+        if abs(step) <= TOLERANCE * max(1.0, abs(chi)):
+            return chi
+    raise KeplerNoConvergence(f"Universal Kepler equation did not converge (dt={dt:g} s).")
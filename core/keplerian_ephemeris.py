@@ -0,0 +1,266 @@
+"""
+Analytic planetary positions from mean Keplerian elements.
+
+`JplEphemeris` is exact but needs the SPK kernel and only covers the
+kernel's date range (core/time.py clamps dates outside it). Plenty of
+uses don't need that precision: orbit lines drawn a few pixels wide,
+coarse porkchop screening before a precise pass, or a date the kernel
+simply doesn't reach. `KeplerianEphemeris` answers those from closed
+form: each planet's orbit is a Keplerian ellipse whose elements drift
+linearly with time.
+
+Elements and rates are E. M. Standish's "Keplerian Elements for
+Approximate Positions of the Major Planets" (JPL SSD), the fit valid
+3000 BC - 3000 AD, including the extra mean-anomaly terms for Jupiter
+through Pluto. The table gives the Earth-Moon barycenter; Earth and the
+Moon are split from it with a mean lunar orbit (Meeus' mean elements,
+precessed to J2000). States are heliocentric, rotated from the J2000
+ecliptic to the ICRF equatorial frame `JplEphemeris` uses, so the two
+are interchangeable.
+
+Accuracy against DE440 over 1550-2650 is bounded by the fit's quoted
+errors: tens of arcseconds to a few arcminutes in heliocentric longitude
+for the inner planets (10^4-10^5 km), up to roughly ten arcminutes for
+the outer ones (10^6 km at Saturn and beyond). The mean lunar orbit
+ignores the solar perturbations (evection, variation), so the Moon is
+only good to about 10^4 km geocentric. Velocities are the analytic time
+derivative of the positions (ignoring the tiny drift in orbit size and
+shape). `scripts/keplerian_accuracy.py` measures the actual errors
+against the kernel.
+
+Every evaluation is vectorized over time: `states` costs one numpy pass
+per body regardless of how many epochs are asked for.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+from math import cos, radians, sin
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+from core.vec3 import Vec3
+
+SECONDS_PER_DAY: float = 86400.0
+AU_KM: float = 149597870.7
+J2000_JD: float = 2451545.0
+DAYS_PER_CENTURY: float = 36525.0
+OBLIQUITY_J2000: float = radians(84381.448 / 3600.0)
+EARTH_MOON_MASS_RATIO: float = 81.30056
+
+# a (au), e, I (deg), L (deg), longitude of perihelion (deg),
+# longitude of the ascending node (deg); then each one's rate per
+# Julian century. Standish, Table 2a (3000 BC - 3000 AD).
+PLANET_ELEMENTS: dict[str, tuple[tuple[float, ...], tuple[float, ...]]] = {
+    "Mercury": ((0.38709843, 0.20563661, 7.00559432, 252.25166724, 77.45771895, 48.33961819),
+                (0.00000000, 0.00002123, -0.00590158, 149472.67486623, 0.15940013, -0.12214182)),
+    "Venus": ((0.72332102, 0.00676399, 3.39777545, 181.97970850, 131.76755713, 76.67261496),
+              (-0.00000026, -0.00005107, 0.00043494, 58517.81560260, 0.05679648, -0.27274174)),
+    "EMB": ((1.00000018, 0.01673163, -0.00054346, 100.46691572, 102.93005885, -5.11260389),
+            (-0.00000003, -0.00003661, -0.01337178, 35999.37306329, 0.31795260, -0.24123856)),
+    "Mars": ((1.52371243, 0.09336511, 1.85181869, -4.56813164, -23.91744784, 49.71320984),
+             (0.00000097, 0.00009149, -0.00724757, 19140.29934243, 0.45223625, -0.26852431)),
+    "Jupiter": ((5.20248019, 0.04853590, 1.29861416, 34.33479152, 14.27495244, 100.29282654),
+                (-0.00002864, 0.00018026, -0.00322699, 3034.90371757, 0.18199196, 0.13024619)),
+    "Saturn": ((9.54149883, 0.05550825, 2.49424102, 50.07571329, 92.86136063, 113.63998702),
+               (-0.00003065, -0.00032044, 0.00451969, 1222.11494724, 0.54179478, -0.25015002)),
+    "Uranus": ((19.18797948, 0.04685740, 0.77298127, 314.20276625, 172.43404441, 73.96250215),
+               (-0.00020455, -0.00001550, -0.00180155, 428.49512595, 0.09266985, 0.05739699)),
+    "Neptune": ((30.06952752, 0.00895439, 1.77005520, 304.22289287, 46.68158724, 131.78635853),
+                (0.00006447, 0.00000818, 0.00022400, 218.46515314, 0.01009938, -0.00606302)),
+    "Pluto": ((39.48686035, 0.24885238, 17.14104260, 238.96535011, 224.09702598, 110.30167986),
+              (0.00449751, 0.00006016, 0.00000501, 145.18042903, -0.00968827, -0.00809981)),
+}
+
+# Extra mean-anomaly terms b*T^2 + c*cos(f*T) + s*sin(f*T) (degrees,
+# T in centuries), Standish Table 2b.
+MEAN_ANOMALY_TERMS: dict[str, tuple[float, float, float, float]] = {
+    "Jupiter": (-0.00012452, 0.06064060, -0.35635438, 38.35125000),
+    "Saturn": (0.00025899, -0.13434469, 0.87320147, 38.35125000),
+    "Uranus": (0.00058331, -0.97731848, 0.17689245, 7.67025000),
+    "Neptune": (-0.00041348, 0.68346318, -0.10162547, 7.67025000),
+    "Pluto": (-0.01262724, 0.0, 0.0, 0.0),
+}
+
+# Geocentric mean lunar orbit: a (km), e, I (deg), then mean longitude,
+# longitude of perigee and of the node (deg) with rates per century,
+# referred to the equinox of date (Meeus, ch. 47).
+MOON_ORBIT: tuple[float, float, float] = (384399.0, 0.0549, 5.145)
+MOON_ANGLES: tuple[tuple[float, float], ...] = ((218.3164477, 481267.88123421),
+                                                (83.3532465, 4069.0137287),
+                                                (125.0445479, -1934.1362891))
+GENERAL_PRECESSION_DEG: float = 1.396971   # per century, equinox of date -> J2000
+
+BODIES: tuple[str, ...] = ("Sun", "Mercury", "Venus", "Earth", "Moon", "Mars",
+                           "Jupiter", "Saturn", "Uranus", "Neptune", "Pluto")
+
+_DEG_PER_CENTURY_TO_RAD_PER_S: float = radians(1.0) / (DAYS_PER_CENTURY * SECONDS_PER_DAY)
+_ECLIPTIC_TO_EQUATORIAL: NDArray[np.float64] = np.array([
+    [1.0, 0.0, 0.0],
+    [0.0, cos(OBLIQUITY_J2000), -sin(OBLIQUITY_J2000)],
+    [0.0, sin(OBLIQUITY_J2000), cos(OBLIQUITY_J2000)],
+])
+
+
+class KeplerianEphemeris:
+    """
+    Implements the planner's `Ephemeris` protocol (and the batch
+    `states` / per-instant `states_at` queries of `JplEphemeris`) from
+    mean orbital elements. States are heliocentric; time is seconds
+    after `epoch_jd`.
+    """
+
+    def __init__(self, epoch_jd: float) -> None:
+        self.epoch_jd: float = epoch_jd
+
+    # ------------------------------------------------------------------
+    # Ephemeris protocol
+    # ------------------------------------------------------------------
+
+    def state(self, body: str, time_s: float) -> tuple[Vec3, Vec3]:
+        """Position (km) and velocity (km/s) of `body` relative to the Sun."""
+        positions, velocities = self.states([body], [time_s])
+        return Vec3(*positions[0, 0].tolist()), Vec3(*velocities[0, 0].tolist())
+
+    def states_at(self,
+                  time_s: float,
+                  bodies: Iterable[str] | None = None) -> dict[str, tuple[Vec3, Vec3]]:
+        """States of `bodies` (default: every supported body) at one instant."""
+        names: list[str] = list(BODIES if bodies is None else bodies)
+        positions, velocities = self.states(names, [time_s])
+        return {name: (Vec3(*positions[i, 0].tolist()), Vec3(*velocities[i, 0].tolist()))
+                for i, name in enumerate(names)}
+
+    def states(self,
+               bodies: Sequence[str],
+               times_s: ArrayLike) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+        """
+        Positions (km) and velocities (km/s) of every body in `bodies` at
+        every time in `times_s`, as two `(N, T, 3)` arrays.
+        """
+        times: NDArray[np.float64] = np.atleast_1d(np.asarray(times_s, dtype=np.float64))
+        if times.ndim != 1:
+            raise ValueError(f"times_s must be one-dimensional, got shape {times.shape}.")
+        for body in bodies:
+            if body not in BODIES:
+                raise KeyError(f"Body '{body}' has no Keplerian elements.")
+        jd: NDArray[np.float64] = self.epoch_jd + times / SECONDS_PER_DAY
+        centuries: NDArray[np.float64] = (jd - J2000_JD) / DAYS_PER_CENTURY
+        positions: NDArray[np.float64] = np.zeros((len(bodies), times.size, 3))
+        velocities: NDArray[np.float64] = np.zeros((len(bodies), times.size, 3))
+        for index, body in enumerate(bodies):
+            if body == "Sun":
+                continue
+            if body in ("Earth", "Moon"):
+                position, velocity = _planet_state("EMB", centuries)
+                moon_position, moon_velocity = _moon_geocentric_state(centuries)
+                share: float = (EARTH_MOON_MASS_RATIO / (1.0 + EARTH_MOON_MASS_RATIO)
+                                if body == "Moon" else -1.0 / (1.0 + EARTH_MOON_MASS_RATIO))
+                position += share * moon_position
+                velocity += share * moon_velocity
+            else:
+                position, velocity = _planet_state(body, centuries)
+            positions[index] = position @ _ECLIPTIC_TO_EQUATORIAL.T
+            velocities[index] = velocity @ _ECLIPTIC_TO_EQUATORIAL.T
+        return positions, velocities
+
+
+def _planet_state(name: str,
+                  centuries: NDArray[np.float64]) -> tuple[NDArray[np.float64],
+                                                           NDArray[np.float64]]:
+    """Heliocentric J2000-ecliptic (T, 3) state of one table entry."""
+    (a0, e0, i0, l0, peri0, node0), (da, de, di, dl, dperi, dnode) = PLANET_ELEMENTS[name]
+    semi_major = (a0 + da * centuries) * AU_KM
+    eccentricity = e0 + de * centuries
+    mean_anomaly = (l0 - peri0) + (dl - dperi) * centuries
+    rate = np.full_like(centuries, dl - dperi)
+    if name in MEAN_ANOMALY_TERMS:
+        b, c, s, f = MEAN_ANOMALY_TERMS[name]
+        phase = np.radians(f * centuries)
+        mean_anomaly = mean_anomaly + b * centuries**2 + c * np.cos(phase) + s * np.sin(phase)
+        rate = rate + 2.0 * b * centuries + radians(f) * (s * np.cos(phase) - c * np.sin(phase))
+    return _ellipse_state(semi_major, eccentricity,
+                          np.radians(i0 + di * centuries),
+                          np.radians(peri0 + dperi * centuries),
+                          np.radians(node0 + dnode * centuries),
+                          np.radians(mean_anomaly),
+                          rate * _DEG_PER_CENTURY_TO_RAD_PER_S,
+                          (di * _DEG_PER_CENTURY_TO_RAD_PER_S,
+                           dperi * _DEG_PER_CENTURY_TO_RAD_PER_S,
+                           dnode * _DEG_PER_CENTURY_TO_RAD_PER_S))
+
+
+def _moon_geocentric_state(centuries: NDArray[np.float64]) -> tuple[NDArray[np.float64],
+                                                                    NDArray[np.float64]]:
+    """The Moon relative to Earth on its mean orbit, J2000 ecliptic."""
+    semi_major, eccentricity, inclination = MOON_ORBIT
+    precession = GENERAL_PRECESSION_DEG * centuries
+    longitude, perigee, node = (angle + rate * centuries - precession
+                                for angle, rate in MOON_ANGLES)
+    (_, longitude_rate), (_, perigee_rate), (_, node_rate) = MOON_ANGLES
+    shape = np.ones_like(centuries)
+    return _ellipse_state(semi_major * shape, eccentricity * shape,
+                          np.radians(inclination * shape),
+                          np.radians(perigee), np.radians(node),
+                          np.radians(longitude - perigee),
+                          (longitude_rate - perigee_rate) * _DEG_PER_CENTURY_TO_RAD_PER_S * shape,
+                          (0.0,
+                           (perigee_rate - GENERAL_PRECESSION_DEG) * _DEG_PER_CENTURY_TO_RAD_PER_S,
+                           (node_rate - GENERAL_PRECESSION_DEG) * _DEG_PER_CENTURY_TO_RAD_PER_S))
+
+
+def _ellipse_state(semi_major: NDArray[np.float64],
+                   eccentricity: NDArray[np.float64],
+                   inclination: NDArray[np.float64],
+                   perihelion_longitude: NDArray[np.float64],
+                   node: NDArray[np.float64],
+                   mean_anomaly: NDArray[np.float64],
+                   mean_motion: NDArray[np.float64],
+                   orientation_rates: tuple[float, float, float],
+                   ) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """
+    Position and velocity on the ellipse (angles in radians, mean motion
+    in rad/s), as (T, 3) arrays in the elements' reference plane.
+    `orientation_rates` are the drift rates (rad/s) of the inclination,
+    the longitude of perihelion and the node: the velocity includes the
+    turning of the ellipse, but not the (far slower) change of its size
+    and shape.
+    """
+    mean_anomaly = np.remainder(mean_anomaly + np.pi, 2.0 * np.pi) - np.pi
+    eccentric = mean_anomaly + eccentricity * np.sin(mean_anomaly)
+    for _ in range(8):  # Newton on Kepler's equation; e < 0.25 converges in a few
+        eccentric -= ((eccentric - eccentricity * np.sin(eccentric) - mean_anomaly)
+                      / (1.0 - eccentricity * np.cos(eccentric)))
+    cos_e, sin_e = np.cos(eccentric), np.sin(eccentric)
+    minor: NDArray[np.float64] = semi_major * np.sqrt(1.0 - eccentricity**2)
+    eccentric_rate = mean_motion / (1.0 - eccentricity * cos_e)
+    # In-plane coordinates: x towards perihelion.
+    x, y = semi_major * (cos_e - eccentricity), minor * sin_e
+    vx, vy = -semi_major * sin_e * eccentric_rate, minor * cos_e * eccentric_rate
+
+    argument = perihelion_longitude - node
+    cos_w, sin_w = np.cos(argument), np.sin(argument)
+    cos_n, sin_n = np.cos(node), np.sin(node)
+    cos_i, sin_i = np.cos(inclination), np.sin(inclination)
+    # Columns of the perifocal -> reference-plane rotation.
+    p = np.stack((cos_w * cos_n - sin_w * sin_n * cos_i,
+                  cos_w * sin_n + sin_w * cos_n * cos_i,
+                  sin_w * sin_i), axis=-1)
+    q = np.stack((-sin_w * cos_n - cos_w * sin_n * cos_i,
+                  -sin_w * sin_n + cos_w * cos_n * cos_i,
+                  cos_w * sin_i), axis=-1)
+    # How p and q turn as the inclination, argument and node drift.
+    inclination_rate, perihelion_rate, node_rate = orientation_rates
+    argument_rate: float = perihelion_rate - node_rate
+    dp_di = np.stack((sin_w * sin_n * sin_i, -sin_w * cos_n * sin_i, sin_w * cos_i), axis=-1)
+    dq_di = np.stack((cos_w * sin_n * sin_i, -cos_w * cos_n * sin_i, cos_w * cos_i), axis=-1)
+    dp_dt = inclination_rate * dp_di + argument_rate * q + node_rate * _about_pole(p)
+    dq_dt = inclination_rate * dq_di - argument_rate * p + node_rate * _about_pole(q)
+    return (x[:, None] * p + y[:, None] * q,
+            vx[:, None] * p + vy[:, None] * q + x[:, None] * dp_dt + y[:, None] * dq_dt)
+
+
+def _about_pole(vectors: NDArray[np.float64]) -> NDArray[np.float64]:
+    """z-hat x v for each row: the rate of change under a unit-rate node turn."""
+    return np.stack((-vectors[:, 1], vectors[:, 0], np.zeros(len(vectors))), axis=-1)
@@ -0,0 +1,174 @@
+"""
+SPK kernel loading and subsetting.
+
+The full de440t.bsp is 146 MB and spans 1550-2650, but the simulation
+only ever reads the segments named in data/bodies.json's location paths,
+and a deployment usually only cares about a few centuries. Two tools
+here cut what a process has to carry:
+
+  * `LazyKernel` satisfies the adapter's `SpkKernel` protocol but opens
+    the file on the first segment lookup, and only resolves (and lets
+    jplephem memory-map) the segments that are actually asked for.
+  * `write_subset` writes a trimmed SPK holding just the required
+    segments up to (or, optionally, also from) a date range;
+    `compare_kernels` then checks that the subset reproduces the full
+    kernel's states bit-for-bit across the kept range.
+    `scripts/subset_kernel.py` drives both from the command line.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+from jplephem.daf import DAF
+from jplephem.excerpter import write_excerpt
+from jplephem.spk import SPK
+
+
+class LazyKernel:
+    """
+    A `jplephem.spk.SPK` that is opened on first use.
+
+    Segments are resolved one by one as the adapter asks for them, so a
+    process that only ever needs the Sun and a few planets never touches
+    the rest of the file. Lookups are thread-safe, and the kernel can be
+    pickled to another process, which reopens the file there.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        self._spk: SPK | None = None
+        self._segments: dict[tuple[int, int], Any] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def __getitem__(self, key: tuple[int, int]) -> Any:
+        segment: Any = self._segments.get(key)
+        if segment is None:
+            with self._lock:
+                if self._spk is None:
+                    self._spk = SPK.open(self.path)
+                segment = self._spk[key]
+                self._segments[key] = segment
+        return segment
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Pickles as its path: an unpickled copy (e.g. in a planner worker
+        # process) memory-maps the file itself on first use.
+        return {"path": self.path}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__init__(state["path"])
+
+    @property
+    def is_open(self) -> bool:
+        return self._spk is not None
+
+    @property
+    def loaded_segments(self) -> list[tuple[int, int]]:
+        """The (center, target) pairs resolved so far."""
+        return list(self._segments)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._spk is not None:
+                self._spk.close()
+            self._spk = None
+            self._segments.clear()
+
+
+def required_segments(location_paths: Iterable[list[int]]) -> set[tuple[int, int]]:
+    """Every (center, target) segment some location path walks through."""
+    return {(origin, target)
+            for path in location_paths
+            for origin, target in zip(path[:-1], path[1:])}
+
+
+def write_subset(source_path: str,
+                 output_path: str,
+                 segments: set[tuple[int, int]],
+                 start_jd: float,
+                 end_jd: float,
+                 keep_start: bool = True) -> list[tuple[int, int]]:
+    """
+    Write an SPK holding only `segments` over [start_jd, end_jd] (whole
+    Chebyshev records, copied verbatim). Returns the pairs written;
+    raises KeyError if the source lacks any requested segment.
+
+    jplephem locates a record from the segment's initial epoch, so
+    dropping the records *before* `start_jd` rebases that epoch and
+    perturbs the computed time offset by floating-point rounding (a
+    sub-metre difference, but not bit-identical). `keep_start=True`
+    keeps each segment's leading records so the subset reproduces the
+    source exactly; pass False to trim both ends for the smallest file.
+    """
+    if end_jd <= start_jd:
+        raise ValueError("end_jd must be after start_jd.")
+    with open(source_path, "rb") as source_file:
+        source = SPK(DAF(source_file))
+        available: set[tuple[int, int]] = {(s.center, s.target) for s in source.segments}
+        missing: set[tuple[int, int]] = segments - available
+        if missing:
+            raise KeyError(f"Source kernel lacks segments {sorted(missing)}.")
+        kept = [(summary, segment)
+                for summary, segment in zip(source.daf.summaries(), source.segments)
+                if (segment.center, segment.target) in segments]
+        first_jd: float = (min(segment.start_jd for _, segment in kept) if keep_start
+                           else start_jd)
+        with open(output_path, "w+b") as output_file:
+            write_excerpt(source, output_file, min(first_jd, start_jd), end_jd,
+                          [summary for summary, _ in kept])
+    with open(output_path, "rb") as output_file:
+        return [(s.center, s.target) for s in SPK(DAF(output_file)).segments]
+
+
+@dataclass(frozen=True)
+class SubsetCheck:
+    """Outcome of comparing a subset kernel against its source."""
+    samples: int                   # (segment, date) pairs compared
+    mismatches: int                # pairs whose states differ in any bit
+    max_position_diff_km: float
+    max_velocity_diff_km_day: float
+
+    @property
+    def identical(self) -> bool:
+        return self.mismatches == 0
+
+
+def compare_kernels(full: Any,
+                    subset: Any,
+                    segments: set[tuple[int, int]],
+                    start_jd: float,
+                    end_jd: float,
+                    samples_per_segment: int = 2000,
+                    seed: int = 0) -> SubsetCheck:
+    """
+    Evaluate every segment in both kernels at the range's end points and
+    at `samples_per_segment` random dates in between, and report any
+    difference. A subset written by `write_subset` with `keep_start`
+    copies the Chebyshev records and their epochs verbatim, so every
+    state should match exactly.
+    """
+    generator = np.random.default_rng(seed)
+    dates = np.concatenate(([start_jd, end_jd],
+                            generator.uniform(start_jd, end_jd, samples_per_segment)))
+    mismatches: int = 0
+    max_position: float = 0.0
+    max_velocity: float = 0.0
+    for key in sorted(segments):
+        full_position, full_velocity = full[key].compute_and_differentiate(dates)
+        subset_position, subset_velocity = subset[key].compute_and_differentiate(dates)
+        differs = ((np.asarray(full_position) != np.asarray(subset_position)).any(axis=0)
+                   | (np.asarray(full_velocity) != np.asarray(subset_velocity)).any(axis=0))
+        mismatches += int(differs.sum())
+        max_position = max(max_position,
+                           float(np.abs(np.asarray(full_position) - subset_position).max()))
+        max_velocity = max(max_velocity,
+                           float(np.abs(np.asarray(full_velocity) - subset_velocity).max()))
+    return SubsetCheck(samples=len(segments) * dates.size,
+                       mismatches=mismatches,
+                       max_position_diff_km=max_position,
+                       max_velocity_diff_km_day=max_velocity)
@@ -0,0 +1,267 @@
+"""
+Precomputed launch-window calendar.
+
+Planetary geometry repeats and the ephemeris is fixed, so the porkchop
+search behind every "fly to" can be done once, offline, for the whole
+ephemeris span. `build_launch_window_index` sweeps an origin/target pair
+across a date range on a porkchop grid (departures a fraction of the
+pair's shortest period apart, flight times bracketing the Hohmann time
+between the mean orbit radii) and keeps only the grid's local delta-v
+minima: one `LaunchWindow` per basin, with its departure (Julian date),
+time of flight and delta-v.
+
+A `LaunchWindowIndex` holds those per pair as sorted columns, answers
+"windows departing between two dates" with a binary search, and is
+stored as one compressed numpy archive (`save`/`load`). The planner
+turns an indexed window into a flyable transfer with a single local
+polish (`MissionPlanner.plan_from_index`) instead of a full grid.
+`scripts/build_launch_windows.py` builds the index for every pair of
+Sun-orbiting bodies in data/bodies.json.
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Iterable, Iterator, Mapping
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from math import pi, sqrt
+
+import numpy as np
+from numpy.typing import NDArray
+
+from core.mission_planner import MissionPlanner, OrbitingBody, grid_minima, linspace
+
+SECONDS_PER_DAY: float = 86400.0
+# Grid resolution of the sweep: departures per shortest period of the pair
+# (the origin's, the target's or their synodic period), and flight times
+# between 0.6 and 1.6 Hohmann times.
+DEFAULT_DEPARTURES_PER_PERIOD: int = 48
+DEFAULT_FLIGHT_SAMPLES: int = 48
+# Minima above this are not launch windows anyone would fly.
+DEFAULT_MAX_DELTA_V_KM_S: float = 50.0
+# Departures per planner call; bounds the sweep's memory.
+SWEEP_CHUNK_DEPARTURES: int = 2048
+
+
+@dataclass(frozen=True)
+class LaunchWindow:
+    """One local delta-v minimum of a pair's porkchop sweep."""
+    origin: str
+    target: str
+    departure_jd: float
+    time_of_flight: float        # s
+    total_delta_v: float         # km/s, at the grid cell
+    departure_step: float        # s, the sweep's grid spacing around it
+    flight_step: float           # s
+
+
+@dataclass(frozen=True)
+class _PairWindows:
+    """A pair's windows as columns sorted by departure."""
+    departure_jd: NDArray[np.float64]
+    time_of_flight: NDArray[np.float64]
+    total_delta_v: NDArray[np.float64]
+    departure_step: float
+    flight_step: float
+
+
+class LaunchWindowIndex:
+    """Launch windows per (origin, target) pair, searchable by departure date."""
+
+    def __init__(self, source: str = "") -> None:
+        # What the index was swept from (kernel file, or an approximate model).
+        self.source: str = source
+        self._pairs: dict[tuple[str, str], _PairWindows] = {}
+
+    def add(self,
+            origin: str,
+            target: str,
+            departure_jd: NDArray[np.float64],
+            time_of_flight: NDArray[np.float64],
+            total_delta_v: NDArray[np.float64],
+            departure_step: float,
+            flight_step: float) -> None:
+        """Store (or replace) a pair's windows, in any order."""
+        order = np.argsort(departure_jd, kind="stable")
+        self._pairs[(origin, target)] = _PairWindows(
+            departure_jd=np.asarray(departure_jd, dtype=np.float64)[order],
+            time_of_flight=np.asarray(time_of_flight, dtype=np.float64)[order],
+            total_delta_v=np.asarray(total_delta_v, dtype=np.float64)[order],
+            departure_step=departure_step,
+            flight_step=flight_step)
+
+    def __contains__(self, pair: tuple[str, str]) -> bool:
+        return pair in self._pairs
+
+    def __len__(self) -> int:
+        """Total number of windows over all pairs."""
+        return sum(len(table.departure_jd) for table in self._pairs.values())
+
+    def pairs(self) -> list[tuple[str, str]]:
+        return list(self._pairs)
+
+    def windows(self,
+                origin: str,
+                target: str,
+                start_jd: float = -float("inf"),
+                end_jd: float = float("inf")) -> list[LaunchWindow]:
+        """The pair's windows departing in [start_jd, end_jd), by departure."""
+        table = self._pairs.get((origin, target))
+        if table is None:
+            return []
+        first, last = np.searchsorted(table.departure_jd, [start_jd, end_jd], side="left")
+        return [self._window(origin, target, table, k) for k in range(first, last)]
+
+    @staticmethod
+    def _window(origin: str, target: str, table: _PairWindows, k: int) -> LaunchWindow:
+        return LaunchWindow(origin=origin,
+                            target=target,
+                            departure_jd=float(table.departure_jd[k]),
+                            time_of_flight=float(table.time_of_flight[k]),
+                            total_delta_v=float(table.total_delta_v[k]),
+                            departure_step=table.departure_step,
+                            flight_step=table.flight_step)
+
+    def save(self, path: str) -> None:
+        """
+        Write the index as one compressed .npz: all pairs' columns
+        concatenated, with per-pair offsets and grid steps. Times of flight
+        (days) and delta-v are single precision -- well inside the polish
+        step's reach.
+        """
+        names = list(self._pairs)
+        tables = [self._pairs[name] for name in names]
+        offsets = np.cumsum([0] + [len(table.departure_jd) for table in tables])
+        with open(path, "wb") as file:
+            np.savez_compressed(
+                file,
+                source=np.array(self.source),
+                origins=np.array([origin for origin, _ in names], dtype=np.str_),
+                targets=np.array([target for _, target in names], dtype=np.str_),
+                offsets=offsets.astype(np.int64),
+                steps=np.array([(table.departure_step, table.flight_step) for table in tables],
+                               dtype=np.float64).reshape(-1, 2),
+                departure_jd=_concatenate(table.departure_jd for table in tables),
+                time_of_flight_days=_concatenate((table.time_of_flight / SECONDS_PER_DAY
+                                                  for table in tables), np.float32),
+                total_delta_v=_concatenate((table.total_delta_v for table in tables),
+                                           np.float32),
+            )
+
+    @classmethod
+    def load(cls, path: str) -> LaunchWindowIndex:
+        """Read an index written by `save`."""
+        with np.load(path) as archive:
+            index = cls(source=str(archive["source"]))
+            offsets = archive["offsets"]
+            departure_jd = archive["departure_jd"].astype(np.float64)
+            time_of_flight = archive["time_of_flight_days"].astype(np.float64) * SECONDS_PER_DAY
+            total_delta_v = archive["total_delta_v"].astype(np.float64)
+            for k, (origin, target) in enumerate(zip(archive["origins"].tolist(),
+                                                     archive["targets"].tolist())):
+                window = slice(int(offsets[k]), int(offsets[k + 1]))
+                departure_step, flight_step = archive["steps"][k].tolist()
+                index.add(origin, target, departure_jd[window], time_of_flight[window],
+                          total_delta_v[window], departure_step, flight_step)
+        return index
+
+    @classmethod
+    def load_if_present(cls, path: str) -> LaunchWindowIndex | None:
+        return cls.load(path) if os.path.exists(path) else None
+
+
+def _concatenate(columns: Iterable[NDArray[np.float64]], dtype: type = np.float64) -> NDArray:
+    parts = list(columns)
+    return (np.concatenate(parts) if parts else np.zeros(0)).astype(dtype)
+
+
+def sweep_grid(origin: OrbitingBody,
+               target: OrbitingBody,
+               mu: float,
+               departures_per_period: int = DEFAULT_DEPARTURES_PER_PERIOD,
+               flight_samples: int = DEFAULT_FLIGHT_SAMPLES) -> tuple[float, list[float]]:
+    """
+    The sweep's departure step (s) and flight times for a pair: the
+    `transfer_grid` bracket of 0.6-1.6 Hohmann times, here between the
+    mean orbit radii implied by the two orbital periods.
+    """
+    period_origin: float = origin.orbital_period * SECONDS_PER_DAY
+    period_target: float = target.orbital_period * SECONDS_PER_DAY
+    rate_difference: float = abs(1.0 / period_origin - 1.0 / period_target)
+    synodic: float = (1.0 / rate_difference) if rate_difference > 0 else period_target
+    departure_step: float = min(synodic, period_origin, period_target) / departures_per_period
+
+    semi_major: float = 0.5 * sum((mu * (period / (2.0 * pi))**2) ** (1.0 / 3.0)
+                                  for period in (period_origin, period_target))
+    hohmann_tof: float = pi * sqrt(semi_major**3 / mu)
+    return departure_step, linspace(0.6 * hohmann_tof, 1.6 * hohmann_tof, flight_samples)
+
+
+def sweep_pair(planner: MissionPlanner,
+               epoch_jd: float,
+               origin: str,
+               target: str,
+               start_jd: float,
+               end_jd: float,
+               departure_step: float,
+               flight_times: list[float],
+               max_delta_v_km_s: float = DEFAULT_MAX_DELTA_V_KM_S,
+               executor: Executor | None = None,
+               workers: int | None = None) -> Iterator[tuple[float, float, float]]:
+    """
+    Yield (departure JD, time of flight s, delta-v km/s) for every local
+    delta-v minimum of the porkchop grid over [start_jd, end_jd], in
+    departure order. The grid is solved `SWEEP_CHUNK_DEPARTURES` rows at a
+    time, each chunk overlapping its neighbours by one row so minima on a
+    chunk edge are judged against both sides. The sweep's own first and
+    last departures are never minima: the grid is cut off there, not at a
+    basin.
+    """
+    start_s: float = (start_jd - epoch_jd) * SECONDS_PER_DAY
+    count: int = int((end_jd - start_jd) * SECONDS_PER_DAY // departure_step) + 1
+    for first in range(0, count, SWEEP_CHUNK_DEPARTURES):
+        rows = range(max(first - 1, 0), min(first + SWEEP_CHUNK_DEPARTURES + 1, count))
+        departures: list[float] = [start_s + row * departure_step for row in rows]
+        totals = planner.delta_v_grid(origin, target, departures, flight_times,
+                                      executor=executor, workers=workers)
+        for i, j in sorted(grid_minima(totals)):
+            row: int = rows[i]
+            if (max(first, 1) <= row < min(first + SWEEP_CHUNK_DEPARTURES, count - 1)
+                    and totals[i, j] <= max_delta_v_km_s):
+                yield (epoch_jd + departures[i] / SECONDS_PER_DAY, flight_times[j],
+                       float(totals[i, j]))
+
+
+def build_launch_window_index(planner: MissionPlanner,
+                              epoch_jd: float,
+                              bodies: Mapping[str, OrbitingBody],
+                              pairs: Iterable[tuple[str, str]],
+                              start_jd: float,
+                              end_jd: float,
+                              departures_per_period: int = DEFAULT_DEPARTURES_PER_PERIOD,
+                              flight_samples: int = DEFAULT_FLIGHT_SAMPLES,
+                              max_delta_v_km_s: float = DEFAULT_MAX_DELTA_V_KM_S,
+                              source: str = "",
+                              executor: Executor | None = None,
+                              workers: int | None = None,
+                              index: LaunchWindowIndex | None = None) -> LaunchWindowIndex:
+    """
+    Sweep every (origin, target) pair over [start_jd, end_jd] with
+    `planner` (whose ephemeris epoch is Julian date `epoch_jd`) and collect
+    the local delta-v minima into a `LaunchWindowIndex` -- a new one, or
+    `index` when given. `executor` and `workers` parallelize each chunk of
+    the grid as in `MissionPlanner.porkchop`.
+    """
+    if index is None:
+        index = LaunchWindowIndex(source=source)
+    for origin, target in pairs:
+        departure_step, flight_times = sweep_grid(bodies[origin], bodies[target], planner.mu,
+                                                  departures_per_period, flight_samples)
+        minima = list(sweep_pair(planner, epoch_jd, origin, target, start_jd, end_jd,
+                                 departure_step, flight_times, max_delta_v_km_s,
+                                 executor, workers))
+        columns = np.array(minima, dtype=np.float64).reshape(-1, 3)
+        index.add(origin, target, columns[:, 0], columns[:, 1], columns[:, 2],
+                  departure_step, (flight_times[-1] - flight_times[0]) / (flight_samples - 1))
+    return index
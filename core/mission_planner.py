@@ -14,24 +14,72 @@ The approach is the classic porkchop search used in real mission design:
 
 The planner never talks to the GUI or to jplephem directly: it sees the
 solar system only through the `Ephemeris` protocol, so tests can drive
-it with analytic circular orbits.
+it with analytic circular orbits. An ephemeris that also offers batch
+`states` queries (`BatchEphemeris`, e.g. `JplEphemeris`) lets a whole
+grid's body states be fetched in two vectorized calls up front. A
+planner can also carry a cheap approximate ephemeris (e.g.
+`KeplerianEphemeris`) for coarse porkchop screening, and is given the
+Lambert solver to use (`solve_lambert` by default, or the faster
+`solve_lambert_izzo`). Whole grids are solved in one vectorized pass
+(`solve_lambert_batch`) unless the planner is told to go cell by cell.
+Single transfers and whole searches can be memoized in a shared
+`TransferCache`, on times snapped to its quantum.
+Large grids can also be split into departure-time bands solved in
+parallel worker processes (`porkchop`/`plan_transfer` with `workers` or
+an `executor`); each worker unpickles its own copy of the planner, and
+so of the ephemeris — a `LazyKernel` reopens (memory-maps) the kernel
+file in every worker.
+
+A grid's answer is only as fine as its spacing, so `plan_transfer` can
+also polish it (`refine`): the best few basins of the coarse grid seed a
+bounded Nelder–Mead search in continuous (departure, time of flight)
+space, each confined to the grid cells around its seed. A coarse grid
+plus a few dozen single Lambert solves per basin lands within minutes of
+the optimum that a dense grid would only approach to its own spacing.
 """
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import os
+from collections.abc import Callable, Mapping
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, replace
 from enum import Enum, auto
-from math import pi, sqrt
-from typing import Protocol, override
+from itertools import repeat
+from math import ceil, isnan, pi, sqrt
+from typing import TYPE_CHECKING, Protocol, override
 
+import numpy as np
+from numpy.typing import NDArray
+
+from core.ephemeris import BatchEphemeris
 from core.flight_plan import FlightPlan
-from core.lambert import MU_SUN, LambertNoConvergence, solve_lambert
+from core.lambert import (
+    MU_SUN,
+    LambertNoConvergence,
+    LambertSolver,
+    solve_lambert,
+    solve_lambert_batch,
+)
+from core.transfer_cache import NO_SOLUTION, TransferCache
 from core.vec3 import Vec3
 
+if TYPE_CHECKING:
+    from core.launch_windows import LaunchWindowIndex
+
 # Porkchop grid defaults, matching the desktop app's GRID_*/MAX_DEPARTURE_WINDOW_S.
 DEFAULT_GRID_DEPARTURE_SAMPLES: int = 24
 DEFAULT_GRID_FLIGHT_SAMPLES: int = 12
 DEFAULT_MAX_DEPARTURE_WINDOW_S: float = 3.0 * 365.25 * 86400.0
+# `transfer_grid` starts its departures on this absolute lattice (whole
+# Julian days), so every search for a pair within the same day covers the
+# same grid and `plan_transfer` answers all but the first from its cache.
+DEPARTURE_LATTICE_S: float = 86400.0
+
+# Local refinement of grid basins (`plan_transfer(refine=...)`).
+DEFAULT_REFINE_BASINS: int = 3
+REFINE_TOLERANCE_S: float = 600.0
+REFINE_MAX_EVALUATIONS: int = 120
 
 
 def linspace(start: float, stop: float, count: int) -> list[float]:
@@ -105,9 +153,27 @@ class MissionPlanner:
     central mass and converts the best solution to a FlightPlan.
     """
 
-    def __init__(self, ephemeris: Ephemeris, mu: float = MU_SUN) -> None:
+    def __init__(self,
+                 ephemeris: Ephemeris,
+                 mu: float = MU_SUN,
+                 approximate_ephemeris: Ephemeris | None = None,
+                 lambert_solver: LambertSolver = solve_lambert,
+                 vectorized_grid: bool = True,
+                 transfer_cache: TransferCache | None = None,
+                 epoch_jd: float = 0.0) -> None:
         self.ephemeris: Ephemeris = ephemeris
         self.mu: float = mu
+        # Optional fast, approximate source for `porkchop(approximate=True)`.
+        self.approximate_ephemeris: Ephemeris | None = approximate_ephemeris
+        # Single transfers always use `lambert_solver`; grids do too when
+        # `vectorized_grid` is False, else the batch Izzo solver.
+        self.lambert_solver: LambertSolver = lambert_solver
+        self.vectorized_grid: bool = vectorized_grid
+        # Optional memo of single transfers and whole searches, keyed on
+        # absolute time: `epoch_jd` is the Julian date of `ephemeris`'s
+        # time zero, so planners with different epochs share entries.
+        self.transfer_cache: TransferCache | None = transfer_cache
+        self.epoch_jd: float = epoch_jd
 
     # ------------------------------------------------------------------
     # Search
@@ -122,13 +188,55 @@ class MissionPlanner:
         Solve one grid point: Lambert from origin's position at
         departure to target's position at arrival. Returns None where
         no single-revolution transfer exists.
+
+        With a `transfer_cache`, the departure and flight times snap to its
+        time quantum and a transfer solved before is returned from it.
         """
+        cache: TransferCache | None = self.transfer_cache
+        if cache is None:
+            return self._solve_transfer(origin, target, departure_time, time_of_flight)
+        epoch_s: float = self.epoch_jd * 86400.0
+        departure_bucket: int = cache.time_bucket(epoch_s + departure_time)
+        flight_bucket: int = cache.time_bucket(time_of_flight)
+        key = ("transfer", origin, target, self.mu, self.lambert_solver,
+               departure_bucket, flight_bucket)
+        stored = cache.get(key)
+        if stored is None:
+            solution = self._solve_transfer(origin, target,
+                                            departure_bucket * cache.time_quantum_s - epoch_s,
+                                            flight_bucket * cache.time_quantum_s)
+            stored = (NO_SOLUTION if solution is None
+                      else replace(solution, departure_time=solution.departure_time + epoch_s))
+            cache.put(key, stored)
+        if stored is NO_SOLUTION:
+            return None
+        return replace(stored, departure_time=stored.departure_time - epoch_s)
+
+    def _solve_transfer(self,
+                        origin: str,
+                        target: str,
+                        departure_time: float,
+                        time_of_flight: float) -> TransferSolution | None:
+        """The uncached `evaluate_transfer`."""
         r1, v_origin = self.ephemeris.state(origin, departure_time)
         r2, v_target = self.ephemeris.state(target, departure_time + time_of_flight)
+        return self._transfer_between(origin, target, departure_time, time_of_flight,
+                                      r1, v_origin, r2, v_target)
+
+    def _transfer_between(self,
+                          origin: str,
+                          target: str,
+                          departure_time: float,
+                          time_of_flight: float,
+                          r1: Vec3,
+                          v_origin: Vec3,
+                          r2: Vec3,
+                          v_target: Vec3) -> TransferSolution | None:
+        """The Lambert half of `evaluate_transfer`, given the body states."""
         try:
-            lambert = solve_lambert(r1=r1, r2=r2,
-                                    time_of_flight=time_of_flight,
-                                    mu=self.mu)
+            lambert = self.lambert_solver(r1=r1, r2=r2,
+                                          time_of_flight=time_of_flight,
+                                          mu=self.mu)
         except LambertNoConvergence:
             return None
         return TransferSolution(origin=origin,
@@ -138,28 +246,184 @@ class MissionPlanner:
                                 departure_delta_v=lambert.v1 - v_origin,
                                 arrival_delta_v=v_target - lambert.v2)
 
+    def _grid_states(self,
+                     origin: str,
+                     target: str,
+                     departure_times: list[float],
+                     flight_times: list[float],
+                     ephemeris: Ephemeris,
+                     ) -> tuple[NDArray[np.float64], NDArray[np.float64],
+                                NDArray[np.float64], NDArray[np.float64]]:
+        """
+        Origin position and velocity at each departure, (D, 3), and target
+        position and velocity at each arrival, (D * F, 3) in departure-major
+        order. A `BatchEphemeris` answers in two vectorized queries;
+        otherwise each time asks `state`.
+        """
+        departures: NDArray[np.float64] = np.asarray(departure_times, dtype=np.float64)
+        flights: NDArray[np.float64] = np.asarray(flight_times, dtype=np.float64)
+        arrivals: NDArray[np.float64] = (departures[:, None] + flights[None, :]).ravel()
+        if isinstance(ephemeris, BatchEphemeris):
+            origin_positions, origin_velocities = ephemeris.states([origin], departures)
+            target_positions, target_velocities = ephemeris.states([target], arrivals)
+            return (origin_positions[0], origin_velocities[0],
+                    target_positions[0], target_velocities[0])
+        origin_states = [ephemeris.state(origin, float(time_s)) for time_s in departures]
+        target_states = [ephemeris.state(target, float(time_s)) for time_s in arrivals]
+        return (np.array([position.as_tuple() for position, _ in origin_states]).reshape(-1, 3),
+                np.array([velocity.as_tuple() for _, velocity in origin_states]).reshape(-1, 3),
+                np.array([position.as_tuple() for position, _ in target_states]).reshape(-1, 3),
+                np.array([velocity.as_tuple() for _, velocity in target_states]).reshape(-1, 3))
+
+    def _grid_delta_v(self,
+                      origin: str,
+                      target: str,
+                      departure_times: list[float],
+                      flight_times: list[float],
+                      ephemeris: Ephemeris,
+                      ) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+        """
+        Departure and arrival delta-v vectors, (D * F, 3) in departure-major
+        order, for the whole grid in one `solve_lambert_batch` call (or
+        cell by cell through `lambert_solver` when `vectorized_grid` is
+        off). Cells without a transfer are NaN.
+        """
+        if not self.vectorized_grid:
+            cells = self._solve_grid(origin, target, departure_times, flight_times, ephemeris)
+            departure: NDArray[np.float64] = np.full((len(cells), 3), np.nan)
+            arrival: NDArray[np.float64] = np.full((len(cells), 3), np.nan)
+            for k, (_, _, solution) in enumerate(cells):
+                if solution is not None:
+                    departure[k] = solution.departure_delta_v.as_tuple()
+                    arrival[k] = solution.arrival_delta_v.as_tuple()
+            return departure, arrival
+        origin_positions, origin_velocities, target_positions, target_velocities = (
+            self._grid_states(origin, target, departure_times, flight_times, ephemeris))
+        count: int = len(flight_times)
+        lambert = solve_lambert_batch(np.repeat(origin_positions, count, axis=0),
+                                      target_positions,
+                                      np.tile(np.asarray(flight_times, dtype=np.float64),
+                                              len(departure_times)),
+                                      mu=self.mu)
+        return (lambert.v1 - np.repeat(origin_velocities, count, axis=0),
+                target_velocities - lambert.v2)
+
+    def _banded_grid_delta_v(self,
+                             origin: str,
+                             target: str,
+                             departure_times: list[float],
+                             flight_times: list[float],
+                             ephemeris: Ephemeris,
+                             executor: Executor | None,
+                             workers: int | None,
+                             ) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+        """
+        `_grid_delta_v`, split into contiguous departure-time bands solved
+        in parallel when an `executor` or more than one worker is asked
+        for. Bands are merged back in departure order, so the result is
+        identical to the single-process grid.
+        """
+        if executor is None and (workers is None or workers <= 1):
+            return self._grid_delta_v(origin, target, departure_times, flight_times, ephemeris)
+        band_count: int = max(1, min(len(departure_times), workers or os.cpu_count() or 1))
+        bands: list[list[float]] = [band.tolist() for band
+                                    in np.array_split(np.asarray(departure_times, dtype=np.float64),
+                                                      band_count)]
+        arguments = (repeat(self), repeat(ephemeris), repeat(origin), repeat(target),
+                     bands, repeat(flight_times))
+        if executor is not None:
+            results = list(executor.map(_solve_band, *arguments))
+        else:
+            with ProcessPoolExecutor(max_workers=band_count) as pool:
+                results = list(pool.map(_solve_band, *arguments))
+        return (np.concatenate([departure for departure, _ in results]),
+                np.concatenate([arrival for _, arrival in results]))
+
+    def _solve_grid(self,
+                    origin: str,
+                    target: str,
+                    departure_times: list[float],
+                    flight_times: list[float],
+                    ephemeris: Ephemeris | None = None,
+                    ) -> list[tuple[float, float, TransferSolution | None]]:
+        """
+        Solve every (departure, flight time) cell one by one with the
+        planner's `lambert_solver`, in departure-major order, reading body
+        states from `ephemeris` (default: the planner's own).
+        """
+        if ephemeris is None:
+            ephemeris = self.ephemeris
+        origin_positions, origin_velocities, target_positions, target_velocities = (
+            self._grid_states(origin, target, departure_times, flight_times, ephemeris))
+        cells: list[tuple[float, float, TransferSolution | None]] = []
+        for i, departure_time in enumerate(departure_times):
+            r1 = Vec3(*origin_positions[i].tolist())
+            v_origin = Vec3(*origin_velocities[i].tolist())
+            for j, time_of_flight in enumerate(flight_times):
+                k: int = i * len(flight_times) + j
+                cells.append((departure_time, time_of_flight,
+                              self._transfer_between(origin, target,
+                                                     departure_time, time_of_flight,
+                                                     r1, v_origin,
+                                                     Vec3(*target_positions[k].tolist()),
+                                                     Vec3(*target_velocities[k].tolist()))))
+        return cells
+
     def porkchop(self,
                  origin: str,
                  target: str,
                  departure_times: list[float],
-                 flight_times: list[float]) -> list[PorkchopPoint]:
+                 flight_times: list[float],
+                 approximate: bool = False,
+                 executor: Executor | None = None,
+                 workers: int | None = None) -> list[PorkchopPoint]:
         """
         Evaluate the whole (departure x flight time) grid. The result
         is the raw material both for plotting and for `plan_transfer`.
+
+        `approximate=True` reads body states from the planner's
+        `approximate_ephemeris` instead: good enough to see where the
+        low-delta-v valleys are, not to fly the result.
+
+        `workers > 1` solves the grid in that many departure-time bands on
+        a private process pool; `executor` uses a caller-owned pool
+        instead (one band per worker, `workers` or the CPU count). Either
+        way the points come back in the same order and with the same
+        values as the single-process grid.
+        """
+        totals = self.delta_v_grid(origin, target, departure_times, flight_times,
+                                   approximate=approximate, executor=executor, workers=workers)
+        cells: list[float | None] = [None if isnan(total) else total
+                                     for total in totals.ravel().tolist()]
+        return [PorkchopPoint(departure_time=departure_time,
+                              time_of_flight=time_of_flight,
+                              total_delta_v=total)
+                for (departure_time, time_of_flight), total
+                in zip(((d, f) for d in departure_times for f in flight_times), cells)]
+
+    def delta_v_grid(self,
+                     origin: str,
+                     target: str,
+                     departure_times: list[float],
+                     flight_times: list[float],
+                     approximate: bool = False,
+                     executor: Executor | None = None,
+                     workers: int | None = None) -> NDArray[np.float64]:
         """
-        grid: list[PorkchopPoint] = []
-        for departure_time in departure_times:
-            for time_of_flight in flight_times:
-                solution = self.evaluate_transfer(origin=origin,
-                                                  target=target,
-                                                  departure_time=departure_time,
-                                                  time_of_flight=time_of_flight)
-                grid.append(PorkchopPoint(
-                    departure_time=departure_time,
-                    time_of_flight=time_of_flight,
-                    total_delta_v=solution.total_delta_v if solution is not None else None,
-                ))
-        return grid
+        `porkchop` as a bare (D, F) array of total delta-v (km/s), NaN where
+        there is no transfer: the form to use for grids too large to hold
+        as `PorkchopPoint`s.
+        """
+        ephemeris: Ephemeris = self.ephemeris
+        if approximate:
+            if self.approximate_ephemeris is None:
+                raise ValueError("This planner has no approximate_ephemeris.")
+            ephemeris = self.approximate_ephemeris
+        departure_dv, arrival_dv = self._banded_grid_delta_v(origin, target, departure_times,
+                                                             flight_times, ephemeris,
+                                                             executor, workers)
+        totals = np.linalg.norm(departure_dv, axis=1) + np.linalg.norm(arrival_dv, axis=1)
+        return totals.reshape(len(departure_times), len(flight_times))
 
     def plan_transfer(self,
                       origin: str,
@@ -167,58 +431,219 @@ class MissionPlanner:
                       departure_times: list[float],
                       flight_times: list[float],
                       objective: Objective = Objective.MIN_DELTA_V,
-                      delta_v_budget_km_s: float | None = None) -> TransferSolution:
+                      delta_v_budget_km_s: float | None = None,
+                      executor: Executor | None = None,
+                      workers: int | None = None,
+                      refine: int = 0) -> TransferSolution:
         """
         Search the grid and return the best transfer per the objective.
 
           * MIN_DELTA_V: cheapest total delta-v.
           * MIN_TIME: earliest arrival among transfers whose total
             delta-v fits within `delta_v_budget_km_s`.
+
+        Ties go to the first cell in departure-major order. `executor` and
+        `workers` parallelize the grid as in `porkchop`.
+
+        `refine > 0` polishes that many of the grid's best local minima
+        off the grid (each searched within the grid cells around it, see
+        `_refine_transfer`) and returns the best result, never worse than
+        the best grid cell. Refined departures stay within the grid's
+        departure span, so a grid from `transfer_grid` still never departs
+        before `now`.
+
+        With a `transfer_cache`, both grid axes are first snapped to its
+        time quantum, and a repeated search is answered from the cache.
         """
         if objective is Objective.MIN_TIME and delta_v_budget_km_s is None:
             raise ValueError("MIN_TIME requires a delta_v_budget_km_s.")
-
-        best: TransferSolution | None = None
-        for departure_time in departure_times:
-            for time_of_flight in flight_times:
-                solution = self.evaluate_transfer(origin=origin,
-                                                  target=target,
-                                                  departure_time=departure_time,
-                                                  time_of_flight=time_of_flight)
-                if solution is None:
-                    continue
-                if objective is Objective.MIN_DELTA_V:
-                    if best is None or solution.total_delta_v < best.total_delta_v:
-                        best = solution
-                else:  # MIN_TIME
-                    assert delta_v_budget_km_s is not None
-                    if solution.total_delta_v > delta_v_budget_km_s:
-                        continue
-                    if best is None or solution.arrival_time < best.arrival_time:
-                        best = solution
-        if best is None:
+        cache: TransferCache | None = self.transfer_cache
+        if cache is None:
+            return self._search_transfer(origin, target, departure_times, flight_times,
+                                         objective, delta_v_budget_km_s, executor, workers,
+                                         refine)
+        epoch_s: float = self.epoch_jd * 86400.0
+        departure_buckets = tuple(cache.time_bucket(epoch_s + time_s)
+                                  for time_s in departure_times)
+        flight_buckets = tuple(cache.time_bucket(time_s) for time_s in flight_times)
+        key = ("plan", origin, target, self.mu, self.lambert_solver, self.vectorized_grid,
+               objective, delta_v_budget_km_s, refine, departure_buckets, flight_buckets)
+        stored = cache.get(key)
+        if stored is None:
+            try:
+                solution = self._search_transfer(
+                    origin, target,
+                    [bucket * cache.time_quantum_s - epoch_s for bucket in departure_buckets],
+                    [bucket * cache.time_quantum_s for bucket in flight_buckets],
+                    objective, delta_v_budget_km_s, executor, workers, refine)
+                stored = replace(solution, departure_time=solution.departure_time + epoch_s)
+            except LambertNoConvergence:
+                stored = NO_SOLUTION
+            cache.put(key, stored)
+        if stored is NO_SOLUTION:
+            raise LambertNoConvergence(
+                f"No feasible {origin} -> {target} transfer found in the "
+                f"searched window."
+            )
+        return replace(stored, departure_time=stored.departure_time - epoch_s)
+
+    def _search_transfer(self,
+                         origin: str,
+                         target: str,
+                         departure_times: list[float],
+                         flight_times: list[float],
+                         objective: Objective,
+                         delta_v_budget_km_s: float | None,
+                         executor: Executor | None,
+                         workers: int | None,
+                         refine: int) -> TransferSolution:
+        """The uncached `plan_transfer`."""
+        departure_dv, arrival_dv = self._banded_grid_delta_v(origin, target, departure_times,
+                                                             flight_times, self.ephemeris,
+                                                             executor, workers)
+        totals = np.linalg.norm(departure_dv, axis=1) + np.linalg.norm(arrival_dv, axis=1)
+        feasible = ~np.isnan(totals)
+        if objective is Objective.MIN_DELTA_V:
+            scores = totals
+        else:  # MIN_TIME
+            assert delta_v_budget_km_s is not None
+            feasible &= totals <= delta_v_budget_km_s
+            scores = (np.asarray(departure_times, dtype=np.float64)[:, None]
+                      + np.asarray(flight_times, dtype=np.float64)[None, :]).ravel()
+        if not feasible.any():
             raise LambertNoConvergence(
                 f"No feasible {origin} -> {target} transfer found in the "
                 f"searched window."
             )
+        masked = np.where(feasible, scores, np.inf)
+        # argmin keeps the first of equal scores.
+        k: int = int(np.argmin(masked))
+        i, j = divmod(k, len(flight_times))
+        best = TransferSolution(origin=origin,
+                                target=target,
+                                departure_time=departure_times[i],
+                                time_of_flight=flight_times[j],
+                                departure_delta_v=Vec3(*departure_dv[k].tolist()),
+                                arrival_delta_v=Vec3(*arrival_dv[k].tolist()))
+        if refine <= 0:
+            return best
+        last_departure: int = len(departure_times) - 1
+        last_flight: int = len(flight_times) - 1
+        boxes = [(np.array([departure_times[i], flight_times[j]]),
+                  np.array([departure_times[max(i - 1, 0)], flight_times[max(j - 1, 0)]]),
+                  np.array([departure_times[min(i + 1, last_departure)],
+                            flight_times[min(j + 1, last_flight)]]))
+                 for i, j in grid_minima(masked.reshape(len(departure_times),
+                                                        len(flight_times)), refine)]
+        return self._refine_transfer(best, boxes, objective, delta_v_budget_km_s)
+
+    def plan_from_index(self,
+                        index: LaunchWindowIndex,
+                        epoch_jd: float,
+                        origin: str,
+                        target: str,
+                        after: float,
+                        within: float | None = None,
+                        max_delta_v_km_s: float | None = None) -> TransferSolution:
+        """
+        The next launch window after `after` (s from the ephemeris epoch,
+        which is Julian date `epoch_jd`) from a precomputed
+        `LaunchWindowIndex`, polished by one local search instead of a
+        porkchop grid. Among the indexed windows departing within `within`
+        seconds of `after` (default: any later one), takes the earliest
+        whose indexed delta-v is at most `max_delta_v_km_s`, or with no
+        limit the cheapest; the polish then stays within one index grid
+        step of it and never departs before `after`.
+
+        Only windows that open after `after` are considered: departing at
+        `after` itself on the tail of an earlier window is the grid
+        search's job.
+        """
+        start_jd: float = epoch_jd + after / 86400.0
+        end_jd: float = float("inf") if within is None else start_jd + within / 86400.0
+        windows = index.windows(origin, target, start_jd, end_jd)
+        if max_delta_v_km_s is not None:
+            windows = [window for window in windows
+                       if window.total_delta_v <= max_delta_v_km_s][:1]
+        if not windows:
+            raise LambertNoConvergence(
+                f"No indexed {origin} -> {target} window in the searched span."
+            )
+        window = min(windows, key=lambda candidate: candidate.total_delta_v)
+        departure: float = (window.departure_jd - epoch_jd) * 86400.0
+        seed = self.evaluate_transfer(origin, target, departure, window.time_of_flight)
+        if seed is None:
+            raise LambertNoConvergence(
+                f"Indexed {origin} -> {target} window at JD {window.departure_jd} "
+                f"has no transfer."
+            )
+        box = (np.array([departure, window.time_of_flight]),
+               np.array([max(departure - window.departure_step, after),
+                         window.time_of_flight - window.flight_step]),
+               np.array([departure + window.departure_step,
+                         window.time_of_flight + window.flight_step]))
+        return self._refine_transfer(seed, [box], Objective.MIN_DELTA_V, None)
+
+    def _refine_transfer(self,
+                         best: TransferSolution,
+                         boxes: list[tuple[NDArray[np.float64], NDArray[np.float64],
+                                           NDArray[np.float64]]],
+                         objective: Objective,
+                         delta_v_budget_km_s: float | None) -> TransferSolution:
+        """
+        Polish each (start, lower, upper) box -- a (departure, time of
+        flight) seed and the bounds of the search around it -- with a
+        Nelder–Mead search, evaluating single transfers through
+        `evaluate_transfer`. Returns the best transfer seen, or `best` (the
+        caller's own answer) if none beats it.
+        """
+        def score(solution: TransferSolution | None) -> float:
+            if solution is None:
+                return float("inf")
+            if objective is Objective.MIN_DELTA_V:
+                return solution.total_delta_v
+            assert delta_v_budget_km_s is not None
+            if solution.total_delta_v > delta_v_budget_km_s:
+                return float("inf")
+            return solution.arrival_time
+
+        best_score: float = score(best)
+
+        def cost(point: NDArray[np.float64]) -> float:
+            nonlocal best, best_score
+            solution = self.evaluate_transfer(best.origin, best.target,
+                                              float(point[0]), float(point[1]))
+            value: float = score(solution)
+            if solution is not None and value < best_score:
+                best, best_score = solution, value
+            return value
+
+        for start, lower, upper in boxes:
+            _nelder_mead(cost, start, lower, upper)
         return best
 
     def transfer_grid(self,
                       origin: str,
                       target: str,
                       now: float,
-                      bodies: dict[str, OrbitingBody],
+                      bodies: Mapping[str, OrbitingBody],
                       grid_departure_samples: int = DEFAULT_GRID_DEPARTURE_SAMPLES,
                       grid_flight_samples: int = DEFAULT_GRID_FLIGHT_SAMPLES,
                       max_departure_window_s: float = DEFAULT_MAX_DEPARTURE_WINDOW_S,
                       ) -> tuple[list[float], list[float]]:
         """
         A porkchop search grid: departures over (up to) one synodic period
-        starting now, and flight times bracketing the Hohmann time between
-        the two bodies' current radii.
+        starting at the first `DEPARTURE_LATTICE_S` boundary (in absolute
+        time, see `epoch_jd`) at or after `now`, and flight times
+        bracketing the Hohmann time between the two bodies' radii at that
+        first departure. Any `now` within the same lattice step gives the
+        same grid.
         """
-        r1: float = self.ephemeris.state(origin, now)[0].magnitude()
-        r2: float = self.ephemeris.state(target, now)[0].magnitude()
+        epoch_s: float = self.epoch_jd * 86400.0
+        start: float = (ceil((epoch_s + now) / DEPARTURE_LATTICE_S) * DEPARTURE_LATTICE_S
+                        - epoch_s)
+        r1: float = self.ephemeris.state(origin, start)[0].magnitude()
+        r2: float = self.ephemeris.state(target, start)[0].magnitude()
         semi_major: float = 0.5 * (r1 + r2)
         hohmann_tof: float = pi * sqrt(semi_major**3 / self.mu)
         flight_times: list[float] = linspace(0.6 * hohmann_tof, 1.6 * hohmann_tof,
@@ -229,11 +654,11 @@ class MissionPlanner:
         rate_difference: float = abs(1.0 / period_origin - 1.0 / period_target)
         synodic: float = (1.0 / rate_difference) if rate_difference > 0 else period_target
         window: float = min(synodic, max_departure_window_s)
-        departure_times: list[float] = linspace(now, now + window, grid_departure_samples)
+        departure_times: list[float] = linspace(start, start + window, grid_departure_samples)
         return departure_times, flight_times
 
     def capture_radius(self, target: str, sim_time_s: float,
-                       bodies: dict[str, OrbitingBody]) -> float:
+                       bodies: Mapping[str, OrbitingBody]) -> float:
         """
         Capture shell at a fraction of the sphere of influence: it only has
         to be wide enough to reliably latch the approach. The insertion then
@@ -306,3 +731,84 @@ class MissionPlanner:
                 .add_coast(duration=coast_duration)
                 .add_delta_v_vector(delta_v_vector_km_s=solution.arrival_delta_v,
                                     duration=burn_duration))
+
+
+def grid_minima(scores: NDArray[np.float64], count: int | None = None) -> list[tuple[int, int]]:
+    """
+    Up to `count` (default: all) (i, j) cells of a (D, F) score grid that
+    are no worse than any of their eight neighbours, best first (ties in
+    departure-major order). Infinite and NaN cells are never minima.
+    """
+    scores = np.where(np.isnan(scores), np.inf, scores)
+    padded = np.pad(scores, 1, constant_values=np.inf)
+    rows, columns = scores.shape
+    minimum = np.isfinite(scores)
+    for di in (-1, 0, 1):
+        for dj in (-1, 0, 1):
+            if di or dj:
+                minimum &= scores <= padded[1 + di:1 + di + rows, 1 + dj:1 + dj + columns]
+    cells = np.flatnonzero(minimum)
+    order = cells[np.argsort(scores.ravel()[cells], kind="stable")][:count]
+    return [divmod(int(k), columns) for k in order]
+
+
+def _nelder_mead(function: Callable[[NDArray[np.float64]], float],
+                 start: NDArray[np.float64],
+                 lower: NDArray[np.float64],
+                 upper: NDArray[np.float64],
+                 tolerance: float = REFINE_TOLERANCE_S,
+                 max_evaluations: int = REFINE_MAX_EVALUATIONS) -> NDArray[np.float64]:
+    """
+    Minimize `function` over the box [lower, upper] by Nelder–Mead, with
+    every trial point clipped into the box. Infinite values (no transfer,
+    or over budget) simply lose every comparison. Stops once all vertices
+    lie within `tolerance` of the best on each axis, or after
+    `max_evaluations`; returns the best vertex.
+    """
+    evaluations: int = 0
+
+    def evaluate(point: NDArray[np.float64]) -> tuple[float, NDArray[np.float64]]:
+        nonlocal evaluations
+        evaluations += 1
+        point = np.clip(point, lower, upper)
+        return function(point), point
+
+    # Start from the seed plus a quarter-box step along each axis, inward.
+    vertices: list[tuple[float, NDArray[np.float64]]] = [evaluate(start)]
+    step = 0.25 * (upper - lower)
+    for axis in range(len(start)):
+        offset = np.zeros_like(start)
+        offset[axis] = step[axis] if start[axis] + step[axis] <= upper[axis] else -step[axis]
+        vertices.append(evaluate(start + offset))
+
+    while evaluations < max_evaluations:
+        vertices.sort(key=lambda vertex: vertex[0])
+        best_point = vertices[0][1]
+        if all(np.all(np.abs(point - best_point) <= tolerance) for _, point in vertices):
+            break
+        worst_value, worst = vertices[-1]
+        centroid = np.mean([point for _, point in vertices[:-1]], axis=0)
+        reflected_value, reflected = evaluate(2.0 * centroid - worst)
+        if reflected_value < vertices[0][0]:
+            expanded = evaluate(3.0 * centroid - 2.0 * worst)
+            vertices[-1] = min(expanded, (reflected_value, reflected), key=lambda v: v[0])
+        elif reflected_value < vertices[-2][0]:
+            vertices[-1] = (reflected_value, reflected)
+        else:
+            towards = reflected if reflected_value < worst_value else worst
+            contracted = evaluate(0.5 * (centroid + towards))
+            if contracted[0] < min(reflected_value, worst_value):
+                vertices[-1] = contracted
+            else:
+                vertices[1:] = [evaluate(0.5 * (best_point + point)) for _, point in vertices[1:]]
+    return min(vertices, key=lambda vertex: vertex[0])[1]
+
+
+def _solve_band(planner: MissionPlanner,
+                ephemeris: Ephemeris,
+                origin: str,
+                target: str,
+                departure_times: list[float],
+                flight_times: list[float]) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """One departure band of a parallel grid (runs in a worker process)."""
+    return planner._grid_delta_v(origin, target, departure_times, flight_times, ephemeris)
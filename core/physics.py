@@ -11,9 +11,13 @@ Unit conventions (matching the rest of the simulation):
 
 from __future__ import annotations
 
+from collections.abc import Mapping
 from math import cos, radians, sin, sqrt
 from typing import Protocol
 
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
 from core.vec3 import Vec3
 
 G: float = 6.674e-11  # m^3 kg^-1 s^-2
@@ -35,8 +39,24 @@ class GravitatingBody(Protocol):
     def radius(self) -> float: ...
 
 
+class MovableBody(GravitatingBody, Protocol):
+    """A body whose state an ephemeris resync writes back."""
+
+    @property
+    def position(self) -> Vec3: ...
+
+    @position.setter
+    def position(self, value: Vec3, /) -> None: ...
+
+    @property
+    def velocity(self) -> Vec3: ...
+
+    @velocity.setter
+    def velocity(self, value: Vec3, /) -> None: ...
+
+
 def gravitational_acceleration(position: Vec3,
-                               bodies: dict[str, GravitatingBody]) -> Vec3:
+                               bodies: Mapping[str, GravitatingBody]) -> Vec3:
     """
     Total gravitational acceleration (km/s^2) at `position` (km) from
     all `bodies`. Contributions from inside a body's radius are ignored
@@ -54,6 +74,77 @@ def gravitational_acceleration(position: Vec3,
     return total
 
 
+class GravityField:
+    """
+    `gravitational_acceleration` with the per-call work hoisted out: the
+    bodies' gravitational parameters GM (km^3/s^2) and radii (km) are
+    computed once into contiguous arrays, and only the positions are
+    re-read when the bodies move (`update_positions`).
+
+    `accelerations` evaluates many field points in one vectorized numpy
+    pass. A single point (`acceleration`, the integrators' inner loop) is
+    summed with plain floats over the same precomputed values instead:
+    with a dozen bodies numpy's per-call overhead costs more than the
+    arithmetic it would vectorize.
+    """
+
+    def __init__(self, bodies: Mapping[str, GravitatingBody]) -> None:
+        self.names: list[str] = list(bodies)
+        # G*M in m^3/s^2 -> km^3/s^2.
+        self.gm: NDArray[np.float64] = np.array([G * body.mass * 1e-9
+                                                 for body in bodies.values()])
+        self.radii: NDArray[np.float64] = np.array([float(body.radius)
+                                                    for body in bodies.values()])
+        self._gm_radii: list[tuple[float, float]] = list(zip(self.gm.tolist(),
+                                                             self.radii.tolist()))
+        self._rows: list[tuple[float, float, float]] = []
+        self._positions: NDArray[np.float64] | None = None
+        self.update_positions(bodies)
+
+    def update_positions(self, bodies: Mapping[str, GravitatingBody]) -> None:
+        """Re-read the positions of the (same) bodies the field was built from."""
+        self.set_positions([bodies[name].position.as_tuple() for name in self.names])
+
+    def set_positions(self, rows: list[tuple[float, float, float]]) -> None:
+        """Move the bodies to `rows` (km), given in `names` order."""
+        self._rows = rows
+        self._positions = None
+
+    @property
+    def positions(self) -> NDArray[np.float64]:
+        """(N, 3) body positions (km), in `names` order."""
+        if self._positions is None:
+            self._positions = np.array(self._rows, dtype=np.float64).reshape(-1, 3)
+        return self._positions
+
+    def acceleration(self, position: Vec3) -> Vec3:
+        """Total acceleration (km/s^2) at one `position` (km)."""
+        px, py, pz = position.x, position.y, position.z
+        ax = ay = az = 0.0
+        for (bx, by, bz), (gm, radius) in zip(self._rows, self._gm_radii):
+            dx, dy, dz = bx - px, by - py, bz - pz
+            distance_squared: float = dx * dx + dy * dy + dz * dz
+            distance: float = sqrt(distance_squared)
+            if distance < radius or distance == 0.0:
+                continue
+            weight: float = gm / (distance_squared * distance)
+            ax += weight * dx
+            ay += weight * dy
+            az += weight * dz
+        return Vec3(ax, ay, az)
+
+    def accelerations(self, points: ArrayLike) -> NDArray[np.float64]:
+        """Accelerations (km/s^2) at an (M, 3) array of points (km), as (M, 3)."""
+        offsets = (self.positions[None, :, :]
+                   - np.asarray(points, dtype=np.float64).reshape(-1, 3)[:, None, :])
+        distance_squared = np.einsum("mni,mni->mn", offsets, offsets)
+        distance = np.sqrt(distance_squared)
+        outside = (distance >= self.radii) & (distance > 0.0)
+        cubes = np.where(outside, distance_squared * distance, 1.0)
+        weights = np.where(outside, self.gm / cubes, 0.0)
+        return np.einsum("mn,mni->mi", weights, offsets)
+
+
 def circular_orbit_velocity(body_mass: float, orbit_radius_km: float) -> float:
     """Speed (km/s) of a circular orbit of `orbit_radius_km` around `body_mass`."""
     return sqrt(G * body_mass / (orbit_radius_km * 1000.0)) / 1000.0
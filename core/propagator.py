@@ -12,15 +12,22 @@ fix the GUI uses for its missions, generalised to all bodies). It validated
 against JPL HORIZONS for Voyager 1's Jupiter flyby — closest approach within
 ~3% on the correct date.
 
+`advance_coasting_adaptive` is the error-controlled alternative: a craft
+with an `AdaptiveIntegrator` (core.integrator) sizes its own steps, and the
+bodies follow the ephemeris *within* each step instead of being frozen at
+its start, so no step-size heuristic is needed at all.
+
 Pure (no GUI): it reads/writes the bodies' state through their `position` /
 `velocity` and steps the ship.
 """
 
 from __future__ import annotations
 
-from typing import Protocol
+from collections.abc import Iterable, Mapping
+from typing import Protocol, runtime_checkable
 
-from core.physics import GravitatingBody
+from core.integrator import TimedAccelerationField
+from core.physics import GravitatingBody, GravityField, MovableBody
 from core.spaceship import Spaceship
 from core.vec3 import Vec3
 
@@ -35,8 +42,40 @@ class Ephemeris(Protocol):
     def state(self, body: str, time_s: float) -> tuple[Vec3, Vec3]: ...
 
 
+@runtime_checkable
+class SnapshotEphemeris(Ephemeris, Protocol):
+    """An ephemeris that can evaluate many bodies at one instant in one call."""
+
+    def states_at(self,
+                  time_s: float,
+                  bodies: Iterable[str] | None = None) -> dict[str, tuple[Vec3, Vec3]]: ...
+
+
+def body_states(ephemeris: Ephemeris,
+                names: Iterable[str],
+                time_s: float) -> dict[str, tuple[Vec3, Vec3]]:
+    """
+    The ephemeris state of every body in `names` at `time_s`. A
+    `SnapshotEphemeris` answers the whole set in one call (sharing the
+    segments common to several bodies); otherwise each body is queried
+    on its own.
+    """
+    if isinstance(ephemeris, SnapshotEphemeris):
+        return ephemeris.states_at(time_s, names)
+    return {name: ephemeris.state(name, time_s) for name in names}
+
+
+def sync_bodies(ephemeris: Ephemeris,
+                bodies: Mapping[str, MovableBody],
+                time_s: float) -> None:
+    """Move every body in `bodies` to its ephemeris state at `time_s`."""
+    states: dict[str, tuple[Vec3, Vec3]] = body_states(ephemeris, bodies, time_s)
+    for name, body in bodies.items():
+        body.position, body.velocity = states[name]
+
+
 def adaptive_dt(ship: Spaceship,
-                bodies: dict[str, GravitatingBody],
+                bodies: Mapping[str, GravitatingBody],
                 step_fraction: float = DEFAULT_STEP_FRACTION,
                 dt_min: float = DEFAULT_DT_MIN,
                 dt_max: float = DEFAULT_DT_MAX) -> float:
@@ -62,7 +101,7 @@ def adaptive_dt(ship: Spaceship,
 
 def advance_coasting(ship: Spaceship,
                      ephemeris: Ephemeris,
-                     bodies: dict[str, GravitatingBody],
+                     bodies: Mapping[str, MovableBody],
                      time_s: float,
                      dt_s: float,
                      step_fraction: float = DEFAULT_STEP_FRACTION,
@@ -77,11 +116,42 @@ def advance_coasting(ship: Spaceship,
     target: float = time_s + dt_s
     current: float = time_s
     while current < target - 1e-6:
-        for name, body in bodies.items():
-            position, velocity = ephemeris.state(name, current)
-            body.position = position
-            body.velocity = velocity
+        sync_bodies(ephemeris, bodies, current)
         sub_dt: float = min(adaptive_dt(ship, bodies, step_fraction, dt_min, dt_max),
                             target - current)
         ship.step_forward(sub_dt, bodies)
         current += sub_dt
+
+
+def moving_gravity(ephemeris: Ephemeris,
+                   bodies: Mapping[str, GravitatingBody]) -> TimedAccelerationField:
+    """
+    The gravity field of `bodies` as a function of time and position,
+    with each body placed where `ephemeris` puts it at that time.
+    """
+    field: GravityField = GravityField(bodies)
+    names: list[str] = field.names
+
+    def acceleration_at(time_s: float, position: Vec3) -> Vec3:
+        if isinstance(ephemeris, SnapshotEphemeris):
+            states: dict[str, tuple[Vec3, Vec3]] = ephemeris.states_at(time_s, names)
+            field.set_positions([states[name][0].as_tuple() for name in names])
+        else:
+            field.set_positions([ephemeris.state(name, time_s)[0].as_tuple() for name in names])
+        return field.acceleration(position)
+
+    return acceleration_at
+
+
+def advance_coasting_adaptive(ship: Spaceship,
+                              ephemeris: Ephemeris,
+                              bodies: Mapping[str, MovableBody],
+                              time_s: float,
+                              dt_s: float) -> None:
+    """
+    Advance `ship` from absolute `time_s` by `dt_s` under full N-body gravity
+    with its own error-controlled step sizes (the ship's integrator must be
+    an `AdaptiveIntegrator`), then sync `bodies` to the end time.
+    """
+    ship.coast(dt_s, moving_gravity(ephemeris, bodies), time_s)
+    sync_bodies(ephemeris, bodies, time_s + dt_s)
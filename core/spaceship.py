@@ -15,13 +15,20 @@ classes in `classes.py`. The main differences:
 
 from __future__ import annotations
 
+from collections.abc import Mapping
 from dataclasses import dataclass
 from math import ceil, log
 from typing import override
 
 from core.flight_plan import FlightPlan, ThrustCommand
-from core.integrator import Integrator, VelocityVerlet
-from core.physics import GravitatingBody, gravitational_acceleration
+from core.integrator import (
+    AdaptiveIntegrator,
+    Integrator,
+    TimedAccelerationField,
+    VelocityVerlet,
+)
+from core.kepler import KeplerNoConvergence, perturbation_ratio, propagate_kepler
+from core.physics import G, GravitatingBody, GravityField
 from core.vec3 import Vec3
 
 # Above this step length the motion is sub-stepped internally so the
@@ -31,6 +38,14 @@ from core.vec3 import Vec3
 # orbit; a future adaptive scheme can relax it during deep-space cruise.
 DEFAULT_MAX_INTEGRATION_DT: float = 60.0  # s
 
+# A coasting step is jumped analytically as a two-body arc (see
+# _simulate_step) while the other bodies' pull stays below this fraction
+# of the dominant body's. The neglected acceleration then displaces a
+# heliocentric transfer by well under 1e-6 of its size -- a few hundred km
+# on a Mars transfer, which the mid-course corrections (themselves
+# two-body Lambert solutions) absorb.
+DEFAULT_ANALYTIC_COAST_TOLERANCE: float = 1e-6
+
 
 @dataclass
 class PropulsionSystem:
@@ -102,7 +117,8 @@ class Spaceship:
                  size: float = 0.1,
                  flight_plan: FlightPlan | None = None,
                  integrator: Integrator | None = None,
-                 max_integration_dt: float = DEFAULT_MAX_INTEGRATION_DT) -> None:
+                 max_integration_dt: float = DEFAULT_MAX_INTEGRATION_DT,
+                 analytic_coast_tolerance: float | None = DEFAULT_ANALYTIC_COAST_TOLERANCE) -> None:
         self.structure_mass: float = structure_mass
         self.payload_mass: float = payload_mass
         self.main_propulsion: PropulsionSystem = main_propulsion
@@ -114,11 +130,17 @@ class Spaceship:
         self.flight_plan: FlightPlan = flight_plan if flight_plan is not None else FlightPlan()
         self.integrator: Integrator = integrator if integrator is not None else VelocityVerlet()
         self.max_integration_dt: float = max_integration_dt
+        # None disables the analytic coast; every step is integrated.
+        self.analytic_coast_tolerance: float | None = analytic_coast_tolerance
         self.trajectory_color: str = "#000000"
 
         self._position: Vec3 = initial_position
         self._velocity: Vec3 = initial_velocity
         self._acceleration: Vec3 = Vec3()
+        # Vectorized gravity over the last `bodies` dict stepped through;
+        # rebuilt only when the set of bodies changes (see _gravity_field).
+        self._gravity: GravityField | None = None
+        self._gravity_key: tuple[tuple[str, int], ...] = ()
 
         self.history: list[StateSnapshot] = [self._snapshot(command=ThrustCommand.coast(),
                                                             dt=0.0)]
@@ -170,7 +192,7 @@ class Spaceship:
     # Simulation stepping
     # ------------------------------------------------------------------
 
-    def step_forward(self, dt: float, bodies: dict[str, GravitatingBody]) -> None:
+    def step_forward(self, dt: float, bodies: Mapping[str, GravitatingBody]) -> None:
         """
         Advance one simulation step: replay from history when stepping
         over ground already covered, otherwise simulate a new step.
@@ -181,6 +203,29 @@ class Spaceship:
         else:
             self._simulate_step(dt, bodies)
 
+    def coast(self, dt: float, acceleration_at: TimedAccelerationField, time_s: float) -> None:
+        """
+        Advance an unpowered craft by `dt` from absolute `time_s` through
+        a time-dependent field (planets moving within the step), in one
+        error-controlled integration with no sub-step cap, and record one
+        snapshot. The flight plan is not consulted. Needs an
+        `AdaptiveIntegrator`; replays history like `step_forward`.
+        """
+        if not isinstance(self.integrator, AdaptiveIntegrator):
+            raise TypeError("coast() needs an AdaptiveIntegrator.")
+        if self.index < len(self.history) - 1:
+            self.index += 1
+            self._restore(self.history[self.index])
+            return
+        self._position, self._velocity, self._acceleration = self.integrator.integrate(
+            position=self._position,
+            velocity=self._velocity,
+            acceleration_at=acceleration_at,
+            time_s=time_s,
+            dt=dt)
+        self.history.append(self._snapshot(command=ThrustCommand.coast(), dt=dt))
+        self.index += 1
+
     def step_backwards(self) -> None:
         if self.index > 0:
             self.index -= 1
@@ -188,7 +233,7 @@ class Spaceship:
 
     def _simulate_step(self,
                        dt: float,
-                       bodies: dict[str, GravitatingBody]) -> None:
+                       bodies: Mapping[str, GravitatingBody]) -> None:
         """
         Advance the dynamic state by `dt` and record one snapshot.
 
@@ -199,7 +244,15 @@ class Spaceship:
         being sampled once per (possibly day-long) display step. Fuel,
         mass and staging update per sub-step too, so a burn that empties a
         tank mid-step is handled correctly with the shrinking mass.
+
+        A step the plan spends wholly coasting, through a field the most
+        massive body dominates to within `analytic_coast_tolerance`, is
+        instead jumped in one exact two-body solution (`_kepler_coast`).
         """
+        if self._kepler_coast(dt, bodies):
+            self.history.append(self._snapshot(command=ThrustCommand.coast(), dt=dt))
+            self.index += 1
+            return
         sub_dt, sub_steps = self._sub_step_plan(dt)
         command: ThrustCommand = ThrustCommand.coast()
         for _ in range(sub_steps):
@@ -209,6 +262,39 @@ class Spaceship:
         self.history.append(self._snapshot(command=command, dt=dt))
         self.index += 1
 
+    def _kepler_coast(self, dt: float, bodies: Mapping[str, GravitatingBody]) -> bool:
+        """
+        Jump the whole step along the Kepler orbit about the dominant body
+        if the flight plan coasts throughout and the other bodies' pull
+        provably stays below `analytic_coast_tolerance` of its own.
+        Returns False, changing nothing, when the step must be integrated.
+        """
+        if (self.analytic_coast_tolerance is None or not bodies
+                or self.flight_plan.coast_time_remaining() < dt):
+            return False
+        central_name: str = max(bodies, key=lambda name: bodies[name].mass)
+        central: GravitatingBody = bodies[central_name]
+        perturbers = [body for name, body in bodies.items() if name != central_name]
+        if (self._position - central.position).magnitude() <= central.radius:
+            return False
+        if perturbation_ratio(self._position, self._velocity, central, perturbers,
+                              dt) > self.analytic_coast_tolerance:
+            return False
+
+        try:
+            relative_position, velocity = propagate_kepler(
+                self._position - central.position, self._velocity,
+                G * central.mass * 1e-9, dt)
+        except (KeplerNoConvergence, OverflowError):
+            # Fast hyperbolic arcs over long steps can defeat the universal-
+            # anomaly solve (or overflow cosh inside it); integrate instead.
+            return False
+        self.flight_plan.next_command(self, bodies, dt)   # advance the plan clock
+        self._position = central.position + relative_position
+        self._velocity = velocity
+        self._acceleration = self._gravity_field(bodies).acceleration(self._position)
+        return True
+
     def _sub_step_plan(self, dt: float) -> tuple[float, int]:
         """Split `dt` into equal sub-steps no longer than the integration cap."""
         if dt <= self.max_integration_dt:
@@ -219,7 +305,7 @@ class Spaceship:
     def _integrate_sub_step(self,
                             command: ThrustCommand,
                             dt: float,
-                            bodies: dict[str, GravitatingBody]) -> None:
+                            bodies: Mapping[str, GravitatingBody]) -> None:
         engine: PropulsionSystem = self.active_propulsion
         thrust: float = engine.thrust(command.throttle) if engine.has_fuel else 0.0
         fuel_needed: float = engine.fuel_needed(thrust, dt)
@@ -248,8 +334,10 @@ class Spaceship:
                     delta_v_km_s = engine.exhaust_velocity * log(mass_before / mass_after) / 1000.0
                     thrust_acceleration = command.direction * (delta_v_km_s / dt)
 
+        gravity: GravityField = self._gravity_field(bodies)
+
         def acceleration_at(position: Vec3) -> Vec3:
-            return gravitational_acceleration(position, bodies) + thrust_acceleration
+            return gravity.acceleration(position) + thrust_acceleration
 
         self._position, self._velocity, self._acceleration = self.integrator.step(
             position=self._position,
@@ -263,6 +351,16 @@ class Spaceship:
                 and not self.takeoff_propulsion.has_fuel):
             self.takeoff_jettisoned = True
 
+    def _gravity_field(self, bodies: Mapping[str, GravitatingBody]) -> GravityField:
+        """The gravity field of `bodies` at their current positions."""
+        key: tuple[tuple[str, int], ...] = tuple((name, id(body)) for name, body in bodies.items())
+        if self._gravity is None or key != self._gravity_key:
+            self._gravity = GravityField(bodies)
+            self._gravity_key = key
+        else:
+            self._gravity.update_positions(bodies)
+        return self._gravity
+
     # ------------------------------------------------------------------
     # History
     # ------------------------------------------------------------------
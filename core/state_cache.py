@@ -0,0 +1,79 @@
+"""
+Process-wide LRU cache of ephemeris states.
+
+Every web session wraps the one shared SPK kernel in its own
+`JplEphemeris`, and sessions tend to look at the same instants: they
+all start from "now" and step in whole `simulation_steps`. Without a
+shared cache each of them evaluates the same segment chains for the
+same Julian dates. `StateCache` sits between `JplEphemeris` and the
+kernel: an ephemeris constructed with a cache looks each
+(body, center, jd) up there first and stores what it computes.
+
+States are pairs of immutable `Vec3`s, so a cached entry can be handed
+to any number of readers without copying. The cache is guarded by a
+lock so sessions served from worker threads can share it safely.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any
+
+from core.vec3 import Vec3
+
+DEFAULT_MAX_ENTRIES: int = 65536
+
+
+class StateCache:
+    """A thread-safe, bounded LRU map of state keys to (position, velocity)."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1.")
+        self.max_entries: int = max_entries
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: OrderedDict[Hashable, tuple[Vec3, Vec3]] = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+
+    def get(self, key: Hashable) -> tuple[Vec3, Vec3] | None:
+        """The cached state for `key` (refreshing its recency), or None."""
+        with self._lock:
+            state: tuple[Vec3, Vec3] | None = self._entries.get(key)
+            if state is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return state
+
+    def put(self, key: Hashable, state: tuple[Vec3, Vec3]) -> None:
+        """Store `state`, evicting the least recently used entry when full."""
+        with self._lock:
+            self._entries[key] = state
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, Any]:
+        """Counters for monitoring: size, capacity, hits, misses, hit rate."""
+        with self._lock:
+            lookups: int = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,158 @@
+"""
+Process-wide LRU cache of transfer and Lambert results.
+
+Sessions plan the same things: users opening the app the same day ask
+for the same Mars window, and every mid-course correction re-solves
+Lambert from a state close to one solved before. `TransferCache`
+memoizes those solves on quantized inputs -- times snapped to
+`time_quantum_s`, positions to `position_quantum_km` -- so the second
+request for (nearly) the same geometry is a dictionary lookup.
+
+Quantizing is done by snapping, not by approximate matching: a caller
+that goes through the cache solves (or is handed the solution of)
+exactly the snapped problem, whoever asked first. Results therefore
+never depend on which session filled an entry, only on the quantum, and
+times are keyed as absolute seconds (Julian date * 86400) so sessions
+with different epochs share entries.
+
+`MissionPlanner` uses it for `evaluate_transfer` and `plan_transfer`
+when given one; `lambert_solver` wraps any `LambertSolver` for direct
+calls whose endpoints recur (not ones solved from a live ship state,
+which would never hit). Unsuccessful solves are cached too.
+One cache must only be shared by planners reading the same ephemeris.
+Like `StateCache`, it is guarded by a lock.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any
+
+from core.lambert import MU_SUN, LambertNoConvergence, LambertSolution, LambertSolver
+from core.vec3 import Vec3
+
+DEFAULT_MAX_TRANSFERS: int = 65536
+DEFAULT_TIME_QUANTUM_S: float = 60.0
+DEFAULT_POSITION_QUANTUM_KM: float = 1.0
+
+# Stored for solves that found no transfer, so a miss and "no transfer" differ.
+NO_SOLUTION: Any = object()
+
+
+class TransferCache:
+    """A thread-safe, bounded LRU map of quantized solve keys to results."""
+
+    def __init__(self,
+                 max_entries: int = DEFAULT_MAX_TRANSFERS,
+                 time_quantum_s: float = DEFAULT_TIME_QUANTUM_S,
+                 position_quantum_km: float = DEFAULT_POSITION_QUANTUM_KM) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1.")
+        if time_quantum_s <= 0.0 or position_quantum_km <= 0.0:
+            raise ValueError("Quanta must be positive.")
+        self.max_entries: int = max_entries
+        self.time_quantum_s: float = time_quantum_s
+        self.position_quantum_km: float = position_quantum_km
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+
+    def __getstate__(self) -> dict[str, Any]:
+        """Pickles (e.g. into a worker process) as an empty cache of the same shape."""
+        return {"max_entries": self.max_entries, "time_quantum_s": self.time_quantum_s,
+                "position_quantum_km": self.position_quantum_km}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__init__(**state)
+
+    # ------------------------------------------------------------------
+    # Quantization
+    # ------------------------------------------------------------------
+
+    def time_bucket(self, seconds: float) -> int:
+        return round(seconds / self.time_quantum_s)
+
+    def position_bucket(self, position: Vec3) -> tuple[int, int, int]:
+        q: float = self.position_quantum_km
+        return (round(position.x / q), round(position.y / q), round(position.z / q))
+
+    # ------------------------------------------------------------------
+    # LRU
+    # ------------------------------------------------------------------
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """The cached value for `key` (refreshing its recency), or `default`."""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store `value`, evicting the least recently used entry when full."""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, Any]:
+        """Counters for monitoring: size, capacity, hits, misses, hit rate."""
+        with self._lock:
+            lookups: int = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ------------------------------------------------------------------
+    # Lambert
+    # ------------------------------------------------------------------
+
+    def lambert_solver(self, solver: LambertSolver) -> LambertSolver:
+        """
+        `solver`, memoized: r1 and r2 snap to the position quantum and the
+        time of flight to the time quantum, and the snapped problem is
+        solved once per cache lifetime.
+        """
+        def cached(r1: Vec3,
+                   r2: Vec3,
+                   time_of_flight: float,
+                   mu: float = MU_SUN,
+                   prograde: bool = True) -> LambertSolution:
+            r1_bucket = self.position_bucket(r1)
+            r2_bucket = self.position_bucket(r2)
+            tof_bucket: int = self.time_bucket(time_of_flight)
+            key = ("lambert", solver, r1_bucket, r2_bucket, tof_bucket, mu, prograde)
+            solution = self.get(key)
+            if solution is None:
+                q: float = self.position_quantum_km
+                try:
+                    solution = solver(r1=Vec3(*(q * c for c in r1_bucket)),
+                                      r2=Vec3(*(q * c for c in r2_bucket)),
+                                      time_of_flight=tof_bucket * self.time_quantum_s,
+                                      mu=mu, prograde=prograde)
+                except LambertNoConvergence:
+                    solution = NO_SOLUTION
+                self.put(key, solution)
+            if solution is NO_SOLUTION:
+                raise LambertNoConvergence("No Lambert solution for this geometry (cached).")
+            return solution
+        return cached
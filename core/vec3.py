@@ -33,6 +33,11 @@ class Vec3:
     def __repr__(self) -> str:
         return f"Vec3({self.x:.6g}, {self.y:.6g}, {self.z:.6g})"
 
+    @override
+    def __reduce__(self) -> tuple[type[Vec3], tuple[float, float, float]]:
+        # Pickles as its three floats (saved sessions hold thousands).
+        return Vec3, (self.x, self.y, self.z)
+
     def dot(self, other: Vec3) -> float:
         return self.x * other.x + self.y * other.y + self.z * other.z
 
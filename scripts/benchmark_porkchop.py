@@ -0,0 +1,71 @@
+"""
+Porkchop scaling across worker processes.
+
+Solves one large Earth->Mars porkchop grid -- daily departures over a
+decade by default, times of flight from 80 to 480 days -- single-process
+and then split into departure bands over 1, 2, 4 and 8 worker processes
+(`MissionPlanner.porkchop(workers=...)`), and prints wall time, speed-up
+and a check that every run returned the same grid. The planner reads the
+JPL kernel through a `LazyKernel`, so each worker memory-maps its own
+copy; without the kernel it falls back to `KeplerianEphemeris`. Run from
+the repo root with the project venv:
+
+    uv run python -m scripts.benchmark_porkchop
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+
+from config import EPHEMERIS_FILE
+from core.bodies import load_bodies_from_json
+from core.ephemeris import JplEphemeris
+from core.kernel import LazyKernel
+from core.keplerian_ephemeris import KeplerianEphemeris
+from core.mission_planner import Ephemeris, MissionPlanner, PorkchopPoint, linspace
+
+WORKER_COUNTS: tuple[int, ...] = (1, 2, 4, 8)
+# 2030-01-01, comfortably inside de440t.bsp.
+EPOCH_JD: float = 2462502.5
+
+
+def make_ephemeris() -> tuple[Ephemeris, str]:
+    if os.path.exists(EPHEMERIS_FILE):
+        return (JplEphemeris.from_bodies(kernel=LazyKernel(EPHEMERIS_FILE),
+                                         bodies=load_bodies_from_json(), epoch_jd=EPOCH_JD),
+                f"JPL kernel {EPHEMERIS_FILE}")
+    return KeplerianEphemeris(epoch_jd=EPOCH_JD), "KeplerianEphemeris (kernel missing)"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--years", type=float, default=10.0, help="departure window length")
+    parser.add_argument("--flights", type=int, default=200, help="time-of-flight samples")
+    parser.add_argument("--workers", type=int, nargs="+", default=list(WORKER_COUNTS))
+    args = parser.parse_args()
+
+    ephemeris, source = make_ephemeris()
+    planner = MissionPlanner(ephemeris=ephemeris)
+    departures: list[float] = [day * 86400.0 for day in range(int(args.years * 365.25))]
+    flights: list[float] = linspace(80.0 * 86400.0, 480.0 * 86400.0, args.flights)
+    print(f"{source}: {len(departures)} departures x {len(flights)} flight times "
+          f"= {len(departures) * len(flights):,} cells, {os.cpu_count()} CPUs\n")
+
+    print(f"{'workers':>8} | {'wall s':>7} | {'speed-up':>8} | same grid")
+    print("-" * 42)
+    reference: list[PorkchopPoint] | None = None
+    baseline: float = 0.0
+    for workers in args.workers:
+        started: float = time.perf_counter()
+        # workers=1 is the plain in-process grid.
+        grid = planner.porkchop("Earth", "Mars", departures, flights, workers=workers)
+        elapsed: float = time.perf_counter() - started
+        if reference is None:
+            reference, baseline = grid, elapsed
+        print(f"{workers:>8} | {elapsed:7.2f} | {baseline / elapsed:8.2f} | {grid == reference}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Bytes per tick and encode time of the state wire formats.
+
+Builds real sessions on the JPL kernel -- one paused (idle), one parked at
+Earth with the clock running, one replaying Voyager 1 at the "1 day" step
+-- and for each encodes the per-tick state push four ways: the full
+`state_message` as the JSON text `send_json` would put on the socket, the
+full packed binary `state_frame`, and the per-socket `StateEncoder` deltas
+in JSON and binary (server/serialization.py). Prints the mean message size
+and encode time per tick, plus a trail reset (the whole retained trail in
+one push). Run from the repo root with the project venv:
+
+    uv run python -m scripts.benchmark_wire
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from collections.abc import Callable
+from typing import Any
+
+from config import EPHEMERIS_FILE
+from core.kernel import LazyKernel
+from core.vec3 import Vec3
+from server.serialization import StateEncoder, state_frame, state_message
+from server.session import SolaraSession
+
+
+Encoder = Callable[[Any, list[Vec3], bool], bytes]
+
+
+def as_json_text(message: dict[str, Any]) -> bytes:
+    # What starlette's send_json puts on the wire.
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def full_json(session: Any, trail: list[Vec3], reset: bool) -> bytes:
+    return as_json_text(state_message(session, trail, trail_reset=reset))
+
+
+def delta_encoder(binary: bool) -> Encoder:
+    """A new connection's encoder: the first push is full, the rest deltas."""
+    encoder = StateEncoder(binary=binary)
+
+    def encode(session: Any, trail: list[Vec3], reset: bool) -> bytes:
+        pushed = encoder.encode(session, trail, trail_reset=reset)
+        return pushed if isinstance(pushed, bytes) else as_json_text(pushed)
+    return encode
+
+
+ENCODERS: dict[str, Callable[[], Encoder]] = {
+    "json": lambda: full_json,
+    "binary": lambda: state_frame,
+    "json delta": lambda: delta_encoder(binary=False),
+    "binary delta": lambda: delta_encoder(binary=True),
+}
+
+
+def measure(session: SolaraSession, ticks: int) -> dict[str, tuple[float, float]]:
+    """Mean (bytes, microseconds) per tick for each encoder, ticking `session`
+    as the socket handler does (advancing only while it plays)."""
+    encoders: dict[str, Encoder] = {name: make() for name, make in ENCODERS.items()}
+    for encode in encoders.values():
+        encode(session, [], False)   # the connection's first (full) push
+    totals: dict[str, list[float]] = {name: [0.0, 0.0] for name in ENCODERS}
+    sent: int = len(session.trail.points)
+    for _ in range(ticks):
+        if session.auto_play:
+            session.advance(session.time_step_s * session.play_direction)
+        points: list[Vec3] = session.trail.points
+        trail, sent = points[sent:], len(points)
+        for name, encode in encoders.items():
+            started: float = time.perf_counter()
+            frame: bytes = encode(session, trail, False)
+            totals[name][1] += time.perf_counter() - started
+            totals[name][0] += len(frame)
+    return {name: (size / ticks, 1e6 * seconds / ticks)
+            for name, (size, seconds) in totals.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--ticks", type=int, default=500)
+    args = parser.parse_args()
+    if not os.path.exists(EPHEMERIS_FILE):
+        print(f"Ephemeris kernel {EPHEMERIS_FILE} missing; cannot run.")
+        return
+    kernel = LazyKernel(EPHEMERIS_FILE)
+
+    paused = SolaraSession(kernel=kernel)
+    paused.set_play(False)
+    parked = SolaraSession(kernel=kernel)
+    parked.set_play(True)
+    replay = SolaraSession(kernel=kernel)
+    replay.load_mission("Voyager 1")
+    replay.set_play(True)
+    rows: list[tuple[str, dict[str, tuple[float, float]]]] = [
+        ("paused (idle)", measure(paused, args.ticks)),
+        ("parked, playing", measure(parked, args.ticks)),
+        ("Voyager 1 replay", measure(replay, args.ticks)),
+    ]
+    reset: dict[str, tuple[float, float]] = {}
+    for name, make in ENCODERS.items():
+        encode: Encoder = make()
+        started: float = time.perf_counter()
+        frame: bytes = encode(replay, replay.trail.points, True)
+        reset[name] = (len(frame), 1e6 * (time.perf_counter() - started))
+    rows.append((f"trail reset ({len(replay.trail.points)} pts)", reset))
+
+    print(f"{'case':<26} | " + " | ".join(f"{name + ' B':>14}" for name in ENCODERS))
+    for case, result in rows:
+        print(f"{case:<26} | " + " | ".join(f"{result[name][0]:14.0f}" for name in ENCODERS))
+    print()
+    print(f"{'case':<26} | " + " | ".join(f"{name + ' us':>14}" for name in ENCODERS))
+    for case, result in rows:
+        print(f"{case:<26} | " + " | ".join(f"{result[name][1]:14.1f}" for name in ENCODERS))
+    kernel.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Build the launch-window index for every pair of Sun-orbiting bodies.
+
+Sweeps each origin/target pair from data/bodies.json (planets and Pluto)
+across the date range on a porkchop grid, keeps the local delta-v minima
+and writes them to a compressed index (`core.launch_windows`) that the
+server loads at startup, so FLY_TO becomes a lookup plus one polish
+instead of a full grid search. Prints the build time and window count
+per pair, the index size, and how long a lookup-and-polish takes against
+the grid search it replaces. Run from the repo root with the project
+venv:
+
+    uv run python -m scripts.build_launch_windows
+
+The default range is the whole kernel (1550-2650), which takes a while;
+`--start`/`--end` and `--pairs Earth:Mars ...` narrow it, `--workers`
+spreads each grid over processes, and `--approximate` sweeps the mean
+Keplerian orbits instead of the kernel (for benchmarking without it).
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from datetime import datetime
+from itertools import permutations
+
+from config import EPHEMERIS_FILE, LAUNCH_WINDOW_FILE
+from core.bodies import CelestialBody, load_bodies_from_json
+from core.ephemeris import JplEphemeris
+from core.kernel import LazyKernel
+from core.keplerian_ephemeris import KeplerianEphemeris
+from core.lambert import LambertNoConvergence, solve_lambert_izzo
+from core.launch_windows import (
+    DEFAULT_DEPARTURES_PER_PERIOD,
+    DEFAULT_FLIGHT_SAMPLES,
+    LaunchWindowIndex,
+    build_launch_window_index,
+)
+from core.mission_planner import DEFAULT_REFINE_BASINS, Ephemeris, MissionPlanner
+from core.time import MAX_JULIAN_DATE, MIN_JULIAN_DATE, convert_to_julian_date
+
+# Lookups benchmarked per pair, spread over the swept range.
+LOOKUP_SAMPLES: int = 5
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--output", default=LAUNCH_WINDOW_FILE, help="index file to write")
+    parser.add_argument("--start", help="first departure date, YYYY-MM-DD (default: kernel start)")
+    parser.add_argument("--end", help="last departure date, YYYY-MM-DD (default: kernel end)")
+    parser.add_argument("--pairs", nargs="+", metavar="ORIGIN:TARGET",
+                        help="only these pairs (default: every Sun-orbiting pair)")
+    parser.add_argument("--departures-per-period", type=int,
+                        default=DEFAULT_DEPARTURES_PER_PERIOD)
+    parser.add_argument("--flight-samples", type=int, default=DEFAULT_FLIGHT_SAMPLES)
+    parser.add_argument("--workers", type=int, help="worker processes per grid")
+    parser.add_argument("--approximate", action="store_true",
+                        help="sweep KeplerianEphemeris instead of the kernel")
+    args = parser.parse_args()
+
+    bodies = load_bodies_from_json()
+    start_jd: float = (convert_to_julian_date(datetime.fromisoformat(args.start))
+                       if args.start else MIN_JULIAN_DATE)
+    end_jd: float = (convert_to_julian_date(datetime.fromisoformat(args.end))
+                     if args.end else MAX_JULIAN_DATE)
+    ephemeris: Ephemeris
+    if args.approximate:
+        ephemeris, source = KeplerianEphemeris(epoch_jd=start_jd), "KeplerianEphemeris"
+    elif os.path.exists(EPHEMERIS_FILE):
+        ephemeris = JplEphemeris.from_bodies(kernel=LazyKernel(EPHEMERIS_FILE), bodies=bodies,
+                                             epoch_jd=start_jd)
+        source = EPHEMERIS_FILE
+    else:
+        print(f"Ephemeris kernel {EPHEMERIS_FILE} missing; cannot run "
+              f"(or pass --approximate).")
+        return
+    planner = MissionPlanner(ephemeris=ephemeris, lambert_solver=solve_lambert_izzo)
+    pairs: list[tuple[str, str]] = (
+        [(origin, target) for origin, target in (pair.split(":") for pair in args.pairs)]
+        if args.pairs else
+        list(permutations([name for name, body in bodies.items()
+                           if body.parent_body == "Sun"], 2)))
+
+    print(f"{source}: {len(pairs)} pairs, JD {start_jd} - {end_jd} "
+          f"({(end_jd - start_jd) / 365.25:.0f} years)\n")
+    print(f"{'pair':<18} | {'build s':>8} | {'windows':>7}")
+    print("-" * 40)
+    index = LaunchWindowIndex(source=source)
+    started: float = time.perf_counter()
+    for origin, target in pairs:
+        pair_started: float = time.perf_counter()
+        build_launch_window_index(planner, start_jd, bodies, [(origin, target)],
+                                  start_jd, end_jd,
+                                  departures_per_period=args.departures_per_period,
+                                  flight_samples=args.flight_samples,
+                                  workers=args.workers, index=index)
+        print(f"{origin + ' -> ' + target:<18} | {time.perf_counter() - pair_started:8.1f} | "
+              f"{len(index.windows(origin, target)):>7}")
+    build_seconds: float = time.perf_counter() - started
+    index.save(args.output)
+    size_kb: float = os.path.getsize(args.output) / 1e3
+    print(f"\nBuilt {len(index):,} windows in {build_seconds:.1f} s; {args.output} is "
+          f"{size_kb:,.1f} kB ({1e3 * size_kb / max(len(index), 1):.1f} bytes/window)")
+
+    report_lookups(planner, LaunchWindowIndex.load(args.output), start_jd, end_jd, bodies)
+
+
+def report_lookups(planner: MissionPlanner,
+                   index: LaunchWindowIndex,
+                   epoch_jd: float,
+                   end_jd: float,
+                   bodies: dict[str, CelestialBody]) -> None:
+    """Time FLY_TO's two paths -- index lookup + polish, refined grid -- on a few dates."""
+    print(f"\n{'pair':<18} | {'index ms':>8} | {'grid ms':>8} | {'index dv':>8} | "
+          f"{'grid dv':>8}")
+    print("-" * 62)
+    for origin, target in index.pairs():
+        for k in range(LOOKUP_SAMPLES):
+            after: float = (end_jd - epoch_jd) * 86400.0 * k / (LOOKUP_SAMPLES + 1)
+            departures, flights = planner.transfer_grid(origin, target, after, bodies)
+            started: float = time.perf_counter()
+            try:
+                indexed = planner.plan_from_index(index, epoch_jd, origin, target, after,
+                                                  within=departures[-1] - departures[0])
+            except LambertNoConvergence as error:
+                print(f"{origin + ' -> ' + target:<18} | {error}")
+                continue
+            index_ms: float = 1e3 * (time.perf_counter() - started)
+            started = time.perf_counter()
+            searched = planner.plan_transfer(origin, target, departures, flights,
+                                             refine=DEFAULT_REFINE_BASINS)
+            grid_ms: float = 1e3 * (time.perf_counter() - started)
+            print(f"{origin + ' -> ' + target:<18} | {index_ms:8.1f} | {grid_ms:8.1f} | "
+                  f"{indexed.total_delta_v:8.3f} | {searched.total_delta_v:8.3f}")
+
+
+if __name__ == "__main__":
+    main()
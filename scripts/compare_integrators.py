@@ -0,0 +1,176 @@
+"""
+Integrator comparison on Voyager 1's Jupiter flyby.
+
+Flies the same coast as scripts/validate_voyager.py -- Voyager 1's real
+1977-09-15 state through the 1979-03-05 Jupiter encounter -- once with the
+current setup (Velocity Verlet, step sized from the nearest-planet distance,
+bodies re-synced each step) and then with the error-controlled integrators
+(Dormand-Prince 5(4) and DOP853) at several tolerances, where the planets
+follow the ephemeris within each step. For each run it prints the number of
+gravity-field evaluations against the position error relative to JPL
+HORIZONS, at the last reference date and the worst over all of them.
+
+Without the kernel the planets come from `KeplerianEphemeris` instead:
+their mean-element positions are too coarse to reproduce the real flyby,
+so the errors are then taken against a DOP853 run at REFERENCE_RTOL in
+the same model rather than against HORIZONS. Run from the repo root with
+the project venv:
+
+    uv run python -m scripts.compare_integrators
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from typing import override
+
+from jplephem.spk import SPK
+
+from config import EPHEMERIS_FILE
+from core.bodies import load_bodies_from_json
+from core.ephemeris import JplEphemeris
+from core.flight_plan import FlightPlan
+from core.integrator import (
+    DOP853,
+    AccelerationField,
+    AdaptiveIntegrator,
+    DormandPrince54,
+    Integrator,
+    VelocityVerlet,
+)
+from core.keplerian_ephemeris import KeplerianEphemeris
+from core.propagator import Ephemeris, adaptive_dt, advance_coasting_adaptive, sync_bodies
+from core.spaceship import PropulsionSystem, Spaceship
+from core.vec3 import Vec3
+from scripts.validate_voyager import DT_MAX, DT_MIN, HORIZONS_FILE, STEP_FRACTION, parse_horizons
+
+TOLERANCES: tuple[float, ...] = (1e-8, 1e-10, 1e-12)
+# The stand-in truth when there is no kernel to compare with HORIZONS.
+REFERENCE_RTOL: float = 1e-13
+
+
+class CountingVerlet(VelocityVerlet):
+    """Velocity Verlet that counts its field evaluations."""
+
+    def __init__(self) -> None:
+        self.evaluations: int = 0
+
+    @override
+    def step(self,
+             position: Vec3,
+             velocity: Vec3,
+             acceleration_at: AccelerationField,
+             dt: float) -> tuple[Vec3, Vec3, Vec3]:
+        def counted(point: Vec3) -> Vec3:
+            self.evaluations += 1
+            return acceleration_at(point)
+        return super().step(position, velocity, counted, dt)
+
+
+def make_ship(position: Vec3, velocity: Vec3, integrator: Integrator) -> Spaceship:
+    return Spaceship(structure_mass=825.0,
+                     payload_mass=0.0,
+                     main_propulsion=PropulsionSystem(),     # inert: coasts
+                     initial_position=position,
+                     initial_velocity=velocity,
+                     flight_plan=FlightPlan(),
+                     integrator=integrator,
+                     max_integration_dt=DT_MAX)
+
+
+def fly_verlet(ephemeris: Ephemeris,
+               reference: list[tuple[float, Vec3]],
+               position: Vec3,
+               velocity: Vec3) -> tuple[int, list[float]]:
+    """The validate_voyager loop: (field evaluations, error at each reference date)."""
+    integrator = CountingVerlet()
+    ship = make_ship(position, velocity, integrator)
+    bodies = load_bodies_from_json()
+    errors: list[float] = []
+    time_s: float = 0.0
+    for ref_time, ref_position in reference[1:]:
+        while time_s < ref_time - 1e-3:
+            sync_bodies(ephemeris, bodies, time_s)
+            dt: float = min(adaptive_dt(ship, bodies, STEP_FRACTION, DT_MIN, DT_MAX),
+                            ref_time - time_s)
+            ship.step_forward(dt, bodies)
+            time_s += dt
+        errors.append((ship.position - ref_position).magnitude())
+    return integrator.evaluations, errors
+
+
+def fly_adaptive(ephemeris: Ephemeris,
+                 reference: list[tuple[float, Vec3]],
+                 position: Vec3,
+                 velocity: Vec3,
+                 integrator: AdaptiveIntegrator) -> tuple[int, list[float]]:
+    """Error-controlled coast between reference dates, planets moving within steps."""
+    ship = make_ship(position, velocity, integrator)
+    bodies = load_bodies_from_json()
+    errors: list[float] = []
+    time_s: float = 0.0
+    for ref_time, ref_position in reference[1:]:
+        advance_coasting_adaptive(ship, ephemeris, bodies, time_s, ref_time - time_s)
+        time_s = ref_time
+        errors.append((ship.position - ref_position).magnitude())
+    return integrator.evaluations, errors
+
+
+def fly_reference(ephemeris: Ephemeris,
+                  reference: list[tuple[float, Vec3]],
+                  position: Vec3,
+                  velocity: Vec3) -> list[tuple[float, Vec3]]:
+    """`reference`'s dates with the positions of a DOP853 run at REFERENCE_RTOL."""
+    ship = make_ship(position, velocity, DOP853(rtol=REFERENCE_RTOL, max_step=DT_MAX))
+    bodies = load_bodies_from_json()
+    flown: list[tuple[float, Vec3]] = [reference[0]]
+    for ref_time, _ in reference[1:]:
+        time_s: float = flown[-1][0]
+        advance_coasting_adaptive(ship, ephemeris, bodies, time_s, ref_time - time_s)
+        flown.append((ref_time, ship.position))
+    return flown
+
+
+def report(label: str, evaluations: int, errors: list[float], seconds: float) -> None:
+    print(f"{label:<24} | {evaluations:>11,} | {errors[-1]:>13,.0f} | "
+          f"{max(errors):>13,.0f} | {seconds:>6.1f}")
+
+
+def main() -> None:
+    rows = parse_horizons(path=HORIZONS_FILE)
+    jd0, position0, velocity0 = rows[0]
+    reference: list[tuple[float, Vec3]] = [((jd - jd0) * 86400.0, pos) for jd, pos, _ in rows]
+    kernel: SPK | None = None
+    ephemeris: Ephemeris
+    if os.path.exists(EPHEMERIS_FILE):
+        kernel = SPK.open(EPHEMERIS_FILE)
+        ephemeris = JplEphemeris.from_bodies(kernel=kernel, bodies=load_bodies_from_json(),
+                                             epoch_jd=jd0)
+        truth: str = "HORIZONS"
+    else:
+        ephemeris = KeplerianEphemeris(epoch_jd=jd0)
+        reference = fly_reference(ephemeris, reference, position0, velocity0)
+        truth = f"DOP853 rtol={REFERENCE_RTOL:g} (no kernel: Keplerian planets)"
+
+    print(f"Voyager 1, {len(reference) - 1} reference dates over "
+          f"{reference[-1][0] / 86400.0:.0f} days, against {truth}\n")
+    print(f"{'integrator':<24} | {'evaluations':>11} | {'final err km':>13} | "
+          f"{'max err km':>13} | {'wall s':>6}")
+    print("-" * 80)
+    started: float = time.perf_counter()
+    evaluations, errors = fly_verlet(ephemeris, reference, position0, velocity0)
+    report("Verlet + adaptive_dt", evaluations, errors, time.perf_counter() - started)
+    for method in (DormandPrince54, DOP853):
+        for rtol in TOLERANCES:
+            started = time.perf_counter()
+            evaluations, errors = fly_adaptive(ephemeris, reference, position0, velocity0,
+                                               method(rtol=rtol, max_step=DT_MAX * 4))
+            report(f"{method.__name__} rtol={rtol:g}", evaluations, errors,
+                   time.perf_counter() - started)
+    if kernel is not None:
+        kernel.close()
+
+
+if __name__ == "__main__":
+    main()
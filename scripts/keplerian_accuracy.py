@@ -0,0 +1,63 @@
+"""
+KeplerianEphemeris accuracy against the JPL kernel.
+
+Samples every body the analytic ephemeris supports at evenly spread dates
+across de440t.bsp's 1550-2650 range and reports the position error of
+`KeplerianEphemeris` relative to `JplEphemeris` (both heliocentric ICRF),
+in km and as the angle it subtends from the Sun (from Earth, for the
+Moon). Run from the repo root with the project venv:
+
+    uv run python -m scripts.keplerian_accuracy
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+
+import numpy as np
+from jplephem.spk import SPK
+
+from config import EPHEMERIS_FILE
+from core.bodies import load_bodies_from_json
+from core.ephemeris import SECONDS_PER_DAY, JplEphemeris
+from core.keplerian_ephemeris import BODIES, KeplerianEphemeris
+from core.time import MAX_JULIAN_DATE, MIN_JULIAN_DATE
+
+ARCSEC_PER_RADIAN: float = 206264.806
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--samples", type=int, default=4000,
+                        help="dates sampled across the kernel range")
+    args = parser.parse_args()
+
+    if not os.path.exists(EPHEMERIS_FILE):
+        print(f"Ephemeris kernel {EPHEMERIS_FILE} missing; cannot run.")
+        return
+    kernel = SPK.open(EPHEMERIS_FILE)
+    jpl = JplEphemeris.from_bodies(kernel=kernel, bodies=load_bodies_from_json(),
+                                   epoch_jd=MIN_JULIAN_DATE)
+    keplerian = KeplerianEphemeris(epoch_jd=MIN_JULIAN_DATE)
+    # Stay a day inside the kernel's end points.
+    times = np.linspace(SECONDS_PER_DAY, (MAX_JULIAN_DATE - MIN_JULIAN_DATE - 1.0)
+                        * SECONDS_PER_DAY, args.samples)
+    bodies: list[str] = [body for body in BODIES if body != "Sun"]
+    exact, _ = jpl.states(bodies + ["Earth"], times)
+    approximate, _ = keplerian.states(bodies, times)
+    earth = exact[-1]
+
+    print(f"{'body':<9} {'median km':>12} {'max km':>12} {'median arcsec':>14} {'max arcsec':>11}")
+    for index, body in enumerate(bodies):
+        error = np.linalg.norm(approximate[index] - exact[index], axis=1)
+        # Angular error as seen from the body's primary.
+        reference = exact[index] - earth if body == "Moon" else exact[index]
+        angle = error / np.linalg.norm(reference, axis=1) * ARCSEC_PER_RADIAN
+        print(f"{body:<9} {np.median(error):12.4g} {error.max():12.4g} "
+              f"{np.median(angle):14.1f} {angle.max():11.1f}")
+    kernel.close()
+
+
+if __name__ == "__main__":
+    main()
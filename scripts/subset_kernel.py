@@ -0,0 +1,77 @@
+"""
+Write a trimmed SPK kernel for deployment.
+
+The simulation only reads the segments named in data/bodies.json's
+location paths, and a deployment usually only needs a few centuries of
+the 1550-2650 range de440t.bsp covers. This writes a subset holding just
+those segments up to `--end` (and, with `--trim-start`, from `--start`),
+then checks it against the full kernel over the kept range and reports
+whether every sampled state matches bit-for-bit. Run from the repo root:
+
+    uv run python -m scripts.subset_kernel --start 1900-01-01 --end 2100-01-01 \
+        --output de440t_subset.bsp
+
+Point the server at the result with EPHEMERIS_FILE=de440t_subset.bsp.
+Dates outside the kept range raise in jplephem, so keep the range wide
+enough for every date users can step to (and every historical mission).
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from datetime import datetime
+
+from jplephem.spk import SPK
+
+from config import EPHEMERIS_FILE
+from core.bodies import load_bodies_from_json
+from core.kernel import compare_kernels, required_segments, write_subset
+from core.time import convert_to_julian_date
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--source", default=EPHEMERIS_FILE, help="full SPK kernel")
+    parser.add_argument("--output", required=True, help="subset SPK to write")
+    parser.add_argument("--start", required=True, help="first date to keep, YYYY-MM-DD")
+    parser.add_argument("--end", required=True, help="last date to keep, YYYY-MM-DD")
+    parser.add_argument("--trim-start", action="store_true",
+                        help="also drop records before --start (smaller file, but "
+                             "states then differ from the source by float rounding)")
+    parser.add_argument("--samples", type=int, default=2000,
+                        help="random dates per segment for the comparison")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.source):
+        print(f"Ephemeris kernel {args.source} missing; cannot run.")
+        return
+    start_jd: float = convert_to_julian_date(datetime.fromisoformat(args.start))
+    end_jd: float = convert_to_julian_date(datetime.fromisoformat(args.end))
+    segments = required_segments(body.location_path
+                                 for body in load_bodies_from_json().values())
+
+    written = write_subset(args.source, args.output, segments, start_jd, end_jd,
+                           keep_start=not args.trim_start)
+    source_mb: float = os.path.getsize(args.source) / 1e6
+    output_mb: float = os.path.getsize(args.output) / 1e6
+    print(f"Wrote {args.output}: {len(written)} segments, JD {start_jd} - {end_jd}")
+    print(f"  size: {source_mb:.1f} MB -> {output_mb:.1f} MB "
+          f"({100.0 * output_mb / source_mb:.0f}%)")
+
+    full = SPK.open(args.source)
+    subset = SPK.open(args.output)
+    check = compare_kernels(full, subset, segments, start_jd, end_jd,
+                            samples_per_segment=args.samples)
+    subset.close()
+    full.close()
+    if check.identical:
+        print(f"  check: all {check.samples} sampled states match bit-for-bit")
+    else:
+        print(f"  check: {check.mismatches} of {check.samples} sampled states differ; "
+              f"max {check.max_position_diff_km * 1000.0:.3g} m, "
+              f"{check.max_velocity_diff_km_day * 1e6 / 86400.0:.3g} mm/s")
+
+
+if __name__ == "__main__":
+    main()
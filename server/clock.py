@@ -0,0 +1,140 @@
+"""Server-driven simulation clock.
+
+The browser used to send a `tick` per animation frame, and the server
+advanced a session once per tick received -- so simulated time ran at
+whatever rate the client's monitor, latency and tab state allowed, and a
+backgrounded tab stopped it. Instead, every session with a socket
+attached has a `SessionClock`: an asyncio task that advances it by one
+time step `steps_per_second` times a second while it plays, giving a
+simulated-time rate of `time_step_s * steps_per_second` whatever its
+clients do. The desktop app advances one step per rendered frame at 60
+fps, hence the default.
+
+The clock is steered through the session itself -- `set_play`,
+`reverse` and `set_time_step` (server/ws.py) change what the next step
+does, and `wake` restarts a paused clock and tells the session's sockets
+(its `listeners`) to push the change. Sockets only push states, at a
+cadence each client asks for (ws.py's `set_push_rate`). Steps run on
+server.simulation_pool like everything else that advances a session, so
+one slower than the clock interval (or cut short by the session's CPU
+budget) delays the next instead of queueing a burst behind it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Callable
+from typing import Any
+
+from server import simulation_pool
+from server.scheduler import JobBudget, advance_within
+
+DEFAULT_STEPS_PER_SECOND: float = 60.0
+
+_steps_per_second: float = DEFAULT_STEPS_PER_SECOND
+_clocks: dict[str, SessionClock] = {}
+
+
+class SessionClock:
+    """Advances one session in real time; shared by all of its sockets."""
+
+    def __init__(self, session: Any, steps_per_second: float) -> None:
+        self.session: Any = session
+        self.interval_s: float = 1.0 / steps_per_second
+        self.sockets: int = 0
+        self.steps: int = 0
+        # Called on `wake`: each socket's way of pushing a change it did
+        # not make itself (another socket's controls, a REST command).
+        self.listeners: list[Callable[[], None]] = []
+        self._wake: asyncio.Event = asyncio.Event()
+        self._task: asyncio.Task[None] = asyncio.create_task(self._run())
+
+    def wake(self, origin: Callable[[], None] | None = None) -> None:
+        """Pick up a change made since the clock last looked, and tell every
+        listener but `origin` (the one that made it)."""
+        self._wake.set()
+        for listener in self.listeners:
+            if listener != origin:
+                listener()
+
+    def check(self) -> None:
+        """Re-raise whatever stopped the clock, if something did."""
+        if self._task.done() and not self._task.cancelled():
+            self._task.result()
+
+    def stop(self) -> None:
+        self._task.cancel()
+
+    async def _run(self) -> None:
+        next_at: float = time.monotonic()
+        while True:
+            self._wake.clear()
+            if not self.session.auto_play:
+                await self._wake.wait()
+                next_at = time.monotonic()
+                continue
+            next_at += self.interval_s
+            delay: float = next_at - time.monotonic()
+            if delay > 0.0:
+                await asyncio.sleep(delay)
+            else:
+                next_at = time.monotonic()   # fell behind: carry on from now
+            await simulation_pool.run_with_budget(self.session, _step, self.session)
+            self.steps += 1
+
+
+def _step(budget: JobBudget, session: Any) -> None:
+    # Re-checked under the session lock: a pause may have landed since the
+    # clock decided to step.
+    if session.auto_play:
+        advance_within(session, session.time_step_s * session.play_direction, budget)
+
+
+def configure(steps_per_second: float = DEFAULT_STEPS_PER_SECOND) -> None:
+    """Set the step rate of clocks started from now on."""
+    global _steps_per_second
+    if steps_per_second <= 0.0:
+        raise ValueError("steps_per_second must be positive.")
+    _steps_per_second = steps_per_second
+
+
+def attach(session: Any, listener: Callable[[], None] | None = None) -> SessionClock:
+    """The session's clock, started by its first socket (call on the event
+    loop); `listener` is called on every `wake` until `detach`."""
+    clock = _clocks.get(session.session_id)
+    if clock is None:
+        clock = _clocks[session.session_id] = SessionClock(session, _steps_per_second)
+    clock.sockets += 1
+    if listener is not None:
+        clock.listeners.append(listener)
+    return clock
+
+
+def detach(session: Any, listener: Callable[[], None] | None = None) -> None:
+    """Release one socket's hold; the last one out stops the clock."""
+    clock = _clocks.get(session.session_id)
+    if clock is None:
+        return
+    if listener is not None and listener in clock.listeners:
+        clock.listeners.remove(listener)
+    clock.sockets -= 1
+    if clock.sockets <= 0:
+        clock.stop()
+        del _clocks[session.session_id]
+
+
+def attached(session_id: str) -> bool:
+    """Whether a socket is streaming the session (its clock is up)."""
+    return session_id in _clocks
+
+
+def wake(session_id: str) -> None:
+    """Pick up a change made to a session outside its sockets, if any are open."""
+    clock = _clocks.get(session_id)
+    if clock is not None:
+        clock.wake()
+
+
+def running() -> int:
+    return len(_clocks)
@@ -1,5 +1,10 @@
-"""FastAPI app entry point. Opens the 146MB SPK kernel once at startup and
-shares it (read-only) across every session -- mirrors app.py's main()."""
+"""FastAPI app entry point. Opens the SPK kernel once at startup and shares
+it (read-only) across every session -- mirrors app.py's main(). The kernel
+path can be overridden with EPHEMERIS_FILE (e.g. to serve a trimmed kernel
+written by scripts/subset_kernel.py), and segments are only resolved as
+sessions first ask for them (see core.kernel.LazyKernel). A launch-window
+index built by scripts/build_launch_windows.py (LAUNCH_WINDOW_FILE) is
+loaded alongside it when present."""
 
 from __future__ import annotations
 
@@ -10,25 +15,67 @@ from typing import AsyncIterator
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from jplephem.spk import SPK
-
-from config import EPHEMERIS_FILE
+from config import EPHEMERIS_FILE, LAUNCH_WINDOW_FILE
+from core.body_snapshots import DEFAULT_RETAINED, BodySnapshots
+from core.kernel import LazyKernel
+from core.launch_windows import LaunchWindowIndex
+from core.state_cache import DEFAULT_MAX_ENTRIES, StateCache
 from core.time import convert_to_julian_date
-from server import session_manager
+from core.transfer_cache import DEFAULT_MAX_TRANSFERS, TransferCache
+from server import clock, session_manager, simulation_pool
 from server.routes import router
+from server.scheduler import DEFAULT_CPU_BUDGET_S
+from server.session_store import MemorySessionStore, SessionStore, SqliteSessionStore
 from server.ws import session_socket
 
-_kernel: SPK | None = None
+_kernel: LazyKernel | None = None
+# Size of the process-wide ephemeris state cache shared by every session
+# (see core.state_cache); each entry is one body's state at one instant.
+_state_cache_entries: int = int(os.environ.get("STATE_CACHE_ENTRIES", DEFAULT_MAX_ENTRIES))
+# Size of the process-wide transfer/Lambert memo (see core.transfer_cache).
+_transfer_cache_entries: int = int(os.environ.get("TRANSFER_CACHE_ENTRIES",
+                                                  DEFAULT_MAX_TRANSFERS))
+# Body snapshots kept alive after the last session left their instant
+# (see core.body_snapshots).
+_body_snapshots_retained: int = int(os.environ.get("BODY_SNAPSHOTS_RETAINED", DEFAULT_RETAINED))
+# Threads that run session ticks and mission commands off the event loop
+# (see server.simulation_pool), and the CPU seconds each session may use
+# per second of wall time before its ticks are cut short (server.scheduler).
+_simulation_workers: int = int(os.environ.get("SIMULATION_WORKERS",
+                                              simulation_pool.DEFAULT_SIMULATION_WORKERS))
+_session_cpu_budget_s: float = float(os.environ.get("SESSION_CPU_BUDGET_S",
+                                                    DEFAULT_CPU_BUDGET_S))
+# A SQLite file shared by every worker on the host, so that several
+# uvicorn processes (behind sticky routing, see deploy/) can hand sessions
+# over, and idle sessions hibernate there instead of being dropped; unset,
+# sessions live only in this process (server.session_store).
+_session_store_path: str = os.environ.get("SESSION_STORE", "")
+# Time steps a playing session advances per second of wall time (see
+# server.clock); its simulated-time rate is this times its time step.
+_clock_steps_per_second: float = float(os.environ.get("CLOCK_STEPS_PER_SECOND",
+                                                      clock.DEFAULT_STEPS_PER_SECOND))
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     global _kernel
-    _kernel = SPK.open(EPHEMERIS_FILE)
-    session_manager.configure(kernel=_kernel, epoch_jd=convert_to_julian_date(datetime.now()))
+    _kernel = LazyKernel(os.environ.get("EPHEMERIS_FILE", EPHEMERIS_FILE))
+    store: SessionStore = (SqliteSessionStore(_session_store_path) if _session_store_path
+                           else MemorySessionStore())
+    session_manager.configure(kernel=_kernel, epoch_jd=convert_to_julian_date(datetime.now()),
+                              state_cache=StateCache(max_entries=_state_cache_entries),
+                              launch_windows=LaunchWindowIndex.load_if_present(
+                                  os.environ.get("LAUNCH_WINDOW_FILE", LAUNCH_WINDOW_FILE)),
+                              transfer_cache=TransferCache(max_entries=_transfer_cache_entries),
+                              body_snapshots=BodySnapshots(retain=_body_snapshots_retained),
+                              store=store)
+    simulation_pool.configure(workers=_simulation_workers, cpu_budget_s=_session_cpu_budget_s)
+    clock.configure(steps_per_second=_clock_steps_per_second)
     try:
         yield
     finally:
+        simulation_pool.shutdown()
+        session_manager.save_all()
         _kernel.close()
 
 
@@ -1,18 +1,20 @@
 """REST routes: static catalogues, session lifecycle, and the one-shot
-mission menu actions (fly_to/set_home/load_mission/export)."""
+mission menu actions (fly_to/set_home/load_mission/export). The mission
+actions run on server.simulation_pool, serialized with the session's
+ticks, and are saved to the session store once done."""
 
 from __future__ import annotations
 
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import PlainTextResponse
 
-from server import session_manager, static_data
+from server import clock, session_manager, simulation_pool, static_data
 
 router = APIRouter()
 
 
-def _require_session(session_id: str):
-    session = session_manager.get_session(session_id)
+async def _require_session(session_id: str):
+    session = await session_manager.get_session(session_id)
     if session is None:
         raise HTTPException(status_code=404, detail="unknown session")
     session_manager.touch(session_id)
@@ -30,8 +32,14 @@ def get_missions() -> dict:
 
 
 @router.get("/api/orbit_lines")
-def get_orbit_lines() -> dict:
-    return static_data.orbit_lines(session_manager.shared_kernel(), session_manager.shared_epoch_jd())
+def get_orbit_lines(approximate: bool = False) -> dict:
+    return static_data.orbit_lines(session_manager.shared_kernel(), session_manager.shared_epoch_jd(),
+                                   session_manager.shared_state_cache(), approximate)
+
+
+@router.get("/api/stats")
+def get_stats() -> dict:
+    return session_manager.stats()
 
 
 @router.post("/api/session")
@@ -41,32 +49,39 @@ def create_session() -> dict:
 
 
 @router.post("/api/session/{session_id}/set_home")
-def set_home(session_id: str, body: dict) -> dict:
-    session = _require_session(session_id)
-    if not session.set_home(str(body.get("body", ""))):
+async def set_home(session_id: str, body: dict) -> dict:
+    session = await _require_session(session_id)
+    if not await simulation_pool.run(session, session.set_home, str(body.get("body", ""))):
         raise HTTPException(status_code=400, detail="unknown body")
+    clock.wake(session.session_id)   # open sockets push the change now
+    await session_manager.checkpoint(session)
     return {"status": "ok", "home_body": session.home_body}
 
 
 @router.post("/api/session/{session_id}/fly_to")
-def fly_to(session_id: str, body: dict) -> dict:
-    session = _require_session(session_id)
-    return session.fly_to(str(body.get("target", "")))
+async def fly_to(session_id: str, body: dict) -> dict:
+    session = await _require_session(session_id)
+    result = await simulation_pool.run(session, session.fly_to, str(body.get("target", "")))
+    clock.wake(session.session_id)
+    await session_manager.checkpoint(session)
+    return result
 
 
 @router.post("/api/session/{session_id}/load_mission")
-def load_mission(session_id: str, body: dict) -> dict:
-    session = _require_session(session_id)
-    result = session.load_mission(str(body.get("name", "")))
+async def load_mission(session_id: str, body: dict) -> dict:
+    session = await _require_session(session_id)
+    result = await simulation_pool.run(session, session.load_mission, str(body.get("name", "")))
     if result["status"] == "unknown_mission":
         raise HTTPException(status_code=400, detail="unknown mission")
+    clock.wake(session.session_id)
+    await session_manager.checkpoint(session)
     return result
 
 
 @router.post("/api/session/{session_id}/export")
-def export_trajectory(session_id: str):
-    session = _require_session(session_id)
-    result = session.export_trajectory()
+async def export_trajectory(session_id: str):
+    session = await _require_session(session_id)
+    result = await simulation_pool.run(session, session.export_trajectory)
     if result["status"] != "ok":
         raise HTTPException(status_code=400, detail=result.get("message", "export failed"))
     with open(result["path"], encoding="utf-8") as handle:
@@ -75,8 +90,8 @@ def export_trajectory(session_id: str):
 
 
 @router.delete("/api/session/{session_id}")
-def delete_session(session_id: str) -> dict:
-    if session_manager.get_session(session_id) is None:
+async def delete_session(session_id: str) -> dict:
+    if await session_manager.get_session(session_id) is None:
         raise HTTPException(status_code=404, detail="unknown session")
-    session_manager.drop_session(session_id)
+    await session_manager.drop_session(session_id)
     return {"status": "ok"}
@@ -0,0 +1,252 @@
+"""Fair-share CPU scheduling of session work.
+
+The session clock (server/clock.py) fixes how often a session steps, not
+what a step costs: at the same step rate, a year-per-step Voyager replay
+burns orders of magnitude more CPU than a parked session. The scheduler
+meters what every job actually costs (its thread's CPU clock) and gives
+each session a budget of CPU seconds per sliding wall-clock window, scaled
+by the session's weight.
+
+Jobs queue per session; worker threads pick the next one by deficit round
+robin. Each visit credits a session `quantum_s * weight` and a job runs
+once its session's credit is positive, so a heavy session pays for its
+long jobs by sitting out rounds while light sessions -- whose jobs cost
+next to nothing -- are served on every pass and keep their latency. A
+session's jobs never run concurrently with each other.
+
+A job receives a `JobBudget` (what is left of its session's budget), and
+`advance_within` serves a tick only as far as that budget -- and a
+per-tick wall-clock deadline -- reaches; the session owes the rest.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Future
+from typing import Any
+
+DEFAULT_WINDOW_S: float = 1.0
+# CPU seconds per session (at weight 1) per window.
+DEFAULT_CPU_BUDGET_S: float = 0.25
+# Round-robin credit per visit, CPU seconds (at weight 1).
+DEFAULT_QUANTUM_S: float = 0.005
+# Wall-clock time one tick may spend advancing its session; the rest of
+# the step is owed and continued on the next tick (SolaraSession.advance).
+DEFAULT_TICK_DEADLINE_S: float = 0.05
+
+
+class SessionShare:
+    """One session's queue, round-robin credit and CPU accounting."""
+
+    def __init__(self, weight: float = 1.0) -> None:
+        self.weight: float = weight
+        self.jobs: deque[tuple[Future, Callable[..., Any], tuple[Any, ...]]] = deque()
+        self.running: bool = False
+        # Forgotten while a job was queued or running: dropped once idle.
+        self.forgotten: bool = False
+        self.deficit: float = 0.0
+        self.cpu_total_s: float = 0.0
+        self.jobs_run: int = 0
+        self.partial_ticks: int = 0
+        self._charges: deque[tuple[float, float]] = deque()   # (wall time, CPU s)
+
+    def used(self, now: float, window_s: float) -> float:
+        """CPU seconds charged within the last `window_s` seconds."""
+        while self._charges and self._charges[0][0] <= now - window_s:
+            self._charges.popleft()
+        return sum(cpu for _, cpu in self._charges)
+
+    def charge(self, now: float, cpu_s: float) -> None:
+        self._charges.append((now, cpu_s))
+        self.cpu_total_s += cpu_s
+
+
+class JobBudget:
+    """The CPU a running job may still use before its session is over budget."""
+
+    def __init__(self,
+                 share: SessionShare,
+                 allowance_s: float,
+                 lock: threading.Condition | None = None) -> None:
+        self.share: SessionShare = share
+        self.allowance_s: float = allowance_s
+        self._lock: threading.Condition = lock if lock is not None else threading.Condition()
+        self._started: float = time.thread_time()
+
+    def spent(self) -> float:
+        return time.thread_time() - self._started
+
+    def remaining(self) -> float:
+        return self.allowance_s - self.spent()
+
+    def count_partial_tick(self) -> None:
+        """Record a tick that left time owed (under the scheduler's lock)."""
+        with self._lock:
+            self.share.partial_ticks += 1
+
+
+class FairShareScheduler:
+    """Worker threads running per-session jobs by weighted deficit round robin."""
+
+    def __init__(self,
+                 workers: int,
+                 cpu_budget_s: float = DEFAULT_CPU_BUDGET_S,
+                 window_s: float = DEFAULT_WINDOW_S,
+                 quantum_s: float = DEFAULT_QUANTUM_S) -> None:
+        if workers < 1:
+            raise ValueError("workers must be at least 1.")
+        if cpu_budget_s <= 0.0 or window_s <= 0.0 or quantum_s <= 0.0:
+            raise ValueError("Budget, window and quantum must be positive.")
+        self.cpu_budget_s: float = cpu_budget_s
+        self.window_s: float = window_s
+        self.quantum_s: float = quantum_s
+        self._shares: dict[str, SessionShare] = {}
+        self._cursor: int = 0
+        self._closed: bool = False
+        self._condition: threading.Condition = threading.Condition()
+        self._threads: list[threading.Thread] = [
+            threading.Thread(target=self._work, name=f"simulation-{k}", daemon=True)
+            for k in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, key: str, job: Callable[..., Any], *args: Any) -> Future:
+        """Queue `job(budget, *args)` for session `key`; its result arrives on the Future."""
+        future: Future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Scheduler is shut down.")
+            share = self._shares.get(key)
+            if share is None:
+                share = self._shares[key] = SessionShare()
+            share.forgotten = False
+            share.jobs.append((future, job, args))
+            self._condition.notify()
+        return future
+
+    def set_weight(self, key: str, weight: float) -> None:
+        if weight <= 0.0:
+            raise ValueError("weight must be positive.")
+        with self._condition:
+            self._shares.setdefault(key, SessionShare()).weight = weight
+
+    def forget(self, key: str) -> None:
+        """Drop a session's accounting, once its queued jobs have run."""
+        with self._condition:
+            share = self._shares.get(key)
+            if share is None:
+                return
+            share.forgotten = True
+            self._drop_if_forgotten(key, share)
+
+    def usage(self) -> dict[str, dict[str, Any]]:
+        """Per-session budget use, for monitoring."""
+        now: float = time.monotonic()
+        with self._condition:
+            return {
+                key: {
+                    "weight": share.weight,
+                    "cpu_s_in_window": share.used(now, self.window_s),
+                    "budget_s": self.cpu_budget_s * share.weight,
+                    "cpu_s_total": share.cpu_total_s,
+                    "jobs_run": share.jobs_run,
+                    "queued": len(share.jobs),
+                    "partial_ticks": share.partial_ticks,
+                }
+                for key, share in self._shares.items()
+            }
+
+    def shutdown(self) -> None:
+        """Stop the workers once they finish their current jobs; cancel the queue."""
+        with self._condition:
+            self._closed = True
+            for share in self._shares.values():
+                while share.jobs:
+                    share.jobs.popleft()[0].cancel()
+            self._condition.notify_all()
+
+    def _next(self) -> tuple[str, SessionShare] | None:
+        """The next session to serve, by weighted deficit round robin (lock held)."""
+        keys: list[str] = [key for key, share in self._shares.items()
+                           if share.jobs and not share.running]
+        if not keys:
+            return None
+        order: list[str] = list(self._shares)
+        start: int = self._cursor % len(order)
+        ring: list[str] = [key for key in order[start:] + order[:start] if key in keys]
+        while True:
+            for key in ring:
+                share = self._shares[key]
+                share.deficit += self.quantum_s * share.weight
+                if share.deficit > 0.0:
+                    self._cursor = order.index(key) + 1
+                    return key, share
+
+    def _work(self) -> None:
+        while True:
+            with self._condition:
+                picked = self._next()
+                while picked is None and not self._closed:
+                    self._condition.wait()
+                    picked = self._next()
+                if picked is None:
+                    return
+                key, share = picked
+                future, job, args = share.jobs.popleft()
+                share.running = True
+                allowance: float = (self.cpu_budget_s * share.weight
+                                    - share.used(time.monotonic(), self.window_s))
+            cpu_s: float = 0.0
+            if future.set_running_or_notify_cancel():
+                budget = JobBudget(share, allowance, self._condition)
+                try:
+                    result = job(budget, *args)
+                except BaseException as error:
+                    cpu_s = budget.spent()
+                    self._finish(key, share, cpu_s)
+                    future.set_exception(error)
+                    continue
+                cpu_s = budget.spent()
+                self._finish(key, share, cpu_s)
+                future.set_result(result)
+            else:
+                self._finish(key, share, cpu_s)
+
+    def _finish(self, key: str, share: SessionShare, cpu_s: float) -> None:
+        with self._condition:
+            share.charge(time.monotonic(), cpu_s)
+            share.jobs_run += 1
+            share.deficit -= cpu_s
+            share.running = False
+            if not share.jobs:
+                share.deficit = min(share.deficit, 0.0)   # no banking credit while idle
+            self._drop_if_forgotten(key, share)
+            self._condition.notify_all()
+
+    def _drop_if_forgotten(self, key: str, share: SessionShare) -> None:
+        """Delete a forgotten share once nothing is queued or running (lock held)."""
+        if share.forgotten and not share.jobs and not share.running:
+            if self._shares.get(key) is share:
+                del self._shares[key]
+
+
+def advance_within(session: Any,
+                   dt_s: float,
+                   budget: JobBudget,
+                   deadline_s: float = DEFAULT_TICK_DEADLINE_S) -> float:
+    """
+    Advance `session` by `dt_s` for at most `deadline_s` of wall time, or
+    what is left of `budget` if that is less (wall time is never shorter
+    than the CPU time it holds), and return the simulated seconds covered.
+    The session keeps whatever it could not reach as owed time (see
+    SolaraSession.advance) and works it off on later ticks; a tick that
+    leaves time owed counts as partial.
+    """
+    allowance: float = min(deadline_s, budget.remaining())
+    done: float = session.advance(dt_s, deadline=time.monotonic() + allowance)
+    if session.owed_s != 0.0:
+        budget.count_partial_tick()
+    return done
@@ -1,9 +1,55 @@
-"""Wire-format helpers: core/ objects -> plain JSON-able dicts."""
+"""Wire-format helpers: core/ objects -> plain JSON-able dicts, or packed
+binary state frames.
+
+`state_message` is the full JSON 'state' push. Sockets actually get theirs
+from a per-connection `StateEncoder`, which sends the full state once and
+then only what changed: bodies (and the date) only when `sim_time_s`
+moved, the ship only when it did, HUD keys one by one as they change, the
+plan lines only when they differ. A paused session's push is a bare
+heartbeat, `{"type": "state"}`. The client merges each push into the
+state it holds (web/src/session/wireTypes.ts applyStateDelta). WebSocket
+is a single ordered, reliable stream, so what was sent on this socket is
+what the client holds; a reconnecting client gets a new encoder and a
+full state.
+
+Body payloads are built from the session's shared `body_snapshot` (see
+core.body_snapshots) and memoized on it -- the JSON `bodies` object and
+the packed body arrays of a binary frame -- so every socket of every
+session at the same instant reuses one copy.
+
+Sockets that negotiate the `BINARY_SUBPROTOCOL` at connect time get the
+same pushes as packed binary frames (`state_frame` is the full one): a
+fixed little-endian header, then the numeric payload as packed arrays the
+browser reads through typed-array views without parsing, then the string
+fields as a short UTF-8 JSON tail. Layout (offsets in bytes, n bodies, m
+trail points):
+
+    0   u16  FRAME_MAGIC             2   u8  FRAME_VERSION
+    3   u8   flags (FRAME_TRAIL_RESET, FRAME_VECTORS)
+    4   u16  n                       6   u16 reserved
+    8   u32  m                       12  u32 tail length in bytes
+    16  f64  sim_time_s
+    24  f64  [n + 1][3]  positions, bodies in name order then the ship (km)
+    ..  f32  [n + 1][3]  velocities, same order (km/s)
+    ..  f32  [m][3]      trail points to append (km)
+    ..  UTF-8 JSON, any of {"date", "bodies": [names], "hud", "plan"}
+
+The vector arrays are present only with FRAME_VECTORS (n is 0 without);
+body names are sent once per connection; the tail is empty when nothing
+in it changed. Positions stay double precision (kilometres across the
+solar system); velocities and trail points, which are only drawn, are
+single. Every array starts on a multiple of its element size, so the
+decoder views the received buffer in place (wireTypes.ts
+decodeStateFrame).
+"""
 
 from __future__ import annotations
 
+import json
+import struct
 from typing import Any
 
+from core.body_snapshots import BodySnapshot
 from core.flight_plan import (
     CoastInstruction,
     DeltaVInstruction,
@@ -15,6 +61,14 @@ from core.flight_plan import (
 from core.moon_transfer import MoonMissionPhase
 from core.vec3 import Vec3
 
+# WebSocket subprotocol a client offers to receive binary state frames.
+BINARY_SUBPROTOCOL: str = "solara.state.v2"
+FRAME_MAGIC: int = 0x534C   # "SL"
+FRAME_VERSION: int = 2
+FRAME_TRAIL_RESET: int = 0x01
+FRAME_VECTORS: int = 0x02
+_FRAME_HEADER = struct.Struct("<HBBHHIId")
+
 
 def vec3_pair(position: Vec3, velocity: Vec3) -> dict[str, list[float]]:
     return {
@@ -23,6 +77,19 @@ def vec3_pair(position: Vec3, velocity: Vec3) -> dict[str, list[float]]:
     }
 
 
+def _body_pairs(snapshot: BodySnapshot) -> dict[str, dict[str, list[float]]]:
+    # Shared between pushes once memoized: never mutated after this.
+    return {name: vec3_pair(*state) for name, state in snapshot.states.items()}
+
+
+def _packed_bodies(snapshot: BodySnapshot) -> tuple[bytes, bytes]:
+    """The bodies' rows of a binary frame's position and velocity arrays."""
+    positions: list[Vec3] = [position for position, _ in snapshot.states.values()]
+    velocities: list[Vec3] = [velocity for _, velocity in snapshot.states.values()]
+    return (struct.pack(f"<{3 * len(positions)}d", *_flatten(positions)),
+            struct.pack(f"<{3 * len(velocities)}f", *_flatten(velocities)))
+
+
 def _describe_instruction(instruction: Instruction) -> str:
     if isinstance(instruction, CoastInstruction):
         return f"Coast {instruction.duration / 86400.0:.2f} d"
@@ -71,12 +138,26 @@ def plan_lines(session: Any) -> list[str]:
     return lines
 
 
+def hud_fields(session: Any) -> dict[str, Any]:
+    return {
+        "time_step_name": session.time_step_name,
+        "playing": session.auto_play,
+        "direction": session.play_direction,
+        "following": session.follow_target,
+        "home_body": session.home_body,
+        "test_drive": session.use_test_ship,
+        "mission_label": session.mission_label,
+        "notification": session.last_notification,
+        # Simulated seconds of the current step not yet integrated; non-zero
+        # while a long step is being worked off over several ticks.
+        "owed_s": session.owed_s,
+    }
+
+
 def state_message(session: Any, trail_append: list[Vec3], trail_reset: bool = False) -> dict[str, Any]:
     """Build the per-tick 'state' push described in the web-port plan."""
-    bodies: dict[str, dict[str, list[float]]] = {
-        name: vec3_pair(body.position, body.velocity)
-        for name, body in session.bodies.items()
-    }
+    bodies: dict[str, dict[str, list[float]]] = session.body_snapshot.encoded("json",
+                                                                              _body_pairs)
     message: dict[str, Any] = {
         "type": "state",
         "sim_time_s": session.sim_time_s,
@@ -87,16 +168,143 @@ def state_message(session: Any, trail_append: list[Vec3], trail_reset: bool = Fa
             "trail_append": [[p.x, p.y, p.z] for p in trail_append],
             "trail_reset": trail_reset,
         },
-        "hud": {
-            "time_step_name": session.time_step_name,
-            "playing": session.auto_play,
-            "direction": session.play_direction,
-            "following": session.follow_target,
-            "home_body": session.home_body,
-            "test_drive": session.use_test_ship,
-            "mission_label": session.mission_label,
-            "notification": session.last_notification,
-        },
+        "hud": hud_fields(session),
         "plan": plan_lines(session),
     }
     return message
+
+
+def state_frame(session: Any, trail_append: list[Vec3], trail_reset: bool = False) -> bytes:
+    """The full `state_message` content as one packed binary frame."""
+    return StateEncoder(binary=True).encode_frame(session, trail_append, trail_reset)
+
+
+class StateEncoder:
+    """One socket's state pushes: full the first time, then only changes."""
+
+    def __init__(self, binary: bool = False) -> None:
+        self.binary: bool = binary
+        self._sim_time_s: float | None = None
+        self._ship: tuple[Vec3, Vec3] | None = None
+        self._body_names: tuple[str, ...] | None = None
+        self._hud: dict[str, Any] = {}
+        self._plan: list[str] | None = None
+        # Whether the last push carried anything (a heartbeat does not).
+        self.changed: bool = True
+
+    def encode(self,
+               session: Any,
+               trail_append: list[Vec3],
+               trail_reset: bool = False) -> dict[str, Any] | bytes:
+        """The next push in this socket's format (`binary` or JSON)."""
+        if self.binary:
+            return self.encode_frame(session, trail_append, trail_reset)
+        return self.encode_message(session, trail_append, trail_reset)
+
+    def encode_message(self,
+                       session: Any,
+                       trail_append: list[Vec3],
+                       trail_reset: bool = False) -> dict[str, Any]:
+        """The next push as a JSON-shaped `state` message."""
+        moved, ship, ship_moved, snapshot, _, hud, plan = self._changes(
+            session, trail_append, trail_reset)
+        message: dict[str, Any] = {"type": "state"}
+        if moved:
+            message["sim_time_s"] = session.sim_time_s
+            message["date"] = session.current_date.isoformat()
+            message["bodies"] = snapshot.encoded("json", _body_pairs)
+        ship_fields: dict[str, Any] = vec3_pair(*ship) if ship_moved else {}
+        if trail_append or trail_reset:
+            ship_fields["trail_append"] = [[p.x, p.y, p.z] for p in trail_append]
+            ship_fields["trail_reset"] = trail_reset
+        if ship_fields:
+            message["ship"] = ship_fields
+        if hud:
+            message["hud"] = hud
+        if plan is not None:
+            message["plan"] = plan
+        return message
+
+    def encode_frame(self,
+                     session: Any,
+                     trail_append: list[Vec3],
+                     trail_reset: bool = False) -> bytes:
+        """The next push as a packed binary frame."""
+        moved, ship, ship_moved, snapshot, renamed, hud, plan = self._changes(
+            session, trail_append, trail_reset)
+        return self._frame(session, snapshot, moved or ship_moved or renamed, moved, renamed,
+                           ship, trail_append, trail_reset, hud, plan)
+
+    def _changes(self,
+                 session: Any,
+                 trail_append: list[Vec3],
+                 trail_reset: bool) -> tuple[bool, tuple[Vec3, Vec3], bool, BodySnapshot,
+                                             bool, dict[str, Any], list[str] | None]:
+        """
+        What changed since the last push -- (moved, ship, ship_moved,
+        snapshot, renamed, hud, plan) -- remembering the new values and
+        whether there were any (`changed`).
+        """
+        moved: bool = session.sim_time_s != self._sim_time_s
+        ship: tuple[Vec3, Vec3] = (session.ship_position(), session.ship_velocity())
+        ship_moved: bool = ship != self._ship
+        snapshot: BodySnapshot = session.body_snapshot
+        names: tuple[str, ...] = snapshot.names
+        renamed: bool = names != self._body_names
+        hud: dict[str, Any] = {key: value for key, value in hud_fields(session).items()
+                               if key not in self._hud or self._hud[key] != value}
+        plan: list[str] | None = plan_lines(session)
+        if plan == self._plan:
+            plan = None
+
+        self._sim_time_s, self._ship, self._body_names = session.sim_time_s, ship, names
+        self._hud.update(hud)
+        if plan is not None:
+            self._plan = plan
+        self.changed = bool(moved or ship_moved or renamed or hud or plan is not None
+                            or trail_append or trail_reset)
+        return moved, ship, ship_moved, snapshot, renamed, hud, plan
+
+    @staticmethod
+    def _frame(session: Any,
+               snapshot: BodySnapshot,
+               vectors: bool,
+               moved: bool,
+               renamed: bool,
+               ship: tuple[Vec3, Vec3],
+               trail_append: list[Vec3],
+               trail_reset: bool,
+               hud: dict[str, Any],
+               plan: list[str] | None) -> bytes:
+        tail_fields: dict[str, Any] = {}
+        if moved:
+            tail_fields["date"] = session.current_date.isoformat()
+        if renamed:
+            tail_fields["bodies"] = list(snapshot.names)
+        if hud:
+            tail_fields["hud"] = hud
+        if plan is not None:
+            tail_fields["plan"] = plan
+        tail: bytes = (json.dumps(tail_fields, separators=(",", ":")).encode("utf-8")
+                       if tail_fields else b"")
+        flags: int = (FRAME_TRAIL_RESET if trail_reset else 0) | (FRAME_VECTORS if vectors else 0)
+        parts: list[bytes] = []
+        count: int = 0
+        if vectors:
+            # Body rows come pre-packed from the snapshot; only the ship's
+            # row is this session's own.
+            positions, velocities = snapshot.encoded("binary", _packed_bodies)
+            count = len(snapshot.names)
+            parts = [positions, struct.pack("<3d", *_flatten([ship[0]])),
+                     velocities, struct.pack("<3f", *_flatten([ship[1]]))]
+        return b"".join((
+            _FRAME_HEADER.pack(FRAME_MAGIC, FRAME_VERSION, flags, count, 0,
+                               len(trail_append), len(tail), session.sim_time_s),
+            *parts,
+            struct.pack(f"<{3 * len(trail_append)}f", *_flatten(trail_append)),
+            tail,
+        ))
+
+
+def _flatten(vectors: list[Vec3]) -> list[float]:
+    return [component for v in vectors for component in (v.x, v.y, v.z)]
@@ -10,24 +10,44 @@ _load_mission()/_load_moon_mission(), minus every Ursina/camera/HUD call.
 from __future__ import annotations
 
 import os
+import threading
+import time
 import uuid
 from datetime import datetime, timedelta
 from math import cos, pi, sin, sqrt
 from typing import Any
 
 from core.bodies import CelestialBody
+from core.body_snapshots import BodySnapshot, BodySnapshots
 from core.ephemeris import JplEphemeris
 from core.export import export_csv
 from core.flight_plan import FlightPlan
-from core.lambert import MU_SUN, LambertNoConvergence, solve_lambert
-from core.mission_planner import MissionPlanner, Objective
+from core.integrator import AdaptiveIntegrator, DormandPrince54
+from core.interpolated_ephemeris import InterpolatedEphemeris
+from core.keplerian_ephemeris import KeplerianEphemeris
+from core.lambert import MU_SUN, LambertNoConvergence, solve_lambert_izzo
+from core.launch_windows import LaunchWindowIndex
+from core.mission_planner import (
+    DEFAULT_REFINE_BASINS,
+    MissionPlanner,
+    Objective,
+    TransferSolution,
+)
 from core.missions import HistoricalMission, load_missions
 from core.moon_transfer import MoonMissionState, plan_moon_transfer
 from core.physics import G, circular_orbit_velocity
-from core.propagator import DEFAULT_DT_MAX, advance_coasting
+from core.propagator import (
+    DEFAULT_DT_MAX,
+    advance_coasting,
+    advance_coasting_adaptive,
+    body_states,
+    sync_bodies,
+)
 from core.spaceship import PropulsionSystem, Spaceship
-from core.time import convert_to_julian_date
+from core.state_cache import StateCache
+from core.time import MAX_JULIAN_DATE, MIN_JULIAN_DATE, convert_to_julian_date
 from core.trail import TrailPath
+from core.transfer_cache import TransferCache
 from core.bodies import load_bodies_from_json
 from core.vec3 import Vec3
 from config import simulation_steps
@@ -45,9 +65,17 @@ MOON_TRAIL_KM: float = 5000.0
 MISSIONS_FILE: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..",
                                   "data", "missions.json")
 EXPORT_DIR: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "exports")
+# Simulated time handed to the coasting propagator between deadline checks.
+HISTORICAL_SLICE_S: float = 86400.0
+# Cap on simulated time owed by a deadline-bounded advance, in steps.
+MAX_OWED_STEPS: float = 4.0
 EXPORT_MAX_FILES: int = 100  # oldest exports are pruned past this on each export, to bound disk use on a public URL
 
 
+def _before(deadline: float | None) -> bool:
+    return deadline is None or time.monotonic() < deadline
+
+
 def _sweep_exports() -> None:
     """Delete oldest files in EXPORT_DIR beyond EXPORT_MAX_FILES."""
     entries = [os.path.join(EXPORT_DIR, name) for name in os.listdir(EXPORT_DIR)]
@@ -65,29 +93,38 @@ class SolaraSession:
     sessions: `bodies` is a fresh dict built from data/bodies.json at
     construction time (CelestialBody instances are mutated every tick by
     `_sync_bodies_to_time`), and `ephemeris` wraps the one shared, read-only
-    SPK kernel in its own lightweight JplEphemeris instance.
+    SPK kernel in its own lightweight JplEphemeris instance (reading through
+    the process-wide `state_cache`, when one is given). What is shared is
+    `body_snapshot`: the immutable state of every body at the current
+    instant, borrowed from the process-wide `body_snapshots` (see
+    core.body_snapshots) and copied into `bodies`.
     """
 
-    def __init__(self, kernel: Any) -> None:
+    def __init__(self,
+                 kernel: Any,
+                 state_cache: StateCache | None = None,
+                 launch_windows: LaunchWindowIndex | None = None,
+                 transfer_cache: TransferCache | None = None,
+                 body_snapshots: BodySnapshots | None = None) -> None:
         self.session_id: str = uuid.uuid4().hex
         # Loaded fresh per session (rather than once at server startup) so
         # that whoever opens the app sees today's actual date and body
         # positions, not wherever the server's uptime happened to start.
-        self.epoch: datetime = datetime.now()
+        # Truncated to the minute so sessions opened close together share
+        # an epoch -- and therefore Julian dates, and `state_cache` entries,
+        # as they step through whole `simulation_steps`.
+        self.epoch: datetime = datetime.now().replace(second=0, microsecond=0)
         self.bodies: dict[str, CelestialBody] = load_bodies_from_json()
-        self.ephemeris: JplEphemeris = JplEphemeris.from_bodies(
-            kernel=kernel, bodies=self.bodies, epoch_jd=convert_to_julian_date(self.epoch))
 
         self.sim_time_s: float = 0.0
+        # Simulated seconds requested but not yet integrated (see advance).
+        self.owed_s: float = 0.0
         self.time_step_index: int = DEFAULT_TIME_STEP_INDEX
         self.auto_play: bool = False
         self.play_direction: float = 1.0
         self.follow_target: str = "Sun"
         self.home_body: str = "Earth"
         self.use_test_ship: bool = False
-
-        self.planner: MissionPlanner = MissionPlanner(ephemeris=self.ephemeris, mu=MU_SUN)
-        self.missions: dict[str, HistoricalMission] = load_missions(MISSIONS_FILE)
         self.mission_label: str = ""
         self.last_notification: str = ""
 
@@ -112,8 +149,66 @@ class SolaraSession:
         self.mission_gravity_bodies: dict[str, CelestialBody] = {}
         self.mcc_index: int = 0
 
+        self.attach(kernel, state_cache=state_cache, launch_windows=launch_windows,
+                    transfer_cache=transfer_cache, body_snapshots=body_snapshots)
+
+    # Everything `attach` builds: process-local, or shared with other
+    # sessions, so never part of the session's own (pickled) state.
+    _ATTACHED: tuple[str, ...] = ("lock", "ephemeris", "coasting_ephemeris",
+                                  "approximate_ephemeris", "planner", "launch_windows",
+                                  "missions", "body_snapshots", "body_snapshot")
+
+    def attach(self,
+               kernel: Any,
+               state_cache: StateCache | None = None,
+               launch_windows: LaunchWindowIndex | None = None,
+               transfer_cache: TransferCache | None = None,
+               body_snapshots: BodySnapshots | None = None) -> None:
+        """
+        Connect the session to this process's kernel and shared caches --
+        at construction, and again when a session saved by another worker
+        is loaded (see server.session_store).
+        """
+        # Held by whoever advances or mutates the session (see
+        # server.simulation_pool), so ticks and REST commands never overlap.
+        self.lock: threading.Lock = threading.Lock()
+        self.ephemeris: JplEphemeris = JplEphemeris.from_bodies(
+            kernel=kernel, bodies=self.bodies, epoch_jd=convert_to_julian_date(self.epoch),
+            cache=state_cache)
+        # Historical replays re-sync every body at every adaptive sub-step;
+        # they read from Hermite tables built lazily over the kernel instead.
+        self.coasting_ephemeris: InterpolatedEphemeris = InterpolatedEphemeris(self.ephemeris)
+        # Analytic mean-element orbits: used for dates the kernel doesn't
+        # cover and for coarse porkchop screening (never to fly a plan).
+        self.approximate_ephemeris: KeplerianEphemeris = KeplerianEphemeris(
+            epoch_jd=self.ephemeris.epoch_jd)
+        # Transfers and searches are memoized in the process-wide
+        # `transfer_cache` (when given), keyed on absolute time, so users
+        # planning the same window share the work. Mid-course corrections
+        # solve from the live ship state, which never repeats, so they call
+        # the solver directly.
+        self.planner: MissionPlanner = MissionPlanner(
+            ephemeris=self.ephemeris, mu=MU_SUN,
+            approximate_ephemeris=self.approximate_ephemeris,
+            lambert_solver=solve_lambert_izzo,
+            transfer_cache=transfer_cache, epoch_jd=self.ephemeris.epoch_jd)
+        # Precomputed launch windows (shared, read-only); FLY_TO polishes one
+        # of these instead of searching a porkchop grid when it can.
+        self.launch_windows: LaunchWindowIndex | None = launch_windows
+        self.missions: dict[str, HistoricalMission] = load_missions(MISSIONS_FILE)
+        self.body_snapshots: BodySnapshots = (body_snapshots if body_snapshots is not None
+                                              else BodySnapshots(retain=0))
+        self.body_snapshot: BodySnapshot
         self._sync_bodies_to_time(self.sim_time_s)
 
+    def __getstate__(self) -> dict[str, Any]:
+        # Only the session's own state; the unpickled copy is unusable until
+        # `attach` gives it this process's kernel and caches.
+        state: dict[str, Any] = self.__dict__.copy()
+        for name in self._ATTACHED:
+            state.pop(name, None)
+        return state
+
     # ------------------------------------------------------------------
     # Simulation time (mirrors SolaraApp's properties)
     # ------------------------------------------------------------------
@@ -131,10 +226,16 @@ class SolaraSession:
         return self.epoch + timedelta(seconds=self.sim_time_s)
 
     def _sync_bodies_to_time(self, time_s: float) -> None:
-        for name, body in self.bodies.items():
-            position, velocity = self.ephemeris.state(name, time_s)
-            body.position = position
-            body.velocity = velocity
+        # Stepping past either end of the kernel's range would raise in
+        # jplephem; show the approximate analytic orbits there instead.
+        jd: float = self.ephemeris.epoch_jd + time_s / 86400.0
+        in_range: bool = MIN_JULIAN_DATE <= jd <= MAX_JULIAN_DATE
+        ephemeris = self.ephemeris if in_range else self.approximate_ephemeris
+        # Whichever session reaches this instant first evaluates it; the
+        # rest borrow its snapshot.
+        self.body_snapshot = self.body_snapshots.get(
+            (jd, in_range), lambda: body_states(ephemeris, self.bodies, time_s))
+        self.body_snapshot.apply_to(self.bodies)
 
     # ------------------------------------------------------------------
     # Ship position (parked kinematic orbit, or the simulated craft)
@@ -163,29 +264,63 @@ class SolaraSession:
     # Advance
     # ------------------------------------------------------------------
 
-    def advance(self, dt_s: float) -> None:
-        if self.mission_active and not self.parked and dt_s > 0.0 and self.sim_ship is not None:
-            self._advance_mission(dt_s)
-        elif self.historical_active and dt_s > 0.0 and self.sim_ship is not None:
-            self._advance_historical(dt_s)
-        else:
-            self.sim_time_s += dt_s
+    def advance(self, dt_s: float, deadline: float | None = None) -> float:
+        """
+        Owe `dt_s` more simulated seconds and integrate what is owed,
+        stopping between integration slices once `time.monotonic()` passes
+        `deadline` (None: run to completion). Whatever is left stays in
+        `owed_s` and is worked off by the next call, so a "1 year" step
+        spreads over several ticks instead of stalling one; a call never
+        raises the debt past MAX_OWED_STEPS times its own `dt_s` (so
+        `advance(0.0, deadline)` just works it off). Returns the simulated
+        seconds covered by this call.
+        """
+        limit: float = max(MAX_OWED_STEPS * abs(dt_s), abs(self.owed_s))
+        owed: float = max(-limit, min(self.owed_s + dt_s, limit))
+        started_at: float = self.sim_time_s
+        if self.mission_active and not self.parked and owed > 0.0 and self.sim_ship is not None:
+            self.owed_s = self._advance_mission(owed, deadline)
+        elif self.historical_active and owed > 0.0 and self.sim_ship is not None:
+            self.owed_s = self._advance_historical(owed, deadline)
+        elif _before(deadline):
+            self.sim_time_s += owed
             self._sync_bodies_to_time(self.sim_time_s)
+            self.owed_s = 0.0
+        else:
+            self.owed_s = owed
         if self.moon_trip and self.moon_state is not None and self.sim_ship is not None:
             self.moon_state.step(self.sim_ship, self.bodies["Earth"], self.sim_time_s)
         if self.sim_ship is not None and self.trail.add(self.sim_ship.position):
             pass  # the delta is picked up by serialization from trail.points
-
-    def _advance_historical(self, dt_s: float) -> None:
-        """Coast a real craft forward under full N-body gravity (adaptive)."""
-        advance_coasting(self.sim_ship, self.ephemeris, self.bodies, self.sim_time_s, dt_s)
-        self.sim_time_s += dt_s
+        return self.sim_time_s - started_at
+
+    def _advance_historical(self, dt_s: float, deadline: float | None = None) -> float:
+        """Coast a real craft forward under full N-body gravity (adaptive),
+        HISTORICAL_SLICE_S at a time; returns the time still owed. A craft
+        with an error-controlled integrator (the historical missions) has
+        the planets move within its steps; the Moon trip's Verlet craft
+        steps with the bodies re-synced between sub-steps."""
+        ship: Spaceship | None = self.sim_ship
+        assert ship is not None
+        remaining: float = dt_s
+        while remaining > 1e-6 and _before(deadline):
+            step: float = min(HISTORICAL_SLICE_S, remaining)
+            if isinstance(ship.integrator, AdaptiveIntegrator):
+                advance_coasting_adaptive(ship, self.coasting_ephemeris, self.bodies,
+                                          self.sim_time_s, step)
+            else:
+                advance_coasting(ship, self.coasting_ephemeris, self.bodies,
+                                 self.sim_time_s, step)
+            self.sim_time_s += step
+            remaining -= step
         self._sync_bodies_to_time(self.sim_time_s)
+        return remaining if remaining > 1e-6 else 0.0
 
-    def _advance_mission(self, dt_s: float) -> None:
+    def _advance_mission(self, dt_s: float, deadline: float | None = None) -> float:
+        """Fly the mission ship forward; returns the time still owed."""
         fine_chunk: float = self.sim_ship.max_integration_dt
         remaining: float = dt_s
-        while remaining > 1e-6:
+        while remaining > 1e-6 and _before(deadline):
             target = self.bodies[self.mission_target]
             distance: float = (self.sim_ship.position - target.position).magnitude()
             cap: float = self.mission_capture_km
@@ -197,14 +332,12 @@ class SolaraSession:
                 chunk = 86400.0
             step: float = min(chunk, remaining)
             self.sim_time_s += step
-            for name, body in self.mission_gravity_bodies.items():
-                position, velocity = self.ephemeris.state(name, self.sim_time_s)
-                body.position = position
-                body.velocity = velocity
+            sync_bodies(self.ephemeris, self.mission_gravity_bodies, self.sim_time_s)
             self.sim_ship.step_forward(step, self.mission_gravity_bodies)
             self._maybe_correct_course()
             remaining -= step
         self._sync_bodies_to_time(self.sim_time_s)
+        return remaining if remaining > 1e-6 else 0.0
 
     def _maybe_correct_course(self) -> None:
         """Re-solve Lambert from the live state and burn the correction at
@@ -228,8 +361,8 @@ class SolaraSession:
                 ).magnitude() < self.mission_capture_km:
             return
         try:
-            lambert = solve_lambert(r1=self.sim_ship.position, r2=target_position,
-                                    time_of_flight=remaining, mu=MU_SUN)
+            lambert = solve_lambert_izzo(r1=self.sim_ship.position, r2=target_position,
+                                         time_of_flight=remaining, mu=MU_SUN)
         except LambertNoConvergence:
             return
         correction: Vec3 = lambert.v1 - self.sim_ship.velocity
@@ -258,6 +391,26 @@ class SolaraSession:
                          initial_position=position, initial_velocity=velocity,
                          flight_plan=plan, max_integration_dt=MISSION_SHIP_MAX_DT)
 
+    def _indexed_transfer(self,
+                          origin: str,
+                          target: str,
+                          within: float) -> TransferSolution | None:
+        """
+        The cheapest window departing within `within` seconds from the
+        precomputed launch-window index, polished; None when there is no
+        index, it lacks the pair, or it has no window in that span (e.g.
+        past the dates it was swept over) -- the caller then searches a
+        porkchop grid.
+        """
+        if self.launch_windows is None or (origin, target) not in self.launch_windows:
+            return None
+        try:
+            return self.planner.plan_from_index(self.launch_windows, self.ephemeris.epoch_jd,
+                                                origin, target, after=self.sim_time_s,
+                                                within=within)
+        except LambertNoConvergence:
+            return None
+
     def fly_to(self, target: str) -> dict[str, Any]:
         """Plan the cheapest transfer to `target` and launch the mission."""
         if target == self.home_body or target not in self.bodies:
@@ -266,10 +419,13 @@ class SolaraSession:
         try:
             departures, flights = self.planner.transfer_grid(origin, target, self.sim_time_s,
                                                               self.bodies)
-            solution = self.planner.plan_transfer(origin=origin, target=target,
-                                                  departure_times=departures,
-                                                  flight_times=flights,
-                                                  objective=Objective.MIN_DELTA_V)
+            solution = self._indexed_transfer(origin, target, departures[-1] - departures[0])
+            if solution is None:
+                solution = self.planner.plan_transfer(origin=origin, target=target,
+                                                      departure_times=departures,
+                                                      flight_times=flights,
+                                                      objective=Objective.MIN_DELTA_V,
+                                                      refine=DEFAULT_REFINE_BASINS)
         except LambertNoConvergence:
             return {"status": "no_window", "message": f"no {origin}->{target} window found"}
 
@@ -293,6 +449,7 @@ class SolaraSession:
         self.parked = False
 
         self.trail = TrailPath(min_separation_km=INTERPLANETARY_TRAIL_KM, max_points=4000)
+        self.owed_s = 0.0
         self.trail.add(self.sim_ship.position)
 
         self.mission_active = True
@@ -323,7 +480,8 @@ class SolaraSession:
         return Spaceship(structure_mass=mission.structure_mass, payload_mass=0.0,
                          main_propulsion=PropulsionSystem(),
                          initial_position=mission.position, initial_velocity=mission.velocity,
-                         flight_plan=FlightPlan(), max_integration_dt=DEFAULT_DT_MAX)
+                         flight_plan=FlightPlan(), integrator=DormandPrince54(),
+                         max_integration_dt=DEFAULT_DT_MAX)
 
     def load_mission(self, name: str) -> dict[str, Any]:
         if name == MOON_TRIP_NAME:
@@ -345,6 +503,7 @@ class SolaraSession:
         self.mission_departure_time = self.sim_time_s
 
         self.trail = TrailPath(min_separation_km=INTERPLANETARY_TRAIL_KM, max_points=4000)
+        self.owed_s = 0.0
         self.trail.add(self.sim_ship.position)
 
         if mission.follow in self.bodies:
@@ -384,6 +543,7 @@ class SolaraSession:
         self.time_step_index = 5   # "1 hour": responsive at this scale
 
         self.trail = TrailPath(min_separation_km=MOON_TRAIL_KM, max_points=4000)
+        self.owed_s = 0.0
         self.trail.add(self.sim_ship.position)
 
         self.follow_target = "Earth"
@@ -415,12 +575,16 @@ class SolaraSession:
 
     def set_play(self, playing: bool) -> None:
         self.auto_play = playing
+        if not playing:
+            self.owed_s = 0.0
 
     def reverse(self) -> None:
         self.play_direction *= -1.0
+        self.owed_s = 0.0
 
     def set_time_step(self, index: int) -> None:
         self.time_step_index = max(0, min(index, len(simulation_steps) - 1))
+        self.owed_s = 0.0
 
     def set_follow(self, target: str) -> None:
         if target in self.bodies or target == "Ship":
@@ -440,6 +604,7 @@ class SolaraSession:
         self.moon_state = None
         self.mission_label = ""
         self.trail = TrailPath(min_separation_km=INTERPLANETARY_TRAIL_KM, max_points=4000)
+        self.owed_s = 0.0
         self.follow_target = body
         return True
 
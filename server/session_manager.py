@@ -1,60 +1,151 @@
-"""In-memory session registry -- single-process, no persistence.
+"""Session registry: the sessions this worker serves, as live objects, plus
+a pluggable `SessionStore` (server.session_store) behind them.
 
-A personal, single-user VPS deployment doesn't need cross-process session
-sharing; if that ever changes, this is the seam where a Redis-backed
-registry would replace the plain dict.
+With the default `MemorySessionStore` this is the whole registry --
+single-process, no persistence. With a shared store (`SqliteSessionStore`,
+SESSION_STORE in server.main) several uvicorn workers share their
+sessions: a new session is saved there and left for whichever worker its
+id routes to, a worker that doesn't hold a session loads it from the
+store on first use, and a session is saved again after each mission
+command, when its socket closes, and at shutdown.
+
+Memory only holds the sessions in use. One left idle, or the least
+recently seen once MAX_SESSIONS are live, is hibernated: saved to the
+store and dropped from memory, to be loaded again by the next
+`get_session` for it. The store keeps it for much longer
+(STORED_SESSION_TTL_S) and holds many more (MAX_STORED_SESSIONS). With
+the memory store there is nowhere to hibernate to, so such a session is
+dropped.
 """
 
 from __future__ import annotations
 
+import asyncio
 import time
 from typing import Any
 
+from core.body_snapshots import BodySnapshots
+from core.launch_windows import LaunchWindowIndex
+from core.state_cache import StateCache
+from core.transfer_cache import TransferCache
+from server import clock, simulation_pool
 from server.session import SolaraSession
+from server.session_store import MemorySessionStore, SessionStore, dump_session, load_session
 
 # A dropped WebSocket (a network blip, a backgrounded tab) is common and
-# should NOT destroy the session -- the frontend reconnects to the same
-# session_id, and any REST call in flight when the socket dropped must still
-# find it. Sessions are instead reaped lazily, on the next create_session
-# call, once they've been unseen for MAX_IDLE_SECONDS (no client ever comes
-# back to them). A single-process personal deployment doesn't need a real
-# background sweep task for this.
+# should NOT take the session out of memory -- the frontend reconnects to
+# the same session_id, and any REST call in flight when the socket dropped
+# must still find it. Sessions are instead hibernated lazily, whenever one
+# is admitted to memory, once they've been unseen for MAX_IDLE_SECONDS. A
+# single-process personal deployment doesn't need a real background sweep
+# task for this.
 MAX_IDLE_SECONDS: float = 30.0 * 60.0
 
 # A public URL can be hit with a burst of POST /api/session calls faster than
 # MAX_IDLE_SECONDS ever elapses, so the lazy idle sweep alone can't bound
-# memory. Once at the cap, the oldest session (by last-seen) is evicted to
-# make room -- simpler than rejecting with 429 for a single-user deployment.
+# memory. Once at the cap, the least recently seen session that no socket
+# is streaming is hibernated to make room -- simpler than rejecting with
+# 429 for a single-user deployment.
 MAX_SESSIONS: int = 50
 
+# How long a hibernated session is kept for a user to come back to, and
+# how many the store holds at most (the least recently seen go first).
+# A parked session takes about 2 kB, one with a long flight tens of kB.
+STORED_SESSION_TTL_S: float = 30.0 * 86400.0
+MAX_STORED_SESSIONS: int = 100_000
+
+# How stale a shared store's last-seen time may get before `touch` writes
+# it (sockets touch on every push).
+STORE_TOUCH_INTERVAL_S: float = 60.0
+
+# How often a worker sweeps the shared store for expired sessions. The
+# sweep scans the whole table, so it runs at most this often rather than
+# on every POST /api/session; the store can overshoot MAX_STORED_SESSIONS
+# by the sessions created in between until the next sweep.
+STORE_EXPIRE_INTERVAL_S: float = 600.0
+
 _sessions: dict[str, SolaraSession] = {}
 _last_seen: dict[str, float] = {}
 _kernel: Any = None
 _epoch_jd: float = 0.0
+# One ephemeris state cache for the whole process: every session (and the
+# orbit_lines endpoint) reads through it, so users looking at the same
+# instant only pay for the kernel evaluation once.
+_state_cache: StateCache = StateCache()
+# Likewise one transfer/Lambert memo for the whole process, so concurrent
+# users planning the same window pay for the search once.
+_transfer_cache: TransferCache = TransferCache()
+# And one registry of body snapshots: sessions at the same instant share
+# its body states and their encoded wire payloads.
+_body_snapshots: BodySnapshots = BodySnapshots()
+_store: SessionStore = MemorySessionStore()
+# Wall-clock time each session's last-seen was last written to `_store`.
+_stored_seen: dict[str, float] = {}
+# Wall-clock time this worker last swept `_store` (see _expire_stored).
+_last_expired: float = 0.0
+# Sessions being saved on their way out of memory (see _hibernate).
+_hibernating: set[str] = set()
+# The precomputed launch-window index (scripts/build_launch_windows.py),
+# when one was found at startup; read-only and shared like the kernel.
+_launch_windows: LaunchWindowIndex | None = None
 
 
-def configure(kernel: Any, epoch_jd: float) -> None:
-    global _kernel, _epoch_jd
+def configure(kernel: Any,
+              epoch_jd: float,
+              state_cache: StateCache | None = None,
+              launch_windows: LaunchWindowIndex | None = None,
+              transfer_cache: TransferCache | None = None,
+              body_snapshots: BodySnapshots | None = None,
+              store: SessionStore | None = None) -> None:
+    global _kernel, _epoch_jd, _state_cache, _launch_windows, _transfer_cache, _body_snapshots
+    global _store
     _kernel = kernel
     _epoch_jd = epoch_jd
+    if state_cache is not None:
+        _state_cache = state_cache
+    if transfer_cache is not None:
+        _transfer_cache = transfer_cache
+    if body_snapshots is not None:
+        _body_snapshots = body_snapshots
+    if store is not None:
+        _store = store
+    _launch_windows = launch_windows
 
 
 def create_session() -> SolaraSession:
-    _sweep_idle()
-    if len(_sessions) >= MAX_SESSIONS:
-        oldest_id = min(_last_seen, key=lambda sid: _last_seen[sid])
-        drop_session(oldest_id)
     # SolaraSession loads its own "now" at construction time -- _epoch_jd
     # here is only the fixed startup reference used for the shared,
     # cached orbit_lines (see static_data.orbit_lines).
-    session = SolaraSession(kernel=_kernel)
-    _sessions[session.session_id] = session
-    _last_seen[session.session_id] = time.monotonic()
+    session = SolaraSession(kernel=_kernel, **_shared())
+    if _store.shared:
+        # The worker its id routes to may be another one: hand the session
+        # over through the store instead of keeping a copy here.
+        _expire_stored()
+        _save(session)
+        return session
+    for session_id in _admit(session):
+        _forget(session_id)   # nowhere to hibernate to
     return session
 
 
-def get_session(session_id: str) -> SolaraSession | None:
-    return _sessions.get(session_id)
+async def get_session(session_id: str) -> SolaraSession | None:
+    """
+    The live session, loaded from a shared store if this worker doesn't
+    hold it. The load, and saving whatever it pushes out of memory, run
+    off the event loop: they wait on SQLite and on other sessions' locks.
+    """
+    session: SolaraSession | None = _sessions.get(session_id)
+    if session is not None or not _store.shared:
+        return session
+    session = await asyncio.to_thread(_load, session_id)
+    if session is None:
+        return None
+    live: SolaraSession | None = _sessions.get(session_id)
+    if live is not None:
+        return live   # a concurrent request loaded it first
+    leaving: list[str] = _admit(session)
+    await asyncio.gather(*(_hibernate(leaving_id) for leaving_id in leaving))
+    return session
 
 
 def touch(session_id: str) -> None:
@@ -62,6 +153,26 @@ def touch(session_id: str) -> None:
     REST command), so it survives disconnects but not true abandonment."""
     if session_id in _sessions:
         _last_seen[session_id] = time.monotonic()
+        if _store.shared:
+            now: float = time.time()
+            if now - _stored_seen.get(session_id, 0.0) > STORE_TOUCH_INTERVAL_S:
+                _store.touch(session_id, now)
+                _stored_seen[session_id] = now
+
+
+async def checkpoint(session: SolaraSession) -> None:
+    """Save the session to a shared store (on the pool, under its lock)."""
+    if _store.shared and session.session_id in _sessions:
+        await simulation_pool.run(session, _save, session)
+
+
+def save_all() -> None:
+    """Save every session this worker holds to a shared store (at shutdown)."""
+    if not _store.shared:
+        return
+    for session in list(_sessions.values()):
+        with session.lock:
+            _save(session)
 
 
 def shared_kernel() -> Any:
@@ -72,13 +183,99 @@ def shared_epoch_jd() -> float:
     return _epoch_jd
 
 
-def drop_session(session_id: str) -> None:
+def shared_state_cache() -> StateCache:
+    return _state_cache
+
+
+def stats() -> dict[str, Any]:
+    """Process-level counters for GET /api/stats."""
+    return {
+        "sessions": len(_sessions),
+        "running_clocks": clock.running(),
+        "state_cache": _state_cache.stats(),
+        "transfer_cache": _transfer_cache.stats(),
+        "body_snapshots": _body_snapshots.stats(),
+        "scheduler": simulation_pool.usage(),
+        "store": _store.stats(),
+    }
+
+
+async def drop_session(session_id: str) -> None:
+    _forget(session_id)
+    await asyncio.to_thread(_store.delete, session_id)
+
+
+def _forget(session_id: str) -> None:
+    """Drop this worker's copy of a session (the store keeps its own)."""
     _sessions.pop(session_id, None)
     _last_seen.pop(session_id, None)
+    _stored_seen.pop(session_id, None)
+    _hibernating.discard(session_id)
+    simulation_pool.forget(session_id)
+
+
+def _shared() -> dict[str, Any]:
+    """What SolaraSession.attach takes besides the kernel."""
+    return {"state_cache": _state_cache, "launch_windows": _launch_windows,
+            "transfer_cache": _transfer_cache, "body_snapshots": _body_snapshots}
+
+
+def _admit(session: SolaraSession) -> list[str]:
+    """
+    Put `session` in memory. Returns the sessions to hibernate to make
+    room -- idle ones, and the least recently seen one at the cap -- which
+    stay in memory, marked in `_hibernating`, until they are saved.
+    """
+    now: float = time.monotonic()
+    leaving: list[str] = [sid for sid, seen in _last_seen.items()
+                          if now - seen > MAX_IDLE_SECONDS and sid not in _hibernating]
+    _hibernating.update(leaving)
+    if len(_sessions) - len(_hibernating) >= MAX_SESSIONS:
+        # A streamed session is advancing on its socket's clock: taken out
+        # of memory, the copy the socket holds would carry on without us.
+        staying = [sid for sid in _last_seen if sid not in _hibernating]
+        quiet = [sid for sid in staying if not clock.attached(sid)] or staying
+        oldest_id: str = min(quiet, key=lambda sid: _last_seen[sid])
+        _hibernating.add(oldest_id)
+        leaving.append(oldest_id)
+    _sessions[session.session_id] = session
+    _last_seen[session.session_id] = now
+    return leaving
+
+
+async def _hibernate(session_id: str) -> None:
+    """Save a session to the shared store (on the pool, under its lock),
+    then take it out of memory unless it was used again meanwhile."""
+    session: SolaraSession | None = _sessions.get(session_id)
+    if session is None:   # dropped meanwhile
+        _hibernating.discard(session_id)
+        return
+    seen: float | None = _last_seen.get(session_id)
+    try:
+        await simulation_pool.run(session, _save, session)
+    finally:
+        _hibernating.discard(session_id)
+    if _last_seen.get(session_id) == seen and not clock.attached(session_id):
+        _forget(session_id)
+
+
+def _expire_stored() -> None:
+    """Sweep expired sessions from the shared store, at most once every
+    STORE_EXPIRE_INTERVAL_S."""
+    global _last_expired
+    now: float = time.time()
+    if now - _last_expired < STORE_EXPIRE_INTERVAL_S:
+        return
+    _last_expired = now
+    _store.expire(now - STORED_SESSION_TTL_S, MAX_STORED_SESSIONS)
+
+
+def _load(session_id: str) -> SolaraSession | None:
+    state: bytes | None = _store.load(session_id)
+    return None if state is None else load_session(state, kernel=_kernel, **_shared())
 
 
-def _sweep_idle() -> None:
-    now = time.monotonic()
-    stale = [sid for sid, seen in _last_seen.items() if now - seen > MAX_IDLE_SECONDS]
-    for sid in stale:
-        drop_session(sid)
+def _save(session: SolaraSession) -> None:
+    now: float = time.time()
+    _store.save(session.session_id, dump_session(session), now)
+    _stored_seen[session.session_id] = now
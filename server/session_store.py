@@ -0,0 +1,175 @@
+"""Where sessions are kept beyond the worker process serving them.
+
+Every worker holds the sessions it is serving as live objects
+(session_manager's `_sessions`). A `SessionStore` decides what else there
+is:
+
+* `MemorySessionStore` -- nothing: the worker's memory is the registry,
+  as for a single uvicorn worker. Sessions die with the process.
+* `SqliteSessionStore` -- a SQLite file every worker on the host opens.
+  Sessions are saved there as compressed pickles (`dump_session`; the
+  shared kernel and caches are left out and re-attached on load), so a
+  session created by one worker, or served by one that restarted, can
+  be picked up by another -- and one hibernated for being idle
+  (session_manager) is picked up again when its user comes back.
+
+Several workers need sticky routing by session_id on top (the Nginx
+upstream in deploy/nginx/solarasim.conf hashes it): a store hands a
+session over between workers, but two workers must never serve the same
+one at once, as each would advance its own copy.
+"""
+
+from __future__ import annotations
+
+import pickle
+import sqlite3
+import threading
+import zlib
+from pathlib import Path
+from typing import Any, Protocol
+
+from server.session import SolaraSession
+
+# zlib level for saved sessions: most of a pickle is float triples (trail,
+# ship history), which the fastest level already shrinks well.
+COMPRESSION_LEVEL: int = 1
+
+
+def dump_session(session: SolaraSession) -> bytes:
+    """The session's own state as compact bytes (call holding its lock)."""
+    return zlib.compress(pickle.dumps(session, protocol=pickle.HIGHEST_PROTOCOL),
+                         COMPRESSION_LEVEL)
+
+
+def load_session(state: bytes, **shared: Any) -> SolaraSession:
+    """Rebuild a `dump_session` result and attach it (see SolaraSession.attach)."""
+    session: SolaraSession = pickle.loads(zlib.decompress(state))
+    session.attach(**shared)
+    return session
+
+
+class SessionStore(Protocol):
+    """Saved sessions by id, with the wall-clock time each was last seen."""
+
+    # Whether sessions saved here outlive this worker's memory: other
+    # workers see them, and so does this one after hibernating a session
+    # or restarting.
+    shared: bool
+
+    def save(self, session_id: str, state: bytes, last_seen: float) -> None: ...
+
+    def load(self, session_id: str) -> bytes | None: ...
+
+    def touch(self, session_id: str, last_seen: float) -> None: ...
+
+    def delete(self, session_id: str) -> None: ...
+
+    def expire(self, seen_before: float, keep: int) -> list[str]:
+        """Delete sessions last seen before `seen_before`, then the least
+        recently seen beyond `keep`; returns the ids deleted."""
+        ...
+
+    def stats(self) -> dict[str, Any]: ...
+
+
+class MemorySessionStore:
+    """The single-process registry: nothing is kept outside the worker."""
+
+    shared: bool = False
+
+    def save(self, session_id: str, state: bytes, last_seen: float) -> None:
+        pass
+
+    def load(self, session_id: str) -> bytes | None:
+        return None
+
+    def touch(self, session_id: str, last_seen: float) -> None:
+        pass
+
+    def delete(self, session_id: str) -> None:
+        pass
+
+    def expire(self, seen_before: float, keep: int) -> list[str]:
+        return []
+
+    def stats(self) -> dict[str, Any]:
+        return {"backend": "memory"}
+
+
+class SqliteSessionStore:
+    """
+    Sessions in one SQLite file, shared by every worker on the host.
+
+    Write-ahead logging lets readers proceed while a worker writes, and
+    each thread gets its own connection (sqlite3 connections are not
+    shared across threads); concurrent writers wait up to `timeout_s`
+    for the file lock.
+    """
+
+    shared: bool = True
+
+    def __init__(self, path: str, timeout_s: float = 30.0) -> None:
+        self.path: str = path
+        self.timeout_s: float = timeout_s
+        self._local: threading.local = threading.local()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        db = self._db()
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("CREATE TABLE IF NOT EXISTS sessions ("
+                   "id TEXT PRIMARY KEY, last_seen REAL NOT NULL, state BLOB NOT NULL)")
+        db.execute("CREATE INDEX IF NOT EXISTS sessions_last_seen ON sessions (last_seen)")
+
+    def _db(self) -> sqlite3.Connection:
+        db: sqlite3.Connection | None = getattr(self._local, "db", None)
+        if db is None:
+            # Autocommit: every statement below is a transaction of its own.
+            db = sqlite3.connect(self.path, timeout=self.timeout_s, isolation_level=None)
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def save(self, session_id: str, state: bytes, last_seen: float) -> None:
+        self._db().execute(
+            "INSERT INTO sessions (id, last_seen, state) VALUES (?, ?, ?) "
+            "ON CONFLICT (id) DO UPDATE SET last_seen = excluded.last_seen, "
+            "state = excluded.state",
+            (session_id, last_seen, state))
+
+    def load(self, session_id: str) -> bytes | None:
+        row = self._db().execute("SELECT state FROM sessions WHERE id = ?",
+                                 (session_id,)).fetchone()
+        return None if row is None else bytes(row[0])
+
+    def touch(self, session_id: str, last_seen: float) -> None:
+        self._db().execute("UPDATE sessions SET last_seen = MAX(last_seen, ?) WHERE id = ?",
+                           (last_seen, session_id))
+
+    def delete(self, session_id: str) -> None:
+        self._db().execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+    def expire(self, seen_before: float, keep: int) -> list[str]:
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            stale: list[str] = [row[0] for row in db.execute(
+                "SELECT id FROM sessions WHERE last_seen < ? UNION "
+                "SELECT id FROM (SELECT id FROM sessions ORDER BY last_seen DESC "
+                "LIMIT -1 OFFSET ?)", (seen_before, keep))]
+            db.executemany("DELETE FROM sessions WHERE id = ?", [(sid,) for sid in stale])
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return stale
+
+    def stats(self) -> dict[str, Any]:
+        count, size = self._db().execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(state)), 0) FROM sessions").fetchone()
+        return {"backend": "sqlite", "stored": count, "stored_bytes": size}
+
+    def close(self) -> None:
+        """Close this thread's connection (others close with their threads)."""
+        db: sqlite3.Connection | None = getattr(self._local, "db", None)
+        if db is not None:
+            db.close()
+            self._local.db = None
@@ -0,0 +1,97 @@
+"""Bounded worker pool for simulation work, off uvicorn's event loop.
+
+A FLY_TO mission or historical replay can integrate thousands of sub-steps
+inside one tick, and a fly_to request runs a whole transfer search; done
+inline in an async handler, either would stall every other user's socket
+and REST call until it finished. Everything that advances or mutates a
+session is instead handed to this pool, and run under that session's
+`lock`, so a session never advances concurrently with itself (a tick
+and a fly_to from another tab, say) while different sessions proceed side
+by side.
+
+Threads rather than processes: sessions hold the shared kernel, caches and
+live mutable state, none of which should be copied per call. The GIL is
+released every few milliseconds, so even a CPU-bound tick leaves the event
+loop free to keep the other sockets moving.
+
+The threads belong to a `FairShareScheduler` (server.scheduler), which
+meters each session's CPU time against a budget and serves sessions in
+weighted round robin; `run_with_budget` hands a job its remaining budget
+so a tick can be served partially.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+from server.scheduler import DEFAULT_CPU_BUDGET_S, DEFAULT_WINDOW_S, FairShareScheduler, JobBudget
+
+T = TypeVar("T")
+
+# Not tied to the core count: the threads buy latency (a long tick no longer
+# queues every other session behind it), not parallel CPU.
+DEFAULT_SIMULATION_WORKERS: int = 4
+
+_scheduler: FairShareScheduler | None = None
+_workers: int = DEFAULT_SIMULATION_WORKERS
+_cpu_budget_s: float = DEFAULT_CPU_BUDGET_S
+_window_s: float = DEFAULT_WINDOW_S
+
+
+def configure(workers: int = DEFAULT_SIMULATION_WORKERS,
+              cpu_budget_s: float = DEFAULT_CPU_BUDGET_S,
+              window_s: float = DEFAULT_WINDOW_S) -> None:
+    """Size the pool and the per-session CPU budget (replaces any running pool)."""
+    global _workers, _cpu_budget_s, _window_s
+    if workers < 1:
+        raise ValueError("workers must be at least 1.")
+    shutdown()
+    _workers, _cpu_budget_s, _window_s = workers, cpu_budget_s, window_s
+
+
+def shutdown() -> None:
+    global _scheduler
+    if _scheduler is not None:
+        _scheduler.shutdown()
+        _scheduler = None
+
+
+def workers() -> int:
+    return _workers
+
+
+def usage() -> dict[str, dict[str, Any]]:
+    """Per-session CPU budget use (see FairShareScheduler.usage)."""
+    return _scheduler.usage() if _scheduler is not None else {}
+
+
+def forget(session_id: str) -> None:
+    if _scheduler is not None:
+        _scheduler.forget(session_id)
+
+
+async def run(session: Any, job: Callable[..., T], *args: Any) -> T:
+    """Run `job(*args)` on the pool while holding `session.lock`."""
+    return await run_with_budget(session, _unbudgeted, job, *args)
+
+
+async def run_with_budget(session: Any, job: Callable[..., T], *args: Any) -> T:
+    """Run `job(budget, *args)` on the pool while holding `session.lock`."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = FairShareScheduler(workers=_workers, cpu_budget_s=_cpu_budget_s,
+                                        window_s=_window_s)
+    future = _scheduler.submit(session.session_id, _run_locked, session, job, args)
+    return await asyncio.wrap_future(future)
+
+
+def _unbudgeted(budget: JobBudget, job: Callable[..., T], *args: Any) -> T:
+    return job(*args)
+
+
+def _run_locked(budget: JobBudget, session: Any, job: Callable[..., T],
+                args: tuple[Any, ...]) -> T:
+    with session.lock:
+        return job(budget, *args)
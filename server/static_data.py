@@ -15,6 +15,8 @@ from math import pi
 from pathlib import Path
 from typing import Any
 
+import numpy as np
+
 from config import ORBIT_SAMPLES
 
 _DATA_DIR: Path = Path(__file__).parent.parent / "data"
@@ -60,8 +62,9 @@ def _body_entry(name: str, props: dict[str, Any], is_star: bool) -> dict[str, An
     }
 
 
-@lru_cache(maxsize=1)
-def orbit_lines(kernel: Any, epoch_jd: float) -> dict[str, list[list[float]]]:
+@lru_cache(maxsize=2)
+def orbit_lines(kernel: Any, epoch_jd: float, state_cache: Any = None,
+                approximate: bool = False) -> dict[str, list[list[float]]]:
     """
     One faint line per body that orbits the Sun directly, sampled over one
     orbital period -- mirrors app.py's _draw_orbit_lines(). Stateless: takes
@@ -71,24 +74,28 @@ def orbit_lines(kernel: Any, epoch_jd: float) -> dict[str, list[list[float]]]:
     kernel and epoch_jd are both fixed for the process lifetime (set once in
     server.main at startup), so the result is identical on every call --
     cached so a public, unauthenticated GET doesn't rebuild the ephemeris and
-    resample every body on every request.
+    resample every body on every request. `state_cache` is the process-wide
+    ephemeris cache the sessions share; the orbit sampling itself is one
+    vectorized `states` query per body, which bypasses it. `approximate`
+    samples the analytic KeplerianEphemeris instead of the kernel -- lines
+    a few pixels wide don't need DE440's precision.
     """
     from core.bodies import load_bodies_from_json
     from core.ephemeris import JplEphemeris
+    from core.keplerian_ephemeris import KeplerianEphemeris
 
     bodies = load_bodies_from_json()
-    ephemeris = JplEphemeris.from_bodies(kernel=kernel, bodies=bodies, epoch_jd=epoch_jd)
+    ephemeris: Any = (KeplerianEphemeris(epoch_jd=epoch_jd) if approximate
+                      else JplEphemeris.from_bodies(kernel=kernel, bodies=bodies,
+                                                    epoch_jd=epoch_jd, cache=state_cache))
     lines: dict[str, list[list[float]]] = {}
     for name, body in bodies.items():
         if body.parent_body != "Sun" or body.orbital_period <= 0:
             continue
         period_s: float = body.orbital_period * 86400.0
-        points: list[list[float]] = []
-        for i in range(ORBIT_SAMPLES + 1):
-            t = period_s * i / ORBIT_SAMPLES
-            position, _ = ephemeris.state(name, t)
-            points.append([position.x, position.y, position.z])
-        lines[name] = points
+        times = np.linspace(0.0, period_s, ORBIT_SAMPLES + 1)
+        positions, _ = ephemeris.states([name], times)
+        lines[name] = positions[0].tolist()
     return lines
 
 
@@ -1,76 +1,218 @@
-"""WebSocket route: per-tick advance + control messages (see plan section on
+"""WebSocket route: state pushes + control messages (see plan section on
 the REST/WebSocket split -- anything tied to the render loop's cadence lives
-here rather than as a REST round trip)."""
+here rather than as a REST round trip). The session advances on its own
+server-side clock (server.clock); a socket only steers it and pushes
+states at the rate its client asked for. The simulation itself runs on
+server.simulation_pool, never on the event loop."""
 
 from __future__ import annotations
+import asyncio
 import time
 from typing import Any
 from fastapi import WebSocket, WebSocketDisconnect
 from core.vec3 import Vec3
-from server import session_manager
-from server.serialization import state_message
+from server import clock as session_clock
+from server import session_manager, simulation_pool
+from server.clock import SessionClock
+from server.scheduler import JobBudget, advance_within
+from server.serialization import BINARY_SUBPROTOCOL, StateEncoder
 from server.session import SolaraSession
 
-# Ceiling on how often a single connection's `tick` messages are acted on.
-# Set well above any real display's refresh rate (240 Hz covers high-refresh
-# monitors), so it never slows a legitimate client -- it exists only to bound
-# the work a flooding client can force. Each processed tick can run a full
-# mission integration step, and a hostile client can send ticks in a tight
-# loop rather than once per animation frame, so without this cap one socket
-# could drive unbounded CPU.
-MAX_TICKS_PER_SECOND: float = 240.0
-MIN_TICK_INTERVAL_S: float = 1.0 / MAX_TICKS_PER_SECOND
+# State pushes per second, until the client sends `set_push_rate` (one per
+# frame of a 60 Hz display; a hidden tab asks for far fewer). The bounds
+# keep a client from having the server encode for it at an unbounded rate.
+DEFAULT_PUSH_HZ: float = 60.0
+MIN_PUSH_HZ: float = 0.5
+MAX_PUSH_HZ: float = 120.0
+# Seconds between pushes while nothing can change on its own: the session
+# is paused, owes no time, and the last push was a bare heartbeat. Controls
+# and changes made elsewhere (SocketInbox.nudge) still push at once, so
+# this only stops an idle tab costing what a playing one does.
+QUIET_PUSH_INTERVAL_S: float = 1.0
+
+
+# Control messages a socket may have waiting for its session's worker;
+# past this, a client flooding step/set_play/... messages has the excess
+# dropped.
+MAX_PENDING_MESSAGES: int = 64
+
+
+class SocketInbox:
+    """
+    Messages received on one socket and not yet run on its session, in
+    order. While the session is busy (a long step, a fly_to) they wait
+    here and run together as one batch.
+    """
+
+    def __init__(self, max_pending: int = MAX_PENDING_MESSAGES) -> None:
+        self.max_pending: int = max_pending
+        self.dropped: int = 0
+        self._messages: list[dict[str, Any]] = []
+        self._nudged: bool = False
+        self._ready: asyncio.Event = asyncio.Event()
+
+    def put(self, message: dict[str, Any]) -> None:
+        if len(self._messages) >= self.max_pending:
+            self.dropped += 1
+            return
+        self._messages.append(message)
+        self._ready.set()
+
+    def nudge(self) -> None:
+        """The session changed outside this socket: push without a message."""
+        self._nudged = True
+        self._ready.set()
+
+    def nudged(self) -> bool:
+        """Whether `nudge` was called since this was last asked."""
+        nudged, self._nudged = self._nudged, False
+        return nudged
+
+    async def take(self, timeout: float | None = None) -> list[dict[str, Any]]:
+        """Wait for messages (at most `timeout` seconds, when given), then
+        hand over (and forget) all of them."""
+        if timeout is None:
+            await self._ready.wait()
+        elif timeout > 0.0:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except TimeoutError:
+                pass
+        self._ready.clear()
+        messages, self._messages = self._messages, []
+        return messages
+
+
+def push_interval_s(message: dict[str, Any]) -> float:
+    """Seconds between pushes asked for by a `set_push_rate` message."""
+    hz: float = float(message.get("hz", DEFAULT_PUSH_HZ))
+    return 1.0 / max(MIN_PUSH_HZ, min(hz, MAX_PUSH_HZ))
+
+
+class _TrailCursor:
+    """How much of the session's trail this socket has already sent, and
+    the rest of what it has sent (see serialization.StateEncoder)."""
+
+    def __init__(self, binary: bool = False) -> None:
+        self.sent: int = 0
+        self.encoder: StateEncoder = StateEncoder(binary=binary)
 
 
 async def session_socket(websocket: WebSocket,
                          session_id: str) -> None:
-    await websocket.accept()
-    session: SolaraSession | None = session_manager.get_session(session_id)
+    # A client that offers BINARY_SUBPROTOCOL gets packed state frames
+    # (server.serialization); anyone else gets JSON.
+    binary: bool = BINARY_SUBPROTOCOL in websocket.scope.get("subprotocols", [])
+    await websocket.accept(subprotocol=BINARY_SUBPROTOCOL if binary else None)
+    session: SolaraSession | None = await session_manager.get_session(session_id)
     if session is None:
         await websocket.close(code=4404,
                               reason="unknown session")
         return
-    last_trail_len = 0
-    last_tick_at: float = 0.0
+    inbox = SocketInbox()
+    clock: SessionClock = session_clock.attach(session, inbox.nudge)
+    # Receiving and pushing run side by side: this coroutine keeps draining
+    # the socket while the pump waits on the simulation pool, so a busy
+    # session backs messages up into the inbox instead of an ever-growing
+    # socket buffer.
+    pump: asyncio.Task[None] = asyncio.create_task(_pump(websocket, session, inbox, clock, binary))
     try:
         while True:
             message: dict[str, Any] = await websocket.receive_json()
+            if pump.done():
+                pump.result()   # re-raise whatever stopped it
+                return
             session_manager.touch(session_id)
-            # Over-rate ticks are dropped without advancing or replying. The
-            # client reads the latest state asynchronously and never blocks on
-            # a per-tick reply (see web/src/main.ts renderLoop), so silently
-            # skipping one is safe; only `tick` is throttled, so control
-            # messages (step/set_play/...) always take effect immediately.
+            # The clock advances the session now; a per-frame `tick` from
+            # an older client would only force extra pushes.
             if message.get("type") == "tick":
-                now: float = time.monotonic()
-                if now - last_tick_at < MIN_TICK_INTERVAL_S:
-                    continue
-                last_tick_at = now
-            _dispatch(session, message)
-            points: list[Vec3] = session.trail.points
-            # A mission/home change replaces `trail` with a fresh TrailPath
-            # (see session.py's set_home/_launch_mission/load_mission), which
-            # this detects as a shrink -- the client must clear its retained
-            # buffer and re-seed it with the full (usually tiny) new one,
-            # rather than appending on top of stale points from the old flight.
-            reset: bool = len(points) < last_trail_len
-            trail_append: list[Vec3] = points if reset else points[last_trail_len:]
-            last_trail_len: int = len(points)
-            await websocket.send_json(data=state_message(session, trail_append,
-                                                         trail_reset=reset))
+                continue
+            inbox.put(message)
     except WebSocketDisconnect:
         pass   # the session survives -- see session_manager's idle sweep
+    finally:
+        pump.cancel()
+        session_clock.detach(session, inbox.nudge)
+    # The client may reconnect to another worker (session_manager).
+    await session_manager.checkpoint(session)
+
+
+async def _pump(websocket: WebSocket,
+                session: SolaraSession,
+                inbox: SocketInbox,
+                clock: SessionClock,
+                binary: bool) -> None:
+    """Push a state every push interval (every QUIET_PUSH_INTERVAL_S while
+    the session is quiet), and straight after control messages or a nudge
+    so they show without waiting for the next one."""
+    cursor = _TrailCursor(binary)
+    interval_s: float = 1.0 / DEFAULT_PUSH_HZ
+    next_push: float = time.monotonic()
+    while True:
+        messages: list[dict[str, Any]] = await inbox.take(timeout=next_push - time.monotonic())
+        controls: list[dict[str, Any]] = []
+        for message in messages:
+            if message.get("type") == "set_push_rate":
+                interval_s = push_interval_s(message)
+            else:
+                controls.append(message)
+        nudged: bool = inbox.nudged()
+        now: float = time.monotonic()
+        if now >= next_push:
+            next_push += interval_s
+            if next_push <= now:
+                next_push = now + interval_s   # fell behind: no burst to catch up
+        elif not controls and not nudged:
+            continue
+        clock.check()
+        state: dict[str, Any] | bytes = await simulation_pool.run_with_budget(
+            session, _apply, session, controls, cursor)
+        if controls:
+            clock.wake(origin=inbox.nudge)
+        # Read off the lock: at worst one push late either way.
+        quiet: bool = (not controls and not session.auto_play and session.owed_s == 0.0
+                       and not cursor.encoder.changed)
+        next_push = (max(next_push, time.monotonic() + QUIET_PUSH_INTERVAL_S) if quiet
+                     else min(next_push, time.monotonic() + interval_s))
+        if isinstance(state, bytes):
+            await websocket.send_bytes(state)
+        else:
+            await websocket.send_json(data=state)
+        # No client messages arrive while it just watches; being pushed to
+        # is what keeps the session from the idle sweep.
+        session_manager.touch(session.session_id)
+
+
+def _apply(budget: JobBudget,
+           session: Any,
+           messages: list[dict[str, Any]],
+           cursor: _TrailCursor) -> dict[str, Any] | bytes:
+    """Run a batch of messages and build the state push (on the pool, locked)."""
+    for message in messages:
+        _dispatch(session, message, budget)
+    points: list[Vec3] = session.trail.points
+    # A mission/home change replaces `trail` with a fresh TrailPath
+    # (see session.py's set_home/_launch_mission/load_mission), which
+    # this detects as a shrink -- the client must clear its retained
+    # buffer and re-seed it with the full (usually tiny) new one,
+    # rather than appending on top of stale points from the old flight.
+    reset: bool = len(points) < cursor.sent
+    trail_append: list[Vec3] = points if reset else points[cursor.sent:]
+    cursor.sent = len(points)
+    return cursor.encoder.encode(session, trail_append, trail_reset=reset)
 
 
 def _dispatch(session: Any,
-              message: dict[str, Any]) -> None:
+              message: dict[str, Any],
+              budget: JobBudget) -> None:
+    # A step stops at its deadline or where the session's CPU budget runs
+    # out (see server.scheduler); the session owes the rest (see
+    # SolaraSession.advance). set_play/reverse/set_time_step
+    # steer the clock (server.clock) through the session's own fields.
     msg_type: str = message.get("type", "")
-    if msg_type == "tick":
-        if session.auto_play:
-            session.advance(session.time_step_s * session.play_direction)
-    elif msg_type == "step":
+    if msg_type == "step":
         direction: float = float(message.get("direction", 1.0))
-        session.advance(session.time_step_s * direction)
+        advance_within(session, session.time_step_s * direction, budget)
     elif msg_type == "set_play":
         session.set_play(bool(message.get("playing", False)))
     elif msg_type == "reverse":
@@ -0,0 +1,77 @@
+"""Shared body snapshot tests."""
+
+from __future__ import annotations
+
+import gc
+
+import pytest
+
+from core.bodies import load_bodies_from_json
+from core.body_snapshots import BodySnapshot, BodySnapshots
+from core.keplerian_ephemeris import KeplerianEphemeris
+from core.propagator import body_states
+from core.vec3 import Vec3
+
+STATES: dict[str, tuple[Vec3, Vec3]] = {
+    "Sun": (Vec3(), Vec3()),
+    "Earth": (Vec3(1.496e8, 0.0, 0.0), Vec3(0.0, 29.8, 0.0)),
+}
+
+
+class TestRegistry:
+    def test_sessions_at_one_instant_share_a_snapshot(self) -> None:
+        snapshots = BodySnapshots()
+        computed: list[float] = []
+
+        def compute() -> dict[str, tuple[Vec3, Vec3]]:
+            computed.append(1.0)
+            return STATES
+
+        first = snapshots.get(2460000.5, compute)
+        second = snapshots.get(2460000.5, compute)
+        assert first is second
+        assert len(computed) == 1
+        assert snapshots.stats()["hit_rate"] == pytest.approx(0.5)
+        assert snapshots.get(2460001.5, compute) is not first
+
+    def test_snapshots_live_while_held_or_recent(self) -> None:
+        snapshots = BodySnapshots(retain=1)
+        held = snapshots.get("held", lambda: STATES)
+        snapshots.get("recent", lambda: STATES)
+        snapshots.get("dropped", lambda: STATES)   # pushes "recent" out
+        gc.collect()
+        assert len(snapshots) == 2                  # "held" and "dropped"
+        assert snapshots.get("held", lambda: {}) is held
+        del held
+        snapshots.get("other", lambda: STATES)
+        gc.collect()
+        assert len(snapshots) == 1
+
+    def test_negative_retention_is_rejected(self) -> None:
+        with pytest.raises(ValueError):
+            BodySnapshots(retain=-1)
+
+
+class TestSnapshot:
+    def test_states_are_read_only_and_applied_to_bodies(self) -> None:
+        bodies = load_bodies_from_json()
+        snapshot = BodySnapshot(0.0, body_states(KeplerianEphemeris(epoch_jd=2460000.5),
+                                                 bodies, 0.0))
+        with pytest.raises(TypeError):
+            snapshot.states["Earth"] = STATES["Earth"]   # type: ignore[index]
+        snapshot.apply_to(bodies)
+        assert snapshot.names == tuple(bodies)
+        assert bodies["Earth"].position == snapshot.states["Earth"][0]
+        assert bodies["Mars"].velocity == snapshot.states["Mars"][1]
+
+    def test_encodings_are_built_once(self) -> None:
+        snapshot = BodySnapshot(0.0, STATES)
+        builds: list[str] = []
+
+        def build(built: BodySnapshot) -> str:
+            builds.append("x")
+            return ",".join(built.names)
+
+        assert snapshot.encoded("names", build) == "Sun,Earth"
+        assert snapshot.encoded("names", build) == "Sun,Earth"
+        assert builds == ["x"]
@@ -3,9 +3,12 @@ from __future__ import annotations
 from dataclasses import dataclass
 from pathlib import Path
 
+import numpy as np
 import pytest
+from numpy.typing import NDArray
 
 from core.ephemeris import SECONDS_PER_DAY, JplEphemeris
+from core.state_cache import StateCache
 from core.vec3 import Vec3
 
 EPOCH_JD: float = 2460000.5
@@ -20,8 +23,8 @@ class FakeSegment:
     base: tuple[float, float, float]
     rate: tuple[float, float, float]  # km/day
 
-    def compute_and_differentiate(self, tdb: float) -> tuple:
-        dt: float = tdb - EPOCH_JD
+    def compute_and_differentiate(self, tdb: float | NDArray[np.float64]) -> tuple:
+        dt = tdb - EPOCH_JD
         position = tuple(b + r * dt for b, r in zip(self.base, self.rate))
         return position, self.rate
 
@@ -107,6 +110,102 @@ class TestCenterSubtraction:
         assert velocity == Vec3()
 
 
+class TestBatchStates:
+    def test_matches_scalar_state(self, fake_kernel: FakeKernel,
+                                  location_paths: dict[str, list[int]]) -> None:
+        ephemeris = JplEphemeris(kernel=fake_kernel,
+                                 location_paths=location_paths,
+                                 epoch_jd=EPOCH_JD)
+        times = np.array([0.0, 0.5, 3.0]) * SECONDS_PER_DAY
+        positions, velocities = ephemeris.states(["Earth", "Sun"], times)
+        assert positions.shape == velocities.shape == (2, 3, 3)
+        for j, time_s in enumerate(times):
+            position, velocity = ephemeris.state("Earth", time_s=float(time_s))
+            assert positions[0, j] == pytest.approx(position.as_tuple())
+            assert velocities[0, j] == pytest.approx(velocity.as_tuple())
+        # The center stays at rest at the origin, as with `state`.
+        assert not positions[1].any() and not velocities[1].any()
+
+    def test_barycentric(self, fake_kernel: FakeKernel,
+                         location_paths: dict[str, list[int]]) -> None:
+        ephemeris = JplEphemeris(kernel=fake_kernel,
+                                 location_paths=location_paths,
+                                 epoch_jd=EPOCH_JD,
+                                 center=None)
+        positions, velocities = ephemeris.states(["Sun"], [SECONDS_PER_DAY])
+        assert positions[0, 0] == pytest.approx((1001.0, 0.0, 0.0))
+        assert velocities[0, 0, 0] == pytest.approx(1.0 / SECONDS_PER_DAY)
+
+    def test_rejects_multidimensional_times(self, fake_kernel: FakeKernel,
+                                            location_paths: dict[str, list[int]]) -> None:
+        ephemeris = JplEphemeris(kernel=fake_kernel,
+                                 location_paths=location_paths,
+                                 epoch_jd=EPOCH_JD)
+        with pytest.raises(ValueError):
+            ephemeris.states(["Earth"], np.zeros((2, 2)))
+
+
+class TestStatesAt:
+    def test_matches_scalar_state(self, fake_kernel: FakeKernel,
+                                  location_paths: dict[str, list[int]]) -> None:
+        ephemeris = JplEphemeris(kernel=fake_kernel,
+                                 location_paths=location_paths,
+                                 epoch_jd=EPOCH_JD)
+        snapshot = ephemeris.states_at(time_s=0.25 * SECONDS_PER_DAY)
+        assert set(snapshot) == {"Sun", "Earth"}
+        for name, state in snapshot.items():
+            assert state == ephemeris.state(name, time_s=0.25 * SECONDS_PER_DAY)
+
+    def test_each_segment_evaluated_once(self, fake_kernel: FakeKernel) -> None:
+        """Earth and Moon share SSB->EMB; every body shares the Sun recentring."""
+        fake_kernel.segments[3, 301] = FakeSegment(base=(384400.0, 0.0, 0.0),
+                                                   rate=(0.0, 88000.0, 0.0))
+        calls: list[tuple[int, int]] = []
+
+        class CountingKernel:
+            def __getitem__(self, key: tuple[int, int]) -> FakeSegment:
+                calls.append(key)
+                return fake_kernel[key]
+
+        ephemeris = JplEphemeris(kernel=CountingKernel(),
+                                 location_paths={"Sun": [0, 10],
+                                                 "Earth": [0, 3, 399],
+                                                 "Moon": [0, 3, 301]},
+                                 epoch_jd=EPOCH_JD)
+        ephemeris.states_at(time_s=0.0)
+        assert sorted(calls) == [(0, 3), (0, 10), (3, 301), (3, 399)]
+
+    def test_subset_of_bodies(self, fake_kernel: FakeKernel,
+                              location_paths: dict[str, list[int]]) -> None:
+        ephemeris = JplEphemeris(kernel=fake_kernel,
+                                 location_paths=location_paths,
+                                 epoch_jd=EPOCH_JD)
+        assert list(ephemeris.states_at(time_s=0.0, bodies=["Earth"])) == ["Earth"]
+
+
+class TestSharedCache:
+    def test_second_adapter_reads_from_cache(self, fake_kernel: FakeKernel,
+                                             location_paths: dict[str, list[int]]) -> None:
+        cache = StateCache()
+        first = JplEphemeris(kernel=fake_kernel, location_paths=location_paths,
+                             epoch_jd=EPOCH_JD, cache=cache)
+        second = JplEphemeris(kernel=fake_kernel, location_paths=location_paths,
+                              epoch_jd=EPOCH_JD, cache=cache)
+        expected = first.state("Earth", time_s=SECONDS_PER_DAY)
+        assert cache.misses == 1
+        assert second.states_at(time_s=SECONDS_PER_DAY, bodies=["Earth"]) == {"Earth": expected}
+        assert cache.hits == 1
+
+    def test_center_is_part_of_the_key(self, fake_kernel: FakeKernel,
+                                       location_paths: dict[str, list[int]]) -> None:
+        cache = StateCache()
+        heliocentric = JplEphemeris(kernel=fake_kernel, location_paths=location_paths,
+                                    epoch_jd=EPOCH_JD, cache=cache)
+        barycentric = JplEphemeris(kernel=fake_kernel, location_paths=location_paths,
+                                   epoch_jd=EPOCH_JD, center=None, cache=cache)
+        assert heliocentric.state("Earth", 0.0) != barycentric.state("Earth", 0.0)
+
+
 class TestValidation:
     def test_unknown_body_raises(self, fake_kernel: FakeKernel,
                                  location_paths: dict[str, list[int]]) -> None:
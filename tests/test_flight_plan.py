@@ -251,3 +251,16 @@ class TestFlightPlan:
         plan.add(CoastInstruction(duration=20.0), index=1)
         durations = [i.duration for i in plan.instructions]
         assert durations == [10.0, 20.0, 30.0]
+
+    def test_coast_time_remaining(self) -> None:
+        ship = StubShip()
+        plan = (FlightPlan()
+                .add_coast(duration=100.0)
+                .add_speed_up(throttle=1.0, duration=10.0))
+        assert plan.coast_time_remaining() == 100.0
+        plan.next_command(ship, {}, dt=40.0)
+        assert plan.coast_time_remaining() == 60.0
+        plan.next_command(ship, {}, dt=60.0)
+        assert plan.coast_time_remaining() == 0.0    # the burn is next
+        plan.next_command(ship, {}, dt=10.0)
+        assert plan.coast_time_remaining() == float("inf")
@@ -10,10 +10,18 @@ These tests pin that difference down quantitatively.
 from __future__ import annotations
 
 from dataclasses import dataclass, field
+from math import pi, sqrt
 
 import pytest
 
-from core.integrator import AccelerationField, SemiImplicitEuler, VelocityVerlet
+from core.integrator import (
+    DOP853,
+    AccelerationField,
+    DormandPrince54,
+    SemiImplicitEuler,
+    VelocityVerlet,
+    WisdomHolman,
+)
 from core.physics import G, circular_orbit_state, circular_orbit_velocity, gravitational_acceleration
 from core.vec3 import Vec3
 
@@ -138,6 +146,184 @@ class TestReportedAcceleration:
         assert acceleration == field_fn(position)
 
 
+# ----------------------------------------------------------------------
+# Error-controlled (embedded Runge-Kutta) integrators
+# ----------------------------------------------------------------------
+
+MU_EARTH: float = G * EARTH_MASS * 1e-9   # km^3/s^2
+
+
+def eccentric_orbit() -> tuple[Vec3, Vec3, float]:
+    """Start at perigee of an e~0.69 orbit; returns (position, velocity, period)."""
+    perigee: float = EARTH_RADIUS + 500.0
+    speed: float = 1.3 * sqrt(MU_EARTH / perigee)
+    semi_major: float = 1.0 / (2.0 / perigee - speed * speed / MU_EARTH)
+    return Vec3(perigee, 0.0, 0.0), Vec3(0.0, speed, 0.0), 2.0 * pi * sqrt(semi_major**3 / MU_EARTH)
+
+
+class TestAdaptiveIntegrators:
+    @pytest.mark.parametrize("method", [DormandPrince54, DOP853])
+    def test_returns_to_perigee_after_whole_orbits(self, method) -> None:
+        position, velocity, period = eccentric_orbit()
+        integrator = method(rtol=1e-11)
+        new_position, new_velocity, _ = integrator.step(position, velocity,
+                                                        earth_gravity_field(), 5.0 * period)
+        assert (new_position - position).magnitude() < 0.01        # km
+        assert (new_velocity - velocity).magnitude() < 1e-6        # km/s
+
+    def test_tighter_tolerance_is_more_accurate(self) -> None:
+        position, velocity, period = eccentric_orbit()
+        errors: list[float] = []
+        for rtol in (1e-6, 1e-9, 1e-12):
+            end, _, _ = DOP853(rtol=rtol).step(position, velocity, earth_gravity_field(), period)
+            errors.append((end - position).magnitude())
+        assert errors[0] > errors[1] > errors[2]
+
+    def test_dop853_needs_fewer_evaluations_at_tight_tolerance(self) -> None:
+        position, velocity, period = eccentric_orbit()
+        dopri, dop853 = DormandPrince54(rtol=1e-12), DOP853(rtol=1e-12)
+        dopri.step(position, velocity, earth_gravity_field(), 3.0 * period)
+        dop853.step(position, velocity, earth_gravity_field(), 3.0 * period)
+        assert dop853.evaluations < dopri.evaluations / 2
+
+    def test_steps_shrink_near_perigee(self) -> None:
+        """Time spent per step is far longer around apogee than through perigee."""
+        position, velocity, period = eccentric_orbit()
+        integrator = DormandPrince54(rtol=1e-10)
+        field_fn = earth_gravity_field()
+        # Half an orbit from perigee reaches apogee; the next window is centred on it.
+        position, velocity, _ = integrator.step(position, velocity, field_fn, 0.4 * period)
+        before = integrator.accepted_steps
+        position, velocity, _ = integrator.step(position, velocity, field_fn, 0.2 * period)
+        around_apogee = integrator.accepted_steps - before
+        before = integrator.accepted_steps
+        integrator.step(position, velocity, field_fn, 0.8 * period)   # through the next perigee
+        through_perigee = integrator.accepted_steps - before
+        assert through_perigee > 3 * around_apogee
+
+    @pytest.mark.parametrize("method", [DormandPrince54, DOP853])
+    def test_time_dependent_field(self, method) -> None:
+        """a(t) = (k t, 0, 0) gives x = k t^3 / 6 and v = k t^2 / 2 exactly."""
+        k: float = 2.0e-6
+        position, velocity, acceleration = method().integrate(
+            Vec3(), Vec3(), lambda t, _: Vec3(k * t, 0.0, 0.0), time_s=0.0, dt=1000.0)
+        assert position.x == pytest.approx(k * 1000.0**3 / 6.0, rel=1e-9)
+        assert velocity.x == pytest.approx(k * 1000.0**2 / 2.0, rel=1e-9)
+        assert acceleration.x == pytest.approx(k * 1000.0)
+
+    def test_step_size_carries_over(self) -> None:
+        position, velocity, period = eccentric_orbit()
+        integrator = DOP853(rtol=1e-10)
+        field_fn = earth_gravity_field()
+        position, velocity, _ = integrator.step(position, velocity, field_fn, 0.1 * period)
+        before = integrator.evaluations
+        integrator.step(position, velocity, field_fn, 1.0)
+        # One first-stage evaluation plus a single step, no re-estimation.
+        assert integrator.evaluations - before == 1 + 12
+
+    def test_rejects_bad_tolerances(self) -> None:
+        with pytest.raises(ValueError):
+            DormandPrince54(rtol=0.0)
+        with pytest.raises(ValueError):
+            DOP853(min_step=10.0, max_step=1.0)
+
+
+# ----------------------------------------------------------------------
+# Wisdom-Holman mapping
+# ----------------------------------------------------------------------
+
+SUN_MASS: float = 1.989e30       # kg
+JUPITER_MASS: float = 1.898e27   # kg
+AU: float = 1.496e8              # km
+DAY: float = 86400.0
+
+
+def sun_and_jupiter() -> dict[str, StubEarth]:
+    """A Sun at the origin and a Jupiter held fixed at 5.2 au."""
+    return {"Sun": StubEarth(mass=SUN_MASS, radius=696000.0),
+            "Jupiter": StubEarth(position=Vec3(5.2 * AU, 0.0, 0.0),
+                                 mass=JUPITER_MASS, radius=71492.0)}
+
+
+def field_energy(position: Vec3, velocity: Vec3, bodies: dict[str, StubEarth]) -> float:
+    """Specific energy (km^2/s^2) in the static field of `bodies`."""
+    potential: float = sum(-G * body.mass * 1e-9 / (position - body.position).magnitude()
+                           for body in bodies.values())
+    return 0.5 * velocity.dot(velocity) + potential
+
+
+def max_energy_error(integrator, bodies: dict[str, StubEarth], dt: float, steps: int) -> float:
+    position = Vec3(AU, 0.0, 0.0)
+    velocity = Vec3(0.0, sqrt(G * SUN_MASS * 1e-9 / AU), 0.0)
+    field_fn: AccelerationField = lambda point: gravitational_acceleration(point, bodies)
+    start: float = field_energy(position, velocity, bodies)
+    worst: float = 0.0
+    for _ in range(steps):
+        position, velocity, _ = integrator.step(position, velocity, field_fn, dt)
+        worst = max(worst, abs(field_energy(position, velocity, bodies) / start - 1.0))
+    return worst
+
+
+class TestWisdomHolman:
+    def test_pure_kepler_field_is_exact(self) -> None:
+        bodies = {"Sun": sun_and_jupiter()["Sun"]}
+        integrator = WisdomHolman(bodies)
+        position, velocity, _ = integrator.step(
+            Vec3(AU, 0.0, 0.0), Vec3(0.0, sqrt(G * SUN_MASS * 1e-9 / AU), 0.0),
+            lambda point: gravitational_acceleration(point, bodies), 365.25 * DAY / 4.0)
+        # A quarter of a (nearly one-year) circular orbit in a single step.
+        assert position.y == pytest.approx(AU, rel=1e-4)
+        assert abs(position.x) < 1e-2 * AU
+        assert velocity.magnitude() == pytest.approx(sqrt(G * SUN_MASS * 1e-9 / AU), rel=1e-9)
+
+    def test_energy_bounded_at_day_steps(self) -> None:
+        bodies = sun_and_jupiter()
+        wisdom_holman = max_energy_error(WisdomHolman(bodies), bodies, 2.0 * DAY, 1800)
+        verlet = max_energy_error(VelocityVerlet(), bodies, 2.0 * DAY, 1800)
+        # The mapping's error scales with Jupiter's share of the field (~1e-4).
+        assert wisdom_holman < 5e-8
+        assert wisdom_holman < verlet / 50.0
+
+    def test_hands_over_inside_sphere_of_influence(self) -> None:
+        bodies = sun_and_jupiter()
+        integrator = WisdomHolman(bodies)
+        field_fn: AccelerationField = lambda point: gravitational_acceleration(point, bodies)
+        near_jupiter = bodies["Jupiter"].position + Vec3(0.0, 2.0e6, 0.0)
+        assert integrator.inside_sphere_of_influence(near_jupiter) == "Jupiter"
+        integrator.step(near_jupiter, Vec3(0.0, 0.0, 5.0), field_fn, 3600.0)
+        assert (integrator.fallback_steps, integrator.kepler_steps) == (1, 0)
+        integrator.step(Vec3(AU, 0.0, 0.0), Vec3(0.0, 30.0, 0.0), field_fn, 3600.0)
+        assert (integrator.fallback_steps, integrator.kepler_steps) == (1, 1)
+
+    def test_unsolvable_drift_falls_back(self) -> None:
+        # A fast escape drifted over years: the universal-anomaly solve gives
+        # up, and the step is handed to the fallback instead of failing.
+        bodies = {"Sun": sun_and_jupiter()["Sun"]}
+        field_fn: AccelerationField = lambda point: gravitational_acceleration(point, bodies)
+        radius: float = 0.895 * AU
+        start = (Vec3(radius, 0.0, 0.0),
+                 Vec3(0.0, 1.49 * sqrt(2.0 * G * SUN_MASS * 1e-9 / radius), 0.0))
+        integrator = WisdomHolman(bodies, fallback=VelocityVerlet())
+        stepped = integrator.step(*start, field_fn, 5.5e8)
+        assert (integrator.fallback_steps, integrator.kepler_steps) == (1, 0)
+        assert stepped == VelocityVerlet().step(*start, field_fn, 5.5e8)
+
+    def test_moving_central_body(self) -> None:
+        """A uniformly moving Sun carries the orbit along with it."""
+        drift = Vec3(0.01, -0.02, 0.005)   # km/s
+        sun = StubEarth(velocity=drift, mass=SUN_MASS, radius=696000.0)
+        bodies = {"Sun": sun}
+        speed: float = sqrt(G * SUN_MASS * 1e-9 / AU)
+        resting, _, _ = WisdomHolman({"Sun": StubEarth(mass=SUN_MASS)}).step(
+            Vec3(AU, 0.0, 0.0), Vec3(0.0, speed, 0.0),
+            lambda point: gravitational_acceleration(point, {"Sun": StubEarth(mass=SUN_MASS)}),
+            30.0 * DAY)
+        moving, velocity, _ = WisdomHolman(bodies).step(
+            Vec3(AU, 0.0, 0.0), Vec3(0.0, speed, 0.0) + drift,
+            lambda point: gravitational_acceleration(point, bodies), 30.0 * DAY)
+        assert (moving - (resting + drift * (30.0 * DAY))).magnitude() < 1e-3
+
+
 def test_circular_orbit_velocity_sanity() -> None:
     """Guard: the helper the tests lean on still gives ISS-like speed."""
     speed = circular_orbit_velocity(EARTH_MASS, EARTH_RADIUS + 418.0)
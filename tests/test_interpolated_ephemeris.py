@@ -0,0 +1,134 @@
+"""Interpolated (Hermite-table) ephemeris tests."""
+
+from __future__ import annotations
+
+from math import cos, sin, sqrt
+from pathlib import Path
+
+import pytest
+
+from core.interpolated_ephemeris import InterpolatedEphemeris
+from core.keplerian_ephemeris import KeplerianEphemeris
+from core.lambert import MU_SUN
+from core.vec3 import Vec3
+
+AU: float = 1.495978707e8
+DAY: float = 86400.0
+
+
+class CountingCircularEphemeris:
+    """Circular coplanar orbits around the Sun; counts source queries."""
+
+    def __init__(self, orbits: dict[str, tuple[float, float]]) -> None:
+        """`orbits` maps body name to (radius km, gravitational parameter km^3/s^2)."""
+        self.orbits: dict[str, tuple[float, float]] = orbits
+        self.calls: int = 0
+
+    def state(self, body: str, time_s: float) -> tuple[Vec3, Vec3]:
+        self.calls += 1
+        radius, mu = self.orbits[body]
+        rate: float = sqrt(mu / radius**3)
+        angle: float = rate * time_s
+        speed: float = rate * radius
+        return (Vec3(radius * cos(angle), radius * sin(angle), 0.0),
+                Vec3(-speed * sin(angle), speed * cos(angle), 0.0))
+
+
+@pytest.fixture
+def source() -> CountingCircularEphemeris:
+    return CountingCircularEphemeris(orbits={
+        "Earth": (AU, MU_SUN),
+        # A tight, fast orbit (~1.4 day period) to force refinement.
+        "Moonlet": (50000.0, 4.0e5),
+    })
+
+
+class TestAccuracy:
+    def test_matches_source_within_tolerance(self, source: CountingCircularEphemeris) -> None:
+        ephemeris = InterpolatedEphemeris(source, tolerance_km=1.0)
+        for i in range(200):
+            time_s: float = i * 0.37 * DAY
+            position, velocity = ephemeris.state("Earth", time_s)
+            expected_position, expected_velocity = source.state("Earth", time_s)
+            assert (position - expected_position).magnitude() < 1.0
+            assert (velocity - expected_velocity).magnitude() < 1e-4
+
+    def test_exact_at_nodes(self, source: CountingCircularEphemeris) -> None:
+        ephemeris = InterpolatedEphemeris(source)
+        position, velocity = ephemeris.state("Earth", 2.0 * DAY)
+        assert position == source.state("Earth", 2.0 * DAY)[0]
+        assert velocity.magnitude() == pytest.approx(source.state("Earth", 0.0)[1].magnitude())
+
+    def test_fast_body_refines_spacing(self, source: CountingCircularEphemeris) -> None:
+        ephemeris = InterpolatedEphemeris(source, tolerance_km=0.5)
+        for i in range(50):
+            time_s: float = i * 0.13 * DAY
+            position, _ = ephemeris.state("Moonlet", time_s)
+            assert (position - source.state("Moonlet", time_s)[0]).magnitude() < 0.5
+        assert 0.0 < ephemeris.max_error_km("Moonlet") <= 0.5
+
+    def test_eccentric_orbit_meets_tolerance_between_checks(self) -> None:
+        # Mercury's perihelion falls between the few midpoints a sparse
+        # check would sample; every interval must be held to the bound.
+        source = KeplerianEphemeris(epoch_jd=2451545.0)
+        ephemeris = InterpolatedEphemeris(source, tolerance_km=1.0, max_windows=16)
+        worst: float = 0.0
+        for i in range(400 * 24):
+            time_s: float = i * 3600.0
+            position, _ = ephemeris.state("Mercury", time_s)
+            worst = max(worst, (position - source.state("Mercury", time_s)[0]).magnitude())
+        assert worst <= 1.0
+        assert ephemeris.max_error_km("Mercury") <= 1.0
+
+
+class TestLazyWindows:
+    def test_no_source_queries_inside_a_built_window(self,
+                                                     source: CountingCircularEphemeris) -> None:
+        ephemeris = InterpolatedEphemeris(source, window_s=10.0 * DAY)
+        ephemeris.state("Earth", 0.0)
+        calls_after_build: int = source.calls
+        for i in range(1000):
+            ephemeris.state("Earth", i * 0.0099 * DAY)
+        assert source.calls == calls_after_build
+
+    def test_window_count_is_bounded(self, source: CountingCircularEphemeris) -> None:
+        ephemeris = InterpolatedEphemeris(source, window_s=5.0 * DAY, max_windows=3)
+        for i in range(40):
+            ephemeris.state("Earth", i * 5.0 * DAY)
+        assert ephemeris.window_count("Earth") == 3
+
+    def test_negative_times(self, source: CountingCircularEphemeris) -> None:
+        ephemeris = InterpolatedEphemeris(source)
+        position, _ = ephemeris.state("Earth", -3.3 * DAY)
+        assert (position - source.state("Earth", -3.3 * DAY)[0]).magnitude() < 1.0
+
+
+class TestValidation:
+    def test_rejects_spacing_larger_than_window(self,
+                                                source: CountingCircularEphemeris) -> None:
+        with pytest.raises(ValueError):
+            InterpolatedEphemeris(source, window_s=DAY, node_spacing_s=2.0 * DAY)
+
+    def test_rejects_non_positive_tolerance(self, source: CountingCircularEphemeris) -> None:
+        with pytest.raises(ValueError):
+            InterpolatedEphemeris(source, tolerance_km=0.0)
+
+
+_KERNEL_PATH = Path(__file__).parent.parent / "de440t.bsp"
+
+
+@pytest.mark.skipif(not _KERNEL_PATH.exists(), reason="de440t.bsp not downloaded")
+def test_error_bound_against_real_kernel() -> None:
+    from jplephem.spk import SPK
+    from core.bodies import load_bodies_from_json
+    from core.ephemeris import JplEphemeris
+    kernel = SPK.open(str(_KERNEL_PATH))
+    jpl = JplEphemeris.from_bodies(kernel=kernel, bodies=load_bodies_from_json(),
+                                   epoch_jd=2443401.5)   # Voyager 1's start, 1977-09-15
+    ephemeris = InterpolatedEphemeris(jpl, tolerance_km=1.0)
+    for name in ("Moon", "Mercury", "Jupiter"):
+        for i in range(100):
+            time_s: float = i * 0.71 * DAY
+            position, _ = ephemeris.state(name, time_s)
+            assert (position - jpl.state(name, time_s)[0]).magnitude() < 2.0
+    kernel.close()
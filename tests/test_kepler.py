@@ -0,0 +1,97 @@
+"""Universal-variable two-body propagation tests."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from math import pi, sqrt
+
+import pytest
+
+from core.integrator import DOP853
+from core.kepler import perturbation_ratio, propagate_kepler, stumpff_c, stumpff_s
+from core.vec3 import Vec3
+
+MU_SUN: float = 1.32712440018e11   # km^3/s^2
+AU: float = 1.495978707e8          # km
+DAY: float = 86400.0
+
+
+def sun_field(position: Vec3) -> Vec3:
+    distance: float = position.magnitude()
+    return position * (-MU_SUN / distance**3)
+
+
+def energy(position: Vec3, velocity: Vec3) -> float:
+    return 0.5 * velocity.dot(velocity) - MU_SUN / position.magnitude()
+
+
+ORBITS: dict[str, tuple[Vec3, Vec3]] = {
+    "elliptic": (Vec3(AU, 0.1 * AU, 0.0), Vec3(-3.0, 35.0, 2.0)),
+    "hyperbolic": (Vec3(AU, 0.0, 0.0), Vec3(0.0, 45.0, 5.0)),
+    "near-parabolic": (Vec3(AU, 0.0, 0.0), Vec3(0.0, sqrt(2.0 * MU_SUN / AU) * (1 + 1e-9), 0.0)),
+}
+
+
+@pytest.mark.parametrize("kind", list(ORBITS))
+def test_matches_numerical_integration(kind: str) -> None:
+    position, velocity = ORBITS[kind]
+    dt: float = 200.0 * DAY
+    expected, expected_velocity, _ = DOP853(rtol=1e-13).step(position, velocity, sun_field, dt)
+    result, result_velocity = propagate_kepler(position, velocity, MU_SUN, dt)
+    assert (result - expected).magnitude() < 1.0                 # km, over ~1e8 km
+    assert (result_velocity - expected_velocity).magnitude() < 1e-6
+
+
+@pytest.mark.parametrize("kind", list(ORBITS))
+def test_reversible_and_conservative(kind: str) -> None:
+    position, velocity = ORBITS[kind]
+    later, later_velocity = propagate_kepler(position, velocity, MU_SUN, 500.0 * DAY)
+    assert energy(later, later_velocity) == pytest.approx(energy(position, velocity),
+                                                          rel=1e-9, abs=1e-9)
+    assert (later.cross(later_velocity) - position.cross(velocity)).magnitude() \
+        < 1e-9 * position.cross(velocity).magnitude()
+    back, back_velocity = propagate_kepler(later, later_velocity, MU_SUN, -500.0 * DAY)
+    assert (back - position).magnitude() < 1e-2
+    assert (back_velocity - velocity).magnitude() < 1e-9
+
+
+def test_whole_periods_return_to_start() -> None:
+    position, velocity = ORBITS["elliptic"]
+    semi_major: float = 1.0 / (2.0 / position.magnitude() - velocity.dot(velocity) / MU_SUN)
+    period: float = 2.0 * pi * sqrt(semi_major**3 / MU_SUN)
+    result, _ = propagate_kepler(position, velocity, MU_SUN, 1000.0 * period)
+    assert (result - position).magnitude() < 10.0
+
+
+def test_stumpff_series_is_continuous() -> None:
+    for z in (-1e-3, 1e-3):
+        for function in (stumpff_c, stumpff_s):
+            assert function(z * (1 + 1e-9)) == pytest.approx(function(z * (1 - 1e-9)), rel=1e-10)
+
+
+@dataclass
+class StubBody:
+    position: Vec3 = field(default_factory=Vec3)
+    velocity: Vec3 = field(default_factory=Vec3)
+    mass: float = 1.989e30
+    radius: float = 696000.0
+
+
+class TestPerturbationRatio:
+    def test_distant_planet_is_negligible(self) -> None:
+        mars = StubBody(position=Vec3(-1.5 * AU, 0.0, 0.0), velocity=Vec3(0.0, -24.0, 0.0),
+                        mass=6.42e23, radius=3390.0)
+        ratio = perturbation_ratio(Vec3(AU, 0.0, 0.0), Vec3(0.0, 30.0, 0.0),
+                                   StubBody(), [mars], DAY)
+        assert 0.0 < ratio < 1e-6
+
+    def test_grows_with_the_step(self) -> None:
+        mars = StubBody(position=Vec3(AU + 5.0e6, 0.0, 0.0), mass=6.42e23, radius=3390.0)
+        ratios = [perturbation_ratio(Vec3(AU, 0.0, 0.0), Vec3(0.0, 30.0, 0.0),
+                                     StubBody(), [mars], dt) for dt in (60.0, 3600.0, DAY)]
+        assert ratios[0] < ratios[1] < ratios[2]
+
+    def test_reachable_planet_is_unbounded(self) -> None:
+        mars = StubBody(position=Vec3(AU + 1.0e5, 0.0, 0.0), mass=6.42e23, radius=3390.0)
+        assert perturbation_ratio(Vec3(AU, 0.0, 0.0), Vec3(30.0, 0.0, 0.0),
+                                  StubBody(), [mars], DAY) == float("inf")
@@ -0,0 +1,98 @@
+"""Analytic (mean Keplerian element) ephemeris tests."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from core.keplerian_ephemeris import AU_KM, BODIES, J2000_JD, KeplerianEphemeris
+from core.vec3 import Vec3
+
+DAY: float = 86400.0
+
+
+@pytest.fixture
+def ephemeris() -> KeplerianEphemeris:
+    return KeplerianEphemeris(epoch_jd=J2000_JD)
+
+
+class TestKnownStates:
+    def test_earth_at_j2000(self, ephemeris: KeplerianEphemeris) -> None:
+        # Heliocentric ICRF Earth at 2000-01-01 12:00 TDB (HORIZONS), in au.
+        position, _ = ephemeris.state("Earth", 0.0)
+        expected = Vec3(-0.1771354, 0.8874737, 0.3847608) * AU_KM
+        assert (position - expected).magnitude() < 1e-3 * AU_KM
+
+    def test_sun_is_origin(self, ephemeris: KeplerianEphemeris) -> None:
+        assert ephemeris.state("Sun", 1234.0 * DAY) == (Vec3(), Vec3())
+
+    def test_moon_distance(self, ephemeris: KeplerianEphemeris) -> None:
+        for i in range(60):
+            moon, _ = ephemeris.state("Moon", i * 1.7 * DAY)
+            earth, _ = ephemeris.state("Earth", i * 1.7 * DAY)
+            assert 356000.0 < (moon - earth).magnitude() < 407000.0
+
+    def test_orbital_speeds(self, ephemeris: KeplerianEphemeris) -> None:
+        for body, low, high in (("Mercury", 38.0, 59.0), ("Earth", 29.0, 31.0),
+                                ("Jupiter", 12.4, 13.8), ("Neptune", 5.3, 5.6)):
+            _, velocity = ephemeris.state(body, 0.0)
+            assert low < velocity.magnitude() < high
+
+
+class TestConsistency:
+    @pytest.mark.parametrize("body", ["Mercury", "Earth", "Moon", "Saturn", "Pluto"])
+    def test_velocity_matches_position_derivative(self, ephemeris: KeplerianEphemeris,
+                                                  body: str) -> None:
+        step: float = 60.0
+        before, _ = ephemeris.state(body, 100.0 * DAY - step)
+        after, _ = ephemeris.state(body, 100.0 * DAY + step)
+        _, velocity = ephemeris.state(body, 100.0 * DAY)
+        assert ((after - before) * (0.5 / step) - velocity).magnitude() < 1e-3
+
+    def test_batch_matches_scalar(self, ephemeris: KeplerianEphemeris) -> None:
+        times = np.linspace(-5.0e9, 5.0e9, 7)
+        positions, velocities = ephemeris.states(["Mars", "Moon"], times)
+        assert positions.shape == velocities.shape == (2, 7, 3)
+        for j, time_s in enumerate(times):
+            position, velocity = ephemeris.state("Moon", float(time_s))
+            assert np.allclose(positions[1, j], position.as_tuple(), rtol=0.0, atol=1e-6)
+            assert np.allclose(velocities[1, j], velocity.as_tuple(), rtol=0.0, atol=1e-12)
+
+    def test_states_at_covers_every_body(self, ephemeris: KeplerianEphemeris) -> None:
+        states = ephemeris.states_at(10.0 * DAY)
+        assert set(states) == set(BODIES)
+        assert states["Venus"] == ephemeris.state("Venus", 10.0 * DAY)
+
+    def test_dates_beyond_kernel_range(self) -> None:
+        # Year ~3000: outside de440t.bsp, still a sensible orbit.
+        ephemeris = KeplerianEphemeris(epoch_jd=2816787.5)
+        position, _ = ephemeris.state("Mars", 0.0)
+        assert 1.38 * AU_KM < position.magnitude() < 1.67 * AU_KM
+
+    def test_unknown_body_raises(self, ephemeris: KeplerianEphemeris) -> None:
+        with pytest.raises(KeyError):
+            ephemeris.state("Vulcan", 0.0)
+
+
+_KERNEL_PATH = Path(__file__).parent.parent / "de440t.bsp"
+
+
+@pytest.mark.skipif(not _KERNEL_PATH.exists(), reason="de440t.bsp not downloaded")
+def test_angular_error_against_real_kernel() -> None:
+    from jplephem.spk import SPK
+    from core.bodies import load_bodies_from_json
+    from core.ephemeris import JplEphemeris
+    from core.time import MAX_JULIAN_DATE, MIN_JULIAN_DATE
+    kernel = SPK.open(str(_KERNEL_PATH))
+    jpl = JplEphemeris.from_bodies(kernel=kernel, bodies=load_bodies_from_json(),
+                                   epoch_jd=MIN_JULIAN_DATE)
+    keplerian = KeplerianEphemeris(epoch_jd=MIN_JULIAN_DATE)
+    times = np.linspace(DAY, (MAX_JULIAN_DATE - MIN_JULIAN_DATE - 1.0) * DAY, 300)
+    planets = ["Mercury", "Venus", "Earth", "Mars", "Jupiter", "Saturn", "Uranus", "Neptune"]
+    exact, _ = jpl.states(planets, times)
+    approximate, _ = keplerian.states(planets, times)
+    error = np.linalg.norm(approximate - exact, axis=2) / np.linalg.norm(exact, axis=2)
+    assert error.max() < np.radians(0.5)   # well under a degree anywhere in range
+    kernel.close()
@@ -0,0 +1,153 @@
+"""Kernel subsetting and lazy loading tests, on small synthetic SPK files."""
+
+from __future__ import annotations
+
+import pickle
+from pathlib import Path
+from struct import Struct
+
+import numpy as np
+import pytest
+from jplephem.daf import DAF, FTPSTR
+from jplephem.spk import S_PER_DAY, SPK, T0
+
+from core.ephemeris import JplEphemeris
+from core.kernel import LazyKernel, compare_kernels, required_segments, write_subset
+from core.state_cache import StateCache
+
+START_JD: float = 2451545.0
+RECORD_DAYS: float = 8.0
+RECORDS: int = 200
+SEGMENTS: list[tuple[int, int]] = [(0, 10), (0, 3), (3, 399), (3, 301), (0, 5)]
+
+
+def write_synthetic_spk(path: Path, segments: list[tuple[int, int]], seed: int = 0) -> None:
+    """A type-2 (Chebyshev) SPK with random coefficients for each (center, target)."""
+    generator = np.random.default_rng(seed)
+    coefficients: int = 8
+    header: bytes = Struct("<8sII60sIII8s603s28s297s").pack(
+        b"DAF/SPK ", 2, 6, b"synthetic test kernel".ljust(60), 2, 2, 3 * 128 + 1,
+        b"LTL-IEEE", b"\0" * 603, FTPSTR, b"\0" * 297)
+    init: float = (START_JD - T0) * S_PER_DAY
+    interval: float = RECORD_DAYS * S_PER_DAY
+    with open(path, "w+b") as file:
+        # File record, an empty summary record and its (blank) name record.
+        file.write(header + b"\0" * 1024 + b" " * 1024)
+        file.seek(0)
+        daf = DAF(file)
+        for center, target in segments:
+            data: list[float] = []
+            for k in range(RECORDS):
+                data.extend([init + (k + 0.5) * interval, interval / 2])
+                data.extend(generator.normal(scale=1e7, size=3 * coefficients))
+            data.extend([init, interval, 2 + 3 * coefficients, RECORDS])
+            daf.add_array(b"synthetic", (init, init + RECORDS * interval, target, center, 1, 2),
+                          np.array(data))
+
+
+@pytest.fixture
+def full_kernel(tmp_path: Path) -> Path:
+    path = tmp_path / "full.bsp"
+    write_synthetic_spk(path, SEGMENTS)
+    return path
+
+
+class TestRequiredSegments:
+    def test_collects_every_hop(self) -> None:
+        paths = [[0, 10], [0, 3, 399], [0, 3, 301], [0, 3, 399]]
+        assert required_segments(paths) == {(0, 10), (0, 3), (3, 399), (3, 301)}
+
+
+class TestWriteSubset:
+    def test_keeps_only_requested_segments(self, full_kernel: Path, tmp_path: Path) -> None:
+        wanted = {(0, 10), (0, 3), (3, 399)}
+        written = write_subset(str(full_kernel), str(tmp_path / "subset.bsp"), wanted,
+                               START_JD + 400.0, START_JD + 1000.0)
+        assert set(written) == wanted
+        assert (tmp_path / "subset.bsp").stat().st_size < full_kernel.stat().st_size
+
+    def test_keep_start_reproduces_source_exactly(self, full_kernel: Path,
+                                                  tmp_path: Path) -> None:
+        wanted = {(0, 10), (0, 3), (3, 301)}
+        start_jd, end_jd = START_JD + 400.0, START_JD + 1000.0
+        write_subset(str(full_kernel), str(tmp_path / "subset.bsp"), wanted, start_jd, end_jd)
+        full, subset = SPK.open(str(full_kernel)), SPK.open(str(tmp_path / "subset.bsp"))
+        check = compare_kernels(full, subset, wanted, start_jd, end_jd, samples_per_segment=500)
+        subset.close()
+        full.close()
+        assert check.identical
+        assert check.samples == 3 * 502
+        assert check.max_position_diff_km == 0.0
+
+    def test_trimmed_start_is_smaller_and_reports_deviation(self, full_kernel: Path,
+                                                            tmp_path: Path) -> None:
+        wanted = {(0, 3)}
+        start_jd, end_jd = START_JD + 800.0, START_JD + 1000.0
+        write_subset(str(full_kernel), str(tmp_path / "kept.bsp"), wanted, start_jd, end_jd)
+        write_subset(str(full_kernel), str(tmp_path / "trimmed.bsp"), wanted, start_jd, end_jd,
+                     keep_start=False)
+        assert ((tmp_path / "trimmed.bsp").stat().st_size
+                < (tmp_path / "kept.bsp").stat().st_size)
+        full, subset = SPK.open(str(full_kernel)), SPK.open(str(tmp_path / "trimmed.bsp"))
+        check = compare_kernels(full, subset, wanted, start_jd, end_jd, samples_per_segment=500)
+        subset.close()
+        full.close()
+        # Rebasing the segment epoch only perturbs rounding, never the record used.
+        assert check.max_position_diff_km < 1e-2
+
+    def test_missing_segment_raises(self, full_kernel: Path, tmp_path: Path) -> None:
+        with pytest.raises(KeyError):
+            write_subset(str(full_kernel), str(tmp_path / "subset.bsp"), {(0, 9)},
+                         START_JD, START_JD + 100.0)
+
+    def test_empty_range_raises(self, full_kernel: Path, tmp_path: Path) -> None:
+        with pytest.raises(ValueError):
+            write_subset(str(full_kernel), str(tmp_path / "subset.bsp"), {(0, 3)},
+                         START_JD + 100.0, START_JD + 100.0)
+
+
+class TestLazyKernel:
+    def test_opens_on_first_lookup(self, full_kernel: Path) -> None:
+        kernel = LazyKernel(str(full_kernel))
+        assert not kernel.is_open
+        kernel[(0, 3)]
+        assert kernel.is_open
+        assert kernel.loaded_segments == [(0, 3)]
+        kernel.close()
+        assert not kernel.is_open
+
+    def test_matches_eager_kernel(self, full_kernel: Path) -> None:
+        lazy, eager = LazyKernel(str(full_kernel)), SPK.open(str(full_kernel))
+        jd: float = START_JD + 123.456
+        for key in SEGMENTS:
+            lazy_position, _ = lazy[key].compute_and_differentiate(jd)
+            eager_position, _ = eager[key].compute_and_differentiate(jd)
+            assert (lazy_position == eager_position).all()
+        assert lazy[(0, 3)] is lazy[(0, 3)]
+        lazy.close()
+        eager.close()
+
+    def test_missing_segment_raises(self, full_kernel: Path) -> None:
+        kernel = LazyKernel(str(full_kernel))
+        with pytest.raises(KeyError):
+            kernel[(0, 9)]
+        kernel.close()
+
+    def test_pickles_as_its_path(self, full_kernel: Path) -> None:
+        kernel = LazyKernel(str(full_kernel))
+        position, _ = kernel[(0, 3)].compute_and_differentiate(START_JD + 10.0)
+        copy = pickle.loads(pickle.dumps(kernel))
+        assert copy.path == kernel.path and not copy.is_open
+        copy_position, _ = copy[(0, 3)].compute_and_differentiate(START_JD + 10.0)
+        assert (copy_position == position).all()
+        kernel.close()
+        copy.close()
+
+    def test_ephemeris_pickles_without_its_cache(self, full_kernel: Path) -> None:
+        """What a parallel porkchop ships to each worker process."""
+        ephemeris = JplEphemeris(kernel=LazyKernel(str(full_kernel)),
+                                 location_paths={"Sun": [0, 10], "Earth": [0, 3, 399]},
+                                 epoch_jd=START_JD, cache=StateCache())
+        copy = pickle.loads(pickle.dumps(ephemeris))
+        assert copy.cache is None and ephemeris.cache is not None
+        assert copy.state("Earth", 5.0 * 86400.0) == ephemeris.state("Earth", 5.0 * 86400.0)
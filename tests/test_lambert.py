@@ -2,16 +2,29 @@ from __future__ import annotations
 
 from math import pi, sqrt
 
+import numpy as np
 import pytest
 
-from core.lambert import LambertNoConvergence, solve_lambert
+from core.kepler import propagate_kepler
+from core.lambert import (
+    MU_SUN,
+    LambertNoConvergence,
+    solve_lambert,
+    solve_lambert_batch,
+    solve_lambert_izzo,
+)
 from core.vec3 import Vec3
 
 MU_EARTH: float = 398600.0  # km^3/s^2
 
+# Every case below must hold for both solvers.
+solvers = pytest.mark.parametrize("solve", [solve_lambert, solve_lambert_izzo],
+                                  ids=["universal", "izzo"])
+
 
 class TestLambertTextbookCase:
-    def test_curtis_example_5_2(self) -> None:
+    @solvers
+    def test_curtis_example_5_2(self, solve) -> None:
         """
         Validation against Curtis, 'Orbital Mechanics for Engineering
         Students', Example 5.2: a 1-hour Earth-orbit transfer with a
@@ -19,9 +32,9 @@ class TestLambertTextbookCase:
         """
         r1 = Vec3(5000.0, 10000.0, 2100.0)
         r2 = Vec3(-14600.0, 2500.0, 7000.0)
-        solution = solve_lambert(r1=r1, r2=r2,
-                                 time_of_flight=3600.0,
-                                 mu=MU_EARTH)
+        solution = solve(r1=r1, r2=r2,
+                         time_of_flight=3600.0,
+                         mu=MU_EARTH)
         assert solution.v1.x == pytest.approx(-5.9925, abs=1e-3)
         assert solution.v1.y == pytest.approx(1.9254, abs=1e-3)
         assert solution.v1.z == pytest.approx(3.2456, abs=1e-3)
@@ -31,7 +44,8 @@ class TestLambertTextbookCase:
 
 
 class TestLambertCircularOrbit:
-    def test_quarter_orbit_recovers_circular_velocity(self) -> None:
+    @solvers
+    def test_quarter_orbit_recovers_circular_velocity(self, solve) -> None:
         """
         Two points a quarter-orbit apart on a circular orbit, with a
         quarter-period time of flight, must be connected by... that
@@ -43,9 +57,9 @@ class TestLambertCircularOrbit:
 
         r1 = Vec3(radius, 0.0, 0.0)
         r2 = Vec3(0.0, radius, 0.0)
-        solution = solve_lambert(r1=r1, r2=r2,
-                                 time_of_flight=quarter_period,
-                                 mu=MU_EARTH)
+        solution = solve(r1=r1, r2=r2,
+                         time_of_flight=quarter_period,
+                         mu=MU_EARTH)
         assert solution.v1.x == pytest.approx(0.0, abs=1e-6)
         assert solution.v1.y == pytest.approx(v_circular, rel=1e-6)
         assert solution.v1.z == pytest.approx(0.0, abs=1e-6)
@@ -55,31 +69,104 @@ class TestLambertCircularOrbit:
 
 
 class TestLambertEdgeCases:
-    def test_rejects_non_positive_time(self) -> None:
+    @solvers
+    def test_rejects_non_positive_time(self, solve) -> None:
         with pytest.raises(ValueError):
-            solve_lambert(r1=Vec3(7000.0, 0.0, 0.0),
-                          r2=Vec3(0.0, 7000.0, 0.0),
-                          time_of_flight=0.0,
-                          mu=MU_EARTH)
+            solve(r1=Vec3(7000.0, 0.0, 0.0),
+                  r2=Vec3(0.0, 7000.0, 0.0),
+                  time_of_flight=0.0,
+                  mu=MU_EARTH)
 
-    def test_rejects_zero_position(self) -> None:
+    @solvers
+    def test_rejects_zero_position(self, solve) -> None:
         with pytest.raises(ValueError):
-            solve_lambert(r1=Vec3(),
-                          r2=Vec3(0.0, 7000.0, 0.0),
-                          time_of_flight=3600.0,
-                          mu=MU_EARTH)
+            solve(r1=Vec3(),
+                  r2=Vec3(0.0, 7000.0, 0.0),
+                  time_of_flight=3600.0,
+                  mu=MU_EARTH)
 
-    def test_degenerate_180_degree_transfer(self) -> None:
+    @solvers
+    def test_degenerate_180_degree_transfer(self, solve) -> None:
         """Diametrically opposite points leave the plane undefined."""
         with pytest.raises(LambertNoConvergence):
-            solve_lambert(r1=Vec3(7000.0, 0.0, 0.0),
-                          r2=Vec3(-7000.0, 0.0, 0.0),
-                          time_of_flight=3600.0,
-                          mu=MU_EARTH)
+            solve(r1=Vec3(7000.0, 0.0, 0.0),
+                  r2=Vec3(-7000.0, 0.0, 0.0),
+                  time_of_flight=3600.0,
+                  mu=MU_EARTH)
 
-    def test_impossibly_short_time_raises(self) -> None:
+    @solvers
+    def test_impossibly_short_time_raises(self, solve) -> None:
         """No orbit can cover interplanetary distance in one minute."""
         with pytest.raises(LambertNoConvergence):
-            solve_lambert(r1=Vec3(1.496e8, 0.0, 0.0),
-                          r2=Vec3(0.0, 2.28e8, 0.0),
-                          time_of_flight=60.0)
+            solve(r1=Vec3(1.496e8, 0.0, 0.0),
+                  r2=Vec3(0.0, 2.28e8, 0.0),
+                  time_of_flight=60.0)
+
+
+class TestIzzoSolver:
+    def test_agrees_with_universal_variables(self) -> None:
+        r1 = Vec3(1.496e8, 1.0e6, 0.0)
+        for r2, days in ((Vec3(-1.5e8, 1.7e8, 3.0e6), 250.0),
+                         (Vec3(2.0e8, -1.2e8, -4.0e6), 300.0),
+                         (Vec3(-2.2e8, -0.4e8, 1.0e6), 180.0)):
+            for prograde in (True, False):
+                expected = solve_lambert(r1, r2, days * 86400.0, prograde=prograde)
+                solution = solve_lambert_izzo(r1, r2, days * 86400.0, prograde=prograde)
+                assert (solution.v1 - expected.v1).magnitude() < 1e-7
+                assert (solution.v2 - expected.v2).magnitude() < 1e-7
+                assert solution.iterations <= 4
+
+    @pytest.mark.parametrize("long_period", [False, True])
+    def test_multi_revolution_reaches_target(self, long_period: bool) -> None:
+        radius: float = 7000.0
+        period: float = 2.0 * pi * sqrt(radius**3 / MU_EARTH)
+        r1, r2 = Vec3(radius, 0.0, 0.0), Vec3(0.0, radius, 0.0)
+        solution = solve_lambert_izzo(r1, r2, 1.25 * period, mu=MU_EARTH,
+                                      revolutions=1, long_period=long_period)
+        arrival, velocity = propagate_kepler(r1, solution.v1, MU_EARTH, 1.25 * period)
+        assert (arrival - r2).magnitude() < 1e-6
+        assert (velocity - solution.v2).magnitude() < 1e-9
+        # The circular orbit itself is the longer-period of the two.
+        circular: bool = solution.v1.magnitude() == pytest.approx(sqrt(MU_EARTH / radius))
+        assert circular == long_period
+
+    def test_too_many_revolutions_raises(self) -> None:
+        radius: float = 7000.0
+        period: float = 2.0 * pi * sqrt(radius**3 / MU_EARTH)
+        with pytest.raises(LambertNoConvergence):
+            solve_lambert_izzo(Vec3(radius, 0.0, 0.0), Vec3(0.0, radius, 0.0),
+                               1.25 * period, mu=MU_EARTH, revolutions=3)
+
+    def test_converges_where_bisection_gives_up(self) -> None:
+        r1, r2 = Vec3(1.496e8, 1.0e6, 0.0), Vec3(2.0e8, -1.2e8, -4.0e6)
+        with pytest.raises(LambertNoConvergence):
+            solve_lambert(r1, r2, 400.0 * 86400.0)
+        solution = solve_lambert_izzo(r1, r2, 400.0 * 86400.0)
+        arrival, _ = propagate_kepler(r1, solution.v1, MU_SUN, 400.0 * 86400.0)
+        assert (arrival - r2).magnitude() < 1e-3
+
+
+class TestBatchSolver:
+    @pytest.mark.parametrize("prograde", [True, False])
+    def test_matches_scalar_solver(self, prograde: bool) -> None:
+        rng = np.random.default_rng(7)
+        r1 = rng.uniform(-2.0e8, 2.0e8, (200, 3))
+        r2 = rng.uniform(-3.0e8, 3.0e8, (200, 3))
+        tof = rng.uniform(1.0, 600.0, 200) * 86400.0
+        batch = solve_lambert_batch(r1, r2, tof, prograde=prograde)
+        assert batch.v1.shape == batch.v2.shape == (200, 3)
+        for i in range(200):
+            solution = solve_lambert_izzo(Vec3(*r1[i]), Vec3(*r2[i]), float(tof[i]),
+                                          prograde=prograde)
+            assert batch.converged[i]
+            assert np.allclose(batch.v1[i], solution.v1.as_tuple(), rtol=0.0, atol=1e-9)
+            assert np.allclose(batch.v2[i], solution.v2.as_tuple(), rtol=0.0, atol=1e-9)
+
+    def test_unsolvable_rows_are_masked(self) -> None:
+        r1 = np.array([[7000.0, 0.0, 0.0]] * 4)
+        r2 = np.array([[0.0, 7000.0, 0.0], [-7000.0, 0.0, 0.0],
+                       [0.0, 7000.0, 0.0], [0.0, 7000.0, 0.0]])
+        tof = np.array([1500.0, 1500.0, 0.0, 1e-9])
+        batch = solve_lambert_batch(r1, r2, tof, mu=MU_EARTH)
+        assert batch.converged.tolist() == [True, False, False, False]
+        assert np.isnan(batch.v1[1:]).all() and np.isnan(batch.v2[1:]).all()
@@ -0,0 +1,98 @@
+"""Launch-window index tests, swept over the analytic Keplerian orbits."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from core.bodies import load_bodies_from_json
+from core.keplerian_ephemeris import KeplerianEphemeris
+from core.lambert import LambertNoConvergence, solve_lambert_izzo
+from core.launch_windows import LaunchWindowIndex, build_launch_window_index
+from core.mission_planner import MissionPlanner
+
+EPOCH_JD: float = 2462502.5   # 2030-01-01
+DAY: float = 86400.0
+YEARS: float = 10.0
+EARTH_MARS_SYNODIC_DAYS: float = 779.9
+
+
+@pytest.fixture(scope="module")
+def planner() -> MissionPlanner:
+    return MissionPlanner(ephemeris=KeplerianEphemeris(epoch_jd=EPOCH_JD),
+                          lambert_solver=solve_lambert_izzo)
+
+
+@pytest.fixture(scope="module")
+def index(planner: MissionPlanner) -> LaunchWindowIndex:
+    return build_launch_window_index(planner, EPOCH_JD, load_bodies_from_json(),
+                                     [("Earth", "Mars"), ("Mars", "Earth")],
+                                     EPOCH_JD, EPOCH_JD + YEARS * 365.25,
+                                     source="KeplerianEphemeris")
+
+
+class TestSweep:
+    def test_one_cheap_window_per_synodic_period(self, index: LaunchWindowIndex) -> None:
+        cheap = [window.departure_jd for window in index.windows("Earth", "Mars")
+                 if window.total_delta_v < 6.9]
+        assert len(cheap) == pytest.approx(YEARS * 365.25 / EARTH_MARS_SYNODIC_DAYS, abs=1)
+        assert np.diff(cheap) == pytest.approx(EARTH_MARS_SYNODIC_DAYS, abs=80.0)
+
+    def test_windows_are_sorted_and_in_range(self, index: LaunchWindowIndex) -> None:
+        for origin, target in index.pairs():
+            departures = [window.departure_jd for window in index.windows(origin, target)]
+            assert departures == sorted(departures)
+            assert EPOCH_JD < departures[0] and departures[-1] < EPOCH_JD + YEARS * 365.25
+
+    def test_date_range_query(self, index: LaunchWindowIndex) -> None:
+        every = index.windows("Earth", "Mars")
+        middle = index.windows("Earth", "Mars", every[2].departure_jd, every[5].departure_jd)
+        assert middle == every[2:5]
+        assert index.windows("Earth", "Venus") == []
+
+    def test_save_and_load(self, index: LaunchWindowIndex, tmp_path: Path) -> None:
+        path = str(tmp_path / "windows.npz")
+        index.save(path)
+        loaded = LaunchWindowIndex.load(path)
+        assert loaded.source == "KeplerianEphemeris"
+        assert loaded.pairs() == index.pairs()
+        for origin, target in index.pairs():
+            for saved, original in zip(loaded.windows(origin, target),
+                                       index.windows(origin, target), strict=True):
+                assert saved.departure_jd == original.departure_jd
+                assert saved.time_of_flight == pytest.approx(original.time_of_flight, abs=60.0)
+                assert saved.total_delta_v == pytest.approx(original.total_delta_v, rel=1e-6)
+                assert saved.departure_step == original.departure_step
+        assert LaunchWindowIndex.load_if_present(str(tmp_path / "missing.npz")) is None
+
+
+class TestPlanFromIndex:
+    def test_matches_a_refined_grid_search(self, planner: MissionPlanner,
+                                           index: LaunchWindowIndex) -> None:
+        bodies = load_bodies_from_json()
+        for after_days in (100.0, 900.0, 2000.0):
+            after: float = after_days * DAY
+            departures, flights = planner.transfer_grid("Earth", "Mars", after, bodies)
+            searched = planner.plan_transfer("Earth", "Mars", departures, flights, refine=3)
+            indexed = planner.plan_from_index(index, EPOCH_JD, "Earth", "Mars", after,
+                                              within=departures[-1] - departures[0])
+            assert indexed.departure_time >= after
+            assert indexed.total_delta_v == pytest.approx(searched.total_delta_v, rel=0.01)
+
+    def test_earliest_window_within_a_budget(self, planner: MissionPlanner,
+                                             index: LaunchWindowIndex) -> None:
+        cheapest = planner.plan_from_index(index, EPOCH_JD, "Mars", "Earth", after=0.0)
+        earliest = planner.plan_from_index(index, EPOCH_JD, "Mars", "Earth", after=0.0,
+                                           max_delta_v_km_s=10.0)
+        assert earliest.total_delta_v <= 10.0
+        assert earliest.departure_time <= cheapest.departure_time
+
+    def test_no_window_in_span_raises(self, planner: MissionPlanner,
+                                      index: LaunchWindowIndex) -> None:
+        with pytest.raises(LambertNoConvergence):
+            planner.plan_from_index(index, EPOCH_JD, "Earth", "Mars",
+                                    after=(YEARS + 1.0) * 365.25 * DAY)
+        with pytest.raises(LambertNoConvergence):
+            planner.plan_from_index(index, EPOCH_JD, "Earth", "Venus", after=0.0)
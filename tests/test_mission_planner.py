@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass
 from math import cos, pi, sin, sqrt
 
+import numpy as np
 import pytest
 
 from core.flight_plan import (
@@ -10,7 +12,13 @@ from core.flight_plan import (
     OrbitInsertionInstruction,
     VectorBurnInstruction,
 )
-from core.lambert import MU_SUN, LambertNoConvergence
+from core.lambert import (
+    MU_SUN,
+    LambertNoConvergence,
+    LambertSolution,
+    solve_lambert,
+    solve_lambert_izzo,
+)
 from core.mission_planner import MissionPlanner, Objective, TransferSolution
 from core.vec3 import Vec3
 
@@ -64,6 +72,20 @@ def planner() -> MissionPlanner:
     return MissionPlanner(ephemeris=ephemeris)
 
 
+class BatchCircularEphemeris(CircularEphemeris):
+    """CircularEphemeris with the vectorized `states` query."""
+
+    def states(self, bodies: list[str], times_s) -> tuple:
+        positions = np.zeros((len(bodies), len(times_s), 3))
+        velocities = np.zeros_like(positions)
+        for i, body in enumerate(bodies):
+            for j, time_s in enumerate(times_s):
+                position, velocity = self.state(body, float(time_s))
+                positions[i, j] = position.as_tuple()
+                velocities[i, j] = velocity.as_tuple()
+        return positions, velocities
+
+
 class TestEvaluateTransfer:
     def test_returns_solution_for_feasible_transfer(self, planner: MissionPlanner) -> None:
         solution = planner.evaluate_transfer(origin="Earth", target="Mars",
@@ -250,3 +272,163 @@ class TestCaptureRadius:
         heavy = planner.capture_radius("Mars", sim_time_s=0.0, bodies=bodies_heavy)
         assert heavy > light
         assert heavy / light == pytest.approx(10.0 ** 0.4, rel=1e-9)
+
+
+class TestBatchEphemeris:
+    def test_grid_matches_scalar_path(self) -> None:
+        orbits = {"Earth": (EARTH_ORBIT_RADIUS, 0.0), "Mars": (MARS_ORBIT_RADIUS, pi / 4.0)}
+        scalar = MissionPlanner(ephemeris=CircularEphemeris(orbits=orbits))
+        batch = MissionPlanner(ephemeris=BatchCircularEphemeris(orbits=orbits))
+        departures = [i * 30.0 * DAY for i in range(6)]
+        flights = [(150.0 + i * 50.0) * DAY for i in range(5)]
+        expected = scalar.porkchop("Earth", "Mars", departures, flights)
+        actual = batch.porkchop("Earth", "Mars", departures, flights)
+        assert [p.total_delta_v for p in actual] == [p.total_delta_v for p in expected]
+        best = batch.plan_transfer("Earth", "Mars", departures, flights)
+        assert best == scalar.plan_transfer("Earth", "Mars", departures, flights)
+
+
+class TestApproximateEphemeris:
+    def test_porkchop_reads_the_approximate_source(self) -> None:
+        exact = CircularEphemeris(orbits={"Earth": (EARTH_ORBIT_RADIUS, 0.0),
+                                          "Mars": (MARS_ORBIT_RADIUS, pi / 4.0)})
+        shifted = CircularEphemeris(orbits={"Earth": (EARTH_ORBIT_RADIUS, 0.0),
+                                            "Mars": (MARS_ORBIT_RADIUS, pi / 4.0 + 0.01)})
+        planner = MissionPlanner(ephemeris=exact, approximate_ephemeris=shifted)
+        departures = [i * 30.0 * DAY for i in range(4)]
+        flights = [(200.0 + i * 50.0) * DAY for i in range(3)]
+        approximate = planner.porkchop("Earth", "Mars", departures, flights, approximate=True)
+        expected = MissionPlanner(ephemeris=shifted).porkchop("Earth", "Mars", departures, flights)
+        assert [p.total_delta_v for p in approximate] == [p.total_delta_v for p in expected]
+        assert approximate != planner.porkchop("Earth", "Mars", departures, flights)
+
+    def test_approximate_requires_a_source(self, planner: MissionPlanner) -> None:
+        with pytest.raises(ValueError):
+            planner.porkchop("Earth", "Mars", [0.0], [200.0 * DAY], approximate=True)
+
+
+class TestLambertSolverChoice:
+    def test_izzo_planner_finds_the_same_transfer(self, planner: MissionPlanner) -> None:
+        universal = MissionPlanner(ephemeris=planner.ephemeris, vectorized_grid=False)
+        izzo = MissionPlanner(ephemeris=planner.ephemeris, lambert_solver=solve_lambert_izzo,
+                              vectorized_grid=False)
+        departures = [i * 20.0 * DAY for i in range(40)]
+        flights = [(150.0 + i * 20.0) * DAY for i in range(11)]
+        expected = universal.plan_transfer("Earth", "Mars", departures, flights,
+                                           objective=Objective.MIN_DELTA_V)
+        best = izzo.plan_transfer("Earth", "Mars", departures, flights,
+                                  objective=Objective.MIN_DELTA_V)
+        assert (best.departure_time, best.time_of_flight) == (expected.departure_time,
+                                                              expected.time_of_flight)
+        assert best.total_delta_v == pytest.approx(expected.total_delta_v, rel=1e-9)
+
+
+class TestVectorizedGrid:
+    def test_matches_cell_by_cell(self, planner: MissionPlanner) -> None:
+        cell_by_cell = MissionPlanner(ephemeris=planner.ephemeris, vectorized_grid=False)
+        departures = [i * 15.0 * DAY for i in range(30)]
+        flights = [(60.0 + i * 15.0) * DAY for i in range(20)]
+        expected = cell_by_cell.porkchop("Earth", "Mars", departures, flights)
+        actual = planner.porkchop("Earth", "Mars", departures, flights)
+        assert [(p.departure_time, p.time_of_flight) for p in actual] == \
+            [(p.departure_time, p.time_of_flight) for p in expected]
+        for point, reference in zip(actual, expected):
+            if reference.total_delta_v is not None:
+                assert point.total_delta_v == pytest.approx(reference.total_delta_v, rel=1e-8)
+        for objective, budget in ((Objective.MIN_DELTA_V, None), (Objective.MIN_TIME, 12.0)):
+            best = planner.plan_transfer("Earth", "Mars", departures, flights,
+                                         objective=objective, delta_v_budget_km_s=budget)
+            reference = cell_by_cell.plan_transfer("Earth", "Mars", departures, flights,
+                                                   objective=objective,
+                                                   delta_v_budget_km_s=budget)
+            assert (best.departure_time, best.time_of_flight) == (reference.departure_time,
+                                                                  reference.time_of_flight)
+            assert (best.departure_delta_v - reference.departure_delta_v).magnitude() < 1e-8
+
+    def test_infeasible_cells_are_none(self, planner: MissionPlanner) -> None:
+        grid = planner.porkchop("Earth", "Mars", [0.0], [60.0, 250.0 * DAY])
+        assert grid[0].total_delta_v is None
+        assert grid[1].total_delta_v is not None
+
+
+class TestParallelGrid:
+    DEPARTURES: list[float] = [i * 7.0 * DAY for i in range(25)]
+    FLIGHTS: list[float] = [(100.0 + i * 20.0) * DAY for i in range(12)]
+
+    def test_bands_merge_to_the_single_process_grid(self, planner: MissionPlanner) -> None:
+        expected = planner.porkchop("Earth", "Mars", self.DEPARTURES, self.FLIGHTS)
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            banded = planner.porkchop("Earth", "Mars", self.DEPARTURES, self.FLIGHTS,
+                                      executor=pool, workers=4)
+        assert banded == expected
+
+    def test_worker_processes(self, planner: MissionPlanner) -> None:
+        expected = planner.plan_transfer("Earth", "Mars", self.DEPARTURES, self.FLIGHTS)
+        assert planner.plan_transfer("Earth", "Mars", self.DEPARTURES, self.FLIGHTS,
+                                     workers=2) == expected
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            grid = planner.porkchop("Earth", "Mars", self.DEPARTURES, self.FLIGHTS,
+                                    executor=pool)
+        assert grid == planner.porkchop("Earth", "Mars", self.DEPARTURES, self.FLIGHTS)
+
+    def test_cell_by_cell_planner_parallelizes_too(self) -> None:
+        planner = MissionPlanner(ephemeris=CircularEphemeris(orbits={
+            "Earth": (EARTH_ORBIT_RADIUS, 0.0), "Mars": (MARS_ORBIT_RADIUS, pi / 4.0)}),
+            vectorized_grid=False)
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            banded = planner.porkchop("Earth", "Mars", self.DEPARTURES, self.FLIGHTS,
+                                      executor=pool, workers=3)
+        assert banded == planner.porkchop("Earth", "Mars", self.DEPARTURES, self.FLIGHTS)
+
+
+class TestRefinement:
+    DEPARTURES: list[float] = [i * 20.0 * DAY for i in range(40)]
+    FLIGHTS: list[float] = [(150.0 + i * 20.0) * DAY for i in range(11)]
+
+    @staticmethod
+    def counting_planner() -> tuple[MissionPlanner, list[int]]:
+        calls: list[int] = [0]
+
+        def counting_solver(r1: Vec3, r2: Vec3, time_of_flight: float, mu: float = MU_SUN,
+                            prograde: bool = True) -> LambertSolution:
+            calls[0] += 1
+            return solve_lambert(r1=r1, r2=r2, time_of_flight=time_of_flight, mu=mu,
+                                 prograde=prograde)
+
+        ephemeris = CircularEphemeris(orbits={"Earth": (EARTH_ORBIT_RADIUS, 0.0),
+                                              "Mars": (MARS_ORBIT_RADIUS, pi / 4.0)})
+        return MissionPlanner(ephemeris=ephemeris, lambert_solver=counting_solver), calls
+
+    def test_polishes_a_coarse_grid_to_hohmann(self) -> None:
+        planner, calls = self.counting_planner()
+        expected_dv, expected_tof = hohmann_expectations()
+        coarse = planner.plan_transfer("Earth", "Mars", self.DEPARTURES, self.FLIGHTS)
+        refined = planner.plan_transfer("Earth", "Mars", self.DEPARTURES, self.FLIGHTS,
+                                        refine=3)
+        assert refined.total_delta_v < coarse.total_delta_v
+        assert refined.total_delta_v == pytest.approx(expected_dv, rel=1e-4)
+        assert refined.time_of_flight == pytest.approx(expected_tof, abs=0.5 * DAY)
+        # Far fewer Lambert solves than even the coarse grid has cells.
+        assert calls[0] < len(self.DEPARTURES) * len(self.FLIGHTS) / 2
+
+    def test_min_time_stays_within_budget_and_window(self) -> None:
+        planner, _ = self.counting_planner()
+        budget: float = hohmann_expectations()[0] * 1.3
+        coarse = planner.plan_transfer("Earth", "Mars", self.DEPARTURES, self.FLIGHTS,
+                                       objective=Objective.MIN_TIME, delta_v_budget_km_s=budget)
+        refined = planner.plan_transfer("Earth", "Mars", self.DEPARTURES, self.FLIGHTS,
+                                        objective=Objective.MIN_TIME,
+                                        delta_v_budget_km_s=budget, refine=3)
+        assert refined.total_delta_v <= budget
+        assert refined.arrival_time < coarse.arrival_time - DAY
+        assert refined.departure_time >= self.DEPARTURES[0]
+
+    def test_refines_a_transfer_grid(self, planner: MissionPlanner) -> None:
+        bodies = {"Earth": StubOrbitingBody(mass=5.97e24, orbital_period=365.2563),
+                  "Mars": StubOrbitingBody(mass=6.42e23, orbital_period=686.98)}
+        departures, flights = planner.transfer_grid("Earth", "Mars", now=0.0, bodies=bodies)
+        coarse = planner.plan_transfer("Earth", "Mars", departures, flights)
+        refined = planner.plan_transfer("Earth", "Mars", departures, flights, refine=2)
+        assert refined.total_delta_v <= coarse.total_delta_v
+        assert departures[0] <= refined.departure_time <= departures[-1]
+        assert flights[0] <= refined.time_of_flight <= flights[-1]
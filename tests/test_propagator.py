@@ -7,8 +7,14 @@ from dataclasses import dataclass, field
 import pytest
 
 from core.flight_plan import FlightPlan
+from core.integrator import DOP853
 from core.physics import circular_orbit_velocity
-from core.propagator import DEFAULT_DT_MAX, adaptive_dt, advance_coasting
+from core.propagator import (
+    DEFAULT_DT_MAX,
+    adaptive_dt,
+    advance_coasting,
+    advance_coasting_adaptive,
+)
 from core.spaceship import PropulsionSystem, Spaceship
 from core.vec3 import Vec3
 
@@ -31,6 +37,22 @@ class SunOnlyEphemeris:
         return Vec3(), Vec3()
 
 
+class MovingSunEphemeris:
+    """A Sun drifting along +x at a constant 1 km/s."""
+    def state(self, body: str, time_s: float) -> tuple[Vec3, Vec3]:
+        return Vec3(time_s, 0.0, 0.0), Vec3(1.0, 0.0, 0.0)
+
+
+def coasting_ship(radius: float, speed: float, integrator=None, drift: float = 0.0) -> Spaceship:
+    return Spaceship(structure_mass=1000.0, payload_mass=0.0,
+                     main_propulsion=PropulsionSystem(),
+                     initial_position=Vec3(radius, 0.0, 0.0),
+                     initial_velocity=Vec3(drift, speed, 0.0),
+                     flight_plan=FlightPlan(),
+                     integrator=integrator,
+                     max_integration_dt=DEFAULT_DT_MAX)
+
+
 class TestAdaptiveDt:
     def test_far_from_planets_uses_max(self) -> None:
         ship = Stub(position=Vec3(AU, 0.0, 0.0), velocity=Vec3(0.0, 30.0, 0.0))
@@ -87,3 +109,32 @@ class TestAdvanceCoasting:
                          time_s=0.0, dt_s=5.0 * 86400.0, dt_max=3600.0)
         total = sum(snap.time_step for snap in ship.history)
         assert total == pytest.approx(5.0 * 86400.0)
+
+
+class TestAdvanceCoastingAdaptive:
+    def test_circular_orbit_radius_holds(self) -> None:
+        radius = 1.2 * AU
+        ship = coasting_ship(radius, circular_orbit_velocity(SUN_MASS, radius), DOP853(rtol=1e-10))
+        bodies = {"Sun": Stub()}
+        advance_coasting_adaptive(ship, SunOnlyEphemeris(), bodies, time_s=0.0,
+                                  dt_s=200.0 * 86400.0)
+        assert ship.position.magnitude() == pytest.approx(radius, rel=1e-8)
+        assert len(ship.history) == 2           # one recorded coast
+
+    def test_bodies_move_within_the_step(self) -> None:
+        """A Sun drifting at 1 km/s drags a co-moving orbit along with it."""
+        radius = 1.0 * AU
+        speed = circular_orbit_velocity(SUN_MASS, radius)
+        ship = coasting_ship(radius, speed, DOP853(rtol=1e-10), drift=1.0)
+        bodies = {"Sun": Stub()}
+        span = 100.0 * 86400.0
+        advance_coasting_adaptive(ship, MovingSunEphemeris(), bodies, time_s=0.0, dt_s=span)
+        assert bodies["Sun"].position == Vec3(span, 0.0, 0.0)
+        assert (ship.position - bodies["Sun"].position).magnitude() == pytest.approx(radius,
+                                                                                       rel=1e-6)
+
+    def test_needs_an_adaptive_integrator(self) -> None:
+        ship = coasting_ship(AU, 30.0)
+        with pytest.raises(TypeError):
+            advance_coasting_adaptive(ship, SunOnlyEphemeris(), {"Sun": Stub()},
+                                      time_s=0.0, dt_s=86400.0)
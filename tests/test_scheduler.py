@@ -0,0 +1,140 @@
+"""Fair-share scheduler: CPU budgets, partial ticks, weighted round robin."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Iterator
+
+import pytest
+
+from server.scheduler import FairShareScheduler, JobBudget, advance_within
+
+
+def burn(cpu_s: float) -> None:
+    until: float = time.thread_time() + cpu_s
+    while time.thread_time() < until:
+        pass
+
+
+class CostlySession:
+    """Resumable `advance` costing `cpu_per_sim_s` CPU seconds per simulated
+    second, integrated a tenth of a step at a time."""
+
+    def __init__(self, cpu_per_sim_s: float) -> None:
+        self.cpu_per_sim_s: float = cpu_per_sim_s
+        self.sim_time_s: float = 0.0
+        self.owed_s: float = 0.0
+
+    def advance(self, dt_s: float, deadline: float | None = None) -> float:
+        started_at: float = self.sim_time_s
+        self.owed_s += dt_s
+        slice_s: float = abs(dt_s) / 10.0
+        while self.owed_s != 0.0 and (deadline is None or time.monotonic() < deadline):
+            step: float = max(-slice_s, min(self.owed_s, slice_s))
+            burn(self.cpu_per_sim_s * abs(step))
+            self.sim_time_s += step
+            self.owed_s = 0.0 if abs(self.owed_s - step) < 1e-9 else self.owed_s - step
+        return self.sim_time_s - started_at
+
+
+@pytest.fixture
+def scheduler() -> Iterator[FairShareScheduler]:
+    pool = FairShareScheduler(workers=1, cpu_budget_s=0.1, window_s=60.0)
+    yield pool
+    pool.shutdown()
+
+
+def test_ticks_are_served_only_as_far_as_the_budget(scheduler: FairShareScheduler) -> None:
+    session = CostlySession(cpu_per_sim_s=0.01)   # a full 60 s tick costs 0.6 s
+
+    def tick(budget: JobBudget) -> float:
+        return advance_within(session, 60.0, budget, deadline_s=10.0)
+
+    served: float = scheduler.submit("replay", tick).result(timeout=10.0)
+    assert 0.0 < served < 60.0
+    assert session.owed_s == pytest.approx(60.0 - served)
+    usage = scheduler.usage()["replay"]
+    assert usage["cpu_s_in_window"] == pytest.approx(0.1, abs=0.05)
+    assert usage["partial_ticks"] == 1
+    # Out of budget for the rest of the window: the next tick only adds to
+    # what is owed.
+    assert scheduler.submit("replay", tick).result(timeout=10.0) == 0.0
+    assert session.owed_s == pytest.approx(120.0 - served)
+
+
+def test_deadline_bounds_each_tick_and_the_rest_carries_over() -> None:
+    scheduler = FairShareScheduler(workers=1, cpu_budget_s=100.0)
+    session = CostlySession(cpu_per_sim_s=0.001)   # 60 ms per 60 s step
+
+    def tick(budget: JobBudget) -> float:
+        return advance_within(session, 60.0, budget, deadline_s=0.02)
+
+    try:
+        served: list[float] = [scheduler.submit("replay", tick).result(timeout=10.0)
+                               for _ in range(3)]
+    finally:
+        scheduler.shutdown()
+    assert all(0.0 < done < 60.0 for done in served)
+    assert session.sim_time_s + session.owed_s == pytest.approx(180.0)
+
+
+def test_cheap_ticks_advance_in_one_go(scheduler: FairShareScheduler) -> None:
+    session = CostlySession(cpu_per_sim_s=0.0)
+    for _ in range(5):
+        scheduler.submit("parked", lambda budget: advance_within(session, -60.0, budget))
+    scheduler.submit("parked", lambda budget: None).result(timeout=10.0)
+    assert session.sim_time_s == pytest.approx(-300.0)
+    assert scheduler.usage()["parked"]["partial_ticks"] == 0
+
+
+def test_light_sessions_are_not_queued_behind_heavy_ones() -> None:
+    scheduler = FairShareScheduler(workers=1, cpu_budget_s=100.0)
+    finished: list[str] = []
+
+    def job(budget: JobBudget, name: str, cpu_s: float) -> None:
+        burn(cpu_s)
+        finished.append(name)
+
+    try:
+        futures = [scheduler.submit("heavy", job, f"heavy-{k}", 0.05) for k in range(6)]
+        futures.append(scheduler.submit("light", job, "light", 0.0))
+        for future in futures:
+            future.result(timeout=10.0)
+    finally:
+        scheduler.shutdown()
+    assert finished.index("light") <= 2
+    assert finished[-1].startswith("heavy")
+
+
+def test_weights_scale_budgets_and_errors_reach_the_caller(
+        scheduler: FairShareScheduler) -> None:
+    scheduler.set_weight("vip", 3.0)
+
+    def fail(budget: JobBudget) -> None:
+        raise RuntimeError(f"{budget.allowance_s:.1f}")
+
+    with pytest.raises(RuntimeError, match="0.3"):
+        scheduler.submit("vip", fail).result(timeout=10.0)
+    assert scheduler.usage()["vip"]["budget_s"] == pytest.approx(0.3)
+    scheduler.forget("vip")
+    assert "vip" not in scheduler.usage()
+
+
+def test_sessions_forgotten_mid_job_are_dropped_once_idle(
+        scheduler: FairShareScheduler) -> None:
+    started, release = threading.Event(), threading.Event()
+
+    def hold(budget: JobBudget) -> None:
+        started.set()
+        release.wait(timeout=10.0)
+
+    running = scheduler.submit("gone", hold)
+    queued = scheduler.submit("gone", lambda budget: None)
+    started.wait(timeout=10.0)
+    scheduler.forget("gone")
+    assert "gone" in scheduler.usage()   # its jobs still run
+    release.set()
+    running.result(timeout=10.0)
+    queued.result(timeout=10.0)
+    assert "gone" not in scheduler.usage()
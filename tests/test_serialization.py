@@ -0,0 +1,166 @@
+"""State pushes: binary frames carry what JSON does; deltas only what changed."""
+
+from __future__ import annotations
+
+import json
+import struct
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from core.bodies import load_bodies_from_json
+from core.body_snapshots import BodySnapshot
+from core.flight_plan import FlightPlan
+from core.keplerian_ephemeris import KeplerianEphemeris
+from core.propagator import body_states
+from core.vec3 import Vec3
+from server.serialization import (
+    FRAME_MAGIC,
+    FRAME_TRAIL_RESET,
+    FRAME_VECTORS,
+    FRAME_VERSION,
+    StateEncoder,
+    state_frame,
+    state_message,
+)
+
+
+class ParkedSession:
+    """The attributes the serializers read, for a craft parked at Earth."""
+
+    def __init__(self) -> None:
+        self.bodies = load_bodies_from_json()
+        self.move_to(86400.0)
+        self.epoch: datetime = datetime(2030, 1, 1)
+        self.time_step_name: str = "1 day"
+        self.auto_play: bool = True
+        self.play_direction: float = -1.0
+        self.follow_target: str = "Earth"
+        self.home_body: str = "Earth"
+        self.use_test_ship: bool = False
+        self.mission_label: str = ""
+        self.last_notification: str = "Parked."
+        self.owed_s: float = 0.0
+        self.sim_ship: Any = None
+        self.moon_trip: bool = False
+
+    def move_to(self, time_s: float) -> None:
+        self.sim_time_s: float = time_s
+        self.body_snapshot = BodySnapshot(
+            time_s, body_states(KeplerianEphemeris(epoch_jd=2462502.5), self.bodies, time_s))
+        self.body_snapshot.apply_to(self.bodies)
+
+    @property
+    def current_date(self) -> datetime:
+        return self.epoch + timedelta(seconds=self.sim_time_s)
+
+    def ship_position(self) -> Vec3:
+        return self.bodies["Earth"].position + Vec3(8378.0, 0.0, 0.0)
+
+    def ship_velocity(self) -> Vec3:
+        return Vec3(0.0, 7.0, 0.0)
+
+
+def decode(frame: bytes, names: list[str] | None = None) -> tuple[dict, list[str] | None]:
+    """What web/src/session/wireTypes.ts decodeStateFrame does: the frame as
+    a JSON-shaped push, and the body names it carries (or `names`)."""
+    magic, version, flags, count, _, trail_count, tail_bytes, sim_time = struct.unpack_from(
+        "<HBBHHIId", frame)
+    assert (magic, version) == (FRAME_MAGIC, FRAME_VERSION)
+    offset: int = 24
+    vectors: int = count + 1 if flags & FRAME_VECTORS else 0
+    positions = struct.unpack_from(f"<{3 * vectors}d", frame, offset)
+    offset += 24 * vectors
+    velocities = struct.unpack_from(f"<{3 * vectors}f", frame, offset)
+    offset += 12 * vectors
+    trail = struct.unpack_from(f"<{3 * trail_count}f", frame, offset)
+    offset += 12 * trail_count
+    tail = json.loads(frame[offset:offset + tail_bytes]) if tail_bytes else {}
+    assert offset + tail_bytes == len(frame)
+    names = tail.get("bodies", names)
+    message: dict = {"type": "state"}
+    if "date" in tail:
+        assert names is not None   # a full push, or the names from an earlier one
+        message["sim_time_s"] = sim_time
+        message["date"] = tail["date"]
+        message["bodies"] = {name: {"p": list(positions[3 * k:3 * k + 3]),
+                                    "v": list(velocities[3 * k:3 * k + 3])}
+                             for k, name in enumerate(names)}
+    ship: dict = {}
+    if vectors:
+        ship.update(p=list(positions[-3:]), v=list(velocities[-3:]))
+    if trail_count or flags & FRAME_TRAIL_RESET:
+        ship.update(trail_append=[list(trail[3 * k:3 * k + 3]) for k in range(trail_count)],
+                    trail_reset=bool(flags & FRAME_TRAIL_RESET))
+    if ship:
+        message["ship"] = ship
+    for key in ("hud", "plan"):
+        if key in tail:
+            message[key] = tail[key]
+    return message, names
+
+
+def assert_same_push(decoded: dict, expected: dict) -> None:
+    """`decoded` (binary) carries what `expected` (JSON) does, to float32."""
+    assert decoded.keys() == expected.keys()
+    for name, pair in expected.get("bodies", {}).items():
+        assert decoded["bodies"][name]["p"] == pair["p"]    # double precision
+        assert decoded["bodies"][name]["v"] == pytest.approx(pair["v"], rel=1e-6)
+    ship, sent = decoded.get("ship", {}), expected.get("ship", {})
+    assert ship.keys() == sent.keys()
+    if "p" in sent:
+        assert ship["p"] == sent["p"]
+        assert ship["v"] == pytest.approx(sent["v"], rel=1e-6)
+    for point, sent_point in zip(ship.get("trail_append", []), sent.get("trail_append", []),
+                                 strict=True):
+        assert point == pytest.approx(sent_point, rel=1e-6)
+    assert ship.get("trail_reset") == sent.get("trail_reset")
+    for key in ("type", "sim_time_s", "date", "hud", "plan"):
+        assert decoded.get(key) == expected.get(key)
+
+
+def test_full_frame_carries_the_json_message() -> None:
+    session = ParkedSession()
+    trail: list[Vec3] = [Vec3(1.5e8, -2.0e7, 3.0e5), Vec3(1.6e8, -2.1e7, 3.1e5)]
+    decoded, _ = decode(state_frame(session, trail, trail_reset=True))
+    assert_same_push(decoded, state_message(session, trail, trail_reset=True))
+
+
+def test_pushes_carry_only_what_changed() -> None:
+    session = ParkedSession()
+    text, binary = StateEncoder(), StateEncoder(binary=True)
+    names: list[str] | None = None
+
+    def push(trail: list[Vec3] | None = None) -> dict:
+        nonlocal names
+        expected = text.encode_message(session, trail or [])
+        decoded, names = decode(binary.encode_frame(session, trail or []), names)
+        assert_same_push(decoded, expected)
+        return expected
+
+    first = push()
+    assert first.keys() == {"type", "sim_time_s", "date", "bodies", "ship", "hud", "plan"}
+    assert push() == {"type": "state"}   # paused: a heartbeat
+    assert not text.changed and not binary.changed
+    assert len(binary.encode_frame(session, [])) == 24
+
+    session.follow_target = "Mars"
+    assert push() == {"type": "state", "hud": {"following": "Mars"}}
+
+    session.move_to(session.sim_time_s + 3600.0)
+    moved = push([Vec3(1.0, 2.0, 3.0)])
+    assert moved.keys() == {"type", "sim_time_s", "date", "bodies", "ship"}
+    assert moved["ship"]["trail_append"] == [[1.0, 2.0, 3.0]]
+
+    session.mission_label = "Voyager 1"
+    session.sim_ship = SimpleNamespace(flight_plan=FlightPlan())
+    assert push() == {"type": "state", "hud": {"mission_label": "Voyager 1"},
+                      "plan": ["(coasting -- no instructions)"]}
+
+
+def test_full_frame_is_smaller_than_json() -> None:
+    session = ParkedSession()
+    text: bytes = json.dumps(state_message(session, []), separators=(",", ":")).encode()
+    assert len(state_frame(session, [])) < 0.6 * len(text)
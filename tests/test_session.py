@@ -0,0 +1,50 @@
+"""SolaraSession against the real kernel (skipped if not downloaded)."""
+
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+import pytest
+
+_KERNEL_PATH = Path(__file__).parent.parent / "de440t.bsp"
+
+pytestmark = pytest.mark.skipif(not _KERNEL_PATH.exists(), reason="de440t.bsp not downloaded")
+
+YEAR: float = 365.25 * 86400.0
+
+
+@pytest.fixture(scope="module")
+def kernel():
+    from core.kernel import LazyKernel
+    kernel = LazyKernel(str(_KERNEL_PATH))
+    yield kernel
+    kernel.close()
+
+
+def test_long_step_resumes_across_deadlines(kernel) -> None:
+    from server.session import SolaraSession
+    whole = SolaraSession(kernel=kernel)
+    whole.load_mission("Voyager 1")
+    whole.advance(YEAR)
+
+    sliced = SolaraSession(kernel=kernel)
+    sliced.load_mission("Voyager 1")
+    done: float = sliced.advance(YEAR, deadline=time.monotonic() + 0.01)
+    assert 0.0 < done < YEAR
+    assert sliced.owed_s == pytest.approx(YEAR - done)
+    while sliced.owed_s > 0.0:
+        sliced.advance(0.0, deadline=time.monotonic() + 0.01)
+    assert sliced.sim_time_s == pytest.approx(whole.sim_time_s)
+    assert sliced.sim_ship is not None and whole.sim_ship is not None
+    assert (sliced.sim_ship.position - whole.sim_ship.position).magnitude() < 1e-3
+
+
+def test_pausing_forgives_owed_time(kernel) -> None:
+    from server.session import SolaraSession
+    session = SolaraSession(kernel=kernel)
+    session.load_mission("Voyager 1")
+    session.advance(YEAR, deadline=time.monotonic())
+    assert session.owed_s == pytest.approx(YEAR)
+    session.set_play(False)
+    assert session.owed_s == 0.0
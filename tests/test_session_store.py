@@ -0,0 +1,280 @@
+"""Session stores: compact round trips, and several worker processes sharing
+one SQLite store."""
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import threading
+import zlib
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pytest
+
+from server import clock, session_manager
+from server.serialization import plan_lines
+from server.session import SolaraSession
+from server.session_store import (
+    MemorySessionStore,
+    SqliteSessionStore,
+    dump_session,
+    load_session,
+)
+
+DAY: float = 86400.0
+
+
+class CircularSegment:
+    """Stand-in SPK segment: a circular orbit about the segment's center."""
+
+    def __init__(self, target: int) -> None:
+        self.radius_km: float = 1.0e5 * (target % 1000 + 1)
+        self.rate: float = 2.0 * np.pi / (30.0 + target % 97)   # radians per day
+
+    def compute_and_differentiate(self, tdb: Any) -> tuple:
+        angle = self.rate * np.asarray(tdb, dtype=float)
+        position = self.radius_km * np.array([np.cos(angle), np.sin(angle), 0.0 * angle])
+        velocity = self.radius_km * self.rate * np.array(
+            [-np.sin(angle), np.cos(angle), 0.0 * angle])
+        return position, velocity
+
+
+class CircularKernel:
+    """Stand-in for the SPK kernel, so sessions run without de440t.bsp."""
+
+    def __getitem__(self, key: tuple[int, int]) -> CircularSegment:
+        return CircularSegment(key[1])
+
+
+@pytest.fixture
+def sqlite_manager(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> SqliteSessionStore:
+    store = SqliteSessionStore(str(tmp_path / "sessions.db"))
+    use_store(monkeypatch, store)
+    return store
+
+
+def get_session(session_id: str) -> SolaraSession | None:
+    return asyncio.run(session_manager.get_session(session_id))
+
+
+def live_session(session_id: str) -> SolaraSession:
+    session = get_session(session_id)
+    assert session is not None, session_id
+    return session
+
+
+def use_store(monkeypatch: pytest.MonkeyPatch, store: Any) -> None:
+    monkeypatch.setattr(session_manager, "_sessions", {})
+    monkeypatch.setattr(session_manager, "_last_seen", {})
+    monkeypatch.setattr(session_manager, "_stored_seen", {})
+    monkeypatch.setattr(session_manager, "_hibernating", set())
+    monkeypatch.setattr(session_manager, "_last_expired", 0.0)
+    monkeypatch.setattr(session_manager, "_kernel", CircularKernel())
+    monkeypatch.setattr(session_manager, "_store", store)
+
+
+def test_a_flying_session_round_trips() -> None:
+    session = SolaraSession(kernel=CircularKernel())
+    session.load_mission("Voyager 1")
+    session.advance(30.0 * DAY)
+    state: bytes = dump_session(session)
+
+    revived = load_session(state, kernel=CircularKernel())
+    assert revived.sim_ship is not None and session.sim_ship is not None
+    assert revived.session_id == session.session_id
+    assert revived.sim_time_s == session.sim_time_s
+    assert revived.sim_ship.position == session.sim_ship.position
+    assert revived.trail.points == session.trail.points
+    assert revived.body_snapshot.states == session.body_snapshot.states
+    # Compact: the shared kernel, caches and Hermite tables stay behind,
+    # and the float-heavy rest compresses.
+    assert len(state) < 0.5 * len(zlib.decompress(state))
+    assert len(state) < 32_000
+    revived.advance(DAY)
+    session.advance(DAY)
+    assert revived.sim_ship.position == session.sim_ship.position
+
+
+def test_mission_bodies_stay_the_sessions_own() -> None:
+    session = SolaraSession(kernel=CircularKernel())
+    session.fly_to("Mars")
+    revived = load_session(dump_session(session), kernel=CircularKernel())
+    for name, body in revived.mission_gravity_bodies.items():
+        assert body is revived.bodies[name]
+
+
+def test_memory_store_keeps_nothing_outside_the_worker(monkeypatch: pytest.MonkeyPatch) -> None:
+    use_store(monkeypatch, MemorySessionStore())
+    session = session_manager.create_session()
+    assert get_session(session.session_id) is session
+    session_manager._forget(session.session_id)
+    assert get_session(session.session_id) is None
+
+
+def test_shared_store_hands_sessions_between_workers(sqlite_manager: SqliteSessionStore) -> None:
+    created = session_manager.create_session()
+    # Not kept by the creating worker: the one its id routes to loads it.
+    assert created.session_id not in session_manager._sessions
+    loaded = get_session(created.session_id)
+    assert loaded is not None and loaded is not created
+    loaded.set_time_step(3)
+    loaded.advance(loaded.time_step_s)
+    session_manager.save_all()
+    session_manager._forget(created.session_id)
+
+    again = live_session(created.session_id)
+    assert (again.time_step_index, again.sim_time_s) == (3, loaded.sim_time_s)
+    assert sqlite_manager.stats()["stored"] == 1
+    asyncio.run(session_manager.drop_session(created.session_id))
+    assert get_session(created.session_id) is None
+
+
+def test_creating_sessions_sweeps_the_store_at_most_once_an_interval(
+        sqlite_manager: SqliteSessionStore, monkeypatch: pytest.MonkeyPatch) -> None:
+    sweeps: list[float] = []
+    expire = sqlite_manager.expire
+
+    def counting_expire(seen_before: float, keep: int) -> list[str]:
+        sweeps.append(seen_before)
+        return expire(seen_before, keep)
+
+    monkeypatch.setattr(sqlite_manager, "expire", counting_expire)
+    for _ in range(3):
+        session_manager.create_session()
+    assert len(sweeps) == 1
+    monkeypatch.setattr(session_manager, "_last_expired",
+                        session_manager._last_expired - session_manager.STORE_EXPIRE_INTERVAL_S)
+    session_manager.create_session()
+    assert len(sweeps) == 2
+    assert sqlite_manager.stats()["stored"] == 4
+
+
+def test_idle_and_excess_sessions_hibernate_to_the_store(sqlite_manager: SqliteSessionStore,
+                                                         monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(session_manager, "MAX_SESSIONS", 2)
+    session_ids: list[str] = [session_manager.create_session().session_id for _ in range(4)]
+    flying = live_session(session_ids[0])
+    flying.load_mission("Voyager 1")
+    flying.advance(30.0 * DAY)
+    streamed: str = session_ids[1]
+    monkeypatch.setattr(clock, "attached", lambda session_id: session_id == streamed)
+    get_session(streamed)
+
+    # At the cap the least recently seen quiet session goes to disk, not
+    # the older one a socket is streaming.
+    get_session(session_ids[2])
+    assert set(session_manager._sessions) == {streamed, session_ids[2]}
+    revived = live_session(session_ids[0])
+    assert revived is not flying
+    assert revived.sim_ship is not None and flying.sim_ship is not None
+    assert revived.sim_time_s == flying.sim_time_s
+    assert revived.sim_ship.history == flying.sim_ship.history
+    assert revived.sim_ship.flight_plan.current_index == flying.sim_ship.flight_plan.current_index
+    assert revived.trail.points == flying.trail.points
+    assert plan_lines(revived) == plan_lines(flying)
+    assert revived.mission_label == flying.mission_label
+
+    # Sessions unseen for MAX_IDLE_SECONDS are hibernated too, unless a
+    # socket is still streaming one.
+    for session_id in session_manager._last_seen:
+        session_manager._last_seen[session_id] -= session_manager.MAX_IDLE_SECONDS + 1.0
+    get_session(session_ids[3])
+    assert set(session_manager._sessions) == {streamed, session_ids[3]}
+    assert not session_manager._hibernating
+    assert sqlite_manager.stats()["stored"] == 4
+
+
+def test_hibernating_leaves_the_event_loop_free(sqlite_manager: SqliteSessionStore,
+                                               monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(session_manager, "MAX_SESSIONS", 1)
+    first, second = (session_manager.create_session().session_id for _ in range(2))
+    busy = live_session(first)
+    busy.lock.acquire()   # a long job on the pool holds it
+    threading.Timer(0.3, busy.lock.release).start()
+
+    async def scenario() -> int:
+        ticks: int = 0
+
+        async def ticker() -> None:
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        await session_manager.get_session(second)
+        task.cancel()
+        return ticks
+
+    assert asyncio.run(scenario()) > 10   # the loop kept running while it waited
+    assert set(session_manager._sessions) == {second}
+
+
+def test_sqlite_store_expires_idle_and_excess_sessions(tmp_path: Path) -> None:
+    store = SqliteSessionStore(str(tmp_path / "sessions.db"))
+    for k, seen in enumerate((10.0, 20.0, 30.0, 40.0)):
+        store.save(f"s{k}", b"state", seen)
+    store.touch("s0", 35.0)
+    assert sorted(store.expire(seen_before=15.0, keep=2)) == ["s1", "s2"]
+    assert store.load("s0") == b"state"
+    assert store.load("s1") is None
+    assert store.stats() == {"backend": "sqlite", "stored": 2, "stored_bytes": 10}
+
+
+def _soak_worker(path: str,
+                 worker: int,
+                 workers: int,
+                 session_ids: list[str],
+                 rounds: int,
+                 barrier: Any,
+                 created: Any) -> None:
+    """One uvicorn worker's share of the soak: every round it serves the
+    sessions routed to it (a different set each round, as after restarts),
+    advancing each a day, and creates one of its own."""
+    session_manager.configure(kernel=CircularKernel(), epoch_jd=0.0,
+                              store=SqliteSessionStore(path))
+    for round_index in range(rounds):
+        for k, session_id in enumerate(session_ids):
+            if (k + round_index) % workers != worker:
+                continue
+            session = live_session(session_id)
+            with session.lock:
+                session.advance(DAY)
+        created.append(session_manager.create_session().session_id)
+        session_manager.save_all()
+        for session_id in list(session_manager._sessions):
+            session_manager._forget(session_id)   # handed to another worker
+        barrier.wait(timeout=60.0)
+
+
+def test_workers_soak_against_one_sqlite_store(tmp_path: Path,
+                                               monkeypatch: pytest.MonkeyPatch) -> None:
+    path = str(tmp_path / "sessions.db")
+    store = SqliteSessionStore(path)
+    use_store(monkeypatch, store)
+    session_ids: list[str] = [session_manager.create_session().session_id for _ in range(12)]
+    workers, rounds = 3, 8
+
+    context = multiprocessing.get_context("spawn")
+    with context.Manager() as manager:
+        barrier = manager.Barrier(workers)
+        created = manager.list()
+        processes = [context.Process(target=_soak_worker,
+                                     args=(path, worker, workers, session_ids, rounds,
+                                           barrier, created))
+                     for worker in range(workers)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(timeout=120.0)
+        assert [process.exitcode for process in processes] == [0] * workers
+        created_ids: list[str] = list(created)
+
+    # Every session was advanced once per round, by whichever worker held
+    # it then, and nothing written concurrently was lost.
+    for session_id in session_ids:
+        assert live_session(session_id).sim_time_s == rounds * DAY
+    assert len(set(created_ids)) == workers * rounds
+    assert store.stats()["stored"] == len(session_ids) + workers * rounds
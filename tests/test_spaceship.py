@@ -2,10 +2,18 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 
+import numpy as np
 import pytest
 
 from core.flight_plan import FlightPlan
-from core.physics import circular_orbit_state, circular_orbit_velocity, gravitational_acceleration
+from core.integrator import DOP853
+from core.physics import (
+    G,
+    GravityField,
+    circular_orbit_state,
+    circular_orbit_velocity,
+    gravitational_acceleration,
+)
 from core.spaceship import PropulsionSystem, Spaceship
 from core.vec3 import Vec3
 
@@ -80,6 +88,44 @@ class TestPhysics:
             circular_orbit_state(StubEarth(), altitude_km=418.0, direction="up")
 
 
+class TestGravityField:
+    @staticmethod
+    def system() -> dict[str, StubEarth]:
+        return {"Sun": StubEarth(position=Vec3(-1.5e8, 2.0e6, 0.0), mass=1.989e30, radius=695700.0),
+                "Earth": StubEarth(),
+                "Moon": StubEarth(position=Vec3(3.8e5, 1.0e4, 2.0e4), mass=7.34e22, radius=1737.0)}
+
+    def test_matches_reference(self) -> None:
+        bodies = self.system()
+        field = GravityField(bodies)
+        for point in (Vec3(7000.0, 0.0, 0.0), Vec3(-2.0e5, 3.0e5, 1.0e3), Vec3(3.8e5, 1.2e4, 2.0e4)):
+            expected = gravitational_acceleration(point, bodies)
+            assert (field.acceleration(point) - expected).magnitude() <= 1e-12 * expected.magnitude()
+
+    def test_batch_matches_single_points(self) -> None:
+        field = GravityField(self.system())
+        points = [Vec3(7000.0, 0.0, 0.0), Vec3(-2.0e5, 3.0e5, 1.0e3), Vec3(100.0, 0.0, 0.0)]
+        batch = field.accelerations([point.as_tuple() for point in points])
+        assert batch.shape == (3, 3)
+        for row, point in zip(batch, points):
+            assert np.allclose(row, field.acceleration(point).as_tuple(), rtol=1e-12, atol=0.0)
+
+    def test_inside_radius_is_excluded(self) -> None:
+        field = GravityField({"Earth": StubEarth()})
+        assert field.acceleration(Vec3(100.0, 0.0, 0.0)) == Vec3()
+        assert (field.accelerations([[0.0, 0.0, 0.0], [100.0, 0.0, 0.0]]) == 0.0).all()
+
+    def test_update_positions_follows_bodies(self) -> None:
+        bodies = self.system()
+        field = GravityField(bodies)
+        bodies["Earth"].position = Vec3(1.0e4, 0.0, 0.0)
+        field.update_positions(bodies)
+        point = Vec3(2.0e4, 5.0e3, 0.0)
+        expected = gravitational_acceleration(point, bodies)
+        assert (field.acceleration(point) - expected).magnitude() <= 1e-12 * expected.magnitude()
+        assert field.positions[1].tolist() == [1.0e4, 0.0, 0.0]
+
+
 # ----------------------------------------------------------------------
 # Orbital coasting: the integration sanity check
 # ----------------------------------------------------------------------
@@ -94,6 +140,7 @@ class TestOrbitalCoast:
         earth = StubEarth()
         bodies = {"Earth": earth}
         ship = make_ship(earth=earth)
+        ship.analytic_coast_tolerance = None   # integrate, don't jump the two-body arc
         initial_radius = (ship.position - earth.position).magnitude()
 
         for _ in range(556):
@@ -112,6 +159,79 @@ class TestOrbitalCoast:
         assert ship.main_propulsion.fuel_mass == fuel_before
 
 
+class TestAnalyticCoast:
+    """A coast dominated by one body is jumped as an exact Kepler arc."""
+
+    MOON_MASS: float = 7.35e22   # kg
+
+    def test_isolated_orbit_closes_in_one_step(self) -> None:
+        earth = StubEarth()
+        ship = make_ship(earth=earth)
+        start = ship.position
+        radius = start.magnitude()
+        mu = G * EARTH_MASS * 1e-9
+        period = 2.0 * np.pi * np.sqrt(radius**3 / mu)
+        ship.step_forward(dt=3.0 * period, bodies={"Earth": earth})
+        assert (ship.position - start).magnitude() < 1e-3
+        assert ship.acceleration.magnitude() == pytest.approx(mu / radius**2, rel=1e-9)
+
+    def test_matches_integration_with_distant_perturber(self) -> None:
+        earth = StubEarth()
+        bodies = {"Earth": earth,
+                  "Moon": StubEarth(position=Vec3(0.0, -3.8e6, 0.0),
+                                    mass=self.MOON_MASS, radius=1737.0)}
+        jumped, integrated = make_ship(earth=earth), make_ship(earth=earth)
+        integrated.analytic_coast_tolerance = None
+        integrated.integrator = DOP853(rtol=1e-12)
+        for _ in range(20):
+            jumped.step_forward(dt=600.0, bodies=bodies)
+            integrated.step_forward(dt=600.0, bodies=bodies)
+        assert (jumped.position - integrated.position).magnitude() < 0.05   # km
+
+    def test_integrates_near_perturber(self) -> None:
+        earth = StubEarth()
+        bodies = {"Earth": earth,
+                  "Moon": StubEarth(position=Vec3(0.0, -3.8e5, 0.0),
+                                    mass=self.MOON_MASS, radius=1737.0)}
+        jumped, integrated = make_ship(earth=earth), make_ship(earth=earth)
+        integrated.analytic_coast_tolerance = None
+        jumped.step_forward(dt=600.0, bodies=bodies)
+        integrated.step_forward(dt=600.0, bodies=bodies)
+        assert jumped.position == integrated.position
+
+    def test_unsolvable_hyperbolic_coast_is_integrated(self) -> None:
+        # A fast escape jumped over years: the universal-anomaly solve gives
+        # up, and the step falls back to integration instead of failing.
+        sun = StubEarth(mass=1.989e30, radius=696000.0)
+        radius = 0.895 * 1.495978707e8
+        speed = 1.49 * np.sqrt(2.0 * G * sun.mass * 1e-9 / radius)
+        jumped, integrated = [
+            Spaceship(structure_mass=2000.0, payload_mass=500.0,
+                      main_propulsion=PropulsionSystem(max_thrust=100000.0,
+                                                       specific_impulse=300.0,
+                                                       exhaust_velocity=4500.0,
+                                                       fuel_mass=0.0),
+                      initial_position=Vec3(radius, 0.0, 0.0),
+                      initial_velocity=Vec3(0.0, speed, 0.0),
+                      max_integration_dt=5.5e6)
+            for _ in range(2)]
+        integrated.analytic_coast_tolerance = None
+        for ship in (jumped, integrated):
+            ship.step_forward(dt=5.5e8, bodies={"Sun": sun})
+        assert jumped.position == integrated.position
+        assert jumped.position.magnitude() > 100.0 * radius
+
+    def test_burn_is_integrated(self) -> None:
+        earth = StubEarth()
+        plan = FlightPlan().add_coast(duration=600.0).add_speed_up(throttle=1.0, duration=10.0)
+        jumped = make_ship(flight_plan=plan, earth=earth)
+        jumped.step_forward(dt=600.0, bodies={"Earth": earth})
+        assert plan.coast_time_remaining() == 0.0
+        fuel_before = jumped.main_propulsion.fuel_mass
+        jumped.step_forward(dt=10.0, bodies={"Earth": earth})
+        assert jumped.main_propulsion.fuel_mass < fuel_before
+
+
 # ----------------------------------------------------------------------
 # Thrust, fuel and staging
 # ----------------------------------------------------------------------
@@ -0,0 +1,62 @@
+"""Shared ephemeris state cache tests."""
+
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from core.state_cache import StateCache
+from core.vec3 import Vec3
+
+STATE: tuple[Vec3, Vec3] = (Vec3(1.0, 2.0, 3.0), Vec3(0.1, 0.2, 0.3))
+
+
+class TestLru:
+    def test_miss_then_hit(self) -> None:
+        cache = StateCache(max_entries=4)
+        assert cache.get(("Earth", "Sun", 2460000.5)) is None
+        cache.put(("Earth", "Sun", 2460000.5), STATE)
+        assert cache.get(("Earth", "Sun", 2460000.5)) == STATE
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert cache.stats()["hit_rate"] == pytest.approx(0.5)
+
+    def test_evicts_least_recently_used(self) -> None:
+        cache = StateCache(max_entries=2)
+        cache.put("a", STATE)
+        cache.put("b", STATE)
+        cache.get("a")            # "b" is now the oldest
+        cache.put("c", STATE)
+        assert len(cache) == 2
+        assert cache.get("b") is None
+        assert cache.get("a") == STATE
+
+    def test_clear_resets_counters(self) -> None:
+        cache = StateCache()
+        cache.put("a", STATE)
+        cache.get("a")
+        cache.clear()
+        assert cache.stats() == {"entries": 0, "max_entries": cache.max_entries,
+                                 "hits": 0, "misses": 0, "hit_rate": 0.0}
+
+    def test_rejects_empty_capacity(self) -> None:
+        with pytest.raises(ValueError):
+            StateCache(max_entries=0)
+
+
+def test_concurrent_access_keeps_bound_and_counts() -> None:
+    cache = StateCache(max_entries=50)
+
+    def worker(offset: int) -> None:
+        for i in range(500):
+            key = (offset + i) % 80
+            if cache.get(key) is None:
+                cache.put(key, STATE)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(cache) <= 50
+    assert cache.hits + cache.misses == 8 * 500
@@ -0,0 +1,167 @@
+"""Shared transfer / Lambert memo tests."""
+
+from __future__ import annotations
+
+import pickle
+from math import pi
+
+import pytest
+
+from core.lambert import LambertNoConvergence, LambertSolution, solve_lambert_izzo
+from core.mission_planner import MissionPlanner
+from core.transfer_cache import TransferCache
+from core.vec3 import Vec3
+from tests.test_mission_planner import (
+    AU,
+    DAY,
+    EARTH_ORBIT_RADIUS,
+    MARS_ORBIT_RADIUS,
+    CircularEphemeris,
+    StubOrbitingBody,
+)
+
+EPOCH_JD: float = 2462502.5
+
+
+class CountingSolver:
+    """solve_lambert_izzo, counting calls."""
+
+    def __init__(self) -> None:
+        self.calls: int = 0
+
+    def __call__(self, r1: Vec3, r2: Vec3, time_of_flight: float, mu: float = 0.0,
+                 prograde: bool = True) -> LambertSolution:
+        self.calls += 1
+        return solve_lambert_izzo(r1=r1, r2=r2, time_of_flight=time_of_flight, mu=mu,
+                                  prograde=prograde)
+
+
+def planner_at(epoch_jd: float, cache: TransferCache, solver: CountingSolver) -> MissionPlanner:
+    """A planner whose time zero is `epoch_jd`, with Mars placed to match."""
+    shift: float = (epoch_jd - EPOCH_JD) * DAY
+    orbits = {"Earth": (EARTH_ORBIT_RADIUS, 0.0), "Mars": (MARS_ORBIT_RADIUS, pi / 4.0)}
+    ephemeris = CircularEphemeris(orbits=orbits)
+    shifted = CircularEphemeris(orbits=orbits)
+    shifted.state = lambda body, time_s: ephemeris.state(body, time_s + shift)  # type: ignore
+    return MissionPlanner(ephemeris=shifted, lambert_solver=solver,
+                          transfer_cache=cache, epoch_jd=epoch_jd)
+
+
+class TestLru:
+    def test_counts_and_evicts(self) -> None:
+        cache = TransferCache(max_entries=2)
+        assert cache.get("a") is None
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1          # "b" is now the oldest
+        cache.put("c", 3)
+        assert cache.get("b", "missing") == "missing"
+        assert cache.stats() == {"entries": 2, "max_entries": 2, "hits": 1, "misses": 2,
+                                 "hit_rate": pytest.approx(1.0 / 3.0)}
+
+    def test_rejects_bad_configuration(self) -> None:
+        with pytest.raises(ValueError):
+            TransferCache(max_entries=0)
+        with pytest.raises(ValueError):
+            TransferCache(time_quantum_s=0.0)
+
+    def test_pickles_empty(self) -> None:
+        cache = TransferCache(max_entries=8, time_quantum_s=30.0)
+        cache.put("a", 1)
+        copy = pickle.loads(pickle.dumps(cache))
+        assert (copy.max_entries, copy.time_quantum_s, len(copy)) == (8, 30.0, 0)
+
+
+class TestLambert:
+    R1: Vec3 = Vec3(AU, 0.0, 0.0)
+    R2: Vec3 = Vec3(0.0, 1.5 * AU, 0.0)
+
+    def test_nearby_problems_share_one_snapped_solve(self) -> None:
+        cache = TransferCache()
+        solver = CountingSolver()
+        cached = cache.lambert_solver(solver)
+        first = cached(r1=self.R1, r2=self.R2, time_of_flight=200.0 * DAY)
+        second = cached(r1=self.R1 + Vec3(0.3, -0.2, 0.0), r2=self.R2,
+                        time_of_flight=200.0 * DAY + 20.0)
+        assert second is first
+        assert solver.calls == 1
+        snapped = solve_lambert_izzo(r1=Vec3(float(round(AU)), 0.0, 0.0),
+                                     r2=Vec3(0.0, float(round(1.5 * AU)), 0.0),
+                                     time_of_flight=200.0 * DAY)
+        assert (first.v1 - snapped.v1).magnitude() < 1e-12
+        cached(r1=self.R1, r2=self.R2, time_of_flight=201.0 * DAY)
+        assert solver.calls == 2
+
+    def test_failures_are_cached(self) -> None:
+        cache = TransferCache()
+        solver = CountingSolver()
+        cached = cache.lambert_solver(solver)
+        for _ in range(2):
+            with pytest.raises(LambertNoConvergence):
+                cached(r1=self.R1, r2=self.R2, time_of_flight=60.0)
+        assert solver.calls == 1
+
+
+class TestPlanner:
+    DEPARTURES: list[float] = [i * 20.0 * DAY for i in range(40)]
+    FLIGHTS: list[float] = [(150.0 + i * 20.0) * DAY for i in range(11)]
+
+    def test_sessions_with_different_epochs_share_transfers(self) -> None:
+        cache = TransferCache()
+        solver = CountingSolver()
+        early = planner_at(EPOCH_JD, cache, solver)
+        late = planner_at(EPOCH_JD + 1.5, cache, solver)
+        first = early.evaluate_transfer("Earth", "Mars", 100.0 * DAY + 10.0, 250.0 * DAY)
+        again = late.evaluate_transfer("Earth", "Mars", 98.5 * DAY, 250.0 * DAY - 15.0)
+        assert first is not None and again is not None
+        assert solver.calls == 1
+        assert first.departure_time == pytest.approx(100.0 * DAY, abs=1e-3)
+        assert again.departure_time == pytest.approx(98.5 * DAY, abs=1e-3)
+        assert again.departure_delta_v == first.departure_delta_v
+        assert early.evaluate_transfer("Earth", "Mars", 0.0, 60.0) is None
+        assert early.evaluate_transfer("Earth", "Mars", 0.0, 60.0) is None
+        assert solver.calls == 2
+
+    def test_repeated_search_is_a_lookup(self) -> None:
+        cache = TransferCache()
+        solver = CountingSolver()
+        planner = planner_at(EPOCH_JD, cache, solver)
+        uncached = MissionPlanner(ephemeris=planner.ephemeris, lambert_solver=solve_lambert_izzo)
+        expected = uncached.plan_transfer("Earth", "Mars", self.DEPARTURES, self.FLIGHTS,
+                                          refine=2)
+        best = planner.plan_transfer("Earth", "Mars", self.DEPARTURES, self.FLIGHTS, refine=2)
+        assert best.total_delta_v == pytest.approx(expected.total_delta_v, rel=1e-6)
+        hits, calls = cache.hits, solver.calls
+        assert planner.plan_transfer("Earth", "Mars", self.DEPARTURES, self.FLIGHTS,
+                                     refine=2) == best
+        assert (cache.hits, solver.calls) == (hits + 1, calls)
+
+    def test_grids_within_a_day_share_one_search(self) -> None:
+        cache = TransferCache()
+        solver = CountingSolver()
+        planner = planner_at(EPOCH_JD, cache, solver)   # midnight; days start at noon
+        bodies = {"Earth": StubOrbitingBody(mass=5.97e24, orbital_period=365.2563),
+                  "Mars": StubOrbitingBody(mass=6.42e23, orbital_period=686.98)}
+        morning = planner.transfer_grid("Earth", "Mars", 3600.0, bodies)
+        later = planner.transfer_grid("Earth", "Mars", 0.5 * DAY - 60.0, bodies)
+        assert later == morning
+        assert morning[0][0] == pytest.approx(0.5 * DAY)
+        assert planner.transfer_grid("Earth", "Mars", 0.5 * DAY + 60.0,
+                                     bodies)[0][0] == pytest.approx(1.5 * DAY)
+
+        best = planner.plan_transfer("Earth", "Mars", *morning)
+        calls = solver.calls
+        # Another session at the same instant, whose clock started a day later.
+        other = planner_at(EPOCH_JD + 1.0, cache, solver)
+        again = other.plan_transfer("Earth", "Mars",
+                                    *other.transfer_grid("Earth", "Mars", -0.9 * DAY, bodies))
+        assert solver.calls == calls
+        assert again.departure_time == pytest.approx(best.departure_time - DAY, abs=1e-3)
+
+    def test_infeasible_search_is_cached(self) -> None:
+        cache = TransferCache()
+        planner = planner_at(EPOCH_JD, cache, CountingSolver())
+        for _ in range(2):
+            with pytest.raises(LambertNoConvergence):
+                planner.plan_transfer("Earth", "Mars", [0.0], [60.0])
+        assert cache.stats()["hits"] == 1
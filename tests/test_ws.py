@@ -0,0 +1,209 @@
+"""WebSocket sessions: server-driven clock, pushes at the client's rate,
+simulation off the event loop."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections.abc import Iterator
+from typing import Any, cast
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from core.trail import TrailPath  # noqa: E402
+from server import clock, session_manager, simulation_pool, ws  # noqa: E402
+from server.serialization import BINARY_SUBPROTOCOL  # noqa: E402
+from server.session import SolaraSession  # noqa: E402
+
+HEAVY_STEP_S: float = 1.0
+STEPS_PER_SECOND: float = 20.0
+
+
+class FakeSession:
+    """Just what ws._dispatch needs; a whole time step burns `work_s` of CPU."""
+
+    def __init__(self, session_id: str, work_s: float = 0.0, playing: bool = False) -> None:
+        self.session_id: str = session_id
+        self.lock = threading.Lock()
+        self.trail = TrailPath(min_separation_km=1.0, max_points=10)
+        self.auto_play: bool = playing
+        self.time_step_s: float = 60.0
+        self.play_direction: float = 1.0
+        self.sim_time_s: float = 0.0
+        self.owed_s: float = 0.0
+        self.work_s: float = work_s
+        self.advancing = threading.Event()
+
+    def advance(self, dt_s: float, deadline: float | None = None) -> float:
+        self.advancing.set()
+        until: float = time.perf_counter() + self.work_s * abs(dt_s) / self.time_step_s
+        while time.perf_counter() < until:
+            pass
+        self.sim_time_s += dt_s
+        return dt_s
+
+    def set_play(self, playing: bool) -> None:
+        self.auto_play = playing
+
+
+class TimeEncoder:
+    """Pushes just the simulated time, as JSON or as bytes."""
+
+    def __init__(self, binary: bool = False) -> None:
+        self.binary: bool = binary
+        self.changed: bool = True
+        self._sim_time_s: float | None = None
+
+    def encode(self, session: FakeSession, trail: list, trail_reset: bool = False) -> Any:
+        self.changed = session.sim_time_s != self._sim_time_s
+        self._sim_time_s = session.sim_time_s
+        if self.binary:
+            return f"{session.sim_time_s}".encode()
+        return {"type": "state", "sim_time_s": session.sim_time_s}
+
+
+@pytest.fixture
+def client(monkeypatch: pytest.MonkeyPatch) -> Iterator[TestClient]:
+    monkeypatch.setattr(ws, "StateEncoder", TimeEncoder)
+    monkeypatch.setattr(session_manager, "_sessions", {})
+    monkeypatch.setattr(session_manager, "_last_seen", {})
+    # Budgets large enough that every step here is served in full (and
+    # FakeSession ignores the step deadline).
+    simulation_pool.configure(cpu_budget_s=100.0)
+    clock.configure(steps_per_second=STEPS_PER_SECOND)
+    app = FastAPI()
+    app.websocket("/ws/session/{session_id}")(ws.session_socket)
+    with TestClient(app) as test_client:
+        yield test_client
+    simulation_pool.configure()
+    clock.configure()
+
+
+def add_session(session: FakeSession) -> FakeSession:
+    # Duck-typed: the socket only touches what FakeSession provides.
+    session_manager._sessions[session.session_id] = cast(SolaraSession, session)
+    session_manager._last_seen[session.session_id] = time.monotonic()
+    return session
+
+
+def receive_until(socket: Any, reached: Any) -> dict[str, Any]:
+    """Read pushes until one satisfies `reached` (pushes also arrive on the
+    push cadence, not only in reply)."""
+    for _ in range(1000):
+        state: dict[str, Any] = socket.receive_json()
+        if reached(state):
+            return state
+    raise AssertionError("state never reached")
+
+
+def test_clock_advances_without_client_messages(client: TestClient) -> None:
+    session = add_session(FakeSession("clock", playing=True))
+    with client.websocket_connect("/ws/session/clock") as socket:
+        socket.send_json({"type": "set_push_rate", "hz": 10.0})
+        started: float = time.perf_counter()
+        pushes: list[dict[str, Any]] = [socket.receive_json() for _ in range(10)]
+        elapsed: float = time.perf_counter() - started
+        socket.send_json({"type": "set_play", "playing": False})
+        receive_until(socket, lambda state: not session.auto_play)
+        time.sleep(0.1)   # a step already under way may still land
+        stopped_at: float = session.sim_time_s
+        time.sleep(0.2)
+        assert session.sim_time_s == stopped_at
+    # About STEPS_PER_SECOND time steps per second of wall time, however
+    # often (here: never) the client speaks.
+    steps: float = pushes[-1]["sim_time_s"] / session.time_step_s
+    assert 0.5 * STEPS_PER_SECOND * elapsed < steps < 1.5 * STEPS_PER_SECOND * elapsed + 2
+    assert 0.5 < elapsed < 2.0   # ten pushes at 10 Hz
+    assert clock.running() == 0   # stopped with its last socket
+
+
+def test_sockets_share_one_clock(client: TestClient) -> None:
+    session = add_session(FakeSession("shared", playing=True))
+    started: float = time.perf_counter()
+    with (client.websocket_connect("/ws/session/shared") as first,
+          client.websocket_connect("/ws/session/shared") as second):
+        first.receive_json()
+        second.receive_json()
+        assert clock.running() == 1
+        time.sleep(0.5)
+        first.send_json({"type": "set_play", "playing": False})
+        receive_until(first, lambda state: not session.auto_play)
+        elapsed: float = time.perf_counter() - started
+    # Two sockets do not double the rate.
+    assert session.sim_time_s / session.time_step_s < 1.5 * STEPS_PER_SECOND * elapsed + 2
+
+
+def test_heavy_session_does_not_delay_others(client: TestClient) -> None:
+    heavy = add_session(FakeSession("heavy", work_s=HEAVY_STEP_S))
+    light = add_session(FakeSession("light"))
+    with (client.websocket_connect("/ws/session/heavy") as heavy_socket,
+          client.websocket_connect("/ws/session/light") as light_socket):
+        started: float = time.perf_counter()
+        heavy_socket.send_json({"type": "step"})
+        assert heavy.advancing.wait(timeout=5.0)
+        latencies: list[float] = []
+        for k in range(1, 4):
+            sent: float = time.perf_counter()
+            light_socket.send_json({"type": "step"})
+            receive_until(light_socket, lambda state: state["sim_time_s"] == 60.0 * k)
+            latencies.append(time.perf_counter() - sent)
+        receive_until(heavy_socket, lambda state: state["sim_time_s"] == 60.0)
+        assert time.perf_counter() - started >= HEAVY_STEP_S
+    assert light.sim_time_s == 180.0
+    assert max(latencies) < 0.25 * HEAVY_STEP_S
+
+
+def test_paused_sessions_push_heartbeats_until_something_changes(client: TestClient) -> None:
+    session = add_session(FakeSession("paused"))
+    with (client.websocket_connect("/ws/session/paused") as socket,
+          client.websocket_connect("/ws/session/paused") as other):
+        socket.receive_json()
+        other.receive_json()
+        # At the default 60 Hz, but quiet: about one push a second.
+        started: float = time.perf_counter()
+        socket.receive_json()
+        socket.receive_json()
+        assert time.perf_counter() - started > 0.5 * ws.QUIET_PUSH_INTERVAL_S
+        # Another socket's step reaches this one at once, not a beat later.
+        sent: float = time.perf_counter()
+        other.send_json({"type": "step"})
+        receive_until(socket, lambda state: state["sim_time_s"] == 60.0)
+        assert time.perf_counter() - sent < 0.5 * ws.QUIET_PUSH_INTERVAL_S
+    assert session.sim_time_s == 60.0
+
+
+def test_binary_frames_are_negotiated_at_connect(client: TestClient) -> None:
+    add_session(FakeSession("binary"))
+    with client.websocket_connect("/ws/session/binary",
+                                  subprotocols=["other", BINARY_SUBPROTOCOL]) as socket:
+        assert socket.accepted_subprotocol == BINARY_SUBPROTOCOL
+        assert socket.receive_bytes() == b"0.0"
+    with client.websocket_connect("/ws/session/binary", subprotocols=["other"]) as socket:
+        assert socket.accepted_subprotocol is None
+        assert socket.receive_json()["sim_time_s"] == 0.0
+
+
+def test_inbox_keeps_controls_in_order_and_bounds_them() -> None:
+    async def scenario() -> tuple[list[dict[str, Any]], list[dict[str, Any]], ws.SocketInbox]:
+        inbox = ws.SocketInbox(max_pending=2)
+        for message in ({"type": "reverse"}, {"type": "step"}, {"type": "set_play"}):
+            inbox.put(message)
+        return await inbox.take(), await inbox.take(timeout=0.01), inbox
+
+    messages, later, inbox = asyncio.run(scenario())
+    assert [message["type"] for message in messages] == ["reverse", "step"]
+    assert later == []
+    assert inbox.dropped == 1
+
+
+def test_push_rate_is_clamped() -> None:
+    assert ws.push_interval_s({"hz": 10.0}) == pytest.approx(0.1)
+    assert ws.push_interval_s({"hz": 1e6}) == pytest.approx(1.0 / ws.MAX_PUSH_HZ)
+    assert ws.push_interval_s({"hz": 0.0}) == pytest.approx(1.0 / ws.MIN_PUSH_HZ)
@@ -4,6 +4,12 @@ const HELP_TEXT =
   "space play | arrows step/timestep | dbl-click/tab follow | m sizes | r reverse | " +
   "h start at | f fly to | v mission | t test drive | i plan | e export | esc reset";
 
+function formatDuration(seconds: number): string {
+  if (seconds >= 86400) return `${(seconds / 86400).toFixed(1)} d`;
+  if (seconds >= 3600) return `${(seconds / 3600).toFixed(1)} h`;
+  return `${Math.round(seconds)} s`;
+}
+
 export class Hud {
   private readonly dateEl: HTMLDivElement;
   private readonly statusEl: HTMLDivElement;
@@ -42,7 +48,8 @@ export class Hud {
     const playState = hud.playing ? (hud.direction > 0 ? "RUNNING" : "REVERSED") : "PAUSED";
     this.statusEl.textContent =
       `Step: ${hud.time_step_name}  [${playState}]   Sizes: ${sizeMode}` +
-      (hud.test_drive ? "   [TEST DRIVE]" : "");
+      (hud.test_drive ? "   [TEST DRIVE]" : "") +
+      (hud.owed_s !== 0 ? `   [catching up ${formatDuration(Math.abs(hud.owed_s))}]` : "");
     this.followEl.textContent = `Following: ${hud.following}`;
     this.missionEl.textContent = hud.mission_label ? `Mission: ${hud.mission_label}` : "";
     if (hud.notification && hud.notification !== this.lastServerNotification) {
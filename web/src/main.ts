@@ -1,6 +1,6 @@
 import * as THREE from "three";
 import "./style.css";
-import { SessionClient } from "./session/client";
+import { BACKGROUND_PUSH_HZ, FOREGROUND_PUSH_HZ, SessionClient } from "./session/client";
 import { BodyScene, SizeMode } from "./scene/bodies";
 import { buildOrbitLines } from "./scene/orbitLines";
 import { ShipScene } from "./scene/ship";
@@ -179,11 +179,14 @@ async function main(): Promise<void> {
     followCamera.onResize();
   });
 
+  document.addEventListener("visibilitychange", () => {
+    client.setPushRate(document.hidden ? BACKGROUND_PUSH_HZ : FOREGROUND_PUSH_HZ);
+  });
+
   let lastMissionLabel = "";
 
   function renderLoop(): void {
     requestAnimationFrame(renderLoop);
-    client.tick();
     const state = client.latestState;
     if (state) {
       for (const [name, { p }] of Object.entries(state.bodies)) {
@@ -192,8 +195,9 @@ async function main(): Promise<void> {
       bodyScene.applySizes(sizeMode, followCamera.camera.position);
       bodyScene.updateSpin(state.sim_time_s);
       shipScene.setPosition(state.ship.p, followCamera.camera.position);
-      if (state.ship.trail_reset) shipScene.clearTrail();
-      shipScene.appendTrail(state.ship.trail_append);
+      const trail = client.takeTrail();
+      if (trail.reset) shipScene.clearTrail();
+      shipScene.appendTrail(trail.points);
 
       const labelTargets = bodyScene.names()
         .map((name) => ({ name, position: bodyScene.position(name), color: "#ffffff" }))
@@ -1,9 +1,13 @@
-import type {
-  BodyCatalogue,
-  Command,
-  MissionCatalogue,
-  OrbitLinesResponse,
-  StateMessage,
+import {
+  applyStateDelta,
+  BINARY_SUBPROTOCOL,
+  decodeStateFrame,
+  type BodyCatalogue,
+  type Command,
+  type MissionCatalogue,
+  type OrbitLinesResponse,
+  type StateDelta,
+  type StateMessage,
 } from "./wireTypes";
 
 // In production this is served from the same origin as the app (Nginx
@@ -12,10 +16,22 @@ import type {
 const API_BASE: string = import.meta.env.DEV ? "http://localhost:8000" : "";
 const WS_BASE: string = import.meta.env.DEV ? "ws://localhost:8000" : `wss://${location.host}`;
 
+// State pushes per second while the tab is shown (one per frame at 60 Hz)
+// and while it is hidden -- the simulation keeps running on the server
+// either way, a hidden tab just doesn't need to see it move.
+export const FOREGROUND_PUSH_HZ = 60;
+export const BACKGROUND_PUSH_HZ = 1;
+
 export class SessionClient {
   private socket: WebSocket | null = null;
   private sessionId: string | null = null;
   latestState: StateMessage | null = null;
+  private bodyNames: string[] = [];
+  // Trail points received but not yet drawn: several pushes can land
+  // between two frames, and each point must be drawn exactly once.
+  private pendingTrail: [number, number, number][] = [];
+  private pendingTrailReset = false;
+  private pushHz = FOREGROUND_PUSH_HZ;
 
   async connect(): Promise<void> {
     const response = await fetch(`${API_BASE}/api/session`, { method: "POST" });
@@ -26,17 +42,36 @@ export class SessionClient {
 
   private openSocket(): Promise<void> {
     return new Promise((resolve, reject) => {
-      const socket = new WebSocket(`${WS_BASE}/ws/session/${this.sessionId}`);
+      // Offer the packed binary state frames; a server that doesn't select
+      // the subprotocol keeps sending JSON, and both decode to StateMessage.
+      const socket = new WebSocket(`${WS_BASE}/ws/session/${this.sessionId}`, [BINARY_SUBPROTOCOL]);
+      socket.binaryType = "arraybuffer";
       let opened = false;
       socket.onopen = () => {
         opened = true;
+        socket.send(JSON.stringify({ type: "set_push_rate", hz: this.pushHz }));
         resolve();
       };
       socket.onerror = (event) => {
         if (!opened) reject(event);
       };
+      // Each socket starts from a full state and then receives only changes.
+      this.latestState = null;
       socket.onmessage = (event) => {
-        this.latestState = JSON.parse(event.data) as StateMessage;
+        let delta: StateDelta;
+        if (event.data instanceof ArrayBuffer) {
+          const frame = decodeStateFrame(event.data, this.bodyNames);
+          delta = frame.delta;
+          this.bodyNames = frame.bodyNames;
+        } else {
+          delta = JSON.parse(event.data) as StateDelta;
+        }
+        this.latestState = applyStateDelta(this.latestState, delta);
+        if (delta.ship?.trail_reset) {
+          this.pendingTrail = [];
+          this.pendingTrailReset = true;
+        }
+        if (delta.ship?.trail_append) this.pendingTrail.push(...delta.ship.trail_append);
       };
       // The server never drops a live session on a dropped socket (a network
       // blip, a backgrounded tab) -- reconnecting to the same session_id
@@ -104,6 +139,15 @@ export class SessionClient {
     return (await response.json()) as T;
   }
 
+  /** Trail points received since the last call (and whether the trail
+   * was replaced first), for the renderer to draw once. */
+  takeTrail(): { reset: boolean; points: [number, number, number][] } {
+    const trail = { reset: this.pendingTrailReset, points: this.pendingTrail };
+    this.pendingTrail = [];
+    this.pendingTrailReset = false;
+    return trail;
+  }
+
   /** Session id for the REST commands above. */
   get id(): string | null {
     return this.sessionId;
@@ -115,10 +159,11 @@ export class SessionClient {
     }
   }
 
-  /** Ask the server to advance one tick and push a fresh state -- called
-   * once per rendered frame, so the sim's speed is tied to time-step choice
-   * exactly as it is in the desktop app's per-frame update(). */
-  tick(): void {
-    this.send({ type: "tick" });
+  /** How often the server should push states to this tab; kept across
+   * reconnects. The simulation's own speed is set server-side (its clock
+   * steps at a fixed rate, scaled by the time-step choice). */
+  setPushRate(hz: number): void {
+    this.pushHz = hz;
+    this.send({ type: "set_push_rate", hz });
   }
 }
@@ -29,6 +29,7 @@ export interface HudState {
   test_drive: boolean;
   mission_label: string;
   notification: string;
+  owed_s: number;
 }
 
 export interface ShipState {
@@ -48,22 +49,137 @@ export interface StateMessage {
   plan: string[];
 }
 
-export type TickCommand = { type: "tick" };
+// After the first (full) push, the server sends only what changed since
+// the previous push on the same socket (server/serialization.py
+// StateEncoder): bodies when sim_time_s moved, the ship when it moved,
+// changed HUD keys, the plan when it changed -- a paused session gets a
+// bare { type: "state" } heartbeat. applyStateDelta folds one into the
+// state the client holds.
+export interface StateDelta {
+  type: "state";
+  sim_time_s?: number;
+  date?: string;
+  bodies?: Record<string, Vec3Pair>;
+  ship?: Partial<ShipState>;
+  hud?: Partial<HudState>;
+  plan?: string[];
+}
+
+export function applyStateDelta(previous: StateMessage | null, delta: StateDelta): StateMessage | null {
+  if (previous === null) {
+    // Only a connection's first push is complete; anything else before it
+    // can't be placed.
+    if (!delta.bodies || !delta.ship?.p || !delta.hud || !delta.plan) return null;
+  }
+  const base = previous ?? ({} as StateMessage);
+  return {
+    type: "state",
+    sim_time_s: delta.sim_time_s ?? base.sim_time_s,
+    date: delta.date ?? base.date,
+    bodies: delta.bodies ?? base.bodies,
+    ship: {
+      p: delta.ship?.p ?? base.ship.p,
+      v: delta.ship?.v ?? base.ship.v,
+      trail_append: delta.ship?.trail_append ?? [],
+      trail_reset: delta.ship?.trail_reset ?? false,
+    },
+    hud: { ...base.hud, ...delta.hud } as HudState,
+    plan: delta.plan ?? base.plan,
+  };
+}
+
+// Binary state frames (server/serialization.py), sent to sockets that
+// offer BINARY_SUBPROTOCOL: the same pushes, with the numeric arrays read
+// in place through typed-array views.
+export const BINARY_SUBPROTOCOL = "solara.state.v2";
+const FRAME_MAGIC = 0x534c;
+const FRAME_VERSION = 2;
+const FRAME_TRAIL_RESET = 0x01;
+const FRAME_VECTORS = 0x02;
+const FRAME_HEADER_BYTES = 24;
+
+interface FrameTail {
+  date?: string;
+  bodies?: string[];
+  hud?: Partial<HudState>;
+  plan?: string[];
+}
+
+const tailDecoder = new TextDecoder();
+
+function triple(values: Float64Array | Float32Array, index: number): [number, number, number] {
+  return [values[3 * index], values[3 * index + 1], values[3 * index + 2]];
+}
+
+/** Decode one frame; body names arrive once per connection, so the caller
+ * passes the last ones seen and keeps the returned `bodyNames`. */
+export function decodeStateFrame(
+  buffer: ArrayBuffer,
+  bodyNames: string[],
+): { delta: StateDelta; bodyNames: string[] } {
+  const header = new DataView(buffer, 0, FRAME_HEADER_BYTES);
+  if (header.getUint16(0, true) !== FRAME_MAGIC || header.getUint8(2) !== FRAME_VERSION) {
+    throw new Error("unsupported state frame");
+  }
+  const flags = header.getUint8(3);
+  const bodyCount = header.getUint16(4, true);
+  const trailCount = header.getUint32(8, true);
+  const tailBytes = header.getUint32(12, true);
+  const simTime = header.getFloat64(16, true);
+
+  const vectors = flags & FRAME_VECTORS ? bodyCount + 1 : 0; // the bodies, then the ship
+  let offset = FRAME_HEADER_BYTES;
+  const positions = new Float64Array(buffer, offset, 3 * vectors);
+  offset += positions.byteLength;
+  const velocities = new Float32Array(buffer, offset, 3 * vectors);
+  offset += velocities.byteLength;
+  const trail = new Float32Array(buffer, offset, 3 * trailCount);
+  offset += trail.byteLength;
+  const tail: FrameTail =
+    tailBytes > 0 ? (JSON.parse(tailDecoder.decode(new Uint8Array(buffer, offset, tailBytes))) as FrameTail) : {};
+
+  const names = tail.bodies ?? bodyNames;
+  const delta: StateDelta = { type: "state", hud: tail.hud, plan: tail.plan };
+  if (tail.date !== undefined) {
+    delta.sim_time_s = simTime;
+    delta.date = tail.date;
+    const bodies: Record<string, Vec3Pair> = {};
+    names.forEach((name, index) => {
+      bodies[name] = { p: triple(positions, index), v: triple(velocities, index) };
+    });
+    delta.bodies = bodies;
+  }
+  const ship: Partial<ShipState> = {};
+  if (vectors > 0) {
+    ship.p = triple(positions, bodyCount);
+    ship.v = triple(velocities, bodyCount);
+  }
+  if (trailCount > 0 || flags & FRAME_TRAIL_RESET) {
+    ship.trail_append = [];
+    for (let index = 0; index < trailCount; index++) ship.trail_append.push(triple(trail, index));
+    ship.trail_reset = (flags & FRAME_TRAIL_RESET) !== 0;
+  }
+  delta.ship = ship;
+  return { delta, bodyNames: names };
+}
+
 export type StepCommand = { type: "step"; direction: number };
 export type SetPlayCommand = { type: "set_play"; playing: boolean };
 export type ReverseCommand = { type: "reverse" };
 export type SetTimeStepCommand = { type: "set_time_step"; index: number };
 export type SetFollowCommand = { type: "set_follow"; target: string };
 export type ToggleTestDriveCommand = { type: "toggle_test_drive" };
+// State pushes per second for this socket (server/ws.py clamps it).
+export type SetPushRateCommand = { type: "set_push_rate"; hz: number };
 
 export type Command =
-  | TickCommand
   | StepCommand
   | SetPlayCommand
   | ReverseCommand
   | SetTimeStepCommand
   | SetFollowCommand
-  | ToggleTestDriveCommand;
+  | ToggleTestDriveCommand
+  | SetPushRateCommand;
 
 export interface OrbitLinesResponse {
   [bodyName: string]: [number, number, number][];